@@ -0,0 +1,113 @@
+#!/usr/bin/env node
+
+/**
+ * API em modo cluster: o processo primário abre API_WORKERS workers, cada um
+ * com o servidor HTTP completo (api-server.js) na mesma porta — o parse do HTML
+ * e a serialização do JSON de usuários diferentes passam a usar núcleos diferentes.
+ *
+ * O primário não atende HTTP: guarda a camada de cache compartilhada e a sessão
+ * HICD de cada host (utils/cluster.js), de modo que um paciente é rastreado uma
+ * vez para todos os workers e cada host tem um login só. Worker que morre é
+ * substituído.
+ *
+ * O orçamento de requisições ao HICD (HICD_MAX_CONCURRENCY, HICD_MIN_INTERVAL_MS)
+ * é do host, não do processo: é dividido entre os workers (no mínimo 1 requisição
+ * simultânea cada). Só o primeiro worker faz o pré-aquecimento.
+ *
+ * Os jobs (/api/jobs) ficam registrados no primário e são consultados de qualquer
+ * worker. O feed de mudanças (/api/feed) é numerado por worker: para pull contínuo
+ * o balanceador deve fixar o cliente num worker.
+ */
+
+require('dotenv').config();
+const cluster = require('cluster');
+const os = require('os');
+
+const WORKERS = parseInt(process.env.API_WORKERS) ||
+    (typeof os.availableParallelism === 'function' ? os.availableParallelism() : os.cpus().length);
+const REINICIO_MS = 1000;
+
+/** Ambiente do worker da posição `indice` (0..WORKERS-1). */
+function ambienteDoWorker(indice) {
+    const concorrencia = parseInt(process.env.HICD_MAX_CONCURRENCY) || 6;
+    const intervaloMs = parseInt(process.env.HICD_MIN_INTERVAL_MS) || 0;
+
+    const env = { HICD_MAX_CONCURRENCY: String(Math.max(1, Math.floor(concorrencia / WORKERS))) };
+    if (intervaloMs) env.HICD_MIN_INTERVAL_MS = String(intervaloMs * WORKERS);
+    if (process.env.HICD_MAX_CONCURRENCY_SEGUNDO_PLANO) {
+        env.HICD_MAX_CONCURRENCY_SEGUNDO_PLANO = String(Math.max(1,
+            Math.floor(parseInt(process.env.HICD_MAX_CONCURRENCY_SEGUNDO_PLANO) / WORKERS)));
+    }
+    if (indice > 0) env.PREWARM_CLINICAS = '';
+    return env;
+}
+
+function iniciarPrimario() {
+    const { CoordenadorCluster } = require('./api/utils/cluster');
+
+    // 'advanced': structured clone no IPC (Map nas observações do feed, datas)
+    cluster.setupPrimary({ serialization: 'advanced' });
+
+    const coordenador = new CoordenadorCluster();
+    const indices = new Map(); // worker.id → posição
+    let encerrando = false;
+
+    const abrirWorker = (indice) => {
+        const worker = cluster.fork(ambienteDoWorker(indice));
+        indices.set(worker.id, indice);
+        coordenador.anexar(worker);
+    };
+
+    console.log(`🔄 Iniciando API HICD em modo cluster: ${WORKERS} workers (primário ${process.pid})`);
+    for (let i = 0; i < WORKERS; i++) abrirWorker(i);
+
+    cluster.on('exit', (worker, code, signal) => {
+        const indice = indices.get(worker.id);
+        indices.delete(worker.id);
+        if (encerrando) {
+            if (indices.size === 0) process.exit(0);
+            return;
+        }
+        console.warn(`⚠️ Worker ${worker.process.pid} saiu (${signal || code}) — reiniciando em ${REINICIO_MS}ms`);
+        setTimeout(() => abrirWorker(indice), REINICIO_MS);
+    });
+
+    const encerrar = (sinal) => {
+        console.log(`\n📴 Recebido ${sinal}. Parando workers graciosamente...`);
+        encerrando = true;
+        for (const worker of Object.values(cluster.workers)) worker.process.kill('SIGTERM');
+    };
+    process.on('SIGTERM', () => encerrar('SIGTERM'));
+    process.on('SIGINT', () => encerrar('SIGINT'));
+}
+
+function iniciarWorker() {
+    const { ClienteCluster } = require('./api/utils/cluster');
+    const cache = require('./api/utils/cache');
+    const sharedCrawler = require('./api/shared-crawler');
+    const { ChangeFeed } = require('./api/utils/change-feed');
+    const SignedPrescriptionCache = require('./src/services/signed-prescription-cache');
+    const jobsController = require('./api/controllers/jobs');
+
+    const cliente = ClienteCluster.conectar(process);
+    cache.usarCamadaCompartilhada(cliente);
+    cliente.on('sessao', ({ host, sessao }) => sharedCrawler.adotarSessao(host, sessao));
+    // DELETE /api/cache/clear num worker também limpa as prescrições assinadas dos outros
+    cliente.on('invalidar', ({ operacao }) => {
+        if (operacao === 'clear') SignedPrescriptionCache.compartilhado.clear();
+    });
+    cliente.on('feed', ({ tipo, host, prontuario, itens }) => ChangeFeed.compartilhado.observar(tipo, host, prontuario, itens));
+    // Job criado num worker é consultado (polling, eventos, resultado) de qualquer outro
+    jobsController.jobs.usarRegistroCompartilhado(cliente);
+
+    // Sem o primário não há camada compartilhada nem coordenação de sessão
+    process.on('disconnect', () => process.exit(1));
+
+    require('./api-server').startServer();
+}
+
+if (cluster.isPrimary) {
+    iniciarPrimario();
+} else {
+    iniciarWorker();
+}
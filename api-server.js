@@ -1,11 +1,11 @@
 #!/usr/bin/env node
 
 const app = require('./api/server');
-const { requestLogger, rateLimit } = require('./api/middleware/auth');
+const { requestLogger } = require('./api/middleware/auth');
+const prewarm = require('./api/prewarm');
 
 // Aplicar middlewares globais
 app.use(requestLogger);
-app.use(rateLimit());
 
 // Configurar porta
 const PORT = process.env.PORT || 3000;
@@ -36,6 +36,9 @@ function startServer() {
             console.log(`    GET  http://${HOST}:${PORT}/api/pacientes/:prontuario/exames`);
             console.log(`    GET  http://${HOST}:${PORT}/api/pacientes/:prontuario/prescricoes`);
             console.log('\n🔧 Pressione Ctrl+C para parar o servidor\n');
+
+            // Pré-aquecimento do cache (só com PREWARM_CLINICAS configurado)
+            prewarm.iniciar();
         });
 
         // Tratamento de sinais do sistema
@@ -0,0 +1,96 @@
+const { TIPOS_FEED, ChangeFeed } = require('../utils/change-feed');
+const { MODOS_STREAM, abrirStream } = require('../utils/stream');
+
+const FEED_HEARTBEAT_MS = parseInt(process.env.FEED_HEARTBEAT_MS) || 25 * 1000;
+
+/** "a,b" → ['a', 'b']; vazio → undefined (sem filtro). */
+function listaDe(valor) {
+    const lista = String(valor || '').split(',').map(v => v.trim()).filter(Boolean);
+    return lista.length > 0 ? lista : undefined;
+}
+
+class FeedController {
+    constructor() {
+        this.feed = ChangeFeed.compartilhado;
+    }
+
+    /** Filtros comuns a pull e stream; null (e 400 respondido) se inválidos. */
+    lerFiltros(req, res) {
+        const tipos = listaDe(req.query.tipos);
+        const invalidos = (tipos || []).filter(t => !TIPOS_FEED.includes(t));
+        if (invalidos.length > 0) {
+            res.status(400).json({
+                success: false,
+                error: 'Parâmetro inválido',
+                message: `Os tipos devem ser um ou mais de: ${TIPOS_FEED.join(', ')}`
+            });
+            return null;
+        }
+        // Cada cliente vê só o feed do próprio host
+        return { host: req.hicdHost || null, tipos, prontuarios: listaDe(req.query.prontuarios) };
+    }
+
+    // Eventos desde o cursor (pull)
+    obterEventos(req, res) {
+        const filtros = this.lerFiltros(req, res);
+        if (!filtros) return;
+
+        const limite = Math.min(parseInt(req.query.limite) || 500, 5000);
+        const { eventos, cursor, completo, mais } = this.feed.desde(req.query.since, { ...filtros, limite });
+
+        res.json({
+            success: true,
+            cursor,
+            completo,
+            mais,
+            total: eventos.length,
+            data: eventos
+        });
+    }
+
+    // Eventos em stream: primeiro os pendentes desde o cursor, depois os novos conforme publicados
+    assinar(req, res) {
+        const filtros = this.lerFiltros(req, res);
+        if (!filtros) return;
+
+        const { modo = 'sse' } = req.query;
+        if (!MODOS_STREAM.includes(modo)) {
+            return res.status(400).json({
+                success: false,
+                error: 'Parâmetro inválido',
+                message: `O modo deve ser um de: ${MODOS_STREAM.join(', ')}`
+            });
+        }
+
+        // EventSource reconectando manda o último id recebido
+        const since = req.query.since || req.headers['last-event-id'];
+        const pendentes = since
+            ? this.feed.desde(since, { ...filtros, limite: Infinity })
+            : { eventos: [], cursor: this.feed.cursorAtual(), completo: true };
+
+        const emitir = abrirStream(res, modo);
+        const corresponde = (evento) => evento.host === filtros.host
+            && (!filtros.tipos || filtros.tipos.includes(evento.tipo))
+            && (!filtros.prontuarios || filtros.prontuarios.includes(evento.prontuario));
+        const enviar = (evento) => {
+            if (corresponde(evento)) emitir('mudanca', evento, evento.cursor);
+        };
+
+        emitir('inicio', { cursor: pendentes.cursor, completo: pendentes.completo, pendentes: pendentes.eventos.length });
+        pendentes.eventos.forEach(enviar);
+
+        this.feed.on('evento', enviar);
+        // Comentário/linha periódica mantém a conexão viva através de proxies
+        const heartbeat = setInterval(() => emitir('heartbeat', { cursor: this.feed.cursorAtual() }), FEED_HEARTBEAT_MS);
+        res.on('close', () => {
+            clearInterval(heartbeat);
+            this.feed.off('evento', enviar);
+        });
+    }
+
+    obterStats(req, res) {
+        res.json({ success: true, data: this.feed.getStats() });
+    }
+}
+
+module.exports = new FeedController();
@@ -0,0 +1,133 @@
+const JobManager = require('../utils/job-manager');
+const { abrirStream } = require('../utils/stream');
+const executarHandler = require('../utils/executar-handler');
+const pacientesController = require('./pacientes');
+
+// tipo → método do PacientesController e parâmetros de query aceitos
+const TIPOS_JOB = {
+    exames: { metodo: 'obterExamesPaciente', parametros: ['formato', 'incluirResultados', 'fields'] },
+    evolucoes: { metodo: 'obterEvolucoesPaciente', parametros: ['formato', 'limite', 'delta', 'fields'] },
+    prescricoes: { metodo: 'obterPrescricaoPaciente', parametros: [] },
+    analise: { metodo: 'obterAnaliseClinica', parametros: [] }
+};
+
+class JobsController {
+    constructor() {
+        this.jobs = new JobManager();
+    }
+
+    // Criar job de busca (retorna o id imediatamente)
+    async criarJob(req, res) {
+        try {
+            const { tipo, prontuario, parametros = {} } = req.body || {};
+            const definicao = TIPOS_JOB[tipo];
+
+            if (!definicao) {
+                return res.status(400).json({
+                    success: false,
+                    error: 'Tipo inválido',
+                    message: `O tipo deve ser um de: ${Object.keys(TIPOS_JOB).join(', ')}`
+                });
+            }
+
+            if (!prontuario || String(prontuario).trim() === '') {
+                return res.status(400).json({
+                    success: false,
+                    error: 'Parâmetro obrigatório',
+                    message: 'O prontuário é obrigatório'
+                });
+            }
+
+            // Só os parâmetros que o endpoint síncrono entende, como strings de query
+            const query = {};
+            for (const nome of definicao.parametros) {
+                if (parametros[nome] !== undefined && parametros[nome] !== null) query[nome] = String(parametros[nome]);
+            }
+
+            const descricao = { tipo, host: req.hicdHost, prontuario: String(prontuario).trim(), parametros: query };
+            const { job, reaproveitado } = this.jobs.criar(descricao, (reportarProgresso) => executarHandler(pacientesController, definicao.metodo, {
+                params: { prontuario: descricao.prontuario },
+                query,
+                headers: {},
+                hicdHost: req.hicdHost,
+                jobProgresso: reportarProgresso
+            }));
+
+            res.status(202).json({
+                success: true,
+                reaproveitado,
+                job: this.jobs.resumo(job),
+                links: {
+                    status: `/api/jobs/${job.id}`,
+                    eventos: `/api/jobs/${job.id}/eventos`,
+                    resultado: `/api/jobs/${job.id}/resultado`
+                }
+            });
+        } catch (error) {
+            console.error('Erro ao criar job:', error);
+            res.status(500).json({
+                success: false,
+                error: 'Erro ao criar job',
+                message: error.message
+            });
+        }
+    }
+
+    /** Job do host da requisição (jobs de outro host ficam invisíveis). */
+    async buscarJob(req, res) {
+        const job = await this.jobs.localizar(req.params.id);
+        if (!job || job.host !== (req.hicdHost || null)) {
+            res.status(404).json({
+                success: false,
+                error: 'Job não encontrado',
+                message: `Job "${req.params.id}" não existe ou já expirou`
+            });
+            return null;
+        }
+        return job;
+    }
+
+    // Estado e progresso do job (polling)
+    async obterJob(req, res) {
+        const job = await this.buscarJob(req, res);
+        if (!job) return;
+        res.json({ success: true, job: this.jobs.resumo(job) });
+    }
+
+    // Resultado: o mesmo corpo (e status) do endpoint síncrono; 202 enquanto o job roda
+    async obterResultado(req, res) {
+        const job = await this.buscarJob(req, res);
+        if (!job) return;
+
+        if (!job.resultado) {
+            return res.status(202).json({ success: true, job: this.jobs.resumo(job) });
+        }
+        res.status(job.resultado.status).json(job.resultado.body);
+    }
+
+    // Progresso em Server-Sent Events até o job terminar
+    async assinarEventos(req, res) {
+        const job = await this.buscarJob(req, res);
+        if (!job) return;
+
+        const emitir = abrirStream(res, 'sse');
+
+        const enviar = (resumo) => {
+            emitir(resumo.ativo ? 'progresso' : 'fim', resumo);
+            if (!resumo.ativo) {
+                this.jobs.off(job.id, enviar);
+                res.end();
+            }
+        };
+
+        req.on('close', () => this.jobs.off(job.id, enviar));
+        this.jobs.on(job.id, enviar);
+        enviar(this.jobs.resumo(job));
+    }
+
+    obterStats(req, res) {
+        res.json({ success: true, data: this.jobs.getStats() });
+    }
+}
+
+module.exports = new JobsController();
@@ -0,0 +1,100 @@
+const cache = require('../utils/cache');
+const { MODOS_STREAM, abrirStream } = require('../utils/stream');
+const { executarLote } = require('../utils/agendador-lote');
+const executarHandler = require('../utils/executar-handler');
+const { RECURSOS_PACIENTE } = require('../utils/recursos-paciente');
+const pacientesController = require('./pacientes');
+
+const LOTE_MAX_ITENS = parseInt(process.env.LOTE_MAX_ITENS) || 200;
+
+class LoteController {
+    // Busca vários recursos de vários pacientes, com resultados em stream (NDJSON ou SSE)
+    async buscarLote(req, res) {
+        const { prontuarios, recursos = ['cadastro'], parametros = {} } = req.body || {};
+        const { modo = 'ndjson' } = req.query;
+
+        if (!Array.isArray(prontuarios) || prontuarios.length === 0) {
+            return res.status(400).json({
+                success: false,
+                error: 'Parâmetro obrigatório',
+                message: 'Informe "prontuarios" como uma lista não vazia'
+            });
+        }
+
+        const invalidos = (Array.isArray(recursos) ? recursos : [recursos]).filter(r => !RECURSOS_PACIENTE[r]);
+        if (!Array.isArray(recursos) || recursos.length === 0 || invalidos.length > 0) {
+            return res.status(400).json({
+                success: false,
+                error: 'Recurso inválido',
+                message: `Os recursos devem ser um ou mais de: ${Object.keys(RECURSOS_PACIENTE).join(', ')}`
+            });
+        }
+
+        if (!MODOS_STREAM.includes(modo)) {
+            return res.status(400).json({
+                success: false,
+                error: 'Parâmetro inválido',
+                message: `O modo deve ser um de: ${MODOS_STREAM.join(', ')}`
+            });
+        }
+
+        const lista = [...new Set(prontuarios.map(p => String(p).trim()).filter(Boolean))];
+        if (lista.length * recursos.length > LOTE_MAX_ITENS) {
+            return res.status(400).json({
+                success: false,
+                error: 'Lote grande demais',
+                message: `O lote pode ter no máximo ${LOTE_MAX_ITENS} itens (prontuários × recursos); recebidos ${lista.length * recursos.length}`
+            });
+        }
+
+        // Só os parâmetros que o endpoint síncrono entende, como strings de query
+        const queries = {};
+        for (const recurso of recursos) {
+            queries[recurso] = {};
+            for (const nome of RECURSOS_PACIENTE[recurso].parametros) {
+                const valor = (parametros[recurso] || {})[nome];
+                if (valor !== undefined && valor !== null) queries[recurso][nome] = String(valor);
+            }
+        }
+
+        // Ordem prontuário → recurso: cada paciente tende a ficar completo cedo
+        const tarefas = lista.flatMap(prontuario => recursos.map(recurso => ({
+            chave: `${recurso}:${prontuario}`,
+            prontuario,
+            recurso
+        })));
+
+        const emitir = abrirStream(res, modo);
+        const controle = new AbortController();
+        res.on('close', () => { if (!res.writableEnded) controle.abort(); });
+        const inicio = Date.now();
+
+        emitir('inicio', { prontuarios: lista.length, recursos, itens: tarefas.length });
+
+        try {
+            const stats = await executarLote(tarefas, {
+                sinal: controle.signal,
+                emCache: ({ prontuario, recurso }) => RECURSOS_PACIENTE[recurso]
+                    .chaves(prontuario, queries[recurso], req.hicdHost)
+                    .every(chave => cache.getExpiresAt(chave) !== null),
+                executar: ({ prontuario, recurso }) => executarHandler(pacientesController, RECURSOS_PACIENTE[recurso].metodo, {
+                    params: { prontuario },
+                    query: queries[recurso],
+                    headers: {},
+                    hicdHost: req.hicdHost
+                }),
+                onResultado: ({ prontuario, recurso }, { status, body }, doCache) => {
+                    emitir('resultado', { prontuario, recurso, status, doCache, body });
+                }
+            });
+
+            emitir('fim', { ...stats, duracaoMs: Date.now() - inicio });
+        } catch (error) {
+            console.error('Erro no lote de pacientes:', error);
+            emitir('erro', { error: 'Erro ao processar lote', message: error.message });
+        }
+        res.end();
+    }
+}
+
+module.exports = new LoteController();
@@ -1,5 +1,12 @@
 const { Paciente, Evolucao, Exame } = require('../models');
 const cache = require('../utils/cache');
+const EvolucaoStore = require('../../src/core/evolucao-store');
+const { MODOS_STREAM, abrirStream } = require('../utils/stream');
+const { naoModificado } = require('../utils/etag');
+const { compilarProjecao, projecaoInclui } = require('../utils/projecao');
+const { DadosBrutos } = require('../utils/dados-brutos');
+
+const EVOLUCOES_DIA_TTL_MS = parseInt(process.env.EVOLUCOES_DIA_TTL_MS) || 60 * 1000;
 const sharedCrawler = require('../shared-crawler');
 
 class PacientesController {
@@ -7,6 +14,11 @@ class PacientesController {
         return sharedCrawler.getCrawler(host);
     }
 
+    /** Dados brutos do paciente compartilhados entre endpoints, contados para a visão `visao`. */
+    dadosBrutos(visao, crawler, prontuario, req) {
+        return DadosBrutos.compartilhado.paraVisao(visao, { crawler, prontuario, host: req.hicdHost });
+    }
+
     // Buscar paciente por prontuário
     async buscarPaciente(req, res) {
         try {
@@ -27,7 +39,12 @@ class PacientesController {
 
             // Buscar cadastro do paciente (que funciona como busca por prontuário)
             if (prontuario) {
-                const cadastroRaw = await crawler.getPacienteCadastro(prontuario);
+                const cadastroRaw = await this.dadosBrutos('busca', crawler, prontuario, req)
+                    .obter('cadastro')
+                    .catch(error => {
+                        if (error.message.startsWith('CADASTRO_NAO_ENCONTRADO:')) return null;
+                        throw error;
+                    });
 
                 if (!cadastroRaw) {
                     return res.status(404).json({
@@ -54,8 +71,25 @@ class PacientesController {
                     searchTerm: prontuario
                 });
             } else {
-                const pacientesRaw = await crawler.getPacientesClinica(0, '', nome);
-                console.log(pacientesRaw);
+                // O diretório local só tem os pacientes das listas de clínica já
+                // carregadas: responde sozinho apenas quando cobre o hospital
+                // inteiro. Caso contrário o HICD é consultado e os cadastros já
+                // guardados localmente são reaproveitados.
+                const locais = crawler.buscarPacientesPorNomeLocal(nome);
+                let pacientesRaw = locais;
+                let source = 'diretorio';
+
+                if (!crawler.diretorioCompleto()) {
+                    const doHicd = await crawler.getPacientesClinica(0, '', nome);
+                    const porProntuario = new Map(locais.map(p => [String(p.prontuario), p]));
+                    pacientesRaw = (doHicd || []).map(p => {
+                        const local = porProntuario.get(String(p.prontuario));
+                        porProntuario.delete(String(p.prontuario));
+                        return local && local.cadastro ? { ...p, cadastro: local.cadastro } : p;
+                    });
+                    pacientesRaw.push(...porProntuario.values());
+                    source = 'hicd';
+                }
 
                 if (!pacientesRaw || pacientesRaw.length === 0) {
                     return res.status(404).json({
@@ -70,7 +104,8 @@ class PacientesController {
                 for (let i = 0; i < pacientesRaw.length; i += BATCH_SIZE) {
                     const batch = pacientesRaw.slice(i, i + BATCH_SIZE);
                     const batchResults = await Promise.all(batch.map(async (p) => {
-                        const pac = await crawler.getPacienteCadastro(p.prontuario);
+                        // Cadastro guardado no diretório evita o round trip ao HICD
+                        const pac = p.cadastro || await crawler.getPacienteCadastro(p.prontuario);
                         const retorn = Paciente.fromParserData(pac, p.prontuario);
                         retorn.internacao.clinicaLeito = p.clinicaLeito;
                         return retorn;
@@ -81,7 +116,8 @@ class PacientesController {
                 res.json({
                     success: true,
                     data: pacientes,
-                    searchTerm: nome
+                    searchTerm: nome,
+                    source
                 });
             }
         } catch (error) {
@@ -109,16 +145,13 @@ class PacientesController {
 
             const crawler = await this.initCrawler(req.hicdHost);
 
+            const brutos = this.dadosBrutos('detalhes', crawler, prontuario, req);
             const cacheKey = cache.generateKey('cadastro', prontuario, {}, req.hicdHost);
 
             const dadosCompletos = await cache.getOrSet(cacheKey, async () => {
                 console.log(`Obtendo detalhes do paciente: ${prontuario}`);
 
-                const cadastroRaw = await crawler.getPacienteCadastro(prontuario);
-
-                if (!cadastroRaw) {
-                    throw new Error(`CADASTRO_NAO_ENCONTRADO:Paciente com prontuário "${prontuario}" não foi encontrado`);
-                }
+                const cadastroRaw = await brutos.obter('cadastro');
 
                 const paciente = Paciente.fromParserData(cadastroRaw, prontuario);
 
@@ -162,6 +195,8 @@ class PacientesController {
                 return dados;
             });
 
+            if (naoModificado(req, res, [cacheKey])) return;
+
             res.json({
                 success: true,
                 data: dadosCompletos
@@ -196,7 +231,9 @@ class PacientesController {
     async obterEvolucoesPaciente(req, res) {
         try {
             const { prontuario } = req.params;
-            const { limite = 1000, formato = 'detalhado' } = req.query;
+            const { limite = 1000, formato = 'detalhado', delta, fields } = req.query;
+            const comoDelta = delta === 'true';
+            const projecao = compilarProjecao('evolucoes', fields);
 
             if (!prontuario) {
                 return res.status(400).json({
@@ -208,20 +245,17 @@ class PacientesController {
 
             const crawler = await this.initCrawler(req.hicdHost);
 
-            // Gerar chave do cache
+            const brutos = this.dadosBrutos('evolucoes', crawler, prontuario, req);
+            // Visão derivada: cacheada por limite/formato sobre a lista bruta compartilhada
             const cacheKey = cache.generateKey('evolucoes', prontuario, { limite, formato }, req.hicdHost);
 
             // Tentar buscar no cache primeiro
             const resultadoCache = await cache.getOrSet(cacheKey, async () => {
                 console.log(`Obtendo evoluções do paciente: ${prontuario}`);
 
-                // Buscar evoluções do paciente
-                const evolucoesRaw = await crawler.getEvolucoes(prontuario);
-
-
-                if (!evolucoesRaw || evolucoesRaw.length === 0) {
-                    throw new Error(`Nenhuma evolução médica encontrada para o prontuário "${prontuario}"`);
-                }
+                // Forma guardada: textos em chunks, que a visão detalhada reaproveita
+                const bruto = await brutos.obter('evolucoes', { compacto: true });
+                const evolucoesRaw = EvolucaoStore.expandirEvolucoes(bruto);
 
                 // Converter para o modelo Evolucao
                 const evolucoes = evolucoesRaw
@@ -238,9 +272,20 @@ class PacientesController {
 
                 // Formatar resultado baseado no parâmetro formato
                 let resultado;
+                let textos = null;
+                let idsTexto = null;
 
                 if (formato === 'detalhado') {
-                    resultado = evolucoesFiltradas.map(evolucao => evolucao.toCompleto());
+                    // Textos ficam nos chunks da lista bruta (a mesma cópia, não uma nova);
+                    // o item do cache guarda só os ids
+                    textos = bruto.textos;
+                    idsTexto = evolucoesFiltradas.map((evolucao, i) =>
+                        evolucao.conteudo.textoCompleto === null ? null : bruto.idsTexto[i]);
+                    resultado = evolucoesFiltradas.map(evolucao => {
+                        const { conteudo, ...completo } = evolucao.toCompleto();
+                        const { textoCompleto, ...restoConteudo } = conteudo;
+                        return { ...completo, conteudo: restoConteudo };
+                    });
                 } else if (formato === 'clinico') {
                     resultado = evolucoesFiltradas.map(evolucao => evolucao.toDadosClinicos());
                 } else {
@@ -250,6 +295,8 @@ class PacientesController {
 
                 return {
                     data: resultado,
+                    textos,
+                    idsTexto,
                     total: evolucoesRaw.length,
                     exibindo: resultado.length,
                     resumoGeral: {
@@ -259,17 +306,42 @@ class PacientesController {
                 };
             });
 
+            if (naoModificado(req, res, [cacheKey])) return;
+
+            // Textos só são remontados se a projeção os pede
+            const comTextos = Boolean(resultadoCache.textos)
+                && (projecaoInclui(projecao, 'conteudo.textoCompleto') || projecaoInclui(projecao, 'conteudo.delta'));
+            const data = comTextos ? EvolucaoStore.materializar(resultadoCache, comoDelta) : resultadoCache.data;
+
             res.json({
                 success: true,
                 prontuario: prontuario,
-                data: resultadoCache.data,
+                data: projecao ? projecao.projetar(data) : data,
                 total: resultadoCache.total,
                 exibindo: resultadoCache.exibindo,
                 formato: formato,
+                campos: projecao ? projecao.campos : null,
+                delta: comTextos && comoDelta,
                 limite: parseInt(limite) > 0 ? parseInt(limite) : null,
                 resumoGeral: resultadoCache.resumoGeral
             });
         } catch (error) {
+            if (error.message.startsWith('CAMPOS_INVALIDOS:')) {
+                return res.status(400).json({
+                    success: false,
+                    error: 'Parâmetro inválido',
+                    message: error.message.replace('CAMPOS_INVALIDOS:', '')
+                });
+            }
+
+            if (error.message.startsWith('EVOLUCOES_NAO_ENCONTRADAS:')) {
+                return res.status(404).json({
+                    success: false,
+                    error: 'Evoluções não encontradas',
+                    message: error.message.replace('EVOLUCOES_NAO_ENCONTRADAS:', '')
+                });
+            }
+
             console.error('Erro ao obter evoluções do paciente:', error);
 
             if (error.message.includes('encontrada') || error.message.includes('processadas')) {
@@ -303,25 +375,31 @@ class PacientesController {
 
             const crawler = await this.initCrawler(req.hicdHost);
 
+            const brutos = this.dadosBrutos('analise', crawler, prontuario, req);
             const cacheKey = cache.generateKey('analise', prontuario, {}, req.hicdHost);
 
             const analise = await cache.getOrSet(cacheKey, async () => {
                 console.log(`Analisando clinicamente o paciente: ${prontuario}`);
 
-                // Buscar cadastro, evoluções e exames em paralelo (são independentes entre si)
+                // Cadastro, evoluções e exames em paralelo, dos mesmos brutos que os demais
+                // endpoints usam — o que já foi buscado para eles não volta ao HICD
                 const [cadastroRaw, evolucoesRaw, examesRaw] = await Promise.all([
-                    crawler.getPacienteCadastro(prontuario),
-                    crawler.getEvolucoes(prontuario),
-                    crawler.getExames(prontuario).catch(err => {
+                    brutos.obter('cadastro').catch(err => {
+                        if (err.message.startsWith('CADASTRO_NAO_ENCONTRADO:')) {
+                            throw new Error(`ANALISE_NAO_ENCONTRADA:${err.message.replace('CADASTRO_NAO_ENCONTRADO:', '')}`);
+                        }
+                        throw err;
+                    }),
+                    brutos.obter('evolucoes').catch(err => {
+                        if (err.message.startsWith('EVOLUCOES_NAO_ENCONTRADAS:')) return [];
+                        throw err;
+                    }),
+                    brutos.obter('exames').catch(err => {
                         console.warn(`Erro ao buscar exames: ${err.message}`);
                         return [];
                     })
                 ]);
 
-                if (!cadastroRaw) {
-                    throw new Error(`ANALISE_NAO_ENCONTRADA:Paciente com prontuário "${prontuario}" não foi encontrado`);
-                }
-
                 const paciente = Paciente.fromParserData(cadastroRaw, prontuario);
 
                 const evolucoes = evolucoesRaw ?
@@ -371,6 +449,8 @@ class PacientesController {
                 };
             });
 
+            if (naoModificado(req, res, [cacheKey])) return;
+
             res.json({ success: true, data: analise });
         } catch (error) {
             if (error.message.startsWith('ANALISE_NAO_ENCONTRADA:')) {
@@ -395,8 +475,9 @@ class PacientesController {
     async obterExamesPaciente(req, res) {
         try {
             const { prontuario } = req.params;
-            const { formato = 'detalhado', incluirResultados = 'false' } = req.query;
+            const { formato = 'detalhado', incluirResultados = 'false', fields } = req.query;
             const incluir = incluirResultados === 'true';
+            const projecao = compilarProjecao('exames', fields);
 
             if (!prontuario) {
                 return res.status(400).json({
@@ -408,26 +489,24 @@ class PacientesController {
 
             const crawler = await this.initCrawler(req.hicdHost);
 
-            // Cache 1: lista bruta de requisições — compartilhada entre todos os formatos
-            const rawKey = cache.generateKey('exames-raw', prontuario, {}, req.hicdHost);
-            const examesRaw = await cache.getOrSet(rawKey, async () => {
-                console.log(`Buscando exames brutos do paciente: ${prontuario}`);
-                const raw = await crawler.getExames(prontuario);
-                if (!raw || raw.length === 0) {
-                    throw new Error(`EXAMES_NAO_ENCONTRADOS:Nenhum exame encontrado para o prontuário "${prontuario}"`);
-                }
-                return raw;
-            });
+            const brutos = this.dadosBrutos('exames', crawler, prontuario, req);
 
-            // Cache 2: resultados completos (N+1) — compartilhado entre formatos quando incluirResultados=true
-            let exames;
+            // Bruto 1: lista de requisições — compartilhada entre todos os formatos, a análise e o stream
+            const examesRaw = await brutos.obter('exames');
+
+            // Bruto 2: resultados completos (N+1) — compartilhado entre formatos quando incluirResultados=true
+            const chavesCache = [brutos.chave('exames')];
+            let resultadosCompletos = null;
             if (incluir) {
-                const resultadosKey = cache.generateKey('exames-resultados', prontuario, {}, req.hicdHost);
-                const resultadosCompletos = await cache.getOrSet(resultadosKey, async () => {
-                    console.log(`Buscando resultados dos exames do paciente: ${prontuario}`);
-                    return crawler.evolutionService.getResultadosExames(prontuario, {}, examesRaw);
-                });
+                chavesCache.push(brutos.chave('resultados'));
+                resultadosCompletos = await brutos.obter('resultados', { onProgresso: req.jobProgresso });
+            }
+
+            // Dados inalterados desde a última resposta ao cliente: 304 sem converter nem serializar
+            if (naoModificado(req, res, chavesCache)) return;
 
+            let exames;
+            if (incluir) {
                 exames = (resultadosCompletos && resultadosCompletos.length > 0)
                     ? resultadosCompletos.map(r => Exame.fromResultadosCompletos(r)).filter(Boolean)
                     : examesRaw.map(r => Exame.fromParserData(r)).filter(Boolean);
@@ -473,12 +552,21 @@ class PacientesController {
             res.json({
                 success: true,
                 prontuario,
-                data: resultado,
+                data: projecao ? projecao.projetar(resultado) : resultado,
                 formato,
+                campos: projecao ? projecao.campos : null,
                 incluirResultados: incluir,
                 estatisticas
             });
         } catch (error) {
+            if (error.message.startsWith('CAMPOS_INVALIDOS:')) {
+                return res.status(400).json({
+                    success: false,
+                    error: 'Parâmetro inválido',
+                    message: error.message.replace('CAMPOS_INVALIDOS:', '')
+                });
+            }
+
             console.error('Erro ao obter exames do paciente:', error);
 
             if (error.message.startsWith('EXAMES_NAO_ENCONTRADOS:')) {
@@ -505,6 +593,96 @@ class PacientesController {
         }
     }
 
+    // Resultados de exames em stream (SSE ou NDJSON): cada requisição é enviada assim que a
+    // sua página de impressão é parseada, com eventos de progresso
+    async streamExamesPaciente(req, res) {
+        const { prontuario } = req.params;
+        const { formato = 'resultados', modo = 'sse' } = req.query;
+
+        if (!MODOS_STREAM.includes(modo)) {
+            return res.status(400).json({
+                success: false,
+                error: 'Parâmetro inválido',
+                message: `O modo deve ser um de: ${MODOS_STREAM.join(', ')}`
+            });
+        }
+
+        let crawler;
+        let brutos;
+        let examesRaw;
+        try {
+            crawler = await this.initCrawler(req.hicdHost);
+            brutos = this.dadosBrutos('exames-stream', crawler, prontuario, req);
+            examesRaw = await brutos.obter('exames');
+        } catch (error) {
+            if (error.message.startsWith('EXAMES_NAO_ENCONTRADOS:')) {
+                return res.status(404).json({
+                    success: false,
+                    error: 'Exames não encontrados',
+                    message: error.message.replace('EXAMES_NAO_ENCONTRADOS:', '')
+                });
+            }
+            console.error('Erro ao iniciar stream de exames:', error);
+            return res.status(500).json({
+                success: false,
+                error: 'Erro ao obter exames do paciente',
+                message: error.message
+            });
+        }
+
+        const emitir = abrirStream(res, modo);
+        const controle = new AbortController();
+        // 'close' da resposta, não da requisição: o corpo do GET já foi lido e
+        // o 'close' do req pode disparar antes de o cliente sair
+        res.on('close', () => { if (!res.writableEnded) controle.abort(); });
+
+        let requisicoesEnviadas = 0;
+        let totalResultados = 0;
+        const enviar = (resultadoCompleto, indice) => {
+            // Cliente saiu, mas a busca pode seguir para quem entrou nela
+            if (controle.signal.aborted) return;
+            const exame = Exame.fromResultadosCompletos(resultadoCompleto);
+            if (!exame) return;
+            requisicoesEnviadas++;
+            totalResultados += resultadoCompleto.totalResultados || 0;
+            emitir('requisicao', { indice, exame: formato === 'detalhado' ? exame.toCompleto() : exame.toResultados() });
+        };
+
+        const progredir = (progresso) => { if (!controle.signal.aborted) emitir('progresso', progresso); };
+
+        emitir('inicio', { prontuario, totalRequisicoes: examesRaw.length, formato });
+
+        try {
+            // Mesmo cache e mesma busca em andamento do endpoint síncrono com
+            // incluirResultados=true, dos jobs e do lote: quem chegar durante o
+            // stream entra nesta busca em vez de começar outra
+            const resultadosKey = brutos.chave('resultados');
+            const doCache = cache.get(resultadosKey) !== null || cache.pending.has(resultadosKey);
+
+            if (doCache) {
+                // Entrando numa busca em andamento, acompanha o progresso dela até o fim
+                const resultadosCompletos = await brutos.obter('resultados', { onProgresso: progredir });
+                resultadosCompletos.forEach(enviar);
+                emitir('progresso', { feitas: resultadosCompletos.length, total: resultadosCompletos.length });
+            } else {
+                // Stream interrompido sem mais ninguém esperando = lista parcial, fora do cache
+                await brutos.obter('resultados', {
+                    onProgresso: progredir,
+                    onItem: enviar,
+                    sinal: controle.signal
+                });
+            }
+
+            emitir('fim', { requisicoes: requisicoesEnviadas, totalResultados, doCache });
+        } catch (error) {
+            if (!controle.signal.aborted) {
+                console.error('Erro no stream de exames:', error);
+                emitir('erro', { error: 'Erro ao obter exames do paciente', message: error.message });
+            }
+        }
+        res.end();
+    }
+
     async obterEvolucoesDiaAtual(req, res) {
         try {
             const { prontuario } = req.params;
@@ -512,14 +690,14 @@ class PacientesController {
 
             const crawler = await this.initCrawler(req.hicdHost);
 
-            const cacheKey = cache.generateKey('evolucoes-raw', prontuario, {}, req.hicdHost);
-            const evolucoesRaw = await cache.getOrSet(cacheKey, async () => {
-                const raw = await crawler.getEvolucoes(prontuario);
-                if (!raw || raw.length === 0) {
-                    throw new Error(`Nenhuma evolução encontrada para o prontuário "${prontuario}"`);
-                }
-                return raw;
-            });
+            // Idade máxima curta: a busca é incremental (uma requisição da lista + parse só das
+            // evoluções novas), então o polling das evoluções do dia pode refletir o HICD quase em
+            // tempo real. A rebusca também renova as visões de evoluções e análise do paciente.
+            const brutos = this.dadosBrutos('evolucoes-dia', crawler, prontuario, req);
+            const cacheKey = brutos.chave('evolucoes');
+            const evolucoesRaw = await brutos.obter('evolucoes', { maxIdadeMs: EVOLUCOES_DIA_TTL_MS });
+
+            if (naoModificado(req, res, [cacheKey])) return;
 
             const evolucoes = evolucoesRaw.map(r => Evolucao.fromParserData(r)).filter(Boolean);
 
@@ -559,6 +737,14 @@ class PacientesController {
                 formato
             });
         } catch (error) {
+            if (error.message.startsWith('EVOLUCOES_NAO_ENCONTRADAS:')) {
+                return res.status(404).json({
+                    success: false,
+                    error: 'Sem evoluções',
+                    message: error.message.replace('EVOLUCOES_NAO_ENCONTRADAS:', '')
+                });
+            }
+
             console.error('Erro ao obter evoluções do último dia:', error);
             res.status(500).json({
                 success: false,
@@ -582,19 +768,12 @@ class PacientesController {
 
             const crawler = await this.initCrawler(req.hicdHost);
 
-            const cacheKey = cache.generateKey('prescricoes', prontuario, {}, req.hicdHost);
+            const brutos = this.dadosBrutos('prescricoes', crawler, prontuario, req);
+            const cacheKey = brutos.chave('prescricoes');
 
-            const prescricoes = await cache.getOrSet(cacheKey, async () => {
-                console.log(`Obtendo prescrição do paciente: ${prontuario}`);
+            const prescricoes = await brutos.obter('prescricoes', { onProgresso: req.jobProgresso });
 
-                const dados = await crawler.getPrescricoesPaciente(prontuario);
-
-                if (!dados || dados.length === 0) {
-                    throw new Error(`PRESCRICOES_NAO_ENCONTRADAS:Nenhuma prescrição encontrada para o prontuário "${prontuario}"`);
-                }
-
-                return dados;
-            });
+            if (naoModificado(req, res, [cacheKey])) return;
 
             res.json({
                 success: true,
@@ -635,7 +814,9 @@ class PacientesController {
             const crawler = await this.initCrawler(req.hicdHost);
 
             console.log(`Buscando paciente por leito: ${leito}`);
-            const pacienteRaw = await crawler.buscarPacientePorLeito(leito);
+            // O service devolve a lista de pacientes do leito (resolvida pelo índice de leitos)
+            const pacientesRaw = await crawler.buscarPacientePorLeito(leito);
+            const pacienteRaw = Array.isArray(pacientesRaw) ? pacientesRaw[0] : pacientesRaw;
 
             if (!pacienteRaw) {
                 return res.status(404).json({
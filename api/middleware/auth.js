@@ -1,3 +1,5 @@
+const JanelaDeslizante = require('../utils/janela-deslizante');
+
 // Middleware para autenticação básica (opcional)
 const basicAuth = (req, res, next) => {
     // Por enquanto, deixaremos sem autenticação
@@ -37,53 +39,85 @@ const basicAuth = (req, res, next) => {
     }
 };
 
-// Middleware para rate limiting básico
-const rateLimit = () => {
-    const requests = new Map();
-    const windowMs = 60 * 1000; // 1 minuto
-    const maxRequests = 100; // máximo 100 requests por minuto
-    
+// Limite padrão por grupo de rotas (requisições por janela, por cliente) quando
+// RATE_LIMIT_MAX liga o limite e RATE_LIMIT_<GRUPO>_MAX não está definido; os
+// demais grupos usam RATE_LIMIT_MAX
+const LIMITES_PADRAO = { auth: 10 };
+
+// grupo → JanelaDeslizante, para diagnóstico
+const limitadores = {};
+
+// Inteiro do ambiente; diferente de `parseInt(x) || padrao`, aceita 0 (desliga)
+function inteiroDoAmbiente(nome, padrao) {
+    const valor = parseInt(process.env[nome]);
+    return Number.isNaN(valor) ? padrao : valor;
+}
+
+/**
+ * Middleware de rate limiting por cliente (IP), em janela deslizante com custo
+ * O(1) por requisição e memória fixa (ver utils/janela-deslizante.js).
+ *
+ * Desligado por padrão. RATE_LIMIT_MAX liga todos os grupos; cada grupo tem o
+ * seu limite e o seu contador: RATE_LIMIT_<GRUPO>_MAX e RATE_LIMIT_<GRUPO>_JANELA_MS,
+ * com RATE_LIMIT_MAX e RATE_LIMIT_JANELA_MS (padrão 60 s) para o que não for
+ * definido. Sem RATE_LIMIT_MAX, só os grupos com RATE_LIMIT_<GRUPO>_MAX são
+ * limitados. 0 desliga o grupo; RATE_LIMIT_MAX=0 desliga todos.
+ *
+ * O cliente é `req.ip`: atrás de proxy reverso (ou NAT do Docker) ele só é o
+ * cliente real com TRUST_PROXY configurado (ver api/server.js) — sem isso todos
+ * dividem o mesmo contador.
+ * @param {object} [opcoes]
+ * @param {string} [opcoes.grupo='geral'] - ex.: auth, pacientes, cache
+ * @param {number} [opcoes.max] - sobrepõe o ambiente
+ * @param {number} [opcoes.janelaMs] - sobrepõe o ambiente
+ */
+const rateLimit = (opcoes = {}) => {
+    const grupo = opcoes.grupo || 'geral';
+    const prefixo = `RATE_LIMIT_${grupo.toUpperCase()}`;
+    const maxGeral = inteiroDoAmbiente('RATE_LIMIT_MAX', null);
+    const padrao = maxGeral === null ? 0 : LIMITES_PADRAO[grupo] ?? maxGeral;
+    const max = opcoes.max ?? (maxGeral !== null && maxGeral <= 0 ? 0 : inteiroDoAmbiente(`${prefixo}_MAX`, padrao));
+    const janelaMs = opcoes.janelaMs ||
+        parseInt(process.env[`${prefixo}_JANELA_MS`]) || parseInt(process.env.RATE_LIMIT_JANELA_MS) || 60 * 1000;
+
+    if (max <= 0) return (req, res, next) => next();
+
+    const janela = new JanelaDeslizante({
+        max,
+        janelaMs,
+        maxClientes: parseInt(process.env.RATE_LIMIT_MAX_CLIENTES) || 10000
+    });
+    limitadores[grupo] = janela;
+
     return (req, res, next) => {
         const clientId = req.ip || req.connection.remoteAddress;
-        const now = Date.now();
-        
-        if (!requests.has(clientId)) {
-            requests.set(clientId, []);
-        }
-        
-        const clientRequests = requests.get(clientId);
-        
-        // Remover requests antigas
-        const validRequests = clientRequests.filter(timestamp => now - timestamp < windowMs);
-        
-        if (validRequests.length >= maxRequests) {
+        const { permitida, restantes, retryAfterMs } = janela.registrar(clientId);
+
+        res.setHeader('RateLimit-Limit', max);
+        res.setHeader('RateLimit-Remaining', restantes);
+
+        if (!permitida) {
+            const retryAfter = Math.max(1, Math.ceil(retryAfterMs / 1000));
+            res.setHeader('Retry-After', retryAfter);
             return res.status(429).json({
                 success: false,
                 error: 'Muitas requisições',
-                message: `Limite de ${maxRequests} requisições por minuto excedido`,
-                retryAfter: Math.ceil((validRequests[0] + windowMs - now) / 1000)
+                message: `Limite de ${max} requisições por ${janelaMs / 1000}s excedido`,
+                retryAfter
             });
         }
-        
-        validRequests.push(now);
-        requests.set(clientId, validRequests);
-        
-        // Limpar cache de requests antigos periodicamente
-        if (Math.random() < 0.01) {
-            for (const [id, reqs] of requests.entries()) {
-                const validReqs = reqs.filter(timestamp => now - timestamp < windowMs);
-                if (validReqs.length === 0) {
-                    requests.delete(id);
-                } else {
-                    requests.set(id, validReqs);
-                }
-            }
-        }
-        
+
         next();
     };
 };
 
+/** Estado dos limitadores por grupo (clientes, permitidas, bloqueadas...). */
+const rateLimitStats = () => {
+    const stats = {};
+    for (const [grupo, janela] of Object.entries(limitadores)) stats[grupo] = janela.getStats();
+    return stats;
+};
+
 // Middleware para logging de requisições
 const requestLogger = (req, res, next) => {
     const start = Date.now();
@@ -126,6 +160,7 @@ const validateHeaders = (req, res, next) => {
 module.exports = {
     basicAuth,
     rateLimit,
+    rateLimitStats,
     requestLogger,
     validateHeaders
 };
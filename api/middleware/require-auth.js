@@ -98,7 +98,7 @@ async function requireCrawler(req, res, next) {
 
     console.log(`[AUTH-MIDDLEWARE] Auto-login via Authorization header para o usuário: ${username} (host: ${host})`);
 
-    const result = await sharedCrawler.initCrawler(username, password, host);
+    const result = await sharedCrawler.entrar(username, password, host);
 
     if (result.success) {
         return next();
@@ -0,0 +1,70 @@
+/**
+ * Medição por requisição e métricas agregadas.
+ *
+ * `medirRequisicao` abre uma Medicao para a requisição (o crawler, os parsers e
+ * o cache somam nela os próprios trechos) e, quando os cabeçalhos saem, escreve
+ * Server-Timing com hicd, hicd-fila, parse, cache, serializacao e total — vale
+ * para JSON, 304 e streams. Ao terminar, a duração vai para o histograma por
+ * rota de GET /metrics.
+ *
+ * Deve vir depois dos body parsers: o `next` deles pode rodar fora do contexto
+ * assíncrono da requisição.
+ */
+const { performance } = require('perf_hooks');
+const { Medicao, executarMedindo } = require('../../src/core/medicao');
+const { Metricas } = require('../../src/core/metricas');
+
+/** Rota com os parâmetros (`/api/pacientes/:prontuario/exames`), não a URL — cardinalidade baixa. */
+function rotaDe(req) {
+    return req.route ? `${req.baseUrl}${req.route.path}` : 'nao-encontrada';
+}
+
+function medirRequisicao(req, res, next) {
+    const medicao = new Medicao();
+    let inicioSerializacao = null;
+    let rota = null;
+
+    // res.json → cabeçalhos: serialização (JSON.stringify, ETag, compressão)
+    const json = res.json;
+    res.json = function (...args) {
+        inicioSerializacao = performance.now();
+        return json.apply(this, args);
+    };
+
+    const writeHead = res.writeHead;
+    res.writeHead = function (...args) {
+        // Com o handler ainda ativo: baseUrl/route ainda são os da rota atendida
+        rota = rotaDe(req);
+        if (!res.headersSent) {
+            if (inicioSerializacao !== null) medicao.adicionar('serializacao', performance.now() - inicioSerializacao);
+            res.setHeader('Server-Timing', medicao.serverTiming());
+        }
+        return writeHead.apply(this, args);
+    };
+
+    res.on('finish', () => {
+        const segundos = (performance.now() - medicao.inicio) / 1000;
+        Metricas.compartilhado.requisicoes.observar([req.method, rota || rotaDe(req), String(res.statusCode)], segundos);
+    });
+
+    executarMedindo(medicao, next);
+}
+
+/**
+ * GET /metrics no formato texto do Prometheus. Com METRICS_TOKEN definido,
+ * exige `Authorization: Bearer <token>`.
+ */
+function rotaMetricas(req, res) {
+    const token = process.env.METRICS_TOKEN;
+    if (token && req.headers.authorization !== `Bearer ${token}`) {
+        return res.status(401).json({
+            success: false,
+            error: 'Não autorizado',
+            message: 'Informe o token das métricas em Authorization: Bearer <token>'
+        });
+    }
+    res.set('Content-Type', 'text/plain; version=0.0.4; charset=utf-8');
+    res.send(Metricas.compartilhado.paraPrometheus());
+}
+
+module.exports = { medirRequisicao, rotaMetricas };
@@ -0,0 +1,28 @@
+/**
+ * Instância do pré-aquecimento do cache configurada pelo ambiente
+ * (ver PrewarmScheduler). Iniciada pelo api-server.js; o status fica em
+ * GET /api/cache/prewarm.
+ */
+
+const PrewarmScheduler = require('./utils/prewarm-scheduler');
+const { RECURSOS_PACIENTE } = require('./utils/recursos-paciente');
+const executarHandler = require('./utils/executar-handler');
+const sharedCrawler = require('./shared-crawler');
+const config = require('../config');
+const pacientesController = require('./controllers/pacientes');
+
+module.exports = PrewarmScheduler.fromEnv({
+    // Sem login no host ainda: a execução é pulada até alguém autenticar
+    obterCrawler: (host) => (sharedCrawler.isReady(host) ? sharedCrawler.getCrawler(host) : null),
+    // Mesmo caminho do endpoint síncrono: as entradas aquecidas são as que ele lê
+    buscarRecurso: (recurso, prontuario, query, host) => executarHandler(pacientesController, RECURSOS_PACIENTE[recurso].metodo, {
+        params: { prontuario },
+        query,
+        headers: {},
+        hicdHost: host
+    })
+}, {
+    ...process.env,
+    // Host canônico, como req.hicdHost — senão as chaves do cache não batem com as das requisições
+    PREWARM_HOST: config.resolveHost(process.env.PREWARM_HOST)
+});
@@ -1,5 +1,10 @@
 const express = require('express');
 const cache = require('../utils/cache');
+const SignedPrescriptionCache = require('../../src/services/signed-prescription-cache');
+const prewarm = require('../prewarm');
+const { RECURSOS_BRUTOS, DadosBrutos } = require('../utils/dados-brutos');
+const { contadoresDosLogs } = require('../../src/core/logger');
+const { ClienteCluster } = require('../utils/cluster');
 
 const router = express.Router();
 
@@ -39,10 +44,30 @@ const router = express.Router();
  *                     defaultTTLMinutes:
  *                       type: number
  *                       description: TTL padrão em minutos
+ *                     prescricoesAssinadas:
+ *                       type: object
+ *                       description: Cache sem TTL dos detalhes de prescrições assinadas (entradas, buscasEvitadas, buscasRealizadas, armazenadas)
+ *                     dadosBrutos:
+ *                       type: object
+ *                       description: Buscas ao HICD por recurso bruto (buscas, reaproveitadas) e por endpoint (requisicoes, buscasHicd, reaproveitadas, buscasPorRequisicao)
+ *                     eventos:
+ *                       type: object
+ *                       description: Eventos frequentes contados pelo logger em vez de logados um a um, por módulo (ex. cache → hit, miss, set)
+ *                     cluster:
+ *                       type: object
+ *                       nullable: true
+ *                       description: Só no modo cluster — camada compartilhada vista por este worker (consultas, encontradas, buscasConcedidas, gravacoes) e pelo primário (entradas, hostsComSessao, concessoesAtivas, esperas, logins)
  */
-router.get('/stats', (req, res) => {
+router.get('/stats', async (req, res) => {
     try {
-        const stats = cache.getStats();
+        const cliente = ClienteCluster.compartilhado;
+        const stats = {
+            ...cache.getStats(),
+            prescricoesAssinadas: SignedPrescriptionCache.compartilhado.getStats(),
+            dadosBrutos: DadosBrutos.compartilhado.getStats(),
+            eventos: contadoresDosLogs(),
+            cluster: cliente ? { worker: cliente.getStats(), primario: await cliente.statsCoordenador() } : null
+        };
         
         res.json({
             success: true,
@@ -59,12 +84,31 @@ router.get('/stats', (req, res) => {
     }
 });
 
+/**
+ * @swagger
+ * /cache/prewarm:
+ *   get:
+ *     summary: Estado do pré-aquecimento do cache
+ *     description: Configuração (PREWARM_*), próxima verificação e resumo da última execução (pacientes, recursos aquecidos, requisições ao HICD, duração)
+ *     tags:
+ *       - Cache
+ *     responses:
+ *       200:
+ *         description: Estado do pré-aquecimento
+ */
+router.get('/prewarm', (req, res) => {
+    res.json({
+        success: true,
+        data: prewarm.getStatus()
+    });
+});
+
 /**
  * @swagger
  * /cache/clear:
  *   delete:
  *     summary: Limpar todo o cache
- *     description: Remove todos os itens armazenados no cache
+ *     description: Remove todos os itens armazenados no cache, inclusive os detalhes de prescrições assinadas (prescricoesAssinadas em /cache/stats)
  *     tags:
  *       - Cache
  *     responses:
@@ -83,6 +127,7 @@ router.get('/stats', (req, res) => {
 router.delete('/clear', (req, res) => {
     try {
         cache.clear();
+        SignedPrescriptionCache.compartilhado.clear();
         
         res.json({
             success: true,
@@ -212,7 +257,11 @@ router.delete('/invalidate/type/:type', (req, res) => {
             });
         }
 
-        const invalidatedCount = cache.invalidateType(type);
+        // O tipo leva junto os dados brutos de que a visão é montada — senão ela seria
+        // remontada a partir do bruto antigo, sem voltar ao HICD
+        const brutos = { exames: ['exames', 'resultados'], evolucoes: ['evolucoes'], prescricoes: ['prescricoes'] }[type] || [];
+        const invalidatedCount = [...new Set([type, ...brutos.map(recurso => RECURSOS_BRUTOS[recurso].tipo)])]
+            .reduce((total, tipo) => total + cache.invalidateType(tipo), 0);
         
         res.json({
             success: true,
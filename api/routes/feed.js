@@ -0,0 +1,23 @@
+const express = require('express');
+const router = express.Router();
+const feedController = require('../controllers/feed');
+const { requireCrawler } = require('../middleware/require-auth');
+
+router.use(requireCrawler);
+
+// GET /api/feed?since=<cursor> - Mudanças desde o cursor (pull)
+router.get('/', (req, res) => {
+    feedController.obterEventos(req, res);
+});
+
+// GET /api/feed/stream?modo=sse|ndjson&since=<cursor> - Mudanças em stream (push)
+router.get('/stream', (req, res) => {
+    feedController.assinar(req, res);
+});
+
+// GET /api/feed/stats - Estatísticas do feed
+router.get('/stats', (req, res) => {
+    feedController.obterStats(req, res);
+});
+
+module.exports = router;
@@ -0,0 +1,33 @@
+const express = require('express');
+const router = express.Router();
+const jobsController = require('../controllers/jobs');
+const { requireCrawler } = require('../middleware/require-auth');
+
+router.use(requireCrawler);
+
+// POST /api/jobs - Criar job de busca { tipo, prontuario, parametros }
+router.post('/', async (req, res) => {
+    await jobsController.criarJob(req, res);
+});
+
+// GET /api/jobs/stats - Estatísticas dos jobs
+router.get('/stats', (req, res) => {
+    jobsController.obterStats(req, res);
+});
+
+// GET /api/jobs/:id - Estado e progresso do job
+router.get('/:id', async (req, res) => {
+    await jobsController.obterJob(req, res);
+});
+
+// GET /api/jobs/:id/eventos - Progresso em Server-Sent Events
+router.get('/:id/eventos', async (req, res) => {
+    await jobsController.assinarEventos(req, res);
+});
+
+// GET /api/jobs/:id/resultado - Resultado do job (202 enquanto executa)
+router.get('/:id/resultado', async (req, res) => {
+    await jobsController.obterResultado(req, res);
+});
+
+module.exports = router;
@@ -1,6 +1,7 @@
 const express = require('express');
 const router = express.Router();
 const pacientesController = require('../controllers/pacientes');
+const loteController = require('../controllers/lote');
 const { requireCrawler } = require('../middleware/require-auth');
 
 router.use(requireCrawler);
@@ -28,6 +29,11 @@ router.get('/search-leito', async (req, res) => {
     await pacientesController.buscarPacientePorLeito(req, res);
 });
 
+// POST /api/pacientes/lote?modo=ndjson|sse - Vários recursos de vários pacientes, em stream
+router.post('/lote', async (req, res) => {
+    await loteController.buscarLote(req, res);
+});
+
 // GET /api/pacientes/:prontuario - Obter detalhes completos de um paciente
 router.get('/:prontuario', validateProntuario, async (req, res) => {
     await pacientesController.obterDetalhesPaciente(req, res);
@@ -48,6 +54,11 @@ router.get('/:prontuario/analise', validateProntuario, async (req, res) => {
     await pacientesController.obterAnaliseClinica(req, res);
 });
 
+// GET /api/pacientes/:prontuario/exames/stream?modo=sse|ndjson - Resultados de exames em stream
+router.get('/:prontuario/exames/stream', validateProntuario, async (req, res) => {
+    await pacientesController.streamExamesPaciente(req, res);
+});
+
 router.get('/:prontuario/exames', validateProntuario, async (req, res) => {
     await pacientesController.obterExamesPaciente(req, res);
 });
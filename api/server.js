@@ -2,6 +2,7 @@ const express = require('express');
 const cors = require('cors');
 const helmet = require('helmet');
 const morgan = require('morgan');
+const compression = require('compression');
 const swaggerUi = require('swagger-ui-express');
 const swaggerSpec = require('./swagger');
 
@@ -10,10 +11,30 @@ const authRoutes = require('./routes/auth');
 const clinicasRoutes = require('./routes/clinicas');
 const pacientesRoutes = require('./routes/pacientes');
 const cacheRoutes = require('./routes/cache');
+const jobsRoutes = require('./routes/jobs');
+const feedRoutes = require('./routes/feed');
+const { obterParsePool } = require('../src/parsers/parse-pool');
+const { medirRequisicao, rotaMetricas } = require('./middleware/server-timing');
+const { rateLimit, rateLimitStats } = require('./middleware/auth');
 
 // Criar instância do Express
 const app = express();
 
+/**
+ * TRUST_PROXY → `trust proxy` do Express (req.ip, req.protocol). Atrás de proxy
+ * reverso sem isso, req.ip é o IP do proxy para todos os clientes.
+ * "true"/"false", número de proxies à frente (ex.: 1) ou lista de IPs/sub-redes
+ * (ex.: "loopback, 172.16.0.0/12"); vazio = não confia em X-Forwarded-For.
+ */
+function trustProxyDoAmbiente(valor = process.env.TRUST_PROXY) {
+    if (!valor || valor.trim() === '') return null;
+    if (valor === 'true' || valor === 'false') return valor === 'true';
+    if (/^\d+$/.test(valor)) return parseInt(valor);
+    return valor;
+}
+const trustProxy = trustProxyDoAmbiente();
+if (trustProxy !== null) app.set('trust proxy', trustProxy);
+
 // Helmet com CSP relaxado para o Swagger UI
 app.use(helmet({
     contentSecurityPolicy: {
@@ -27,10 +48,20 @@ app.use(helmet({
 app.use(cors());
 app.use(morgan('combined'));
 
+// gzip/brotli nas respostas JSON. Streams (SSE/NDJSON) ficam de fora:
+// o compressor seguraria os eventos em buffer
+const TIPOS_STREAM = /^(text\/event-stream|application\/x-ndjson)/;
+app.use(compression({
+    filter: (req, res) => !TIPOS_STREAM.test(res.getHeader('Content-Type') || '') && compression.filter(req, res)
+}));
+
 // Configurar parsing de JSON
 app.use(express.json({ limit: '10mb' }));
 app.use(express.urlencoded({ extended: true }));
 
+// Server-Timing por requisição e histogramas de GET /metrics
+app.use(medirRequisicao);
+
 // Middleware para logging de requisições
 app.use((req, res, next) => {
     console.log(`[${new Date().toISOString()}] ${req.method} ${req.path}`);
@@ -44,11 +75,13 @@ app.use('/api/docs', swaggerUi.serve, swaggerUi.setup(swaggerSpec, {
 }));
 app.get('/api/docs.json', (req, res) => res.json(swaggerSpec));
 
-// Rotas da API
-app.use('/api/auth', authRoutes);
-app.use('/api/clinicas', clinicasRoutes);
-app.use('/api/pacientes', pacientesRoutes);
-app.use('/api/cache', cacheRoutes);
+// Rotas da API, cada grupo com o seu limite de requisições por cliente (RATE_LIMIT_* no .env)
+app.use('/api/auth', rateLimit({ grupo: 'auth' }), authRoutes);
+app.use('/api/clinicas', rateLimit({ grupo: 'clinicas' }), clinicasRoutes);
+app.use('/api/pacientes', rateLimit({ grupo: 'pacientes' }), pacientesRoutes);
+app.use('/api/cache', rateLimit({ grupo: 'cache' }), cacheRoutes);
+app.use('/api/jobs', rateLimit({ grupo: 'jobs' }), jobsRoutes);
+app.use('/api/feed', rateLimit({ grupo: 'feed' }), feedRoutes);
 
 // Rota de saúde da API
 app.get('/api/health', (req, res) => {
@@ -56,10 +89,15 @@ app.get('/api/health', (req, res) => {
         status: 'ok',
         timestamp: new Date().toISOString(),
         uptime: process.uptime(),
-        version: '1.0.0'
+        version: '1.0.0',
+        parsePool: obterParsePool().getStats(),
+        rateLimit: rateLimitStats()
     });
 });
 
+// Métricas no formato do Prometheus
+app.get('/metrics', rotaMetricas);
+
 // Rota principal
 app.get('/', (req, res) => {
     const base = `${req.protocol}://${req.get('host')}`;
@@ -67,6 +105,7 @@ app.get('/', (req, res) => {
         message: 'API HICD - Sistema de Prontuário Eletrônico',
         version: '1.0.0',
         swagger: `${base}/api/docs`,
+        metrics: `${base}/metrics`,
         endpoints: {
             auth: {
                 login:  'POST /api/auth/login',
@@ -86,10 +125,24 @@ app.get('/', (req, res) => {
                 evolucoes:  'GET /api/pacientes/:prontuario/evolucoes',
                 analise:    'GET /api/pacientes/:prontuario/analise',
                 exames:     'GET /api/pacientes/:prontuario/exames',
-                prescricoes:'GET /api/pacientes/:prontuario/prescricoes'
+                examesStream: 'GET /api/pacientes/:prontuario/exames/stream?modo=sse|ndjson',
+                prescricoes:'GET /api/pacientes/:prontuario/prescricoes',
+                lote:       'POST /api/pacientes/lote { prontuarios, recursos, parametros }'
+            },
+            jobs: {
+                criar:     'POST /api/jobs { tipo, prontuario, parametros }',
+                status:    'GET  /api/jobs/:id',
+                eventos:   'GET  /api/jobs/:id/eventos',
+                resultado: 'GET  /api/jobs/:id/resultado'
+            },
+            feed: {
+                eventos: 'GET /api/feed?since=<cursor>',
+                stream:  'GET /api/feed/stream?modo=sse|ndjson&since=<cursor>',
+                stats:   'GET /api/feed/stats'
             },
             cache: {
                 stats:             'GET    /api/cache/stats',
+                prewarm:           'GET    /api/cache/prewarm',
                 clear:             'DELETE /api/cache/clear',
                 invalidatePatient: 'DELETE /api/cache/invalidate/patient/:prontuario',
                 invalidateType:    'DELETE /api/cache/invalidate/type/:type',
@@ -108,6 +161,7 @@ app.use('*', (req, res) => {
         availableEndpoints: [
             'GET  /',
             'GET  /api/health',
+            'GET  /metrics',
             'GET  /api/docs',
             'GET  /api/docs.json',
             'POST /api/auth/login',
@@ -124,7 +178,12 @@ app.use('*', (req, res) => {
             'GET  /api/pacientes/:prontuario/analise',
             'GET  /api/pacientes/:prontuario/exames',
             'GET  /api/pacientes/:prontuario/prescricoes',
+            'POST /api/pacientes/lote',
+            'GET  /api/feed',
+            'GET  /api/feed/stream',
+            'GET  /api/feed/stats',
             'GET  /api/cache/stats',
+            'GET  /api/cache/prewarm',
             'DELETE /api/cache/clear',
             'DELETE /api/cache/invalidate/patient/:prontuario',
             'DELETE /api/cache/invalidate/type/:type',
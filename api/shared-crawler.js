@@ -2,10 +2,13 @@
  * Gestão multi-tenant das instâncias do crawler, uma por host HICD.
  * Cada host mantém sua própria sessão/cookies e login independente.
  * Inicializada via POST /api/auth/login ou auto-login no middleware.
+ * No modo cluster (api-cluster.js), a sessão de cada host é uma só para todos
+ * os workers, coordenada pelo processo primário (ver utils/cluster.js).
  */
 
 const HICDCrawler = require('../hicd-crawler-refactored');
 const config = require('../config');
+const { ClienteCluster } = require('./utils/cluster');
 
 // Map<hostCanônico, HICDCrawler>
 const instances = new Map();
@@ -13,9 +16,29 @@ const instances = new Map();
 // Factory injetável (facilita testes sem bater na rede).
 let crawlerFactory = (username, password, cfg) => new HICDCrawler(username, password, cfg);
 
+/**
+ * Login no HICD com uma instância nova, que substitui a anterior do host.
+ * @returns {Promise<{result: {success: boolean, message: string}, instance: object}>}
+ */
+async function abrirSessao(username, password, cfg) {
+    const canonical = cfg.host;
+    instances.delete(canonical);
+
+    const instance = crawlerFactory(username, password, cfg);
+    const result = await instance.login();
+
+    if (result.success) {
+        coordenarRenovacao(instance, canonical);
+        instances.set(canonical, instance);
+    }
+
+    return { result, instance };
+}
+
 /**
  * Inicializa o crawler para um host específico e executa o login no HICD.
- * Substitui qualquer instância anterior daquele host.
+ * Substitui qualquer instância anterior daquele host (no modo cluster, a de
+ * todos os workers).
  * @param {string} username
  * @param {string} password
  * @param {string} [host] - host HICD (validado contra allowlist). Vazio = host padrão.
@@ -23,20 +46,86 @@ let crawlerFactory = (username, password, cfg) => new HICDCrawler(username, pass
  */
 async function initCrawler(username, password, host) {
     const cfg = config.forHost(host);        // valida host (throw se inválido)
-    const canonical = cfg.host;
+    const { result, instance } = await abrirSessao(username, password, cfg);
 
-    instances.delete(canonical);
+    const cliente = ClienteCluster.compartilhado;
+    if (result.success && cliente) cliente.publicarSessao(cfg.host, sessaoDe(instance));
 
-    const instance = crawlerFactory(username, password, cfg);
-    const result = await instance.login();
+    return result;
+}
 
-    if (result.success) {
-        instances.set(canonical, instance);
-    }
+/**
+ * Auto-login (middleware). No modo cluster, reaproveita a sessão do host se outro
+ * worker já a abriu — um login por host, os demais esperam e adotam os cookies.
+ * Fora dele, o mesmo que initCrawler.
+ * @param {string} username
+ * @param {string} password
+ * @param {string} [host]
+ * @returns {Promise<{success: boolean, message: string}>}
+ */
+async function entrar(username, password, host) {
+    const cliente = ClienteCluster.compartilhado;
+    if (!cliente) return initCrawler(username, password, host);
+
+    const cfg = config.forHost(host);
+    let result = null;
+    const { sessao, adotada } = await cliente.sessao(cfg.host, null, async () => {
+        const aberta = await abrirSessao(username, password, cfg);
+        result = aberta.result;
+        return result.success ? sessaoDe(aberta.instance) : null;
+    });
 
+    if (adotada) {
+        adotarSessao(cfg.host, sessao);
+        return { success: true, message: 'Sessão HICD reaproveitada de outro worker' };
+    }
     return result;
 }
 
+/**
+ * Passa a usar uma sessão aberta por outro worker (modo cluster). Mantém a
+ * instância do host se for do mesmo usuário, só trocando os cookies.
+ * @param {string} host - host canônico
+ * @param {{username: string, password: string, cookies: string}} sessao
+ */
+function adotarSessao(host, sessao) {
+    const cfg = config.forHost(host);
+    let instance = instances.get(cfg.host);
+    if (!instance || instance.authService.username !== sessao.username) {
+        instance = crawlerFactory(sessao.username, sessao.password, cfg);
+        coordenarRenovacao(instance, cfg.host);
+        instances.set(cfg.host, instance);
+    }
+    instance.adotarSessao(sessao.cookies);
+}
+
+function sessaoDe(instance) {
+    return {
+        username: instance.authService.username,
+        password: instance.authService.password,
+        cookies: instance.httpClient.cookies
+    };
+}
+
+/**
+ * No modo cluster, sessão expirada é renovada por um worker só: quem chega
+ * depois adota os cookies novos em vez de logar de novo.
+ */
+function coordenarRenovacao(instance, host) {
+    const cliente = ClienteCluster.compartilhado;
+    if (!cliente) return;
+
+    instance.httpClient.onSessionExpired = async () => {
+        const { sessao, adotada } = await cliente.sessao(host, instance.httpClient.cookies, async () => {
+            console.warn(`[SHARED-CRAWLER] Sessão HICD expirada (host: ${host}) — refazendo login...`);
+            const result = await instance.login();
+            if (!result.success) console.error('[SHARED-CRAWLER] Falha ao renovar a sessão HICD:', result.message);
+            return result.success ? sessaoDe(instance) : null;
+        });
+        if (adotada) instance.adotarSessao(sessao.cookies);
+    };
+}
+
 /**
  * Retorna a instância ativa do crawler para o host informado.
  * @param {string} [host] - host HICD. Vazio = host padrão.
@@ -72,4 +161,4 @@ function __reset() {
     crawlerFactory = (username, password, cfg) => new HICDCrawler(username, password, cfg);
 }
 
-module.exports = { initCrawler, getCrawler, isReady, __setCrawlerFactory, __reset };
+module.exports = { initCrawler, entrar, adotarSessao, getCrawler, isReady, __setCrawlerFactory, __reset };
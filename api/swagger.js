@@ -73,7 +73,18 @@ Gere com: \`node payload.js usuario minhaSenha\``,
                     validItems: { type: 'integer' },
                     expiredItems: { type: 'integer' },
                     estimatedSizeKB: { type: 'integer' },
-                    defaultTTLMinutes: { type: 'integer' }
+                    defaultTTLMinutes: { type: 'integer' },
+                    prescricoesAssinadas: {
+                        type: 'object',
+                        description: 'Detalhes de prescrições assinadas, guardados sem TTL',
+                        properties: {
+                            entradas: { type: 'integer' },
+                            maxEntradas: { type: 'integer' },
+                            buscasEvitadas: { type: 'integer', description: 'Buscas ao imprime.php evitadas pelo cache' },
+                            buscasRealizadas: { type: 'integer' },
+                            armazenadas: { type: 'integer' }
+                        }
+                    }
                 }
             }
         }
@@ -83,6 +94,8 @@ Gere com: \`node payload.js usuario minhaSenha\``,
         { name: 'Auth', description: 'Autenticação e sessão' },
         { name: 'Clínicas', description: 'Listagem e busca de clínicas' },
         { name: 'Pacientes', description: 'Dados clínicos de pacientes' },
+        { name: 'Jobs', description: 'Buscas longas em segundo plano (criar, acompanhar, obter resultado)' },
+        { name: 'Feed', description: 'Novos resultados de exames e novas evoluções, sem consultar paciente a paciente' },
         { name: 'Cache', description: 'Gerenciamento do cache em memória' },
         { name: 'Sistema', description: 'Health check e informações gerais' }
     ],
@@ -323,7 +336,9 @@ Gere com: \`node payload.js usuario minhaSenha\``,
                 parameters: [
                     { name: 'prontuario', in: 'path', required: true, schema: { type: 'string' }, example: '45164' },
                     { name: 'formato', in: 'query', schema: { type: 'string', enum: ['resumido', 'detalhado', 'clinico'], default: 'detalhado' } },
-                    { name: 'limite', in: 'query', schema: { type: 'integer', default: 1000 }, description: '0 = sem limite' }
+                    { name: 'limite', in: 'query', schema: { type: 'integer', default: 1000 }, description: '0 = sem limite' },
+                    { name: 'delta', in: 'query', schema: { type: 'boolean', default: false }, description: 'Só no formato detalhado: a partir da segunda evolução, conteudo.delta = { base: id da evolução anterior na lista, ops } no lugar de conteudo.textoCompleto. ops: [inicio, quantidade] copia linhas da anterior; string insere a linha.' },
+                    { name: 'fields', in: 'query', schema: { type: 'string' }, example: 'slim', description: 'Projeção: caminhos separados por vírgula (ex.: `dataEvolucao,profissional,conteudo.resumo`). `slim` = id, dataEvolucao, profissional, atividade, clinicaLeito, conteudo.resumo. Os textos só são remontados se `conteudo.textoCompleto` (ou `conteudo.delta`) for pedido.' }
                 ],
                 responses: {
                     200: { description: 'Lista de evoluções' },
@@ -337,7 +352,7 @@ Gere com: \`node payload.js usuario minhaSenha\``,
             get: {
                 tags: ['Pacientes'],
                 summary: 'Evoluções do último dia registrado',
-                description: 'Filtra apenas as evoluções cuja data (DD/MM/AAAA) é a mais recente encontrada. Cache 10 min.',
+                description: 'Filtra apenas as evoluções cuja data (DD/MM/AAAA) é a mais recente encontrada. Cache 60 s (EVOLUCOES_DIA_TTL_MS); a busca é incremental, só as evoluções novas passam pelo parse.',
                 parameters: [
                     { name: 'prontuario', in: 'path', required: true, schema: { type: 'string' }, example: '45164' },
                     { name: 'formato', in: 'query', schema: { type: 'string', enum: ['resumido', 'detalhado', 'clinico'], default: 'detalhado' } }
@@ -367,6 +382,61 @@ Gere com: \`node payload.js usuario minhaSenha\``,
             }
         },
 
+        '/api/pacientes/lote': {
+            post: {
+                tags: ['Pacientes'],
+                summary: 'Vários recursos de vários pacientes, em stream',
+                description: 'Cada item (prontuário × recurso) é respondido pelo mesmo handler do endpoint individual. Itens já em cache saem na hora; os demais são buscados no máximo LOTE_CONCORRENCIA (3) por vez, no ritmo do rate limit do host. Itens repetidos são buscados uma vez. Eventos: `inicio` { prontuarios, recursos, itens }, `resultado` { prontuario, recurso, status, doCache, body } (body = corpo do endpoint individual), `fim` { total, doCache, agendadas, sucesso, falhas, canceladas, duracaoMs } ou `erro`. Em NDJSON cada linha é { evento, dados }.',
+                parameters: [
+                    { name: 'modo', in: 'query', schema: { type: 'string', enum: ['ndjson', 'sse'], default: 'ndjson' } }
+                ],
+                requestBody: {
+                    required: true,
+                    content: {
+                        'application/json': {
+                            schema: {
+                                type: 'object',
+                                required: ['prontuarios'],
+                                properties: {
+                                    prontuarios: { type: 'array', items: { type: 'string' }, example: ['45164', '44826'] },
+                                    recursos: { type: 'array', items: { type: 'string', enum: ['cadastro', 'evolucoes', 'exames', 'prescricoes'] }, default: ['cadastro'] },
+                                    parametros: {
+                                        type: 'object',
+                                        description: 'Query por recurso (evolucoes: formato, limite, delta, fields; exames: formato, incluirResultados, fields)',
+                                        example: { evolucoes: { fields: 'slim', limite: 10 }, exames: { incluirResultados: true } }
+                                    }
+                                }
+                            }
+                        }
+                    }
+                },
+                responses: {
+                    200: { description: 'application/x-ndjson ou text/event-stream' },
+                    400: { description: 'Lista vazia, recurso ou modo inválido, ou mais de LOTE_MAX_ITENS (200) itens', content: { 'application/json': { schema: { $ref: '#/components/schemas/Erro' } } } },
+                    503: { description: 'Não autenticado', content: { 'application/json': { schema: { $ref: '#/components/schemas/Erro' } } } }
+                }
+            }
+        },
+
+        '/api/pacientes/{prontuario}/exames/stream': {
+            get: {
+                tags: ['Pacientes'],
+                summary: 'Resultados de exames em stream (SSE ou NDJSON)',
+                description: 'Envia cada requisição assim que a sua página de impressão é parseada, sem esperar as demais. Eventos: `inicio` { prontuario, totalRequisicoes, formato }, `progresso` { feitas, total }, `requisicao` { indice, exame }, `fim` { requisicoes, totalResultados, doCache } ou `erro` { error, message }. Em NDJSON cada linha é { evento, dados }. Usa o mesmo cache de incluirResultados=true.',
+                parameters: [
+                    { name: 'prontuario', in: 'path', required: true, schema: { type: 'string' }, example: '45164' },
+                    { name: 'modo', in: 'query', schema: { type: 'string', enum: ['sse', 'ndjson'], default: 'sse' } },
+                    { name: 'formato', in: 'query', schema: { type: 'string', enum: ['resultados', 'detalhado'], default: 'resultados' } }
+                ],
+                responses: {
+                    200: { description: 'text/event-stream ou application/x-ndjson' },
+                    400: { description: 'Modo inválido', content: { 'application/json': { schema: { $ref: '#/components/schemas/Erro' } } } },
+                    404: { description: 'Nenhum exame encontrado', content: { 'application/json': { schema: { $ref: '#/components/schemas/Erro' } } } },
+                    503: { description: 'Não autenticado', content: { 'application/json': { schema: { $ref: '#/components/schemas/Erro' } } } }
+                }
+            }
+        },
+
         '/api/pacientes/{prontuario}/analise': {
             get: {
                 tags: ['Pacientes'],
@@ -391,7 +461,8 @@ Gere com: \`node payload.js usuario minhaSenha\``,
                 parameters: [
                     { name: 'prontuario', in: 'path', required: true, schema: { type: 'string' }, example: '45164' },
                     { name: 'formato', in: 'query', schema: { type: 'string', enum: ['resumido', 'detalhado', 'resultados'], default: 'detalhado' } },
-                    { name: 'incluirResultados', in: 'query', schema: { type: 'string', enum: ['true', 'false'], default: 'true' } }
+                    { name: 'incluirResultados', in: 'query', schema: { type: 'string', enum: ['true', 'false'], default: 'true' } },
+                    { name: 'fields', in: 'query', schema: { type: 'string' }, example: 'slim', description: 'Projeção: caminhos separados por vírgula; arrays são atravessados (ex.: `data,resultados.sigla,resultados.valor`). `slim` = requisicaoId, data, hora, status, resultados.sigla/valor/unidade/status.' }
                 ],
                 responses: {
                     200: { description: 'Lista de exames com resultados' },
@@ -417,6 +488,131 @@ Gere com: \`node payload.js usuario minhaSenha\``,
             }
         },
 
+        // ── JOBS ──────────────────────────────────────────────────────────────
+
+        '/api/jobs': {
+            post: {
+                tags: ['Jobs'],
+                summary: 'Criar job de busca',
+                description: 'Cria a busca em segundo plano e devolve o id imediatamente (202). Um job idêntico (tipo, prontuário, parâmetros e host) ainda em andamento é reaproveitado (`reaproveitado: true`). O resultado é o mesmo corpo do endpoint síncrono correspondente.',
+                requestBody: {
+                    required: true,
+                    content: {
+                        'application/json': {
+                            schema: {
+                                type: 'object',
+                                required: ['tipo', 'prontuario'],
+                                properties: {
+                                    tipo: { type: 'string', enum: ['exames', 'evolucoes', 'prescricoes', 'analise'] },
+                                    prontuario: { type: 'string', example: '45164' },
+                                    parametros: {
+                                        type: 'object',
+                                        description: 'Query do endpoint síncrono (exames: formato, incluirResultados, fields; evolucoes: formato, limite, delta, fields)',
+                                        example: { formato: 'resultados', incluirResultados: true }
+                                    }
+                                }
+                            }
+                        }
+                    }
+                },
+                responses: {
+                    202: { description: 'Job criado (ou reaproveitado), com links de status, eventos e resultado' },
+                    400: { description: 'Tipo ou prontuário inválido', content: { 'application/json': { schema: { $ref: '#/components/schemas/Erro' } } } },
+                    503: { description: 'Não autenticado', content: { 'application/json': { schema: { $ref: '#/components/schemas/Erro' } } } }
+                }
+            }
+        },
+
+        '/api/jobs/{id}': {
+            get: {
+                tags: ['Jobs'],
+                summary: 'Estado e progresso do job',
+                description: 'estado: pendente | executando | concluido | falhou. progresso: { feitas, total } (requisições de impressão de exames, detalhes de prescrições). Jobs terminados expiram após JOBS_TTL_MS (30 min).',
+                parameters: [{ name: 'id', in: 'path', required: true, schema: { type: 'string' } }],
+                responses: {
+                    200: { description: 'Job' },
+                    404: { description: 'Job inexistente ou expirado', content: { 'application/json': { schema: { $ref: '#/components/schemas/Erro' } } } }
+                }
+            }
+        },
+
+        '/api/jobs/{id}/eventos': {
+            get: {
+                tags: ['Jobs'],
+                summary: 'Progresso do job em Server-Sent Events',
+                description: 'Eventos `progresso` a cada mudança e um `fim` quando o job termina (a conexão é encerrada).',
+                parameters: [{ name: 'id', in: 'path', required: true, schema: { type: 'string' } }],
+                responses: {
+                    200: { description: 'text/event-stream' },
+                    404: { description: 'Job inexistente ou expirado', content: { 'application/json': { schema: { $ref: '#/components/schemas/Erro' } } } }
+                }
+            }
+        },
+
+        '/api/jobs/{id}/resultado': {
+            get: {
+                tags: ['Jobs'],
+                summary: 'Resultado do job',
+                description: 'Enquanto o job executa: 202 com o estado. Terminado: status e corpo do endpoint síncrono.',
+                parameters: [{ name: 'id', in: 'path', required: true, schema: { type: 'string' } }],
+                responses: {
+                    200: { description: 'Resultado' },
+                    202: { description: 'Job ainda em execução' },
+                    404: { description: 'Job inexistente ou expirado (ou dado não encontrado no HICD)', content: { 'application/json': { schema: { $ref: '#/components/schemas/Erro' } } } }
+                }
+            }
+        },
+
+        // ── FEED ──────────────────────────────────────────────────────────────
+
+        '/api/feed': {
+            get: {
+                tags: ['Feed'],
+                summary: 'Mudanças desde o cursor',
+                description: 'Eventos { cursor, em, tipo, host, prontuario, novos, alterados } publicados quando uma busca da própria API (requisição, lote, job ou pré-aquecimento) encontra requisições de exames, resultados ou evoluções que não estavam na busca anterior do mesmo paciente. Guarde `cursor` e envie em `since` na próxima chamada. `completo: false` = o cursor é de antes de um reinício ou mais antigo que o buffer (FEED_MAX_EVENTOS): reconsulte os pacientes uma vez. `mais: true` = há mais eventos além de `limite`.',
+                parameters: [
+                    { name: 'since', in: 'query', schema: { type: 'string' }, description: 'Cursor da última chamada (vazio = todo o buffer)' },
+                    { name: 'tipos', in: 'query', schema: { type: 'string' }, example: 'resultados-exames,evolucoes', description: 'requisicoes-exames, resultados-exames, evolucoes' },
+                    { name: 'prontuarios', in: 'query', schema: { type: 'string' }, example: '44826,45136' },
+                    { name: 'limite', in: 'query', schema: { type: 'integer', default: 500, maximum: 5000 } }
+                ],
+                responses: {
+                    200: { description: 'Eventos, cursor, completo e mais' },
+                    400: { description: 'Tipo inválido', content: { 'application/json': { schema: { $ref: '#/components/schemas/Erro' } } } },
+                    503: { description: 'Não autenticado', content: { 'application/json': { schema: { $ref: '#/components/schemas/Erro' } } } }
+                }
+            }
+        },
+
+        '/api/feed/stream': {
+            get: {
+                tags: ['Feed'],
+                summary: 'Mudanças em stream (SSE ou NDJSON)',
+                description: 'Evento `inicio` { cursor, completo, pendentes }, depois os eventos pendentes desde `since` (ou o cabeçalho Last-Event-ID) e cada novo evento como `mudanca` (em SSE com `id:` = cursor, de modo que o EventSource retoma de onde parou ao reconectar). `heartbeat` a cada FEED_HEARTBEAT_MS. Mesmos filtros de /api/feed.',
+                parameters: [
+                    { name: 'modo', in: 'query', schema: { type: 'string', enum: ['sse', 'ndjson'], default: 'sse' } },
+                    { name: 'since', in: 'query', schema: { type: 'string' } },
+                    { name: 'tipos', in: 'query', schema: { type: 'string' } },
+                    { name: 'prontuarios', in: 'query', schema: { type: 'string' } }
+                ],
+                responses: {
+                    200: { description: 'text/event-stream ou application/x-ndjson' },
+                    400: { description: 'Modo ou tipo inválido', content: { 'application/json': { schema: { $ref: '#/components/schemas/Erro' } } } },
+                    503: { description: 'Não autenticado', content: { 'application/json': { schema: { $ref: '#/components/schemas/Erro' } } } }
+                }
+            }
+        },
+
+        '/api/feed/stats': {
+            get: {
+                tags: ['Feed'],
+                summary: 'Estatísticas do feed',
+                responses: {
+                    200: { description: 'Cursor atual, eventos no buffer, pacientes observados, assinantes, observações e publicados' }
+                }
+            }
+        },
+
         // ── CACHE ─────────────────────────────────────────────────────────────
 
         '/api/cache/stats': {
@@ -430,6 +626,16 @@ Gere com: \`node payload.js usuario minhaSenha\``,
             }
         },
 
+        '/api/cache/prewarm': {
+            get: {
+                tags: ['Cache'],
+                summary: 'Estado do pré-aquecimento do cache',
+                description: 'Com PREWARM_CLINICAS configurado, dentro das janelas PREWARM_JANELAS e a cada PREWARM_INTERVALO_MS, os pacientes dessas clínicas têm evoluções, exames (com resultados) e prescrições renovados no cache antes de expirar. As requisições ao HICD vão para a fila de segundo plano do rate limiter do host e só andam quando não há requisição de usuário esperando. `ultimaExecucao`: { inicio, fim, duracaoMs, clinicas, pacientes, aquecidos, jaQuentes, falhas, requisicoesHicd, erros }.',
+                security: [],
+                responses: { 200: { description: 'Configuração, próxima verificação e última execução' } }
+            }
+        },
+
         '/api/cache/clear': {
             delete: {
                 tags: ['Cache'],
@@ -498,6 +704,19 @@ Gere com: \`node payload.js usuario minhaSenha\``,
                     }
                 }
             }
+        },
+
+        '/metrics': {
+            get: {
+                tags: ['Sistema'],
+                summary: 'Métricas no formato do Prometheus',
+                description: 'Histogramas de latência por rota da API (hicd_api_request_duration_seconds), por endpoint do HICD (hicd_upstream_request_duration_seconds), da espera no limitador (hicd_upstream_queue_wait_seconds) e por parser (hicd_parse_duration_seconds); consultas ao cache por resultado (hicd_cache_lookups_total). Com METRICS_TOKEN definido, exige `Authorization: Bearer <token>`. Cada resposta da API traz também o cabeçalho Server-Timing (hicd, hicd-fila, parse, cache, serializacao, total).',
+                security: [],
+                responses: {
+                    200: { description: 'text/plain; version=0.0.4' },
+                    401: { description: 'Token das métricas ausente ou inválido', content: { 'application/json': { schema: { $ref: '#/components/schemas/Erro' } } } }
+                }
+            }
         }
     }
 };
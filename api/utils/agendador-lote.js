@@ -0,0 +1,66 @@
+/**
+ * Agendamento das buscas de um lote multi-paciente.
+ *
+ * Tarefas repetidas (mesma `chave`) são executadas uma vez. As que já estão no
+ * cache rodam na hora, todas juntas — respondem em microssegundos. As demais
+ * entram numa fila com no máximo `concorrencia` em voo; o ritmo real das
+ * chamadas ao HICD continua sendo o do RateLimiter do crawler do host, então a
+ * fila só evita empilhar dezenas de buscas longas (e seus parses) de uma vez.
+ * Cada resultado é entregue a `onResultado` assim que termina.
+ */
+
+const LOTE_CONCORRENCIA = parseInt(process.env.LOTE_CONCORRENCIA) || 3;
+
+/**
+ * @param {Array<{ chave: string }>} tarefas
+ * @param {object} opcoes
+ * @param {(tarefa) => boolean} opcoes.emCache - a tarefa pode ser respondida do cache?
+ * @param {(tarefa) => Promise<{ status: number, body: any }>} opcoes.executar
+ * @param {(tarefa, resultado: { status: number, body: any }, doCache: boolean) => void} opcoes.onResultado
+ * @param {number} [opcoes.concorrencia]
+ * @param {AbortSignal} [opcoes.sinal] - abortado: nenhuma tarefa nova é iniciada
+ * @returns {Promise<{ total: number, doCache: number, agendadas: number, sucesso: number, falhas: number, canceladas: number }>}
+ */
+async function executarLote(tarefas, { emCache, executar, onResultado, concorrencia = LOTE_CONCORRENCIA, sinal } = {}) {
+    const unicas = new Map();
+    for (const tarefa of tarefas) {
+        if (!unicas.has(tarefa.chave)) unicas.set(tarefa.chave, tarefa);
+    }
+
+    const doCache = [];
+    const agendadas = [];
+    for (const tarefa of unicas.values()) {
+        (emCache(tarefa) ? doCache : agendadas).push(tarefa);
+    }
+
+    const stats = { total: unicas.size, doCache: doCache.length, agendadas: agendadas.length, sucesso: 0, falhas: 0, canceladas: 0 };
+
+    const rodar = async (tarefa, veioDoCache) => {
+        let resultado;
+        try {
+            resultado = await executar(tarefa);
+        } catch (error) {
+            resultado = { status: 500, body: { success: false, error: 'Erro ao executar busca do lote', message: error.message } };
+        }
+        if (resultado.status >= 400) stats.falhas++;
+        else stats.sucesso++;
+        onResultado(tarefa, resultado, veioDoCache);
+    };
+
+    let proxima = 0;
+    const trabalhador = async () => {
+        while (proxima < agendadas.length && !(sinal && sinal.aborted)) {
+            await rodar(agendadas[proxima++], false);
+        }
+    };
+
+    await Promise.all([
+        ...doCache.map(tarefa => rodar(tarefa, true)),
+        ...Array.from({ length: Math.min(Math.max(1, concorrencia), agendadas.length) }, trabalhador)
+    ]);
+
+    stats.canceladas = stats.total - stats.sucesso - stats.falhas;
+    return stats;
+}
+
+module.exports = { LOTE_CONCORRENCIA, executarLote };
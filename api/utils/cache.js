@@ -2,12 +2,27 @@
  * Sistema de Cache em Memória
  * Cache com TTL (Time To Live) para otimizar consultas ao HICD
  */
+const crypto = require('crypto');
+const { AsyncLocalStorage } = require('async_hooks');
+const { medir } = require('../../src/core/medicao');
+const { Metricas } = require('../../src/core/metricas');
+const { criarLogger } = require('../../src/core/logger');
+
+// hit/miss/set/delete são contados e só amostrados em debug; limpezas e invalidações saem em info
+const log = criarLogger('cache');
+
+// Chaves sendo renovadas pelo código que roda dentro de MemoryCache.refresh()
+const renovacao = new AsyncLocalStorage();
 
 class MemoryCache {
     constructor() {
         this.cache = new Map();
         this.pending = new Map(); // evita execução duplicada em cache miss simultâneo
         this.defaultTTL = 10 * 60 * 1000; // 10 minutos em milissegundos
+        // Modo cluster: camada compartilhada entre os workers (ClienteCluster), consultada
+        // nos misses de getOrSet; gravações e invalidações são repassadas a ela
+        this.camadaCompartilhada = null;
+        this._aplicandoRemoto = false;
 
         // Limpar cache expirado a cada 5 minutos.
         // .unref() evita que o timer segure o event loop (ex.: em testes/scripts).
@@ -45,14 +60,62 @@ class MemoryCache {
      */
     set(key, data, ttl = this.defaultTTL) {
         const expiresAt = Date.now() + ttl;
-        
+        const createdAt = Date.now();
+
+        this.setEntry(key, { data, expiresAt, createdAt });
+        if (this.camadaCompartilhada && !this._aplicandoRemoto) {
+            this.camadaCompartilhada.gravar(key, { data, expiresAt, createdAt });
+        }
+
+        if (log.evento('set')) log.debug('Cache SET', { chave: key, ttlS: ttl / 1000 });
+    }
+
+    /**
+     * Grava uma entrada com validade e data de criação já definidas (vinda de ou
+     * indo para a camada compartilhada), sem repassá-la
+     * @param {string} key - Chave do cache
+     * @param {{data: any, expiresAt: number, createdAt: number}} entry
+     */
+    setEntry(key, { data, expiresAt, createdAt }) {
         this.cache.set(key, {
             data,
             expiresAt,
-            createdAt: Date.now()
+            createdAt,
+            hash: null // calculado sob demanda por getEntryTag
         });
+    }
 
-        console.log(`📦 Cache SET: ${key} (TTL: ${ttl/1000}s)`);
+    /**
+     * Entrada válida com validade e data de criação, sem logar hit/miss
+     * @param {string} key - Chave do cache
+     * @returns {{data: any, expiresAt: number, createdAt: number}|null}
+     */
+    getEntry(key) {
+        const item = this.cache.get(key);
+        if (!item || Date.now() > item.expiresAt) return null;
+        return { data: item.data, expiresAt: item.expiresAt, createdAt: item.createdAt };
+    }
+
+    /**
+     * Liga o cache à camada compartilhada do modo cluster e aplica localmente as
+     * invalidações feitas pelos outros workers
+     * @param {object} camada - ClienteCluster (obter, gravar, desistir, invalidar; evento 'invalidar')
+     */
+    usarCamadaCompartilhada(camada) {
+        this.camadaCompartilhada = camada;
+        camada.on('invalidar', ({ operacao, args }) => {
+            this._aplicandoRemoto = true;
+            try {
+                this[operacao](...args);
+            } finally {
+                this._aplicandoRemoto = false;
+            }
+        });
+    }
+
+    /** Repassa uma invalidação à camada compartilhada (não as que vieram dela). @private */
+    _propagar(operacao, args) {
+        if (this.camadaCompartilhada && !this._aplicandoRemoto) this.camadaCompartilhada.invalidar(operacao, args);
     }
 
     /**
@@ -61,33 +124,83 @@ class MemoryCache {
      * @returns {any|null} Dados armazenados ou null se não encontrado/expirado
      */
     get(key) {
+        return medir('cache', () => this._consultar(key));
+    }
+
+    /** @private */
+    _consultar(key) {
         const item = this.cache.get(key);
         
         if (!item) {
-            console.log(`❌ Cache MISS: ${key}`);
+            Metricas.compartilhado.consultasCache.incrementar(['miss']);
+            if (log.evento('miss')) log.debug('Cache MISS', { chave: key });
             return null;
         }
 
         if (Date.now() > item.expiresAt) {
             this.cache.delete(key);
-            console.log(`⏰ Cache EXPIRED: ${key}`);
+            Metricas.compartilhado.consultasCache.incrementar(['expired']);
+            if (log.evento('expired')) log.debug('Cache EXPIRED', { chave: key });
             return null;
         }
 
-        const ageSeconds = Math.round((Date.now() - item.createdAt) / 1000);
-        console.log(`✅ Cache HIT: ${key} (idade: ${ageSeconds}s)`);
+        Metricas.compartilhado.consultasCache.incrementar(['hit']);
+        if (log.evento('hit')) {
+            log.debug('Cache HIT', { chave: key, idadeS: Math.round((Date.now() - item.createdAt) / 1000) });
+        }
         return item.data;
     }
 
+    /**
+     * Hash do conteúdo de uma entrada (para ETag). Calculado na primeira consulta
+     * e guardado junto da entrada — as consultas seguintes não serializam os dados.
+     * @param {string} key - Chave do cache
+     * @returns {{hash: string, createdAt: number}|null} null se ausente ou expirada
+     */
+    getEntryTag(key) {
+        const item = this.cache.get(key);
+        if (!item || Date.now() > item.expiresAt) return null;
+
+        if (item.hash === null) {
+            item.hash = crypto.createHash('sha1').update(JSON.stringify(item.data) ?? '').digest('base64url');
+        }
+        return { hash: item.hash, createdAt: item.createdAt };
+    }
+
+    /**
+     * Momento em que a entrada expira, sem tocar nos dados nem logar hit/miss
+     * (para checar presença e idade antes de decidir buscar).
+     * @param {string} key - Chave do cache
+     * @returns {number|null} timestamp em ms, ou null se ausente ou expirada
+     */
+    getExpiresAt(key) {
+        const item = this.cache.get(key);
+        if (!item || Date.now() > item.expiresAt) return null;
+        return item.expiresAt;
+    }
+
+    /**
+     * Momento em que a entrada foi gravada, sem tocar nos dados nem logar hit/miss
+     * (para quem exige dados mais novos que o TTL garante).
+     * @param {string} key - Chave do cache
+     * @returns {number|null} timestamp em ms, ou null se ausente ou expirada
+     */
+    getCreatedAt(key) {
+        const item = this.cache.get(key);
+        if (!item || Date.now() > item.expiresAt) return null;
+        return item.createdAt;
+    }
+
     /**
      * Remove item específico do cache
      * @param {string} key - Chave do cache
      */
     delete(key) {
         const deleted = this.cache.delete(key);
-        if (deleted) {
-            console.log(`🗑️ Cache DELETE: ${key}`);
+        if (deleted && log.evento('delete')) {
+            log.debug('Cache DELETE', { chave: key });
         }
+        this._propagar('delete', [key]);
         return deleted;
     }
 
@@ -106,7 +219,7 @@ class MemoryCache {
         }
 
         if (cleanedCount > 0) {
-            console.log(`🧹 Cache limpo: ${cleanedCount} itens expirados removidos`);
+            log.info('Itens expirados removidos', { itens: cleanedCount });
         }
     }
 
@@ -116,7 +229,8 @@ class MemoryCache {
     clear() {
         const size = this.cache.size;
         this.cache.clear();
-        console.log(`🗑️ Cache limpo completamente: ${size} itens removidos`);
+        log.info('Cache limpo completamente', { itens: size });
+        this._propagar('clear', []);
     }
 
     /**
@@ -134,9 +248,43 @@ class MemoryCache {
         }
 
         if (invalidatedCount > 0) {
-            console.log(`🔄 Cache invalidado para paciente ${prontuario}: ${invalidatedCount} itens`);
+            log.info('Cache invalidado para paciente', { prontuario, itens: invalidatedCount });
         }
-        
+        this._propagar('invalidatePatient', [prontuario]);
+
+        return invalidatedCount;
+    }
+
+    /**
+     * Invalida as entradas de um paciente nos tipos informados, só do host
+     * informado (com quaisquer outros parâmetros na chave)
+     * @param {string} prontuario - Prontuário do paciente
+     * @param {string[]} types - Tipos de consulta
+     * @param {string} [host] - Host HICD (null = chaves sem host)
+     */
+    invalidatePatientTypes(prontuario, types, host = null) {
+        let invalidatedCount = 0;
+
+        for (const key of this.cache.keys()) {
+            const type = types.find(t => key.startsWith(`${t}:${prontuario}`));
+            if (!type) continue;
+
+            // "analise:123" não pode casar com "analise:1234"
+            const resto = key.slice(`${type}:${prontuario}`.length);
+            if (resto !== '' && !resto.startsWith(':')) continue;
+
+            const hostParam = resto.slice(1).split('|').find(p => p.startsWith('host:'));
+            if ((hostParam ? hostParam.slice('host:'.length) : null) !== (host || null)) continue;
+
+            this.cache.delete(key);
+            invalidatedCount++;
+        }
+
+        if (invalidatedCount > 0) {
+            log.info('Cache invalidado para paciente', { prontuario, tipos: types.join(','), itens: invalidatedCount });
+        }
+        this._propagar('invalidatePatientTypes', [prontuario, types, host]);
+
         return invalidatedCount;
     }
 
@@ -155,9 +303,10 @@ class MemoryCache {
         }
 
         if (invalidatedCount > 0) {
-            console.log(`🔄 Cache invalidado para tipo ${type}: ${invalidatedCount} itens`);
+            log.info('Cache invalidado para tipo', { tipo: type, itens: invalidatedCount });
         }
-        
+        this._propagar('invalidateType', [type]);
+
         return invalidatedCount;
     }
 
@@ -197,8 +346,11 @@ class MemoryCache {
      * @param {number} ttl - TTL personalizado (opcional)
      */
     async getOrSet(cacheKey, asyncFunction, ttl = this.defaultTTL) {
+        // Dentro de refresh(), as chaves renovadas ignoram a entrada atual
+        const renovando = Boolean(renovacao.getStore() && renovacao.getStore().has(cacheKey));
+
         // Tentar buscar no cache primeiro
-        const cached = this.get(cacheKey);
+        const cached = renovando ? null : this.get(cacheKey);
         if (cached !== null) {
             return cached;
         }
@@ -209,9 +361,8 @@ class MemoryCache {
         }
 
         // Registrar a promise pendente antes de executar para bloquear chamadas concorrentes
-        const promise = asyncFunction()
+        const promise = this._buscar(cacheKey, asyncFunction, ttl, renovando)
             .then(data => {
-                this.set(cacheKey, data, ttl);
                 this.pending.delete(cacheKey);
                 return data;
             })
@@ -223,6 +374,51 @@ class MemoryCache {
         this.pending.set(cacheKey, promise);
         return promise;
     }
+
+    /**
+     * Renova entradas antes de expirarem sem tirá-las do cache: dentro de `fn`,
+     * getOrSet das `chaves` busca de novo e sobrescreve a entrada só quando a
+     * busca dá certo. Enquanto isso, as outras chamadas continuam recebendo a
+     * entrada atual em vez de esperar pela renovação (que pode estar numa fila
+     * de segundo plano); se a busca falhar, a entrada atual fica.
+     * @param {string[]} chaves - chaves a renovar
+     * @param {Function} fn - código que chama getOrSet com essas chaves (ex.: o handler do endpoint)
+     */
+    refresh(chaves, fn) {
+        return renovacao.run(new Set(chaves), fn);
+    }
+
+    /**
+     * Miss local. Com camada compartilhada, usa a entrada de lá ou recebe a vez de
+     * executar — se outro worker já está executando para a mesma chave, espera
+     * a gravação dele em vez de repetir a busca. Com a vez, a mantém enquanto a
+     * busca não termina (buscas de resultados podem levar minutos). Numa renovação
+     * a entrada de lá é justamente a que se quer substituir: busca direto e grava por cima.
+     * @private
+     */
+    async _buscar(cacheKey, asyncFunction, ttl, renovando = false) {
+        const camada = renovando ? null : this.camadaCompartilhada;
+        if (camada) {
+            const entrada = await camada.obter(cacheKey);
+            if (entrada) {
+                this.setEntry(cacheKey, entrada);
+                return entrada.data;
+            }
+        }
+
+        const soltarVez = camada ? camada.manterVez(cacheKey) : null;
+        let data;
+        try {
+            data = await asyncFunction();
+        } catch (error) {
+            if (camada) camada.desistir(cacheKey);
+            throw error;
+        } finally {
+            if (soltarVez) soltarVez();
+        }
+        this.set(cacheKey, data, ttl);
+        return data;
+    }
 }
 
 // Instância única do cache
@@ -0,0 +1,172 @@
+/**
+ * Feed de mudanças: novas requisições/resultados de exames e novas evoluções.
+ *
+ * Sempre que a API busca esses dados no HICD (requisição de usuário, lote,
+ * job ou pré-aquecimento), o controller entrega a lista ao feed via
+ * `observar`. O feed compara com o que viu da última vez para o mesmo
+ * paciente e, havendo itens novos ou alterados, publica um evento. A primeira
+ * observação de um paciente é só a linha de base (não gera evento).
+ *
+ * Consumidores acompanham o feed em vez de consultar todos os pacientes:
+ * `desde(cursor)` para pull e o evento `evento` (SSE) para push. O cursor é
+ * `<instância>.<sequência>`; um cursor de outra instância (o processo
+ * reiniciou, ou outro worker no modo cluster) ou mais antigo que o buffer
+ * devolve `completo: false` — o consumidor deve então reconsultar tudo uma vez.
+ *
+ * No modo cluster cada worker tem o seu feed (as observações são repassadas
+ * entre eles, mas a sequência é local): o pull só é contínuo com roteamento
+ * fixo do cliente para um worker.
+ */
+const EventEmitter = require('events');
+
+const TIPOS_FEED = ['requisicoes-exames', 'resultados-exames', 'evolucoes'];
+
+let feedsCriados = 0;
+
+/**
+ * Identificador da instância no cursor. Inclui o pid: workers abertos no mesmo
+ * milissegundo não podem aceitar o cursor um do outro (a sequência de cada um
+ * é independente e eventos seriam pulados).
+ */
+function novaInstancia() {
+    return [process.pid, Date.now(), ++feedsCriados].map(n => n.toString(36)).join('-');
+}
+
+class ChangeFeed extends EventEmitter {
+    /**
+     * @param {object} [options]
+     * @param {number} [options.maxEventos] - eventos mantidos para pull
+     * @param {number} [options.maxPacientes] - linhas de base guardadas (as menos recentes saem primeiro)
+     */
+    constructor(options = {}) {
+        super();
+        this.setMaxListeners(0);
+        this.maxEventos = options.maxEventos || parseInt(process.env.FEED_MAX_EVENTOS) || 5000;
+        this.maxPacientes = options.maxPacientes || parseInt(process.env.FEED_MAX_PACIENTES) || 2000;
+
+        this.instancia = novaInstancia();
+        this.sequencia = 0;
+        this.eventos = [];
+        // `${tipo}:${host}:${prontuario}` → Map<id do item, assinatura>
+        this.linhasDeBase = new Map();
+        this.stats = { observacoes: 0, publicados: 0 };
+    }
+
+    /**
+     * Compara os itens atuais de um paciente com a última observação e publica
+     * o que mudou.
+     * @param {string} tipo - um de TIPOS_FEED
+     * @param {string|null} host
+     * @param {string} prontuario
+     * @param {Map<string, string>} itens - id do item → assinatura (muda quando o item muda)
+     * @returns {object|null} evento publicado
+     */
+    observar(tipo, host, prontuario, itens) {
+        this.stats.observacoes++;
+        const chave = `${tipo}:${host || ''}:${prontuario}`;
+        const anterior = this.linhasDeBase.get(chave);
+
+        // Reinsere no fim: o Map fica em ordem de uso para o descarte
+        this.linhasDeBase.delete(chave);
+        this.linhasDeBase.set(chave, itens);
+        while (this.linhasDeBase.size > this.maxPacientes) {
+            this.linhasDeBase.delete(this.linhasDeBase.keys().next().value);
+        }
+
+        if (!anterior) return null;
+
+        const novos = [];
+        const alterados = [];
+        for (const [id, assinatura] of itens) {
+            if (!anterior.has(id)) novos.push(id);
+            else if (anterior.get(id) !== assinatura) alterados.push(id);
+        }
+        if (novos.length === 0 && alterados.length === 0) return null;
+
+        return this.publicar({ tipo, host: host || null, prontuario: String(prontuario), novos, alterados });
+    }
+
+    /** Acrescenta um evento ao feed e avisa os assinantes. */
+    publicar(dados) {
+        const evento = { cursor: `${this.instancia}.${++this.sequencia}`, em: new Date().toISOString(), ...dados };
+        this.eventos.push(evento);
+        if (this.eventos.length > this.maxEventos) this.eventos.splice(0, this.eventos.length - this.maxEventos);
+        this.stats.publicados++;
+        this.emit('evento', evento);
+        return evento;
+    }
+
+    /**
+     * Eventos posteriores ao cursor.
+     * @param {string} [cursor] - vazio = desde o início do buffer
+     * @param {object} [filtros]
+     * @param {string|null} [filtros.host] - só eventos deste host
+     * @param {string[]} [filtros.tipos]
+     * @param {string[]} [filtros.prontuarios]
+     * @param {number} [filtros.limite=500]
+     * @returns {{ eventos: object[], cursor: string, completo: boolean, mais: boolean }}
+     */
+    desde(cursor, filtros = {}) {
+        const { host, tipos, prontuarios, limite = 500 } = filtros;
+        const [instancia, sequencia] = String(cursor || '').split('.');
+        const desdeSequencia = instancia === this.instancia ? parseInt(sequencia) || 0 : 0;
+        const primeira = this.eventos.length > 0 ? this.sequenciaDe(this.eventos[0]) : this.sequencia + 1;
+
+        // Cursor de outra instância, ou eventos entre o cursor e o buffer já descartados
+        const completo = !cursor || (instancia === this.instancia && desdeSequencia >= primeira - 1);
+
+        const eventos = [];
+        let ultimo = cursor && instancia === this.instancia ? desdeSequencia : 0;
+        let mais = false;
+        // Busca binária: o buffer está em ordem de sequência
+        for (let i = this._indiceApos(desdeSequencia); i < this.eventos.length; i++) {
+            const evento = this.eventos[i];
+            if (eventos.length >= limite) {
+                mais = true;
+                break;
+            }
+            ultimo = this.sequenciaDe(evento);
+            if (host !== undefined && evento.host !== (host || null)) continue;
+            if (tipos && !tipos.includes(evento.tipo)) continue;
+            if (prontuarios && !prontuarios.includes(evento.prontuario)) continue;
+            eventos.push(evento);
+        }
+
+        return { eventos, cursor: `${this.instancia}.${ultimo}`, completo, mais };
+    }
+
+    /** Cursor do fim do feed (para quem quer só o que vier daqui em diante). */
+    cursorAtual() {
+        return `${this.instancia}.${this.sequencia}`;
+    }
+
+    sequenciaDe(evento) {
+        return parseInt(evento.cursor.split('.')[1]);
+    }
+
+    _indiceApos(sequencia) {
+        let inicio = 0;
+        let fim = this.eventos.length;
+        while (inicio < fim) {
+            const meio = (inicio + fim) >> 1;
+            if (this.sequenciaDe(this.eventos[meio]) <= sequencia) inicio = meio + 1;
+            else fim = meio;
+        }
+        return inicio;
+    }
+
+    getStats() {
+        return {
+            cursor: this.cursorAtual(),
+            eventos: this.eventos.length,
+            maxEventos: this.maxEventos,
+            pacientesObservados: this.linhasDeBase.size,
+            assinantes: this.listenerCount('evento'),
+            ...this.stats
+        };
+    }
+}
+
+ChangeFeed.compartilhado = new ChangeFeed();
+
+module.exports = { TIPOS_FEED, ChangeFeed };
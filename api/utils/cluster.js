@@ -0,0 +1,408 @@
+/**
+ * Coordenação entre os workers do modo cluster (api-cluster.js).
+ *
+ * O processo primário não atende HTTP: guarda a camada de cache compartilhada
+ * (o MemoryCache dele, com as entradas gravadas por todos os workers) e a sessão
+ * HICD de cada host. Os workers falam com ele pelo canal IPC do cluster:
+ *
+ *  - cache: num miss local, o worker pede a entrada ao primário; se ninguém a
+ *    tiver, recebe a vez de buscar no HICD e os outros workers que pedirem a
+ *    mesma chave esperam a gravação (single-flight entre processos, como o
+ *    `pending` do MemoryCache dentro de um processo). Invalidações vão para o
+ *    primário e para os caches locais de todos os workers.
+ *  - sessão: um login por host. Quem precisa de sessão (auto-login, sessão
+ *    expirada) recebe a do host se outro worker já a abriu ou renovou; senão
+ *    recebe a vez de fazer o login e os demais esperam e adotam os cookies.
+ *  - feed: listas observadas por um worker são repassadas aos outros, para que
+ *    o feed de mudanças de cada um veja as buscas feitas pelos demais.
+ *  - jobs: o registro fica no primário. O worker que executa um job publica
+ *    cada mudança; os outros consultam o job e recebem os eventos dele. Job
+ *    ativo de um worker que morre é dado como falho.
+ *
+ * A vez de buscar (concessão) expira quando o worker morre ou fica
+ * CLUSTER_CONCESSAO_MS sem renová-la; o próximo da fila assume. Enquanto a busca
+ * está em andamento o worker a renova a cada metade do prazo — uma busca de
+ * resultados de vários minutos não é repetida por outro worker.
+ */
+const { EventEmitter } = require('events');
+const cache = require('./cache');
+const JobManager = require('./job-manager');
+
+const CANAL = 'hicd-cluster';
+const CONCESSAO_MS = parseInt(process.env.CLUSTER_CONCESSAO_MS) || 2 * 60 * 1000;
+
+// Operações do MemoryCache replicadas entre os processos
+const INVALIDACOES = ['delete', 'clear', 'invalidatePatient', 'invalidatePatientTypes', 'invalidateType'];
+
+class CoordenadorCluster {
+    /**
+     * @param {object} [options]
+     * @param {object} [options.cache] - MemoryCache que serve de camada compartilhada (padrão: o do processo)
+     * @param {number} [options.concessaoMs]
+     * @param {JobManager} [options.jobs] - registro dos jobs de todos os workers
+     */
+    constructor(options = {}) {
+        this.cache = options.cache || cache;
+        this.concessaoMs = options.concessaoMs || CONCESSAO_MS;
+        this.workers = new Set();
+        // host → { username, password, cookies }
+        this.sessoes = new Map();
+        // 'cache:<chave>' | 'sessao:<host>' → { worker, timer, esperando: [{ worker, msg }] }
+        this.concessoes = new Map();
+        this.jobs = options.jobs || new JobManager();
+        // id do job ativo → worker que o executa
+        this.donosJobs = new Map();
+        this.stats = { consultas: 0, encontradas: 0, concedidas: 0, renovacoes: 0, esperas: 0, gravacoes: 0, invalidacoes: 0, logins: 0 };
+    }
+
+    /**
+     * Passa a atender um worker (cluster.Worker ou qualquer EventEmitter com send()).
+     * @param {object} worker
+     */
+    anexar(worker) {
+        this.workers.add(worker);
+        worker.on('message', (msg) => this._receber(worker, msg));
+        worker.on('exit', () => this._desanexar(worker));
+    }
+
+    _desanexar(worker) {
+        this.workers.delete(worker);
+        for (const [recurso, concessao] of [...this.concessoes]) {
+            concessao.esperando = concessao.esperando.filter(e => e.worker !== worker);
+            if (concessao.worker === worker) this._liberar(recurso);
+        }
+        for (const [id, dono] of [...this.donosJobs]) {
+            if (dono !== worker) continue;
+            const job = this.jobs.obter(id);
+            if (job) {
+                const erro = 'Worker que executava o job foi encerrado';
+                Object.assign(job, {
+                    estado: 'falhou',
+                    erro,
+                    concluidoEm: new Date().toISOString(),
+                    resultado: { status: 500, body: { success: false, error: 'Erro ao executar job', message: erro } }
+                });
+                this._publicarJob(worker, job);
+            }
+        }
+    }
+
+    _receber(worker, msg) {
+        if (!msg || msg.canal !== CANAL) return;
+        switch (msg.tipo) {
+            case 'cache:obter': return this._obterCache(worker, msg);
+            case 'cache:gravar': return this._gravarCache(worker, msg);
+            case 'cache:desistir': return this._liberar(`cache:${msg.chave}`, worker);
+            case 'cache:renovar': return this._renovar(`cache:${msg.chave}`, worker);
+            case 'cache:invalidar': return this._invalidarCache(worker, msg);
+            case 'sessao:obter': return this._obterSessao(worker, msg);
+            case 'sessao:publicar': return this._publicarSessao(worker, msg);
+            case 'sessao:desistir': return this._liberar(`sessao:${msg.host}`, worker);
+            case 'feed:observar': return this._difundir(worker, 'feed', { observacao: msg.observacao });
+            case 'job:publicar': return this._publicarJob(worker, msg.job);
+            case 'job:obter': return this._responder(worker, msg, { job: this.jobs.obter(msg.jobId) });
+            case 'stats': return this._responder(worker, msg, { stats: this.getStats() });
+        }
+    }
+
+    _obterCache(worker, msg) {
+        if (!msg.reprocessado) this.stats.consultas++;
+        const entrada = this.cache.getEntry(msg.chave);
+        if (entrada) {
+            this.stats.encontradas++;
+            return this._responder(worker, msg, { entrada });
+        }
+        if (this._aguardarVez(`cache:${msg.chave}`, worker, msg)) return;
+        this._responder(worker, msg, { entrada: null, concessaoMs: this.concessaoMs });
+    }
+
+    _gravarCache(worker, msg) {
+        this.stats.gravacoes++;
+        this.cache.setEntry(msg.chave, msg.entrada);
+        // Cópias locais antigas nos outros workers: a próxima leitura vem daqui
+        this._difundir(worker, 'cache:invalidar', { operacao: 'delete', args: [msg.chave] });
+        this._liberar(`cache:${msg.chave}`, worker);
+    }
+
+    _invalidarCache(worker, msg) {
+        if (!INVALIDACOES.includes(msg.operacao)) return;
+        this.stats.invalidacoes++;
+        this.cache[msg.operacao](...msg.args);
+        this._difundir(worker, 'cache:invalidar', { operacao: msg.operacao, args: msg.args });
+    }
+
+    /** Sessão do host se for outra que não a do pedido (expirada ou nenhuma); senão, a vez de fazer login. */
+    _obterSessao(worker, msg) {
+        const sessao = this.sessoes.get(msg.host);
+        if (sessao && sessao.cookies !== msg.cookies) return this._responder(worker, msg, { sessao });
+        if (this._aguardarVez(`sessao:${msg.host}`, worker, msg)) return;
+        this._responder(worker, msg, { sessao: null });
+    }
+
+    _publicarSessao(worker, msg) {
+        this.stats.logins++;
+        this.sessoes.set(msg.host, msg.sessao);
+        this._difundir(worker, 'sessao', { host: msg.host, sessao: msg.sessao });
+        this._liberar(`sessao:${msg.host}`, worker);
+    }
+
+    _publicarJob(worker, job) {
+        this.jobs.registrar(job);
+        const resumo = this.jobs.resumo(job);
+        if (resumo.ativo) this.donosJobs.set(job.id, worker);
+        else this.donosJobs.delete(job.id);
+        this._difundir(worker, 'job', { resumo });
+    }
+
+    /**
+     * Concede a vez ao worker, ou o põe na fila se outro já a tem.
+     * @returns {boolean} true se o pedido ficou esperando
+     */
+    _aguardarVez(recurso, worker, msg) {
+        const concessao = this.concessoes.get(recurso);
+        if (concessao && concessao.worker !== worker) {
+            if (!msg.reprocessado) this.stats.esperas++;
+            concessao.esperando.push({ worker, msg });
+            return true;
+        }
+        if (!concessao) {
+            this.stats.concedidas++;
+            this.concessoes.set(recurso, { worker, timer: this._prazo(recurso), esperando: [] });
+        }
+        return false;
+    }
+
+    /** Quem tem a vez e ainda está buscando adia a expiração dela. */
+    _renovar(recurso, worker) {
+        const concessao = this.concessoes.get(recurso);
+        if (!concessao || concessao.worker !== worker) return;
+        this.stats.renovacoes++;
+        clearTimeout(concessao.timer);
+        concessao.timer = this._prazo(recurso);
+    }
+
+    _prazo(recurso) {
+        const timer = setTimeout(() => this._liberar(recurso), this.concessaoMs);
+        if (typeof timer.unref === 'function') timer.unref();
+        return timer;
+    }
+
+    /**
+     * Encerra a concessão (de `worker`, se informado) e reprocessa os pedidos em
+     * espera: pegam a entrada/sessão gravada ou o primeiro deles recebe a vez.
+     */
+    _liberar(recurso, worker) {
+        const concessao = this.concessoes.get(recurso);
+        if (!concessao || (worker && concessao.worker !== worker)) return;
+        clearTimeout(concessao.timer);
+        this.concessoes.delete(recurso);
+        for (const { worker: esperando, msg } of concessao.esperando) this._receber(esperando, { ...msg, reprocessado: true });
+    }
+
+    _responder(worker, msg, dados) {
+        this._enviar(worker, { canal: CANAL, tipo: 'resposta', id: msg.id, ...dados });
+    }
+
+    _difundir(origem, tipo, dados) {
+        for (const worker of this.workers) {
+            if (worker !== origem) this._enviar(worker, { canal: CANAL, tipo, ...dados });
+        }
+    }
+
+    _enviar(worker, msg) {
+        try {
+            worker.send(msg);
+        } catch (error) {
+            // Worker saindo: o 'exit' remove as concessões dele
+            console.warn('[CLUSTER] Falha ao enviar mensagem ao worker:', error.message);
+        }
+    }
+
+    getStats() {
+        return {
+            workers: this.workers.size,
+            entradas: this.cache.cache.size,
+            hostsComSessao: [...this.sessoes.keys()],
+            concessoesAtivas: this.concessoes.size,
+            jobs: this.jobs.getStats().jobs,
+            ...this.stats
+        };
+    }
+}
+
+/**
+ * Lado do worker. Implementa a camada compartilhada usada pelo MemoryCache
+ * (obter, manterVez, gravar, desistir, invalidar), o registro de jobs usado pelo
+ * JobManager (publicarJob, obterJob) e emite 'invalidar', 'sessao', 'feed' e 'job'
+ * com o que os outros workers fizeram.
+ */
+class ClienteCluster extends EventEmitter {
+    /**
+     * @param {object} canal - `process` no worker (send + evento 'message')
+     */
+    constructor(canal) {
+        super();
+        this.canal = canal;
+        this.proximoId = 1;
+        // id → resolve
+        this.pendentes = new Map();
+        // chave → prazo da concessão informado pelo primário
+        this.prazos = new Map();
+        this.stats = { consultas: 0, encontradas: 0, buscasConcedidas: 0, gravacoes: 0, invalidacoesRecebidas: 0, sessoesAdotadas: 0 };
+        canal.on('message', (msg) => this._receber(msg));
+    }
+
+    /** Cria o cliente do processo (ClienteCluster.compartilhado). */
+    static conectar(canal = process) {
+        ClienteCluster.compartilhado = new ClienteCluster(canal);
+        return ClienteCluster.compartilhado;
+    }
+
+    _receber(msg) {
+        if (!msg || msg.canal !== CANAL) return;
+        if (msg.tipo === 'resposta') {
+            const resolver = this.pendentes.get(msg.id);
+            this.pendentes.delete(msg.id);
+            if (resolver) resolver(msg);
+            return;
+        }
+        if (msg.tipo === 'cache:invalidar') {
+            this.stats.invalidacoesRecebidas++;
+            this.emit('invalidar', { operacao: msg.operacao, args: msg.args });
+        } else if (msg.tipo === 'sessao') {
+            this.emit('sessao', { host: msg.host, sessao: msg.sessao });
+        } else if (msg.tipo === 'feed') {
+            this.emit('feed', msg.observacao);
+        } else if (msg.tipo === 'job') {
+            this.emit('job', msg.resumo);
+        }
+    }
+
+    _enviar(tipo, dados) {
+        this.canal.send({ canal: CANAL, tipo, ...dados });
+    }
+
+    _pedir(tipo, dados) {
+        const id = this.proximoId++;
+        return new Promise((resolve) => {
+            this.pendentes.set(id, resolve);
+            this._enviar(tipo, { id, ...dados });
+        });
+    }
+
+    // ===== Camada compartilhada do cache =====
+
+    /**
+     * Entrada da camada compartilhada, ou null — e então este worker tem a vez de
+     * buscar (e deve chamar gravar ou desistir). Espera se outro worker estiver buscando.
+     * @param {string} chave
+     * @returns {Promise<{data: any, expiresAt: number, createdAt: number}|null>}
+     */
+    async obter(chave) {
+        this.stats.consultas++;
+        const { entrada, concessaoMs } = await this._pedir('cache:obter', { chave });
+        this.stats[entrada ? 'encontradas' : 'buscasConcedidas']++;
+        if (!entrada) this.prazos.set(chave, concessaoMs);
+        return entrada;
+    }
+
+    /**
+     * Renova a vez de buscar `chave` (recebida de obter) a cada metade do prazo,
+     * até a função devolvida ser chamada.
+     * @param {string} chave
+     * @returns {Function} para de renovar
+     */
+    manterVez(chave) {
+        const prazo = this.prazos.get(chave);
+        this.prazos.delete(chave);
+        if (!prazo) return () => {};
+        const timer = setInterval(() => this._enviar('cache:renovar', { chave }), Math.max(1, Math.floor(prazo / 2)));
+        if (typeof timer.unref === 'function') timer.unref();
+        return () => clearInterval(timer);
+    }
+
+    gravar(chave, entrada) {
+        this.prazos.delete(chave);
+        this.stats.gravacoes++;
+        this._enviar('cache:gravar', { chave, entrada });
+    }
+
+    desistir(chave) {
+        this.prazos.delete(chave);
+        this._enviar('cache:desistir', { chave });
+    }
+
+    invalidar(operacao, args) {
+        this._enviar('cache:invalidar', { operacao, args });
+    }
+
+    // ===== Sessão HICD por host =====
+
+    /**
+     * Sessão do host aberta por outro worker ou, se não houver outra além de
+     * `cookiesAtuais`, a vez de abrir: chama `abrir()` e publica o resultado.
+     * @param {string} host
+     * @param {string|null} cookiesAtuais - cookies da sessão que este worker já tem (expirada), ou null
+     * @param {() => Promise<{username: string, password: string, cookies: string}|null>} abrir - login local
+     * @returns {Promise<{sessao: object|null, adotada: boolean}>}
+     */
+    async sessao(host, cookiesAtuais, abrir) {
+        const { sessao } = await this._pedir('sessao:obter', { host, cookies: cookiesAtuais });
+        if (sessao) {
+            this.stats.sessoesAdotadas++;
+            return { sessao, adotada: true };
+        }
+
+        let aberta = null;
+        try {
+            aberta = await abrir();
+        } finally {
+            if (aberta) this.publicarSessao(host, aberta);
+            else this._enviar('sessao:desistir', { host });
+        }
+        return { sessao: aberta, adotada: false };
+    }
+
+    publicarSessao(host, sessao) {
+        this._enviar('sessao:publicar', { host, sessao });
+    }
+
+    // ===== Feed de mudanças =====
+
+    /** Repassa aos outros workers uma lista observada aqui (argumentos de ChangeFeed.observar). */
+    difundirObservacao(tipo, host, prontuario, itens) {
+        this._enviar('feed:observar', { observacao: { tipo, host, prontuario, itens } });
+    }
+
+    // ===== Jobs =====
+
+    /** Publica o estado atual de um job executado aqui no registro do primário. */
+    publicarJob(job) {
+        this._enviar('job:publicar', { job });
+    }
+
+    /**
+     * Job de qualquer worker, do registro do primário.
+     * @param {string} id
+     * @returns {Promise<object|null>}
+     */
+    async obterJob(id) {
+        const { job } = await this._pedir('job:obter', { jobId: id });
+        return job;
+    }
+
+    /** Estatísticas do primário (camada compartilhada, sessões, concessões). */
+    async statsCoordenador() {
+        const { stats } = await this._pedir('stats', {});
+        return stats;
+    }
+
+    getStats() {
+        return { ...this.stats };
+    }
+}
+
+// Fora do modo cluster não há cliente
+ClienteCluster.compartilhado = null;
+
+module.exports = { CANAL, CoordenadorCluster, ClienteCluster };
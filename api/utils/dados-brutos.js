@@ -0,0 +1,271 @@
+/**
+ * Camada de dados brutos do paciente, compartilhada por todos os endpoints.
+ *
+ * Cada recurso do HICD (cadastro, evoluções, requisições de exames, resultados,
+ * prescrições) é buscado e guardado uma única vez por host + prontuário; os
+ * endpoints compõem as suas visões (detalhes, evoluções, análise, exames,
+ * último dia) a partir daqui e cacheiam só a visão derivada por cima. Abrir um
+ * paciente no frontend (detalhes + análise + evoluções + exames) passa a
+ * rastrear cada página do HICD uma vez, não uma vez por endpoint.
+ *
+ * Quando um recurso é buscado de novo, as visões derivadas dele para o mesmo
+ * paciente e host saem do cache (são recalculadas na próxima requisição, sem
+ * tocar o HICD) e a lista é entregue ao feed de mudanças.
+ *
+ * Contadores por recurso e por visão mostram quantas buscas ao HICD cada
+ * requisição de endpoint custou (`buscasPorRequisicao`).
+ *
+ * O progresso de uma busca longa (resultados, prescrições) é repassado a todos
+ * os que pediram o recurso, inclusive a quem entrou na busca já em andamento
+ * (um job que chega depois de uma requisição síncrona, do pré-aquecimento ou
+ * de um lote recebe o último progresso na hora e os seguintes).
+ *
+ * Uma busca com `sinal` (stream de exames) só é interrompida pelo sinal se
+ * ninguém mais estiver esperando por ela; interrompida, não vai para o cache.
+ *
+ * As evoluções são guardadas com os textos em chunks (EvolucaoStore): a visão
+ * detalhada reaproveita os mesmos chunks em vez de guardar os textos de novo.
+ */
+const cache = require('./cache');
+const { ChangeFeed } = require('./change-feed');
+const { ClienteCluster } = require('./cluster');
+const EvolucaoStore = require('../../src/core/evolucao-store');
+const { chaveEvolucao } = require('../../src/parsers/evolucao-identidade');
+
+/**
+ * recurso → tipo da chave de cache, visões derivadas (tipos de chave invalidados
+ * quando o recurso é rebuscado), busca no crawler, mensagem quando o HICD não
+ * devolve nada (não vai para o cache), observação para o feed e, se houver,
+ * a forma guardada no cache (compactar/expandir).
+ */
+const RECURSOS_BRUTOS = {
+    cadastro: {
+        tipo: 'cadastro-raw',
+        derivados: ['cadastro', 'analise'],
+        buscar: (crawler, prontuario) => crawler.getPacienteCadastro(prontuario),
+        vazio: (prontuario) => `CADASTRO_NAO_ENCONTRADO:Paciente com prontuário "${prontuario}" não foi encontrado`
+    },
+    evolucoes: {
+        tipo: 'evolucoes-raw',
+        derivados: ['evolucoes', 'analise'],
+        buscar: (crawler, prontuario) => crawler.getEvolucoes(prontuario),
+        vazio: (prontuario) => `EVOLUCOES_NAO_ENCONTRADAS:Nenhuma evolução médica encontrada para o prontuário "${prontuario}"`,
+        observar: (evolucoes) => ['evolucoes', new Map(evolucoes.map(e => [e.chave || chaveEvolucao(e), '']))],
+        compactar: EvolucaoStore.compactarEvolucoes,
+        expandir: EvolucaoStore.expandirEvolucoes
+    },
+    exames: {
+        tipo: 'exames-raw',
+        derivados: ['analise'],
+        buscar: (crawler, prontuario) => crawler.getExames(prontuario),
+        vazio: (prontuario) => `EXAMES_NAO_ENCONTRADOS:Nenhum exame encontrado para o prontuário "${prontuario}"`,
+        observar: (exames) => ['requisicoes-exames', new Map(exames.map(e => [String(e.requisicao), '']))]
+    },
+    resultados: {
+        tipo: 'exames-resultados',
+        derivados: [],
+        // N+1 páginas de impressão, uma por requisição da lista de exames
+        depende: 'exames',
+        buscar: (crawler, prontuario, { entrada, onProgresso, onItem, sinal }) =>
+            crawler.evolutionService.getResultadosExames(prontuario, {}, entrada, { onProgresso, onRequisicao: onItem, sinal }),
+        observar: (resultados) => ['resultados-exames',
+            new Map(resultados.map(r => [String(r.requisicao), String(r.totalResultados)]))]
+    },
+    prescricoes: {
+        // Sem visão derivada: o endpoint devolve o bruto como está
+        tipo: 'prescricoes',
+        derivados: [],
+        buscar: (crawler, prontuario, { onProgresso }) => crawler.getPrescricoesPaciente(prontuario, { onProgresso }),
+        vazio: (prontuario) => `PRESCRICOES_NAO_ENCONTRADAS:Nenhuma prescrição encontrada para o prontuário "${prontuario}"`
+    }
+};
+
+const semDados = (dados) => !dados || (Array.isArray(dados) && dados.length === 0);
+
+class DadosBrutos {
+    /**
+     * @param {object} [options]
+     * @param {object} [options.cache] - MemoryCache (padrão: o compartilhado)
+     * @param {ChangeFeed} [options.feed]
+     */
+    constructor(options = {}) {
+        this.cache = options.cache || cache;
+        this.feed = options.feed || ChangeFeed.compartilhado;
+        this.porRecurso = {};
+        this.porVisao = {};
+        // chave → { interessados, ultimo: { feitas, total } | null, ouvintes: Set<Function> }
+        this.emVoo = new Map();
+    }
+
+    chave(recurso, prontuario, host) {
+        return this.cache.generateKey(RECURSOS_BRUTOS[recurso].tipo, prontuario, {}, host);
+    }
+
+    /**
+     * Acesso de uma requisição de endpoint (visão) aos dados de um paciente.
+     * Conta a requisição e as buscas ao HICD que ela disparar.
+     * @param {string} visao - nome do endpoint (detalhes, evolucoes, analise...)
+     * @param {{ crawler: object, prontuario: string, host: string|null }} contexto
+     */
+    paraVisao(visao, contexto) {
+        this._contadorVisao(visao).requisicoes++;
+        const acesso = {
+            buscas: 0,
+            chave: (recurso) => this.chave(recurso, contexto.prontuario, contexto.host),
+            obter: (recurso, opcoes = {}) => this.obter(recurso, { ...contexto, visao, acesso }, opcoes)
+        };
+        return acesso;
+    }
+
+    /**
+     * Recurso bruto do cache ou, na falta, do HICD (uma busca por chave mesmo com
+     * chamadas simultâneas de visões diferentes).
+     * @param {string} recurso - um de RECURSOS_BRUTOS
+     * @param {object} contexto - crawler, prontuario, host (e visao/acesso, via paraVisao)
+     * @param {object} [opcoes]
+     * @param {number} [opcoes.maxIdadeMs] - rebusca se a entrada for mais antiga que isso
+     * @param {Function} [opcoes.onProgresso] - progresso da busca (resultados, prescrições)
+     * @param {Function} [opcoes.onItem] - cada item assim que buscado (resultados), só para quem inicia a busca
+     * @param {AbortSignal} [opcoes.sinal] - interrompe a busca iniciada por esta chamada, se for a única interessada
+     * @param {boolean} [opcoes.compacto] - devolve a forma guardada no cache (recursos com `compactar`)
+     */
+    async obter(recurso, contexto, opcoes = {}) {
+        const definicao = RECURSOS_BRUTOS[recurso];
+        const { crawler, prontuario, host } = contexto;
+        const chave = this.chave(recurso, prontuario, host);
+
+        if (opcoes.maxIdadeMs && !this.cache.pending.has(chave)) {
+            const criadaEm = this.cache.getCreatedAt(chave);
+            if (criadaEm !== null && Date.now() - criadaEm > opcoes.maxIdadeMs) this.cache.delete(chave);
+        }
+
+        let buscou = false;
+        const voo = this._entrarNoVoo(chave, opcoes.onProgresso);
+        try {
+            const guardado = await this.cache.getOrSet(chave, async () => {
+                buscou = true;
+                const controle = opcoes.sinal ? new AbortController() : null;
+                // Com outros esperando a mesma busca, o sinal de quem a iniciou não a interrompe
+                const interromper = () => { if (voo.interessados <= 1) controle.abort(); };
+                if (controle) {
+                    if (opcoes.sinal.aborted) interromper();
+                    else opcoes.sinal.addEventListener('abort', interromper, { once: true });
+                }
+                try {
+                    const entrada = definicao.depende ? await this.obter(definicao.depende, contexto) : undefined;
+                    const onProgresso = (progresso) => this.reportarProgresso(chave, progresso);
+                    const dados = await definicao.buscar(crawler, prontuario, {
+                        entrada, onProgresso, onItem: opcoes.onItem, sinal: controle ? controle.signal : undefined
+                    });
+                    // Lista parcial: não vai para o cache nem para o feed
+                    if (controle && controle.signal.aborted) throw new Error(`BUSCA_INTERROMPIDA:${recurso} do prontuário "${prontuario}"`);
+                    if (definicao.vazio && semDados(dados)) throw new Error(definicao.vazio(prontuario));
+                    this._aoBuscar(recurso, contexto, dados);
+                    return definicao.compactar ? definicao.compactar(dados) : dados;
+                } finally {
+                    if (controle) opcoes.sinal.removeEventListener('abort', interromper);
+                    this._encerrarProgresso(chave);
+                }
+            });
+            return definicao.expandir && !opcoes.compacto ? definicao.expandir(guardado) : guardado;
+        } catch (error) {
+            // Entrou numa busca que quem iniciou interrompeu logo antes: busca por conta própria
+            if (!buscou && error.message.startsWith('BUSCA_INTERROMPIDA:')) {
+                return this.obter(recurso, contexto, opcoes);
+            }
+            throw error;
+        } finally {
+            this._sairDoVoo(chave, opcoes.onProgresso);
+            this._contabilizar(recurso, contexto, buscou);
+        }
+    }
+
+    /**
+     * Progresso da busca em andamento de uma chave, repassado a quem a acompanha.
+     * @param {string} chave
+     * @param {{ feitas: number, total: number }} progresso
+     */
+    reportarProgresso(chave, progresso) {
+        const voo = this._voo(chave);
+        voo.ultimo = { ...progresso };
+        for (const ouvinte of voo.ouvintes) ouvinte(progresso);
+    }
+
+    _voo(chave) {
+        let voo = this.emVoo.get(chave);
+        if (!voo) {
+            voo = { interessados: 0, ultimo: null, ouvintes: new Set() };
+            this.emVoo.set(chave, voo);
+        }
+        return voo;
+    }
+
+    _entrarNoVoo(chave, ouvinte) {
+        const voo = this._voo(chave);
+        voo.interessados++;
+        if (ouvinte) {
+            voo.ouvintes.add(ouvinte);
+            // Entrou numa busca em andamento: parte do ponto em que ela está
+            if (voo.ultimo) ouvinte(voo.ultimo);
+        }
+        return voo;
+    }
+
+    _sairDoVoo(chave, ouvinte) {
+        const voo = this.emVoo.get(chave);
+        if (!voo) return;
+        voo.interessados--;
+        if (ouvinte) voo.ouvintes.delete(ouvinte);
+        if (voo.interessados <= 0) this.emVoo.delete(chave);
+    }
+
+    /** Busca da chave terminou (com ou sem sucesso). */
+    _encerrarProgresso(chave) {
+        const voo = this.emVoo.get(chave);
+        if (voo) voo.ultimo = null;
+    }
+
+    _aoBuscar(recurso, { prontuario, host }, dados) {
+        const definicao = RECURSOS_BRUTOS[recurso];
+        if (definicao.derivados.length > 0) {
+            this.cache.invalidatePatientTypes(prontuario, definicao.derivados, host);
+        }
+        // Lista vazia não é linha de base: a próxima busca pareceria cheia de novidades
+        if (definicao.observar && !semDados(dados)) {
+            const [tipo, itens] = definicao.observar(dados);
+            this.feed.observar(tipo, host, prontuario, itens);
+            // Modo cluster: os outros workers recebem os dados pela camada compartilhada,
+            // sem buscar — o feed deles precisa ver a lista por aqui
+            if (ClienteCluster.compartilhado) ClienteCluster.compartilhado.difundirObservacao(tipo, host, prontuario, itens);
+        }
+    }
+
+    _contabilizar(recurso, { visao, acesso }, buscou) {
+        const porRecurso = this.porRecurso[recurso] || (this.porRecurso[recurso] = { buscas: 0, reaproveitadas: 0 });
+        porRecurso[buscou ? 'buscas' : 'reaproveitadas']++;
+        if (!visao) return;
+        this._contadorVisao(visao)[buscou ? 'buscasHicd' : 'reaproveitadas']++;
+        if (buscou && acesso) acesso.buscas++;
+    }
+
+    _contadorVisao(visao) {
+        return this.porVisao[visao] || (this.porVisao[visao] = { requisicoes: 0, buscasHicd: 0, reaproveitadas: 0 });
+    }
+
+    getStats() {
+        const porVisao = {};
+        for (const [visao, contador] of Object.entries(this.porVisao)) {
+            porVisao[visao] = {
+                ...contador,
+                buscasPorRequisicao: contador.requisicoes > 0
+                    ? Math.round((contador.buscasHicd / contador.requisicoes) * 100) / 100
+                    : 0
+            };
+        }
+        return { porRecurso: { ...this.porRecurso }, porVisao };
+    }
+}
+
+DadosBrutos.compartilhado = new DadosBrutos();
+
+module.exports = { RECURSOS_BRUTOS, DadosBrutos };
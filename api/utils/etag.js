@@ -0,0 +1,68 @@
+/**
+ * GET condicional para respostas montadas a partir de entradas do MemoryCache.
+ *
+ * A resposta é função das entradas de cache usadas e da URL (query define o
+ * formato), então o ETag é o hash desses elementos — sem serializar o corpo.
+ * Com If-None-Match correspondente a resposta é 304 e o corpo nem é montado.
+ * O hash de cada entrada é calculado uma vez e guardado nela (MemoryCache.getEntryTag).
+ * O ETag é fraco (W/): identifica os dados, não os bytes — o corpo ainda passa
+ * pela compressão, que muda conforme o Accept-Encoding.
+ */
+const crypto = require('crypto');
+const cache = require('./cache');
+
+/** If-None-Match (lista separada por vírgulas, `*`, W/) contém o ETag? Comparação fraca, como na RFC 9110. */
+function correspondeIfNoneMatch(cabecalho, etag) {
+    if (!cabecalho) return false;
+    if (cabecalho.trim() === '*') return true;
+    const opaca = (tag) => tag.trim().replace(/^W\//, '');
+    return cabecalho.split(',').some(tag => opaca(tag) === opaca(etag));
+}
+
+/**
+ * ETag e Last-Modified da resposta, ou null se alguma entrada não está no cache.
+ * @param {object} req
+ * @param {string[]} chaves - chaves do cache de que a resposta depende
+ */
+function validadoresDe(req, chaves) {
+    const tags = chaves.map(chave => cache.getEntryTag(chave));
+    if (tags.some(tag => tag === null)) return null;
+
+    const hash = crypto.createHash('sha1')
+        .update([req.originalUrl || req.url || '', req.hicdHost || '', ...tags.map(tag => tag.hash)].join('\n'))
+        .digest('base64url');
+    return {
+        etag: `W/"${hash}"`,
+        lastModified: new Date(Math.max(...tags.map(tag => tag.createdAt))).toUTCString()
+    };
+}
+
+/**
+ * Define ETag/Last-Modified da resposta e, se o cliente já tem a versão atual
+ * (If-None-Match), responde 304. Chamar logo após obter os dados do cache,
+ * antes de montar o corpo:
+ *
+ *     if (naoModificado(req, res, [cacheKey])) return;
+ *
+ * @param {object} req
+ * @param {object} res
+ * @param {string[]} chaves - chaves do cache de que a resposta depende
+ * @returns {boolean} true se respondeu 304
+ */
+function naoModificado(req, res, chaves) {
+    const validadores = validadoresDe(req, chaves);
+    if (!validadores) return false;
+
+    res.setHeader('ETag', validadores.etag);
+    res.setHeader('Last-Modified', validadores.lastModified);
+    // Revalidar sempre: o dado muda no HICD sem aviso
+    res.setHeader('Cache-Control', 'private, no-cache');
+
+    if (correspondeIfNoneMatch(req.headers && req.headers['if-none-match'], validadores.etag)) {
+        res.status(304).end();
+        return true;
+    }
+    return false;
+}
+
+module.exports = { naoModificado, validadoresDe, correspondeIfNoneMatch };
@@ -0,0 +1,27 @@
+/**
+ * Executa um handler de controller fora de uma requisição HTTP, capturando o
+ * status e o corpo JSON que ele responderia. Assim jobs e lotes usam
+ * exatamente o mesmo caminho (cache, single-flight, formatação) do endpoint síncrono.
+ *
+ * @param {object} controller
+ * @param {string} metodo - nome do handler (req, res)
+ * @param {object} req - requisição sintética ({ params, query, headers, hicdHost, ... })
+ * @returns {Promise<{ status: number, body: any }>}
+ */
+function executarHandler(controller, metodo, req) {
+    return new Promise((resolve, reject) => {
+        let status = 200;
+        const res = {
+            status(codigo) { status = codigo; return res; },
+            json(body) { resolve({ status, body }); return res; },
+            end() { resolve({ status, body: null }); return res; },
+            set() { return res; },
+            setHeader() { return res; }
+        };
+        Promise.resolve(controller[metodo](req, res))
+            .then(() => resolve({ status, body: null }))
+            .catch(reject);
+    });
+}
+
+module.exports = executarHandler;
@@ -0,0 +1,97 @@
+/**
+ * Limite de requisições por cliente em janela deslizante, com memória fixa.
+ *
+ * Em vez de guardar o instante de cada requisição, cada cliente tem só dois
+ * contadores: o da janela fixa atual e o da anterior. A contagem estimada nos
+ * últimos `janelaMs` é `anterior × (fração da janela anterior ainda dentro do
+ * intervalo) + atual` — custo O(1) por requisição, qualquer que seja a taxa.
+ *
+ * Na virada de cada janela, uma varredura remove os clientes sem requisições
+ * na janela que acabou de terminar — eles já não contam nada. A expiração é
+ * determinística (não depende de sorteio) e custa uma passada pelo Map por
+ * janela, não por requisição. Acima de `maxClientes`, sai o cliente mais antigo.
+ */
+class JanelaDeslizante {
+    /**
+     * @param {object} options
+     * @param {number} options.max - requisições permitidas por janela
+     * @param {number} [options.janelaMs=60000]
+     * @param {number} [options.maxClientes=10000]
+     */
+    constructor(options) {
+        this.max = options.max;
+        this.janelaMs = options.janelaMs || 60 * 1000;
+        this.maxClientes = options.maxClientes || 10000;
+        // cliente → { inicio (da última janela com requisição), atual, anterior }, em ordem de chegada
+        this.clientes = new Map();
+        this.inicioVarredura = null;
+        this.stats = { permitidas: 0, bloqueadas: 0, expirados: 0, despejados: 0 };
+    }
+
+    /**
+     * Conta uma requisição do cliente, se couber no limite (bloqueadas não contam).
+     * @param {string} cliente
+     * @param {number} [agora=Date.now()]
+     * @returns {{ permitida: boolean, restantes: number, retryAfterMs: number }}
+     */
+    registrar(cliente, agora = Date.now()) {
+        const inicio = agora - (agora % this.janelaMs);
+        if (inicio !== this.inicioVarredura) this._expirar(inicio);
+
+        let estado = this.clientes.get(cliente);
+        if (!estado) {
+            if (this.clientes.size >= this.maxClientes) this._despejarMaisAntigo();
+            estado = { inicio, atual: 0, anterior: 0 };
+            this.clientes.set(cliente, estado);
+        } else if (estado.inicio !== inicio) {
+            // Só a janela imediatamente anterior ainda pesa
+            estado.anterior = inicio - estado.inicio === this.janelaMs ? estado.atual : 0;
+            estado.atual = 0;
+            estado.inicio = inicio;
+        }
+
+        const decorrido = agora - inicio;
+        const estimativa = estado.anterior * (1 - decorrido / this.janelaMs) + estado.atual;
+        if (estimativa >= this.max) {
+            this.stats.bloqueadas++;
+            return { permitida: false, restantes: 0, retryAfterMs: this._espera(estado, decorrido) };
+        }
+
+        estado.atual++;
+        this.stats.permitidas++;
+        return { permitida: true, restantes: Math.max(0, Math.floor(this.max - estimativa - 1)), retryAfterMs: 0 };
+    }
+
+    /** Tempo (ms) até a estimativa ficar abaixo do limite. @private */
+    _espera(estado, decorrido) {
+        const W = this.janelaMs;
+        if (estado.atual >= this.max) {
+            // Só na próxima janela, quando `atual` vira `anterior` e começa a perder peso
+            return Math.floor((W - decorrido) + W * (1 - this.max / estado.atual)) + 1;
+        }
+        return Math.max(0, Math.floor(W * (1 - (this.max - estado.atual) / estado.anterior) - decorrido)) + 1;
+    }
+
+    /** Na virada da janela: remove quem não fez requisição na janela anterior. @private */
+    _expirar(inicio) {
+        this.inicioVarredura = inicio;
+        for (const [cliente, estado] of this.clientes) {
+            if (inicio - estado.inicio <= this.janelaMs) continue;
+            this.clientes.delete(cliente);
+            this.stats.expirados++;
+        }
+    }
+
+    /** @private */
+    _despejarMaisAntigo() {
+        const [cliente] = this.clientes.keys();
+        this.clientes.delete(cliente);
+        this.stats.despejados++;
+    }
+
+    getStats() {
+        return { max: this.max, janelaMs: this.janelaMs, clientes: this.clientes.size, maxClientes: this.maxClientes, ...this.stats };
+    }
+}
+
+module.exports = JanelaDeslizante;
@@ -0,0 +1,191 @@
+/**
+ * Jobs assíncronos para buscas longas (ex.: exames com resultados de uma
+ * internação longa).
+ *
+ * O cliente cria o job e recebe o id na hora; o trabalho roda em segundo
+ * plano e o cliente consulta (ou assina) o progresso e busca o resultado
+ * quando pronto. Jobs idênticos (mesmo tipo, host, prontuário e parâmetros)
+ * ainda em andamento são reaproveitados — single-flight, como o `pending`
+ * do MemoryCache. Jobs terminados ficam disponíveis por `ttlMs`.
+ *
+ * Eventos: o manager emite `<id do job>` com o resumo do job a cada mudança
+ * de progresso ou de estado.
+ *
+ * No modo cluster o job roda no worker que o criou, mas cada mudança é
+ * publicada no registro do primário (usarRegistroCompartilhado): qualquer
+ * worker encontra o job (`localizar`) e repassa os eventos dele — o balanceamento
+ * round-robin pode mandar cada consulta a um worker diferente.
+ */
+const crypto = require('crypto');
+const EventEmitter = require('events');
+
+const ESTADOS_ATIVOS = new Set(['pendente', 'executando']);
+
+class JobManager extends EventEmitter {
+    /**
+     * @param {object} [options]
+     * @param {number} [options.ttlMs] - por quanto tempo um job terminado fica disponível
+     * @param {number} [options.maxJobs] - jobs terminados guardados (os mais antigos saem primeiro)
+     */
+    constructor(options = {}) {
+        super();
+        this.setMaxListeners(0);
+        this.ttlMs = options.ttlMs || parseInt(process.env.JOBS_TTL_MS) || 30 * 60 * 1000;
+        this.maxJobs = options.maxJobs || parseInt(process.env.JOBS_MAX) || 200;
+
+        this.jobs = new Map();
+        this.ativosPorChave = new Map();
+        this.registro = null;
+        this.stats = { criados: 0, reaproveitados: 0, concluidos: 0, falhas: 0 };
+
+        const limpeza = setInterval(() => this.limparExpirados(), 60 * 1000);
+        if (typeof limpeza.unref === 'function') limpeza.unref();
+    }
+
+    /**
+     * Modo cluster: publica os jobs daqui no registro do primário e repassa os
+     * eventos dos jobs de outros workers.
+     * @param {object} registro - ClienteCluster (publicarJob, obterJob, evento 'job')
+     */
+    usarRegistroCompartilhado(registro) {
+        this.registro = registro;
+        registro.on('job', (resumo) => this.emit(resumo.id, resumo));
+    }
+
+    /** Chave de single-flight: parâmetros ordenados, como em MemoryCache.generateKey. */
+    static chave({ tipo, host, prontuario, parametros = {} }) {
+        const params = Object.keys(parametros).sort().map(k => `${k}:${parametros[k]}`).join('|');
+        return `${tipo}:${host || ''}:${prontuario}:${params}`;
+    }
+
+    /**
+     * Cria um job (ou devolve o idêntico em andamento).
+     * @param {{ tipo: string, host: string, prontuario: string, parametros: object }} descricao
+     * @param {(reportarProgresso: Function) => Promise<{ status: number, body: any }>} executar
+     * @returns {{ job: object, reaproveitado: boolean }}
+     */
+    criar(descricao, executar) {
+        const chave = JobManager.chave(descricao);
+        const ativo = this.ativosPorChave.get(chave);
+        if (ativo) {
+            this.stats.reaproveitados++;
+            return { job: ativo, reaproveitado: true };
+        }
+
+        const job = {
+            id: crypto.randomUUID(),
+            tipo: descricao.tipo,
+            host: descricao.host || null,
+            prontuario: descricao.prontuario,
+            parametros: { ...(descricao.parametros || {}) },
+            estado: 'pendente',
+            progresso: { feitas: 0, total: null },
+            criadoEm: new Date().toISOString(),
+            iniciadoEm: null,
+            concluidoEm: null,
+            resultado: null,
+            erro: null
+        };
+        this.jobs.set(job.id, job);
+        this.ativosPorChave.set(chave, job);
+        this.stats.criados++;
+        this.limparExpirados();
+
+        // Começa no próximo tick: o criador recebe o id antes de qualquer trabalho
+        setImmediate(() => this._executar(job, chave, executar));
+        return { job, reaproveitado: false };
+    }
+
+    async _executar(job, chave, executar) {
+        job.estado = 'executando';
+        job.iniciadoEm = new Date().toISOString();
+        this._notificar(job);
+
+        const reportarProgresso = ({ feitas, total }) => {
+            job.progresso = { feitas, total: total === undefined ? job.progresso.total : total };
+            this._notificar(job);
+        };
+
+        try {
+            const resultado = await executar(reportarProgresso);
+            job.resultado = resultado;
+            if (resultado.status >= 400) {
+                job.estado = 'falhou';
+                job.erro = (resultado.body && (resultado.body.message || resultado.body.error)) || `HTTP ${resultado.status}`;
+                this.stats.falhas++;
+            } else {
+                job.estado = 'concluido';
+                if (job.progresso.total !== null) job.progresso.feitas = job.progresso.total;
+                this.stats.concluidos++;
+            }
+        } catch (error) {
+            job.estado = 'falhou';
+            job.erro = error.message;
+            job.resultado = { status: 500, body: { success: false, error: 'Erro ao executar job', message: error.message } };
+            this.stats.falhas++;
+        } finally {
+            job.concluidoEm = new Date().toISOString();
+            this.ativosPorChave.delete(chave);
+            this._notificar(job);
+        }
+    }
+
+    _notificar(job) {
+        this.emit(job.id, this.resumo(job));
+        if (this.registro) this.registro.publicarJob(job);
+    }
+
+    /**
+     * @param {string} id
+     * @returns {object|null}
+     */
+    obter(id) {
+        return this.jobs.get(id) || null;
+    }
+
+    /**
+     * Job daqui ou, no modo cluster, de outro worker (cópia do registro do primário).
+     * @param {string} id
+     * @returns {Promise<object|null>}
+     */
+    async localizar(id) {
+        const job = this.obter(id);
+        if (job || !this.registro) return job;
+        return this.registro.obterJob(id);
+    }
+
+    /** Guarda a cópia de um job executado em outro processo (registro do primário). */
+    registrar(job) {
+        this.jobs.set(job.id, job);
+        this.limparExpirados();
+    }
+
+    /** Visão pública do job (sem o resultado). */
+    resumo(job) {
+        const { resultado, ...publico } = job;
+        return { ...publico, progresso: { ...job.progresso }, ativo: ESTADOS_ATIVOS.has(job.estado) };
+    }
+
+    /** Remove jobs terminados há mais de ttlMs e, acima de maxJobs, os terminados mais antigos. */
+    limparExpirados() {
+        const limite = Date.now() - this.ttlMs;
+        const terminados = [];
+        for (const job of this.jobs.values()) {
+            if (ESTADOS_ATIVOS.has(job.estado)) continue;
+            if (Date.parse(job.concluidoEm) < limite) this.jobs.delete(job.id);
+            else terminados.push(job);
+        }
+        let excesso = this.jobs.size - this.maxJobs;
+        for (const job of terminados) {
+            if (excesso <= 0) break;
+            this.jobs.delete(job.id);
+            excesso--;
+        }
+    }
+
+    getStats() {
+        return { jobs: this.jobs.size, ativos: this.ativosPorChave.size, ...this.stats };
+    }
+}
+
+module.exports = JobManager;
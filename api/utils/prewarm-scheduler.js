@@ -0,0 +1,252 @@
+/**
+ * Pré-aquecimento do cache para clínicas configuradas.
+ *
+ * Dentro das janelas de horário configuradas, a cada `intervaloMs` o scheduler
+ * lista os pacientes de cada clínica e, para cada recurso (evoluções, exames
+ * com resultados, prescrições), refaz a busca se a entrada do cache não existe
+ * ou expira antes de `margemMs` — quem abre o paciente pela manhã já encontra
+ * o cache quente. A renovação (cache.refresh) só sobrescreve a entrada quando a
+ * nova busca termina; até lá as requisições continuam servidas pela atual.
+ *
+ * Tudo roda em `executarEmSegundoPlano`: as requisições ao HICD vão para a fila
+ * de segundo plano do RateLimiter do host (só andam quando não há requisição de
+ * usuário esperando) e são contadas para o status.
+ */
+const cache = require('./cache');
+const { RECURSOS_PACIENTE } = require('./recursos-paciente');
+const { executarEmSegundoPlano } = require('../../src/core/segundo-plano');
+
+// Query com que cada recurso é aquecido (a mesma que os dashboards usam)
+const QUERY_PREWARM = {
+    evolucoes: {},
+    exames: { incluirResultados: 'true' },
+    prescricoes: {},
+    cadastro: {}
+};
+
+const JANELA = /^(\d{1,2}):(\d{2})-(\d{1,2}):(\d{2})$/;
+
+class PrewarmScheduler {
+    /**
+     * @param {object} options
+     * @param {string[]} options.clinicas - códigos das clínicas
+     * @param {Array<{ inicio: number, fim: number }>} [options.janelas] - minutos do dia; vazio = o dia todo
+     * @param {string|null} [options.host] - host HICD (null = padrão)
+     * @param {string[]} [options.recursos]
+     * @param {number} [options.intervaloMs]
+     * @param {number} [options.margemMs] - renova entradas que expiram antes disso
+     * @param {number} [options.concorrencia] - pacientes aquecidos ao mesmo tempo
+     * @param {(host) => object|null} options.obterCrawler - crawler autenticado do host, ou null
+     * @param {(recurso, prontuario, query, host) => Promise<{ status: number, body: any }>} options.buscarRecurso
+     */
+    constructor(options) {
+        this.clinicas = options.clinicas || [];
+        this.janelas = options.janelas || [];
+        this.host = options.host || null;
+        this.recursos = options.recursos || ['evolucoes', 'exames', 'prescricoes'];
+        this.intervaloMs = options.intervaloMs || 5 * 60 * 1000;
+        this.margemMs = options.margemMs || this.intervaloMs;
+        this.concorrencia = options.concorrencia || 2;
+        this.obterCrawler = options.obterCrawler;
+        this.buscarRecurso = options.buscarRecurso;
+
+        this._timer = null;
+        this.executando = false;
+        this.ultimaExecucao = null;
+        this.proximaVerificacao = null;
+        this.stats = { execucoes: 0, puladasForaDaJanela: 0, puladasSemSessao: 0 };
+    }
+
+    /**
+     * Configuração a partir do ambiente (PREWARM_CLINICAS, PREWARM_JANELAS, PREWARM_HOST,
+     * PREWARM_RECURSOS, PREWARM_INTERVALO_MS, PREWARM_MARGEM_MS, PREWARM_CONCORRENCIA).
+     */
+    static fromEnv(dependencias, env = process.env) {
+        const lista = (valor) => (valor || '').split(',').map(v => v.trim()).filter(Boolean);
+        const recursos = lista(env.PREWARM_RECURSOS).filter(r => RECURSOS_PACIENTE[r]);
+        return new PrewarmScheduler({
+            ...dependencias,
+            clinicas: lista(env.PREWARM_CLINICAS),
+            janelas: PrewarmScheduler.parseJanelas(env.PREWARM_JANELAS),
+            host: env.PREWARM_HOST || null,
+            recursos: recursos.length > 0 ? recursos : undefined,
+            intervaloMs: parseInt(env.PREWARM_INTERVALO_MS) || undefined,
+            margemMs: parseInt(env.PREWARM_MARGEM_MS) || undefined,
+            concorrencia: parseInt(env.PREWARM_CONCORRENCIA) || undefined
+        });
+    }
+
+    /**
+     * "06:00-08:00,12:30-13:30" → [{ inicio: 360, fim: 480 }, { inicio: 750, fim: 810 }].
+     * Janela que passa da meia-noite ("22:00-02:00") vale. Entradas malformadas são ignoradas.
+     */
+    static parseJanelas(texto) {
+        const janelas = [];
+        for (const parte of (texto || '').split(',').map(p => p.trim()).filter(Boolean)) {
+            const m = parte.match(JANELA);
+            if (!m) {
+                console.warn(`[PREWARM] Janela ignorada (use HH:MM-HH:MM): "${parte}"`);
+                continue;
+            }
+            janelas.push({ inicio: Number(m[1]) * 60 + Number(m[2]), fim: Number(m[3]) * 60 + Number(m[4]) });
+        }
+        return janelas;
+    }
+
+    /** O horário local de `data` cai em alguma janela? Sem janelas, sempre. */
+    dentroDaJanela(data = new Date()) {
+        if (this.janelas.length === 0) return true;
+        const minuto = data.getHours() * 60 + data.getMinutes();
+        return this.janelas.some(({ inicio, fim }) => inicio <= fim
+            ? minuto >= inicio && minuto < fim
+            : minuto >= inicio || minuto < fim);
+    }
+
+    get configurado() {
+        return this.clinicas.length > 0;
+    }
+
+    iniciar() {
+        if (!this.configurado || this._timer) return false;
+        this._timer = setInterval(() => this.verificar(), this.intervaloMs);
+        if (typeof this._timer.unref === 'function') this._timer.unref();
+        this.proximaVerificacao = new Date(Date.now() + this.intervaloMs).toISOString();
+        console.log(`[PREWARM] Ativo para clínicas ${this.clinicas.join(', ')} a cada ${Math.round(this.intervaloMs / 1000)}s`);
+        setImmediate(() => this.verificar());
+        return true;
+    }
+
+    parar() {
+        if (this._timer) clearInterval(this._timer);
+        this._timer = null;
+        this.proximaVerificacao = null;
+    }
+
+    /** Tick do timer: roda uma execução se estiver na janela, com sessão e sem outra em andamento. */
+    async verificar(agora = new Date()) {
+        if (this._timer) this.proximaVerificacao = new Date(agora.getTime() + this.intervaloMs).toISOString();
+        if (this.executando) return null;
+        if (!this.dentroDaJanela(agora)) {
+            this.stats.puladasForaDaJanela++;
+            return null;
+        }
+        const crawler = this.obterCrawler(this.host);
+        if (!crawler) {
+            this.stats.puladasSemSessao++;
+            return null;
+        }
+        return this.executar(crawler);
+    }
+
+    /**
+     * Uma passada completa pelas clínicas configuradas.
+     * @returns {Promise<object>} resumo da execução (também em `ultimaExecucao`)
+     */
+    async executar(crawler) {
+        this.executando = true;
+        const inicio = Date.now();
+        const contexto = { requisicoes: 0 };
+        const execucao = {
+            inicio: new Date(inicio).toISOString(),
+            fim: null,
+            duracaoMs: null,
+            clinicas: 0,
+            pacientes: 0,
+            aquecidos: 0,
+            jaQuentes: 0,
+            falhas: 0,
+            requisicoesHicd: 0,
+            erros: []
+        };
+
+        try {
+            await executarEmSegundoPlano(contexto, async () => {
+                for (const codigo of this.clinicas) {
+                    let pacientes;
+                    try {
+                        pacientes = await crawler.getPacientesClinica(codigo);
+                    } catch (error) {
+                        execucao.erros.push(`clínica ${codigo}: ${error.message}`);
+                        continue;
+                    }
+                    execucao.clinicas++;
+
+                    const prontuarios = [...new Set((pacientes || []).map(p => p.prontuario).filter(Boolean))];
+                    execucao.pacientes += prontuarios.length;
+
+                    let proximo = 0;
+                    const trabalhador = async () => {
+                        while (proximo < prontuarios.length) {
+                            await this._aquecerPaciente(prontuarios[proximo++], execucao);
+                        }
+                    };
+                    await Promise.all(Array.from({ length: Math.min(this.concorrencia, prontuarios.length) }, trabalhador));
+                }
+            });
+        } finally {
+            execucao.fim = new Date().toISOString();
+            execucao.duracaoMs = Date.now() - inicio;
+            execucao.requisicoesHicd = contexto.requisicoes;
+            execucao.erros = execucao.erros.slice(0, 20);
+            this.ultimaExecucao = execucao;
+            this.stats.execucoes++;
+            this.executando = false;
+        }
+
+        console.log(`[PREWARM] ${execucao.pacientes} pacientes, ${execucao.aquecidos} recursos aquecidos, ` +
+            `${execucao.requisicoesHicd} requisições ao HICD em ${execucao.duracaoMs}ms`);
+        return execucao;
+    }
+
+    async _aquecerPaciente(prontuario, execucao) {
+        for (const recurso of this.recursos) {
+            const query = QUERY_PREWARM[recurso] || {};
+            const chaves = RECURSOS_PACIENTE[recurso].chaves(prontuario, query, this.host);
+            const limite = Date.now() + this.margemMs;
+
+            if (chaves.every(chave => (cache.getExpiresAt(chave) || 0) > limite)) {
+                execucao.jaQuentes++;
+                continue;
+            }
+
+            // Entrada perto de expirar: o handler busca de novo e grava por cima, sem
+            // apagá-la antes (senão as requisições do paciente esperariam esta busca,
+            // que anda na fila de segundo plano)
+            try {
+                const { status, body } = await cache.refresh(chaves,
+                    () => this.buscarRecurso(recurso, prontuario, query, this.host));
+                if (status >= 400) {
+                    execucao.falhas++;
+                    if (status >= 500) execucao.erros.push(`${recurso} ${prontuario}: ${(body && body.message) || status}`);
+                } else {
+                    execucao.aquecidos++;
+                }
+            } catch (error) {
+                execucao.falhas++;
+                execucao.erros.push(`${recurso} ${prontuario}: ${error.message}`);
+            }
+        }
+    }
+
+    getStatus() {
+        const minutos = (m) => `${String(Math.floor(m / 60)).padStart(2, '0')}:${String(m % 60).padStart(2, '0')}`;
+        return {
+            ativo: Boolean(this._timer),
+            executando: this.executando,
+            configuracao: {
+                clinicas: this.clinicas,
+                janelas: this.janelas.map(({ inicio, fim }) => `${minutos(inicio)}-${minutos(fim)}`),
+                host: this.host,
+                recursos: this.recursos,
+                intervaloMs: this.intervaloMs,
+                margemMs: this.margemMs,
+                concorrencia: this.concorrencia
+            },
+            proximaVerificacao: this.proximaVerificacao,
+            ultimaExecucao: this.ultimaExecucao,
+            ...this.stats
+        };
+    }
+}
+
+module.exports = PrewarmScheduler;
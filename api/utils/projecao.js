@@ -0,0 +1,115 @@
+/**
+ * Projeção de campos nas respostas (`?fields=`).
+ *
+ * `fields` é uma lista separada por vírgulas de caminhos com ponto
+ * (`data,hora,resultados.sigla`). Arrays são atravessados: `resultados.sigla`
+ * pega a sigla de cada resultado. Um caminho que para num objeto leva o objeto
+ * inteiro. `slim` expande para o preset enxuto do recurso e pode ser combinado
+ * com outros campos (`slim,medico`).
+ *
+ * A projeção é aplicada sobre o objeto já formatado, antes do JSON.stringify —
+ * o corpo serializado (e o tempo de serialização) encolhe junto.
+ */
+
+const PRESETS_SLIM = {
+    exames: [
+        'requisicaoId', 'data', 'hora', 'status',
+        'resultados.sigla', 'resultados.valor', 'resultados.unidade', 'resultados.status'
+    ],
+    evolucoes: [
+        'id', 'dataEvolucao', 'profissional', 'atividade', 'clinicaLeito', 'conteudo.resumo'
+    ]
+};
+
+const CAMINHO_VALIDO = /^[A-Za-z_$][\w$]*(\.[A-Za-z_$][\w$]*)*$/;
+// Segmentos que levariam a árvore (ou a cópia) ao protótipo
+const SEGMENTOS_PROIBIDOS = new Set(['__proto__', 'prototype', 'constructor']);
+
+// Projeções compiladas por (recurso, fields) — consumidores repetem sempre as mesmas
+const compiladas = new Map();
+const MAX_COMPILADAS = 100;
+
+/**
+ * Monta a árvore de campos: `{ data: true, resultados: { sigla: true } }`.
+ * Os nós não têm protótipo: `toString`, `hasOwnProperty` etc. são campos comuns.
+ * @param {string[]} caminhos
+ */
+function montarArvore(caminhos) {
+    const arvore = Object.create(null);
+    for (const caminho of caminhos) {
+        const partes = caminho.split('.');
+        let no = arvore;
+        for (let i = 0; i < partes.length; i++) {
+            const parte = partes[i];
+            if (no[parte] === true) break; // pai já pedido inteiro
+            if (i === partes.length - 1) no[parte] = true;
+            else no = (no[parte] = no[parte] || Object.create(null));
+        }
+    }
+    return arvore;
+}
+
+function aplicar(valor, arvore) {
+    if (Array.isArray(valor)) return valor.map(item => aplicar(item, arvore));
+    if (valor === null || typeof valor !== 'object') return valor;
+
+    const saida = {};
+    for (const campo in arvore) {
+        if (!Object.prototype.hasOwnProperty.call(valor, campo)) continue;
+        saida[campo] = arvore[campo] === true ? valor[campo] : aplicar(valor[campo], arvore[campo]);
+    }
+    return saida;
+}
+
+/**
+ * Compila o parâmetro `fields` de um recurso.
+ * @param {'exames'|'evolucoes'} recurso
+ * @param {string} [fields]
+ * @returns {{ campos: string[], arvore: object, projetar: (valor: any) => any }|null}
+ *          null quando `fields` não foi informado (resposta completa)
+ * @throws {Error} CAMPOS_INVALIDOS: caminho malformado
+ */
+function compilarProjecao(recurso, fields) {
+    if (fields === undefined || fields === null || String(fields).trim() === '') return null;
+
+    const chave = `${recurso}:${fields}`;
+    const existente = compiladas.get(chave);
+    if (existente) return existente;
+
+    const campos = [];
+    for (const token of String(fields).split(',').map(t => t.trim()).filter(Boolean)) {
+        if (token === 'slim') {
+            campos.push(...(PRESETS_SLIM[recurso] || []));
+        } else if (CAMINHO_VALIDO.test(token) && !token.split('.').some(p => SEGMENTOS_PROIBIDOS.has(p))) {
+            campos.push(token);
+        } else {
+            throw new Error(`CAMPOS_INVALIDOS:Campo inválido em fields: "${token}"`);
+        }
+    }
+
+    const arvore = montarArvore([...new Set(campos)]);
+    const projecao = { campos: [...new Set(campos)], arvore, projetar: (valor) => aplicar(valor, arvore) };
+
+    if (compiladas.size >= MAX_COMPILADAS) compiladas.delete(compiladas.keys().next().value);
+    compiladas.set(chave, projecao);
+    return projecao;
+}
+
+/**
+ * A projeção inclui o caminho (ou um ancestral dele)? Sem projeção, tudo é incluído.
+ * Permite pular trabalho caro para campos que não vão sair na resposta.
+ * @param {object|null} projecao
+ * @param {string} caminho
+ */
+function projecaoInclui(projecao, caminho) {
+    if (!projecao) return true;
+    let no = projecao.arvore;
+    for (const parte of caminho.split('.')) {
+        if (no[parte] === undefined) return false;
+        if (no[parte] === true) return true;
+        no = no[parte];
+    }
+    return true;
+}
+
+module.exports = { PRESETS_SLIM, compilarProjecao, projecaoInclui };
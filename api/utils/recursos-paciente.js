@@ -0,0 +1,47 @@
+/**
+ * Recursos de paciente que podem ser buscados fora de uma requisição HTTP
+ * (lote multi-paciente, pré-aquecimento do cache).
+ *
+ * recurso → método do PacientesController, parâmetros de query aceitos e
+ * chaves de cache que precisam existir para a resposta sair sem tocar o HICD:
+ * a visão do endpoint e os dados brutos de que ela é montada (o pré-aquecimento
+ * renova os dois). As chaves espelham as que o handler gera (mesmos padrões de query).
+ */
+const cache = require('./cache');
+const { DadosBrutos } = require('./dados-brutos');
+
+const bruto = (recurso, prontuario, host) => DadosBrutos.compartilhado.chave(recurso, prontuario, host);
+
+const RECURSOS_PACIENTE = {
+    cadastro: {
+        metodo: 'obterDetalhesPaciente',
+        parametros: [],
+        chaves: (prontuario, query, host) => [
+            bruto('cadastro', prontuario, host),
+            cache.generateKey('cadastro', prontuario, {}, host)
+        ]
+    },
+    evolucoes: {
+        metodo: 'obterEvolucoesPaciente',
+        parametros: ['formato', 'limite', 'delta', 'fields'],
+        chaves: (prontuario, { limite = 1000, formato = 'detalhado' }, host) => [
+            bruto('evolucoes', prontuario, host),
+            cache.generateKey('evolucoes', prontuario, { limite, formato }, host)
+        ]
+    },
+    exames: {
+        metodo: 'obterExamesPaciente',
+        parametros: ['formato', 'incluirResultados', 'fields'],
+        chaves: (prontuario, { incluirResultados }, host) => [
+            bruto('exames', prontuario, host),
+            ...(incluirResultados === 'true' ? [bruto('resultados', prontuario, host)] : [])
+        ]
+    },
+    prescricoes: {
+        metodo: 'obterPrescricaoPaciente',
+        parametros: [],
+        chaves: (prontuario, query, host) => [bruto('prescricoes', prontuario, host)]
+    }
+};
+
+module.exports = { RECURSOS_PACIENTE };
@@ -0,0 +1,33 @@
+/**
+ * Respostas em stream: Server-Sent Events ou NDJSON (um objeto JSON por linha).
+ *
+ * `abrirStream(res, modo)` escreve os cabeçalhos e devolve `emitir(evento, dados, id?)`.
+ * Em SSE cada chamada vira `event: <evento>` + `data: <json>` (+ `id: <id>`, que o
+ * EventSource reenvia em Last-Event-ID ao reconectar); em NDJSON, a linha
+ * `{"evento": ..., "dados": ...}`.
+ */
+
+const MODOS_STREAM = ['sse', 'ndjson'];
+
+/**
+ * @param {import('http').ServerResponse} res
+ * @param {'sse'|'ndjson'} [modo='sse']
+ * @returns {(evento: string, dados: any, id?: string) => void}
+ */
+function abrirStream(res, modo = 'sse') {
+    const comum = {
+        'Cache-Control': 'no-cache',
+        // Proxies (nginx) não devem segurar os eventos em buffer
+        'X-Accel-Buffering': 'no'
+    };
+
+    if (modo === 'ndjson') {
+        res.writeHead(200, { ...comum, 'Content-Type': 'application/x-ndjson; charset=utf-8' });
+        return (evento, dados) => res.write(`${JSON.stringify({ evento, dados })}\n`);
+    }
+
+    res.writeHead(200, { ...comum, 'Content-Type': 'text/event-stream; charset=utf-8', 'Connection': 'keep-alive' });
+    return (evento, dados, id) => res.write(`${id ? `id: ${id}\n` : ''}event: ${evento}\ndata: ${JSON.stringify(dados)}\n\n`);
+}
+
+module.exports = { MODOS_STREAM, abrirStream };
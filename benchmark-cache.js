@@ -0,0 +1,82 @@
+/**
+ * Benchmark do caminho quente do cache (MemoryCache.get) com e sem log.
+ *
+ * Mede o throughput de `get` (90% hits, 10% misses) com o logger:
+ *  - desligado: nível info, hit/miss só incrementam contadores (padrão)
+ *  - amostrado: nível debug, 1 linha a cada LOG_AMOSTRA eventos
+ *  - todos: nível debug com amostra 1 — uma linha estruturada por consulta
+ *  - legado: uma linha de console por consulta, como antes do logger
+ * As linhas vão para /dev/null com escrita síncrona (como o console faz em
+ * arquivos): mede a formatação e a chamada de sistema, não o terminal.
+ *
+ * Uso: node benchmark-cache.js [--operacoes=N] [--chaves=N] [--amostra=N]
+ */
+const fs = require('fs');
+const { performance } = require('perf_hooks');
+const { resumirDuracoes } = require('./src/core/timing');
+const { configurarLogs } = require('./src/core/logger');
+const cache = require('./api/utils/cache');
+
+const args = process.argv.slice(2);
+const valor = (nome) => (args.find(a => a.startsWith(`--${nome}=`)) || '').split('=')[1];
+const OPERACOES = parseInt(valor('operacoes')) || 500000;
+const CHAVES = parseInt(valor('chaves')) || 1000;
+const AMOSTRA = parseInt(valor('amostra')) || 100;
+const LOTE = 1000;
+
+const devNull = fs.openSync('/dev/null', 'w');
+const saida = (linha) => fs.writeSync(devNull, `${linha}\n`);
+
+// Chaves no formato real; 1 em cada 10 consultas não existe
+const chaves = [];
+for (let i = 0; i < CHAVES; i++) chaves.push(cache.generateKey('exames', String(100000 + i), { limite: 50 }, 'hicd.exemplo'));
+const consultas = Array.from({ length: LOTE }, (_, i) => (i % 10 === 9 ? `ausente:${i}` : chaves[(i * 7919) % CHAVES]));
+
+function executar(porConsulta) {
+    // Aquecimento (JIT)
+    for (let i = 0; i < 20 * LOTE; i++) porConsulta(consultas[i % LOTE]);
+
+    const duracoes = [];
+    const inicio = performance.now();
+    for (let feitas = 0; feitas < OPERACOES; feitas += LOTE) {
+        const t0 = performance.now();
+        for (let i = 0; i < LOTE; i++) porConsulta(consultas[i]);
+        duracoes.push(performance.now() - t0);
+    }
+    const totalMs = performance.now() - inicio;
+    return { opsPorSegundo: Math.round(OPERACOES / (totalMs / 1000)), ...resumirDuracoes(duracoes) };
+}
+
+const cenarios = [
+    ['desligado', { nivel: 'info', saida }, (chave) => cache.get(chave)],
+    ['amostrado', { nivel: 'debug', amostra: AMOSTRA, saida }, (chave) => cache.get(chave)],
+    ['todos', { nivel: 'debug', amostra: 1, saida }, (chave) => cache.get(chave)],
+    ['legado', { nivel: 'info', saida }, (chave) => {
+        const dados = cache.get(chave);
+        saida(dados === null ? `❌ Cache MISS: ${chave}` : `✅ Cache HIT: ${chave} (idade: 0s)`);
+        return dados;
+    }]
+];
+
+function main() {
+    configurarLogs({ nivel: 'silencioso', resumoMs: 0, saida });
+    for (const chave of chaves) cache.set(chave, { exames: [], total: 0 });
+
+    console.log(`\n=== BENCHMARK CACHE GET — ${OPERACOES} consultas, ${CHAVES} chaves, lotes de ${LOTE} ===\n`);
+
+    let base = null;
+    for (const [rotulo, opcoes, porConsulta] of cenarios) {
+        configurarLogs({ resumoMs: 0, ...opcoes });
+        const r = executar(porConsulta);
+        base = base || r.opsPorSegundo;
+        console.log(
+            `  ${rotulo.padEnd(10)} ${String(r.opsPorSegundo).padStart(10)} ops/s  ` +
+            `lote p50 ${String(r.p50Ms).padStart(7)} ms  p99 ${String(r.p99Ms).padStart(7)} ms  ` +
+            `(${Math.round((r.opsPorSegundo / base) * 100)}% do desligado)`
+        );
+    }
+    console.log('');
+    fs.closeSync(devNull);
+}
+
+main();
@@ -0,0 +1,132 @@
+/**
+ * Benchmark por evolução da extração de seções (EvolucaoParser).
+ *
+ * Corpus: descrições da fixture test/fixtures/evolucoes/evolucoes.html mais
+ * evoluções longas sintetizadas (internação prolongada, com todas as seções).
+ * Mede, por evolução:
+ *   - seções simples com um RegExp montado por título (implementação anterior)
+ *     × tokenizador de seções (src/parsers/secoes-evolucao.js), conferindo
+ *     que o resultado é o mesmo;
+ *   - EvolucaoParser.extrairDadosEstruturadosEvolucao completo (quando as
+ *     dependências dos parsers estão instaladas).
+ *
+ * Uso: node benchmark-evolucoes.js [--evolucoes=N] [--iteracoes=N]
+ */
+const fs = require('fs');
+const path = require('path');
+const assert = require('assert');
+const { performance } = require('perf_hooks');
+const { SECOES_DELIMITADORAS, tokenizarSecoes, corpoDaSecao } = require('./src/parsers/secoes-evolucao');
+const { resumirDuracoes } = require('./src/core/timing');
+
+const args = process.argv.slice(2);
+const valor = (nome) => (args.find(a => a.startsWith(`--${nome}=`)) || '').split('=')[1];
+const EVOLUCOES = parseInt(valor('evolucoes')) || 300;
+const ITERACOES = parseInt(valor('iteracoes')) || 20;
+
+const TITULOS_SIMPLES = ['Diagnósticos anteriores', 'Fez uso', 'Dispositivos', 'Conduta', 'Pendências'];
+
+function lerDescricoesFixture() {
+    const html = fs.readFileSync(path.join(__dirname, 'test', 'fixtures', 'evolucoes', 'evolucoes.html'), 'utf8');
+    return [...html.matchAll(/<b>Descrição:<\/b><\/div><div class="col-lg-10">([\s\S]*?)<\/div><\/div>/g)]
+        .map(m => m[1].replace(/<br\s*\/?>/gi, '\n').replace(/<[^>]*>/g, ''));
+}
+
+/** Evolução de UTI longa, com as seções que os parsers procuram. */
+function sintetizarEvolucao(dia) {
+    const itens = (prefixo, n) => Array.from({ length: n }, (_, i) => `- ${prefixo} ${i + 1} (D${dia})`).join('\n');
+    return [
+        'Nome: PACIENTE TESTE', 'DN: 01/01/2015', 'Idade: 11 anos', 'Peso Atual: 32 kg', `DIH: ${dia} dias`,
+        'Hipóteses Diagnósticas:', '1. Choque séptico', '2. Pneumonia associada à ventilação', '3. Desnutrição',
+        'Diagnósticos anteriores:', itens('Diagnóstico prévio', 4),
+        'Medicações em uso:', itens('Medicação', 12),
+        'Fez uso:', itens('Antibiótico anterior', 6),
+        'Dispositivos:', itens('Dispositivo', 5),
+        'Exames Complementares:', `${String(dia % 28 + 1).padStart(2, '0')}/09/26: Hb 10,2 Ht 31 Leuco 14.300 PCR 8,1`,
+        'Gasometria', 'pH 7,31 pCO2 48 pO2 82 HCO3 22 BE -3',
+        'HDA: febre e desconforto respiratório há 5 dias.', 'HPP: asma.', 'HF: nega.', 'HSE: casa de alvenaria.',
+        'Admissão emergência: admitido taquipneico.', 'Admissão UTIP: intubado na admissão.',
+        'Evolução médica:', 'Paciente grave, sedado, em VM. '.repeat(8),
+        'Controle 24 h: FC 120 FR 28 PA 90x50 Tax 37,9', 'Diurese: 1,2 ml/kg/h', 'BH 24 h: +340 ml',
+        'Exame Físico: REG, corado, hidratado. '.repeat(4),
+        'Conduta:', itens('Conduta', 8),
+        'Pendências:', itens('Pendência', 3)
+    ].join('\n');
+}
+
+/** Implementação anterior de parseSecaoSimples (um RegExp novo por título por evolução). */
+function secaoSimplesRegex(texto, tituloSecao) {
+    const esc = s => s.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
+    const lookahead = SECOES_DELIMITADORAS.filter(s => s !== tituloSecao).map(esc).join('|');
+    const match = texto.match(new RegExp(`${esc(tituloSecao)}:\\s*([\\s\\S]*?)(?=(?:${lookahead}):|$)`, 'i'));
+    return match && match[1] ? match[1].trim() : '';
+}
+
+function secaoSimplesTokens(secoes, titulo) {
+    const corpo = corpoDaSecao(secoes, titulo);
+    return corpo ? corpo.trim() : '';
+}
+
+function medirPorEvolucao(textos, fn) {
+    for (const texto of textos.slice(0, 50)) fn(texto);
+    const duracoes = [];
+    for (let i = 0; i < ITERACOES; i++) {
+        for (const texto of textos) {
+            const t0 = performance.now();
+            fn(texto);
+            duracoes.push(performance.now() - t0);
+        }
+    }
+    return resumirDuracoes(duracoes);
+}
+
+function carregarEvolucaoParser() {
+    try {
+        const EvolucaoParser = require('./src/parsers/evolucao-parser');
+        const parser = new EvolucaoParser();
+        parser.setDebugMode(false);
+        return parser;
+    } catch (error) {
+        return null;
+    }
+}
+
+function main() {
+    const fixture = lerDescricoesFixture();
+    const textos = Array.from({ length: EVOLUCOES }, (_, i) => (i % 4 === 0 && fixture.length ? fixture[i % fixture.length] : sintetizarEvolucao(i)));
+
+    for (const texto of textos) {
+        const secoes = tokenizarSecoes(texto);
+        for (const titulo of TITULOS_SIMPLES) {
+            assert.strictEqual(secaoSimplesTokens(secoes, titulo), secaoSimplesRegex(texto, titulo), `seção ${titulo} divergente`);
+        }
+    }
+
+    console.log(`\n=== BENCHMARK EVOLUÇÕES — ${textos.length} evoluções × ${ITERACOES} iterações ===\n`);
+    const linha = (rotulo, r) => console.log(
+        `${rotulo.padEnd(40)} p50 ${String(r.p50Ms).padStart(7)} ms  p95 ${String(r.p95Ms).padStart(7)} ms  ` +
+        `p99 ${String(r.p99Ms).padStart(7)} ms  (${Math.round(1000 / r.mediaMs)} evoluções/s)`
+    );
+
+    const regex = medirPorEvolucao(textos, texto => TITULOS_SIMPLES.map(t => secaoSimplesRegex(texto, t)));
+    const tokens = medirPorEvolucao(textos, texto => {
+        const secoes = tokenizarSecoes(texto);
+        return TITULOS_SIMPLES.map(t => secaoSimplesTokens(secoes, t));
+    });
+    linha('seções simples: RegExp por título', regex);
+    linha('seções simples: tokenizador', tokens);
+    console.log(`ganho p50: ${Math.round((regex.p50Ms / tokens.p50Ms) * 10) / 10}x\n`);
+
+    const parser = carregarEvolucaoParser();
+    if (!parser) {
+        console.log('ℹ️ EvolucaoParser indisponível (dependências não instaladas) — pulando a extração completa.');
+        return;
+    }
+    const log = console.log;
+    console.log = () => {};
+    const completo = medirPorEvolucao(textos, texto => parser.extrairDadosEstruturadosEvolucao(texto));
+    console.log = log;
+    linha('extrairDadosEstruturadosEvolucao', completo);
+}
+
+main();
@@ -0,0 +1,73 @@
+/**
+ * Benchmark offline do parse de páginas de impressão de exames (ms/página).
+ *
+ * Roda ExamesParser.parseResultadosExames sobre as fixtures de
+ * test/fixtures/exames (ou outro diretório com .html) em dois modos:
+ *   - frio: parser novo a cada página
+ *   - aquecido: um parser para todas as páginas
+ *
+ * Uso: node benchmark-parser-exames.js [diretorio] [--iteracoes=N]
+ */
+const fs = require('fs');
+const path = require('path');
+const { performance } = require('perf_hooks');
+const ExamesParser = require('./src/parsers/exames-parser');
+const { resumirDuracoes } = require('./src/core/timing');
+
+const args = process.argv.slice(2);
+const DIRETORIO = args.find(a => !a.startsWith('--')) || path.join(__dirname, 'test', 'fixtures', 'exames');
+const ITERACOES = parseInt((args.find(a => a.startsWith('--iteracoes=')) || '').split('=')[1]) || 200;
+
+const novoParser = () => new ExamesParser('https://hicd.local');
+
+function medir(paginas, { parserPorPagina = false } = {}) {
+    const duracoes = [];
+    let resultados = 0;
+    let parser = novoParser();
+
+    for (let i = 0; i < ITERACOES; i++) {
+        for (const pagina of paginas) {
+            if (parserPorPagina) parser = novoParser();
+            const t0 = performance.now();
+            resultados += parser.parseResultadosExames(pagina.html, pagina.nome).length;
+            duracoes.push(performance.now() - t0);
+        }
+    }
+    return { ...resumirDuracoes(duracoes), resultadosPorIteracao: resultados / ITERACOES, parser };
+}
+
+function main() {
+    const paginas = fs.readdirSync(DIRETORIO)
+        .filter(f => f.endsWith('.html'))
+        .sort()
+        .map(nome => ({ nome, html: fs.readFileSync(path.join(DIRETORIO, nome), 'utf8') }));
+
+    if (paginas.length === 0) {
+        console.error(`❌ Nenhuma fixture .html em ${DIRETORIO}`);
+        process.exit(1);
+    }
+
+    console.log(`\n=== BENCHMARK PARSER DE EXAMES — ${paginas.length} página(s) × ${ITERACOES} iterações ===\n`);
+
+    // O parser loga cada página; silencia durante as medições
+    const log = console.log;
+    console.log = () => {};
+    const frio = medir(paginas, { parserPorPagina: true });
+    const aquecido = medir(paginas);
+    const porFixture = paginas.map(pagina => ({ nome: pagina.nome, ...medir([pagina]) }));
+    console.log = log;
+
+    const linha = (rotulo, r) => console.log(
+        `${rotulo.padEnd(28)} média ${String(r.mediaMs).padStart(7)} ms  p50 ${String(r.p50Ms).padStart(7)} ms  ` +
+        `p95 ${String(r.p95Ms).padStart(7)} ms  (${r.resultadosPorIteracao} resultados)`
+    );
+
+    linha('frio (parser por página)', frio);
+    linha('aquecido (parser único)', aquecido);
+    console.log('');
+    porFixture.forEach(r => linha(r.nome, r));
+
+    console.log('\nDespacho por layout (aquecido):', JSON.stringify(aquecido.parser.getEstatisticasLayout(), null, 2));
+}
+
+main();
@@ -0,0 +1,235 @@
+/**
+ * Benchmark offline dos parsers (src/parsers) sobre o corpus de fixtures.
+ *
+ * Roda cada parser sobre as páginas HTML anonimizadas de test/fixtures e
+ * reporta, por caso: páginas/s, ms/página (p50/p95/p99) e heap alocado por
+ * página. Compara com o baseline (benchmark-parsers.baseline.json) e sai com
+ * código 1 quando algum caso piora além do limiar. Sem baseline, a primeira
+ * execução grava o seu e avisa que nada foi comparado.
+ *
+ * Uso:
+ *   node benchmark-parsers.js [--iteracoes=N] [--limiar=0.25] [--filtro=exames]
+ *   node benchmark-parsers.js --atualizar-baseline
+ *
+ * O baseline só vale para a máquina/versão de Node em que foi gerado (ambos
+ * ficam registrados no JSON), por isso não é versionado; regenere ao trocar
+ * de ambiente.
+ */
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const v8 = require('v8');
+const vm = require('vm');
+const { performance } = require('perf_hooks');
+const { resumirDuracoes } = require('./src/core/timing');
+
+const FIXTURES = path.join(__dirname, 'test', 'fixtures');
+const BASELINE = path.join(__dirname, 'benchmark-parsers.baseline.json');
+const LIMIAR_PADRAO = parseFloat(process.env.BENCH_PARSERS_THRESHOLD) || 0.25;
+// Diferenças absolutas abaixo disto são ruído de medição, não regressão
+const TOLERANCIA_MS = 0.05;
+const TOLERANCIA_KB = 16;
+
+/**
+ * Casos do benchmark: parser × fixture. `porPagina` = instância nova a cada
+ * página (parsers com memoização do último HTML devolveriam o resultado cacheado).
+ */
+function carregarCasos() {
+    const ClinicaParser = require('./src/parsers/clinica-parser');
+    const PacienteParser = require('./src/parsers/paciente-parser');
+    const ExamesParser = require('./src/parsers/exames-parser');
+    const EvolucaoParser = require('./src/parsers/evolucao-parser');
+    const PrescricaoParser = require('./src/parsers/prescricao-parser');
+    const ProntuarioParser = require('./src/parsers/prontuario-parser');
+    const HICDParser = require('./src/parsers/hicd-parser');
+
+    return [
+        { parser: 'clinica', fixture: 'clinicas/lista-clinicas.html', criar: () => new ClinicaParser(), executar: (p, html) => p.parse(html), porPagina: true },
+        { parser: 'tipo-pagina', fixture: 'clinicas/lista-clinicas.html', criar: () => new HICDParser(), executar: (p, html) => p.scorePageTypes(html) },
+        { parser: 'parse-multiplo', fixture: 'clinicas/lista-clinicas.html', criar: () => new HICDParser(), executar: (p, html) => p.parseMultiple(html).dados, porPagina: true },
+        { parser: 'paciente', fixture: 'pacientes/lista-pacientes.html', criar: () => new PacienteParser(), executar: (p, html) => p.parse(html, '012'), porPagina: true },
+        { parser: 'paciente-cadastro', fixture: 'pacientes/cadastro.html', criar: () => new PacienteParser(), executar: (p, html) => p.parsePacienteCadastro(html, '100037'), porPagina: true },
+        { parser: 'prontuario', fixture: 'pacientes/cadastro.html', criar: () => new ProntuarioParser(), executar: (p, html) => p.parse(html, '100037') },
+        { parser: 'evolucao', fixture: 'evolucoes/evolucoes.html', criar: () => new EvolucaoParser(), executar: (p, html) => p.parse(html, '100037') },
+        { parser: 'prescricao', fixture: 'prescricoes/lista-prescricoes.html', criar: () => new PrescricaoParser(), executar: (p, html) => p.parse(html, '100037') },
+        { parser: 'prescricao-detalhes', fixture: 'prescricoes/prescricao-detalhes.html', criar: () => new PrescricaoParser(), executar: (p, html) => p.parsePrescricaoDetalhes(html, '700000') },
+        ...fs.readdirSync(path.join(FIXTURES, 'exames')).filter(f => f.endsWith('.html')).sort().map(f => ({
+            parser: 'exames-resultados',
+            fixture: `exames/${f}`,
+            criar: () => new ExamesParser('https://hicd.local'),
+            executar: (p, html) => p.parseResultadosExames(html, 'R1')
+        }))
+    ];
+}
+
+/** gc() sem exigir --expose-gc na linha de comando. */
+function obterGc() {
+    if (typeof global.gc === 'function') return global.gc;
+    v8.setFlagsFromString('--expose-gc');
+    return vm.runInNewContext('gc');
+}
+
+function tamanhoResultado(resultado) {
+    if (Array.isArray(resultado)) return resultado.length;
+    if (resultado && typeof resultado === 'object') return Object.keys(resultado).length;
+    return resultado ? 1 : 0;
+}
+
+/**
+ * Mede um caso: tempo por página e heap alocado por página (mediana de
+ * execuções isoladas precedidas de gc(), para não contar lixo de outras).
+ */
+function medirCaso(caso, html, iteracoes, gc) {
+    let parser = caso.criar();
+    const rodar = () => {
+        if (caso.porPagina) parser = caso.criar();
+        return caso.executar(parser, html);
+    };
+
+    // Aquecimento (JIT, caches de regex)
+    for (let i = 0; i < Math.min(20, iteracoes); i++) rodar();
+
+    const duracoes = [];
+    let itens = 0;
+    for (let i = 0; i < iteracoes; i++) {
+        const t0 = performance.now();
+        itens = tamanhoResultado(rodar());
+        duracoes.push(performance.now() - t0);
+    }
+
+    const alocacoes = [];
+    for (let i = 0; i < Math.min(30, iteracoes); i++) {
+        gc();
+        const antes = process.memoryUsage().heapUsed;
+        rodar();
+        alocacoes.push(Math.max(0, process.memoryUsage().heapUsed - antes));
+    }
+    alocacoes.sort((a, b) => a - b);
+
+    const tempos = resumirDuracoes(duracoes);
+    return {
+        itens,
+        paginasPorSegundo: tempos.mediaMs ? Math.round(1000 / tempos.mediaMs) : null,
+        mediaMs: tempos.mediaMs,
+        p50Ms: tempos.p50Ms,
+        p95Ms: tempos.p95Ms,
+        p99Ms: tempos.p99Ms,
+        heapKBPorPagina: Math.round(alocacoes[Math.floor(alocacoes.length / 2)] / 1024)
+    };
+}
+
+/**
+ * Compara a execução atual com o baseline.
+ * @param {object} atual - { casos: { chave: { p50Ms, heapKBPorPagina, ... } } }
+ * @param {object|null} baseline - mesmo formato
+ * @param {number} [limiar=0.25] - piora relativa tolerada (0.25 = +25%)
+ * @returns {Array<{ caso, metrica, baseline, atual, variacao }>} regressões encontradas
+ */
+function compararComBaseline(atual, baseline, limiar = LIMIAR_PADRAO) {
+    if (!baseline || !baseline.casos) return [];
+    const regressoes = [];
+    const metricas = [
+        { nome: 'p50Ms', tolerancia: TOLERANCIA_MS },
+        { nome: 'heapKBPorPagina', tolerancia: TOLERANCIA_KB }
+    ];
+
+    for (const [caso, medido] of Object.entries(atual.casos)) {
+        const referencia = baseline.casos[caso];
+        if (!referencia) continue;
+        for (const { nome, tolerancia } of metricas) {
+            const antes = referencia[nome];
+            const agora = medido[nome];
+            if (!Number.isFinite(antes) || !Number.isFinite(agora)) continue;
+            if (agora - antes <= tolerancia) continue;
+            const variacao = antes > 0 ? (agora - antes) / antes : Infinity;
+            if (variacao > limiar) {
+                regressoes.push({ caso, metrica: nome, baseline: antes, atual: agora, variacao: Math.round(variacao * 1000) / 1000 });
+            }
+        }
+    }
+    return regressoes;
+}
+
+function lerArgs(argv) {
+    const valor = (nome) => (argv.find(a => a.startsWith(`--${nome}=`)) || '').split('=')[1];
+    return {
+        iteracoes: parseInt(valor('iteracoes')) || 300,
+        limiar: parseFloat(valor('limiar')) || LIMIAR_PADRAO,
+        filtro: valor('filtro') || '',
+        atualizarBaseline: argv.includes('--atualizar-baseline')
+    };
+}
+
+function main() {
+    const args = lerArgs(process.argv.slice(2));
+    const gc = obterGc();
+    const casos = carregarCasos().filter(c => `${c.parser}:${c.fixture}`.includes(args.filtro));
+
+    console.log(`\n=== BENCHMARK DE PARSERS — ${casos.length} caso(s) × ${args.iteracoes} iterações ===\n`);
+
+    const atual = {
+        geradoEm: new Date().toISOString(),
+        node: process.version,
+        plataforma: `${os.platform()}-${os.arch()} ${(os.cpus()[0] || {}).model || ''}`.trim(),
+        iteracoes: args.iteracoes,
+        casos: {}
+    };
+
+    // Os parsers logam a cada página; silencia durante as medições
+    const log = console.log;
+    for (const caso of casos) {
+        const html = fs.readFileSync(path.join(FIXTURES, caso.fixture), 'utf8');
+        console.log = () => {};
+        let medido;
+        try {
+            medido = medirCaso(caso, html, args.iteracoes, gc);
+        } finally {
+            console.log = log;
+        }
+        const chave = `${caso.parser}:${caso.fixture}`;
+        atual.casos[chave] = medido;
+        console.log(
+            `${chave.padEnd(58)} ${String(medido.paginasPorSegundo).padStart(7)} pág/s  ` +
+            `p50 ${String(medido.p50Ms).padStart(6)} ms  p95 ${String(medido.p95Ms).padStart(6)} ms  ` +
+            `p99 ${String(medido.p99Ms).padStart(6)} ms  heap ${String(medido.heapKBPorPagina).padStart(5)} KB/pág  ` +
+            `(${medido.itens} itens)`
+        );
+        if (medido.itens === 0) console.warn(`   ⚠️ ${chave} não extraiu nada — fixture ou parser quebrado?`);
+    }
+
+    if (args.atualizarBaseline || !fs.existsSync(BASELINE)) {
+        fs.writeFileSync(BASELINE, JSON.stringify(atual, null, 2) + '\n', 'utf8');
+        console.log(`\n💾 Baseline gravado em ${path.relative(process.cwd(), BASELINE)}`);
+        if (!args.atualizarBaseline) {
+            console.warn('⚠️ Não havia baseline: nada foi comparado. As próximas execuções comparam com este.');
+        }
+        return;
+    }
+
+    const baseline = JSON.parse(fs.readFileSync(BASELINE, 'utf8'));
+    if (baseline.node !== atual.node || baseline.plataforma !== atual.plataforma) {
+        console.warn(`\n⚠️ Baseline gerado em outro ambiente (${baseline.node}, ${baseline.plataforma}) — comparação indicativa.`);
+    }
+    const semReferencia = Object.keys(atual.casos).filter(caso => !baseline.casos[caso]);
+    if (semReferencia.length > 0) {
+        console.warn(`\n⚠️ ${semReferencia.length} caso(s) fora do baseline, não comparados: ${semReferencia.join(', ')}`);
+    }
+
+    const regressoes = compararComBaseline(atual, baseline, args.limiar);
+    if (regressoes.length === 0) {
+        console.log(`\n✅ Nenhuma regressão acima de ${Math.round(args.limiar * 100)}% em relação ao baseline`);
+        return;
+    }
+
+    console.error(`\n❌ ${regressoes.length} regressão(ões) acima de ${Math.round(args.limiar * 100)}%:`);
+    for (const r of regressoes) {
+        console.error(`   ${r.caso} ${r.metrica}: ${r.baseline} → ${r.atual} (+${Math.round(r.variacao * 100)}%)`);
+    }
+    process.exitCode = 1;
+}
+
+if (require.main === module) {
+    main();
+}
+
+module.exports = { compararComBaseline, lerArgs, BASELINE };
@@ -0,0 +1,92 @@
+/**
+ * Benchmark do rate limiting por cliente da API (middleware rateLimit).
+ *
+ * Compara a implementação anterior (array de instantes por cliente, `filter` a
+ * cada requisição e limpeza do Map num sorteio de 1%) com a JanelaDeslizante
+ * (dois contadores por cliente, expiração na virada da janela) em taxas altas.
+ * O relógio é simulado: N requisições por segundo distribuídas entre os
+ * clientes, durante alguns minutos de tráfego, sem esperar de verdade.
+ *
+ * Uso: node benchmark-rate-limit.js [--requisicoes=N] [--taxas=1000,10000,100000] [--clientes=10,1000,10000]
+ */
+const { performance } = require('perf_hooks');
+const JanelaDeslizante = require('./api/utils/janela-deslizante');
+
+const args = process.argv.slice(2);
+const valor = (nome) => (args.find(a => a.startsWith(`--${nome}=`)) || '').split('=')[1];
+const REQUISICOES = parseInt(valor('requisicoes')) || 1000000;
+const TAXAS = (valor('taxas') || '1000,10000,100000').split(',').map(n => parseInt(n)).filter(n => n > 0);
+const CLIENTES = (valor('clientes') || '10,1000,10000').split(',').map(n => parseInt(n)).filter(n => n > 0);
+const MAX = 100;
+const JANELA_MS = 60 * 1000;
+
+/** Implementação anterior, mantida aqui só como referência de desempenho. */
+function limitadorAnterior() {
+    const requests = new Map();
+    let sorteio = 0;
+    return (clientId, now) => {
+        if (!requests.has(clientId)) requests.set(clientId, []);
+        const validRequests = requests.get(clientId).filter(timestamp => now - timestamp < JANELA_MS);
+        if (validRequests.length >= MAX) return false;
+        validRequests.push(now);
+        requests.set(clientId, validRequests);
+        // Math.random() < 0.01, determinístico para comparar execuções
+        if (++sorteio % 100 === 0) {
+            for (const [id, reqs] of requests.entries()) {
+                const validReqs = reqs.filter(timestamp => now - timestamp < JANELA_MS);
+                if (validReqs.length === 0) requests.delete(id);
+                else requests.set(id, validReqs);
+            }
+        }
+        return true;
+    };
+}
+
+function limitadorJanela() {
+    const janela = new JanelaDeslizante({ max: MAX, janelaMs: JANELA_MS, maxClientes: 100000 });
+    return (clientId, now) => janela.registrar(clientId, now).permitida;
+}
+
+function executar(criar, taxa, clientes) {
+    const ids = Array.from({ length: clientes }, (_, i) => `10.0.${i >> 8}.${i & 255}`);
+    const passoMs = 1000 / taxa;
+    const limitar = criar();
+
+    if (global.gc) global.gc();
+    const heapAntes = process.memoryUsage().heapUsed;
+    let permitidas = 0;
+    const inicio = performance.now();
+    for (let i = 0; i < REQUISICOES; i++) {
+        if (limitar(ids[(i * 7919) % clientes], i * passoMs)) permitidas++;
+    }
+    const ms = performance.now() - inicio;
+    // Memória retida pelo limitador (ainda referenciado), sem o lixo do loop
+    if (global.gc) global.gc();
+    const heapMB = (process.memoryUsage().heapUsed - heapAntes) / 1024 / 1024;
+    limitar('', REQUISICOES * passoMs);
+    return { nsPorReq: Math.round((ms * 1e6) / REQUISICOES), permitidas, heapMB: Math.round(heapMB * 10) / 10 };
+}
+
+function main() {
+    console.log(`\n=== BENCHMARK RATE LIMIT — ${REQUISICOES} requisições, ${MAX}/${JANELA_MS / 1000}s por cliente ===`);
+    if (!global.gc) console.log('(rode com --expose-gc para uma medida de heap mais estável)');
+
+    for (const taxa of TAXAS) {
+        for (const clientes of CLIENTES) {
+            const anterior = executar(limitadorAnterior, taxa, clientes);
+            const janela = executar(limitadorJanela, taxa, clientes);
+            const segundos = Math.round(REQUISICOES / taxa);
+            console.log(`\n${taxa} req/s, ${clientes} clientes (${segundos}s de tráfego):`);
+            const linha = (rotulo, r) => console.log(
+                `  ${rotulo.padEnd(18)} ${String(r.nsPorReq).padStart(7)} ns/req  ` +
+                `permitidas ${String(r.permitidas).padStart(8)}  heap ${String(r.heapMB).padStart(6)} MB`
+            );
+            linha('array + filter', anterior);
+            linha('janela deslizante', janela);
+            console.log(`  ganho: ${Math.round((anterior.nsPorReq / janela.nsPorReq) * 10) / 10}x`);
+        }
+    }
+    console.log('');
+}
+
+main();
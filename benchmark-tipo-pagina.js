@@ -0,0 +1,92 @@
+/**
+ * Benchmark da detecção de tipo de página (HICDParser.detectPageType).
+ *
+ * Compara a contagem antiga (um RegExp por palavra-chave, uma varredura do
+ * HTML por palavra) com o KeywordScorer (Aho–Corasick, uma varredura para
+ * todas) em listas de clínicas grandes sintetizadas a partir da fixture, e
+ * confere que os scores são idênticos.
+ *
+ * Uso: node benchmark-tipo-pagina.js [--iteracoes=N] [--tamanhos=100,1000,5000]
+ */
+const fs = require('fs');
+const path = require('path');
+const { performance } = require('perf_hooks');
+const assert = require('assert');
+const KeywordScorer = require('./src/parsers/keyword-scorer');
+const { resumirDuracoes } = require('./src/core/timing');
+
+const args = process.argv.slice(2);
+const valor = (nome) => (args.find(a => a.startsWith(`--${nome}=`)) || '').split('=')[1];
+const ITERACOES = parseInt(valor('iteracoes')) || 200;
+const TAMANHOS = (valor('tamanhos') || '100,1000,5000').split(',').map(n => parseInt(n)).filter(n => n > 0);
+
+// Mesma tabela do HICDParser
+const PALAVRAS = {
+    clinicas: ['clínica', 'clinica', 'clinic', 'código da clínica', 'lista de clínicas'],
+    pacientes: ['paciente', 'patient', 'prontuário', 'prontuario', 'lista de pacientes'],
+    exames: ['exame', 'exam', 'resultado', 'laboratorial', 'lista de exames'],
+    evolucoes: ['evolução', 'evolucao', 'evolution', 'nota médica', 'evolução médica'],
+    prontuario: ['prontuário completo', 'dados do paciente', 'histórico médico', 'ficha médica']
+};
+
+/** Implementação anterior, mantida aqui só como referência de desempenho e resultado. */
+function pontuarPorRegex(html) {
+    const htmlLower = html.toLowerCase();
+    const scores = {};
+    for (const [tipo, keywords] of Object.entries(PALAVRAS)) {
+        scores[tipo] = 0;
+        for (const keyword of keywords) {
+            const matches = htmlLower.match(new RegExp(keyword, 'gi'));
+            if (matches) scores[tipo] += matches.length;
+        }
+    }
+    return scores;
+}
+
+/** Lista de clínicas com `opcoes` <option>, no layout da fixture (ParamModule 2904). */
+function gerarListaClinicas(opcoes) {
+    const base = fs.readFileSync(path.join(__dirname, 'test', 'fixtures', 'clinicas', 'lista-clinicas.html'), 'utf8');
+    const linhas = [];
+    for (let i = 0; i < opcoes; i++) {
+        const codigo = String(i).padStart(3, '0');
+        linhas.push(`    <option value="${codigo}">CLINICA ${i % 2 ? 'MEDICA' : 'CIRURGICA'} ${codigo} - PACIENTES INTERNADOS</option>`);
+    }
+    return base.replace(/<\/select>/i, `${linhas.join('\n')}\n  </select>`);
+}
+
+function medir(fn, html) {
+    for (let i = 0; i < Math.min(20, ITERACOES); i++) fn(html);
+    const duracoes = [];
+    for (let i = 0; i < ITERACOES; i++) {
+        const t0 = performance.now();
+        fn(html);
+        duracoes.push(performance.now() - t0);
+    }
+    return resumirDuracoes(duracoes);
+}
+
+function main() {
+    const pontuador = new KeywordScorer(PALAVRAS, { ignorarCaixa: true });
+    const pontuarPorAutomato = (html) => pontuador.pontuar(html);
+
+    console.log(`\n=== BENCHMARK DETECÇÃO DE TIPO DE PÁGINA — ${ITERACOES} iterações ===\n`);
+
+    for (const opcoes of TAMANHOS) {
+        const html = gerarListaClinicas(opcoes);
+        assert.deepStrictEqual(pontuarPorAutomato(html), pontuarPorRegex(html), `scores divergentes com ${opcoes} opções`);
+
+        const regex = medir(pontuarPorRegex, html);
+        const automato = medir(pontuarPorAutomato, html);
+        const kb = Math.round(html.length / 1024);
+        const linha = (rotulo, r) => console.log(
+            `  ${rotulo.padEnd(22)} p50 ${String(r.p50Ms).padStart(8)} ms  p95 ${String(r.p95Ms).padStart(8)} ms  ` +
+            `${Math.round((html.length / 1024 / 1024) / (r.mediaMs / 1000))} MB/s`
+        );
+        console.log(`${opcoes} clínicas (${kb} KB):`);
+        linha('regex por palavra', regex);
+        linha('aho-corasick', automato);
+        console.log(`  ganho p50: ${Math.round((regex.p50Ms / automato.p50Ms) * 10) / 10}x\n`);
+    }
+}
+
+main();
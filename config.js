@@ -11,6 +11,10 @@ require('dotenv').config();
 // Default mantém o host de produção atual.
 const DEFAULT_HOST = process.env.HICD_HOST || 'hicd-hospub.sesau.ro.gov.br';
 
+// Protocolo do origin. Produção é sempre https; http só para o HICD falso
+// local de testes de carga (loadtest/fake-hicd-server.js).
+const HICD_PROTOCOL = process.env.HICD_PROTOCOL === 'http' ? 'http' : 'https';
+
 // Allowlist de hosts aceitos no override por header (anti-SSRF).
 // Sempre inclui o host padrão; hosts extras vêm de HICD_HOST_ALLOWLIST (CSV).
 const HOST_ALLOWLIST = Array.from(new Set(
@@ -27,7 +31,7 @@ const HOST_ALLOWLIST = Array.from(new Set(
  */
 function buildConfig(host = DEFAULT_HOST) {
     const HICD_HOST = host || DEFAULT_HOST;
-    const HICD_ORIGIN = `https://${HICD_HOST}`;
+    const HICD_ORIGIN = `${HICD_PROTOCOL}://${HICD_HOST}`;
 
     return {
     // Host base do sistema (origin sem caminho). Use para montar URLs absolutas.
@@ -0,0 +1,62 @@
+#!/usr/bin/env node
+
+/**
+ * Extração completa do HICD em NDJSON, retomável.
+ *
+ * Uso:
+ *   node crawler-ndjson.js [arquivo.ndjson] [--concorrencia=N]
+ *
+ * Sem arquivo, grava em output/hicd-data.ndjson. Rodar de novo com o mesmo
+ * arquivo retoma do checkpoint (arquivo.ndjson.checkpoint.json) sem duplicar
+ * registros; para uma extração nova, informe outro arquivo.
+ */
+
+const HICDCrawler = require('./hicd-crawler-refactored');
+
+async function main() {
+    const args = process.argv.slice(2);
+    const arquivo = args.find(a => !a.startsWith('--')) || HICDCrawler.ARQUIVO_NDJSON_PADRAO;
+    const concorrenciaArg = args.find(a => a.startsWith('--concorrencia='));
+    const concorrencia = concorrenciaArg ? parseInt(concorrenciaArg.split('=')[1]) : undefined;
+
+    console.log('🏥 HICD Crawler - Extração Completa (NDJSON)');
+    console.log('============================================');
+    console.log(`⏰ Iniciado em: ${new Date().toLocaleString('pt-BR')}`);
+    console.log(`📄 Arquivo: ${arquivo}`);
+    console.log(`   Se a extração parar, retome com: node crawler-ndjson.js ${arquivo}\n`);
+
+    const crawler = new HICDCrawler();
+
+    try {
+        const loginResult = await crawler.login();
+        if (!loginResult.success) {
+            console.error('❌ Falha no login:', loginResult.message);
+            process.exitCode = 1;
+            return;
+        }
+
+        const resumo = await crawler.extractDataNdjson({ arquivo, concorrencia });
+
+        console.log('\n📊 RELATÓRIO FINAL');
+        console.log('==================');
+        console.log(`📄 Arquivo: ${resumo.arquivo}`);
+        console.log(`🏥 Clínicas concluídas: ${resumo.clinicasConcluidas}/${resumo.clinicas}`);
+        console.log(`👥 Registros: ${resumo.registros} (${resumo.registrosSessao} nesta execução)`);
+        console.log(`⚡ Ritmo: ${resumo.registrosPorMinuto} registros/min`);
+        if (resumo.retomado && resumo.registrosSessao === 0 && resumo.clinicasConcluidas >= resumo.clinicas) {
+            console.log(`ℹ️ ${arquivo} já estava completo — para uma extração nova, informe outro arquivo`);
+        }
+        if (resumo.falhas.length > 0) {
+            console.log(`⚠️ ${resumo.falhas.length} clínica(s) com erro — rode novamente para retomar`);
+            process.exitCode = 1;
+        }
+    } catch (error) {
+        console.error('❌ Extração interrompida:', error.message);
+        console.error(`   Retome do checkpoint com: node crawler-ndjson.js ${arquivo}`);
+        process.exitCode = 1;
+    } finally {
+        await crawler.logout().catch(() => {});
+    }
+}
+
+main();
@@ -5,6 +5,8 @@ const PatientService = require('./src/services/patient-service');
 const EvolutionService = require('./src/services/evolution-service');
 const ClinicalDataExtractor = require('./src/extractors/clinical-data-extractor');
 const ClinicAnalyzer = require('./src/analyzers/clinic-analyzer');
+const CheckpointedCrawl = require('./src/services/checkpointed-crawl');
+const SignedPrescriptionCache = require('./src/services/signed-prescription-cache');
 const config = require('./config');
 const fs = require('fs').promises;
 const path = require('path');
@@ -30,9 +32,12 @@ class HICDCrawler {
         this.httpClient = new HICDHttpClient(cfg);
         this.authService = new HICDAuthService(this.httpClient, username, password);
         this.parser = new HICDParser({ origin: cfg.origin });
-        this.patientService = new PatientService(this.httpClient, this.parser);
-        this.evolutionService = new EvolutionService(this.httpClient, this.parser);
+        // Índices de leitos/nomes e histórico de evoluções são do host, não desta sessão
+        this.patientService = new PatientService(this.httpClient, this.parser, { host: cfg.host });
+        this.evolutionService = new EvolutionService(this.httpClient, this.parser, { host: cfg.host });
         this.clinicalExtractor = new ClinicalDataExtractor();
+        // Detalhes de prescrições assinadas (imutáveis): compartilhado entre crawlers, chave host + id
+        this.prescricoesAssinadas = SignedPrescriptionCache.compartilhado;
         this.clinicAnalyzer = new ClinicAnalyzer(
             this.patientService,
             this.evolutionService,
@@ -83,6 +88,16 @@ class HICDCrawler {
         return result;
     }
 
+    /**
+     * Usa os cookies de uma sessão já aberta no HICD (por outro worker, no modo
+     * cluster), sem novo login
+     * @param {string} cookies
+     */
+    adotarSessao(cookies) {
+        this.httpClient.updateCookies(cookies);
+        this.authService.isLoggedIn = true;
+    }
+
     /**
      * Faz logout do sistema
      */
@@ -130,6 +145,14 @@ class HICDCrawler {
         this.verificarAutenticacao();
         return await this.patientService.getPacientesClinica(codigoClinica, referencia, filtroNome, ordem);
     }
+
+    /**
+     * Busca pacientes de uma clínica propagando falhas (getPacientesClinica devolve [])
+     */
+    async buscarPacientesClinica(codigoClinica, referencia = '', filtroNome = '', ordem = '') {
+        this.verificarAutenticacao();
+        return await this.patientService.buscarPacientesClinica(codigoClinica, referencia, filtroNome, ordem);
+    }
     /**
      * Busca paciente por leito específico
      */
@@ -143,7 +166,29 @@ class HICDCrawler {
      */
     async getPacienteCadastro(pacienteId, tipoBusca = 'PRONT') {
         this.verificarAutenticacao();
-        return await this.evolutionService.getPacienteCadastro(pacienteId, tipoBusca);
+        const cadastro = await this.evolutionService.getPacienteCadastro(pacienteId, tipoBusca);
+        if (tipoBusca === 'PRONT') {
+            this.patientService.diretorio.registrarCadastro(pacienteId, cadastro);
+        }
+        return cadastro;
+    }
+
+    /**
+     * Busca pacientes por nome no diretório local (sem requisição ao HICD).
+     * Retorna [] para nomes ainda desconhecidos — o caller decide cair no HICD.
+     */
+    buscarPacientesPorNomeLocal(nome, opcoes = {}) {
+        return this.patientService.diretorio.buscar(nome, opcoes);
+    }
+
+    /**
+     * Indica se o diretório local cobre o hospital inteiro: todas as clínicas
+     * conhecidas tiveram a lista completa carregada dentro do TTL do índice de
+     * leitos (as mesmas listas alimentam o diretório). Só então uma busca local
+     * pode dispensar o HICD.
+     */
+    diretorioCompleto() {
+        return this.patientService.leitoIndex.isFresh();
     }
 
     /**
@@ -379,6 +424,26 @@ class HICDCrawler {
         }
     }
 
+    /**
+     * Extração completa em NDJSON com checkpoint (retomável).
+     *
+     * Diferente de extractData(), grava cada registro assim que produzido e
+     * guarda as clínicas concluídas; rodar de novo com o mesmo `arquivo` retoma
+     * de onde parou. Sem `arquivo`, usa ARQUIVO_NDJSON_PADRAO — fixo, para que
+     * a execução seguinte a uma queda retome em vez de começar outro arquivo.
+     * Clínicas em paralelo, limitadas pelo rate limiter do host.
+     *
+     * @param {object} [opcoes] - ver CheckpointedCrawl (arquivo, concorrencia, enriquecer, onProgresso)
+     * @returns {Promise<object>} resumo com registros e registros/minuto
+     */
+    async extractDataNdjson(opcoes = {}) {
+        this.verificarAutenticacao();
+
+        const arquivo = opcoes.arquivo || HICDCrawler.ARQUIVO_NDJSON_PADRAO;
+        const crawl = new CheckpointedCrawl(this, { ...opcoes, arquivo });
+        return await crawl.executar();
+    }
+
     /**
      * Salva dados extraídos
      */
@@ -509,9 +574,11 @@ class HICDCrawler {
     /**
      * Buscar prescrições médicas de um paciente
      * @param {string} prontuario - Número do prontuário do paciente
+     * @param {object} [opcoes]
+     * @param {Function} [opcoes.onProgresso] - chamado com { feitas, total } (detalhes buscados) a cada batch
      * @returns {Promise<Array>} Lista de prescrições
      */
-    async getPrescricoesPaciente(prontuario) {
+    async getPrescricoesPaciente(prontuario, opcoes = {}) {
         this.verificarAutenticacao();
         
         try {
@@ -576,29 +643,44 @@ class HICDCrawler {
             console.log(`[PRESCRICOES] Resposta recebida - tamanho: ${response.data.length} caracteres`);
          //   console.log(response.data.substring(0, 200)); // Log dos primeiros 200 caracteres
             // Passo 4: Extrair lista de prescrições
-            const prescricoes = this.parser.parsePrescricoes(response.data, prontuario);
+            const prescricoes = await this.parser.parseAsync('parsePrescricoes', response.data, prontuario);
             console.log(`✅ ${prescricoes.length} prescrições encontradas para o paciente ${prontuario}`);
             
-            // Passo 5: Buscar detalhes de cada prescrição em batches paralelos
+            // Passo 5: Buscar detalhes em batches paralelos — só das prescrições novas ou
+            // não assinadas; as assinadas já vistas vêm do cache de longa duração
             console.log('[PRESCRICOES] Buscando detalhes das prescrições...');
             const BATCH_SIZE = 3;
-            const prescricoesCompletas = [];
+            const host = this.config.host;
+            const prescricoesCompletas = new Array(prescricoes.length);
+            const pendentes = [];
+
+            prescricoes.forEach((prescricao, indice) => {
+                const detalhes = this.prescricoesAssinadas.obter(host, prescricao.id);
+                if (detalhes) prescricoesCompletas[indice] = { ...prescricao, detalhes };
+                else pendentes.push(indice);
+            });
+            if (pendentes.length < prescricoes.length) {
+                console.log(`[PRESCRICOES] ${prescricoes.length - pendentes.length} prescrições assinadas reaproveitadas do cache`);
+            }
+            const onProgresso = opcoes.onProgresso || (() => {});
+            onProgresso({ feitas: 0, total: pendentes.length });
 
-            for (let i = 0; i < prescricoes.length; i += BATCH_SIZE) {
-                const batch = prescricoes.slice(i, i + BATCH_SIZE);
-                console.log(`[PRESCRICOES] Processando prescrições ${i + 1}-${Math.min(i + BATCH_SIZE, prescricoes.length)}/${prescricoes.length}`);
+            for (let i = 0; i < pendentes.length; i += BATCH_SIZE) {
+                const batch = pendentes.slice(i, i + BATCH_SIZE);
+                console.log(`[PRESCRICOES] Processando prescrições ${i + 1}-${Math.min(i + BATCH_SIZE, pendentes.length)}/${pendentes.length}`);
 
-                const batchResults = await Promise.all(batch.map(async (prescricao) => {
+                await Promise.all(batch.map(async (indice) => {
+                    const prescricao = prescricoes[indice];
                     try {
                         const detalhes = await this.getPrescricaoDetalhes(prescricao.id);
-                        return { ...prescricao, detalhes };
+                        this.prescricoesAssinadas.registrar(host, prescricao.id, detalhes);
+                        prescricoesCompletas[indice] = { ...prescricao, detalhes };
                     } catch (error) {
                         console.warn(`[PRESCRICOES] Erro ao buscar detalhes da prescrição ${prescricao.id}:`, error.message);
-                        return { ...prescricao, detalhes: null, erro: error.message };
+                        prescricoesCompletas[indice] = { ...prescricao, detalhes: null, erro: error.message };
                     }
                 }));
-
-                prescricoesCompletas.push(...batchResults);
+                onProgresso({ feitas: Math.min(i + BATCH_SIZE, pendentes.length), total: pendentes.length });
             }
 
             console.log(`✅ Processamento concluído: ${prescricoesCompletas.length} prescrições processadas`);
@@ -631,7 +713,7 @@ class HICDCrawler {
             console.log(`[PRESCRICAO] Resposta recebida para prescrição ${idPrescricao} - tamanho: ${response.data.length} caracteres`);
             
             // Extrair detalhes da prescrição
-            const detalhes = this.parser.parsePrescricaoDetalhes(response.data, idPrescricao);
+            const detalhes = await this.parser.parseAsync('parsePrescricaoDetalhes', response.data, idPrescricao);
             console.log(`✅ Detalhes extraídos da prescrição ${idPrescricao}`);
             
             return detalhes;
@@ -664,4 +746,7 @@ class HICDCrawler {
     }
 }
 
+// Saída padrão de extractDataNdjson (e do crawler-ndjson.js sem argumento)
+HICDCrawler.ARQUIVO_NDJSON_PADRAO = path.join('./output', 'hicd-data.ndjson');
+
 module.exports = HICDCrawler;
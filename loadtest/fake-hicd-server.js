@@ -0,0 +1,302 @@
+#!/usr/bin/env node
+
+/**
+ * HICD falso para testes de carga locais.
+ *
+ * Serve as páginas gravadas de test/fixtures nas mesmas rotas do HICD real
+ * (controller.php por Param/ParamModule, impressão de exames, prescrições),
+ * com latência, jitter, taxa de erro e expiração de sessão configuráveis.
+ * Conta as requisições recebidas por rota para medir quantas chamadas ao
+ * HICD cada requisição da API gera.
+ *
+ * Uso:
+ *   node loadtest/fake-hicd-server.js [--porta=8089] [--latencia=120] [--jitter=80]
+ *        [--erro=0.01] [--sessao-ttl=0] [--expirar-a-cada=0]
+ *
+ * API apontada para ele:
+ *   HICD_PROTOCOL=http HICD_HOST=localhost:8089 npm start
+ *
+ * Rotas de controle: GET /__stats (contadores), POST /__reset (zera contadores).
+ */
+
+const fs = require('fs');
+const http = require('http');
+const path = require('path');
+const crypto = require('crypto');
+
+const FIXTURES = path.join(__dirname, '..', 'test', 'fixtures');
+const PREFIXO = '/prontuario/frontend';
+
+// Página inicial anônima: o mesmo marcador que o verifyLogin/session.js usam
+const PAGINA_ANONIMA = '<html><body><div id="usuario">ANONYMOUS</div><form><input name="user"><input name="pass"></form></body></html>';
+const PAGINA_LOGADA = '<html><body><div id="usuario">USUARIO TESTE</div><a href="#">Sair</a></body></html>';
+// Aviso que o controller.php devolve com PHPSESSID expirado (capturado em produção)
+const PAGINA_EXPIRADA = '<html><body><h2>Sess&atilde;o Expirada!</h2><div class="alert">Login expirado!</div></body></html>';
+const PAGINA_VAZIA = '<html><body></body></html>';
+
+function lerFixture(relativo) {
+    return fs.readFileSync(path.join(FIXTURES, relativo), 'utf8');
+}
+
+/** Fixtures servidas por rota (carregadas uma vez). */
+function carregarPaginas() {
+    const impressoes = fs.readdirSync(path.join(FIXTURES, 'exames'))
+        .filter(f => f.endsWith('.html'))
+        .sort()
+        .map(f => lerFixture(`exames/${f}`));
+
+    return {
+        clinicas: lerFixture('clinicas/lista-clinicas.html'),
+        pacientes: lerFixture('pacientes/lista-pacientes.html'),
+        cadastro: lerFixture('pacientes/cadastro.html'),
+        evolucoes: lerFixture('evolucoes/evolucoes.html'),
+        exames: lerFixture('exames-lista/lista-requisicoes.html'),
+        impressoes,
+        prescricoes: lerFixture('prescricoes/lista-prescricoes.html'),
+        prescricaoDetalhes: lerFixture('prescricoes/prescricao-detalhes.html')
+    };
+}
+
+// Módulos do controller.php: `${Param}:${ParamModule}` → rota (nome usado nas estatísticas)
+const MODULOS_CONTROLLER = {
+    'SIGHO:2904': 'clinicas',
+    'SIGHO:544': 'pacientes',
+    'REGE:CONSPAC_OPEN': 'cadastro',
+    'REGE:Evo': 'evolucoes',
+    'REGE:Exames': 'exames',
+    'RUNPLUGIN%PM:2751': 'modulo-prescricao'
+};
+
+class FakeHicdServer {
+    /**
+     * @param {object} [opcoes]
+     * @param {number} [opcoes.latenciaMs] - latência base por resposta (FAKE_HICD_LATENCY_MS, default 120)
+     * @param {number} [opcoes.jitterMs] - variação uniforme somada à latência (FAKE_HICD_JITTER_MS, default 80)
+     * @param {number} [opcoes.taxaErro] - fração de respostas HTTP 500 (FAKE_HICD_ERROR_RATE, default 0)
+     * @param {number} [opcoes.sessaoTtlMs] - sessão expira após esse tempo do login (FAKE_HICD_SESSION_TTL_MS, 0 = nunca)
+     * @param {number} [opcoes.expirarACada] - sessão expira após N requisições de dados (FAKE_HICD_EXPIRE_EVERY, 0 = nunca)
+     */
+    constructor(opcoes = {}) {
+        this.latenciaMs = opcoes.latenciaMs ?? (parseInt(process.env.FAKE_HICD_LATENCY_MS) || 120);
+        this.jitterMs = opcoes.jitterMs ?? (parseInt(process.env.FAKE_HICD_JITTER_MS) || 80);
+        this.taxaErro = opcoes.taxaErro ?? (parseFloat(process.env.FAKE_HICD_ERROR_RATE) || 0);
+        this.sessaoTtlMs = opcoes.sessaoTtlMs ?? (parseInt(process.env.FAKE_HICD_SESSION_TTL_MS) || 0);
+        this.expirarACada = opcoes.expirarACada ?? (parseInt(process.env.FAKE_HICD_EXPIRE_EVERY) || 0);
+
+        this.paginas = carregarPaginas();
+        this.sessoes = new Map(); // PHPSESSID -> { autenticada, loginEm, requisicoes }
+        this.servidor = http.createServer((req, res) => this._atender(req, res));
+        this.zerarEstatisticas();
+    }
+
+    /** Sobe o servidor; porta 0 = porta livre aleatória. Resolve com a porta usada. */
+    iniciar(porta = 8089) {
+        return new Promise((resolve, reject) => {
+            this.servidor.once('error', reject);
+            this.servidor.listen(porta, () => resolve(this.servidor.address().port));
+        });
+    }
+
+    encerrar() {
+        return new Promise(resolve => this.servidor.close(() => resolve()));
+    }
+
+    zerarEstatisticas() {
+        this.stats = { total: 0, porRota: {}, erros: 0, sessoesExpiradas: 0, logins: 0, iniciadoEm: Date.now() };
+    }
+
+    getStats() {
+        return { ...this.stats, porRota: { ...this.stats.porRota }, sessoesAtivas: this.sessoes.size };
+    }
+
+    // ── Internos ─────────────────────────────────────────────────────────────
+
+    async _atender(req, res) {
+        const url = new URL(req.url, 'http://localhost');
+
+        if (url.pathname === '/__stats') return this._json(res, 200, this.getStats());
+        if (url.pathname === '/__reset' && req.method === 'POST') {
+            this.zerarEstatisticas();
+            return this._json(res, 200, { success: true });
+        }
+
+        const corpo = req.method === 'POST' ? await this._lerCorpo(req) : '';
+        const form = new URLSearchParams(corpo);
+        const rota = this._identificarRota(req.method, url.pathname, form);
+
+        this.stats.total++;
+        this.stats.porRota[rota] = (this.stats.porRota[rota] || 0) + 1;
+
+        await this._aguardarLatencia();
+
+        if (rota !== 'index' && rota !== 'login' && Math.random() < this.taxaErro) {
+            this.stats.erros++;
+            return this._html(res, 500, '<html><body>Internal Server Error</body></html>');
+        }
+
+        const sessaoId = this._lerSessao(req);
+        switch (rota) {
+            case 'index': return this._index(res, sessaoId);
+            case 'login': return this._login(res, sessaoId, form);
+            case 'logout':
+                this.sessoes.delete(sessaoId);
+                return this._html(res, 200, 'OK');
+            case 'desconhecida':
+                return this._html(res, 404, '<html><body>Not Found</body></html>');
+        }
+
+        if (!this._sessaoValida(sessaoId)) {
+            this.stats.sessoesExpiradas++;
+            return this._html(res, 200, PAGINA_EXPIRADA);
+        }
+        return this._html(res, 200, this._pagina(rota, url));
+    }
+
+    _identificarRota(metodo, caminho, form) {
+        if (caminho === `${PREFIXO}/index.php`) return 'index';
+        if (caminho === `${PREFIXO}/controller/controller.php`) {
+            const param = form.get('Param');
+            if (param === 'LOGIN') return 'login';
+            if (param === 'LOGOUT') return 'logout';
+            return MODULOS_CONTROLLER[`${param}:${form.get('ParamModule')}`] || 'controller-outro';
+        }
+        if (caminho === '/prontuario/generator/sadt/app/exame.php') return 'exame-impressao';
+        if (caminho === '/prescricao_medica3/interface/consulta.php') return 'prescricao-consulta';
+        if (caminho === '/prescricao_medica3/scripts/todas_prescricoes.php') return 'prescricoes';
+        if (caminho === '/prescricao_medica3/interface/imprime.php') return 'prescricao-impressao';
+        return 'desconhecida';
+    }
+
+    _pagina(rota, url) {
+        switch (rota) {
+            case 'clinicas': return this.paginas.clinicas;
+            case 'pacientes': return this.paginas.pacientes;
+            case 'cadastro': return this.paginas.cadastro;
+            case 'evolucoes': return this.paginas.evolucoes;
+            case 'exames': return this.paginas.exames;
+            case 'prescricoes': return this.paginas.prescricoes;
+            case 'prescricao-impressao': return this.paginas.prescricaoDetalhes;
+            case 'exame-impressao': {
+                // Mesma requisição → mesmo layout (respostas estáveis entre execuções)
+                const requisicao = url.searchParams.get('requisicao') || '';
+                const indice = crypto.createHash('md5').update(requisicao).digest()[0] % this.paginas.impressoes.length;
+                return this.paginas.impressoes[indice];
+            }
+            default: return PAGINA_VAZIA;
+        }
+    }
+
+    /** GET index: sessão nova quando não há cookie conhecido ou a sessão expirou. */
+    _index(res, sessaoId) {
+        const sessao = this.sessoes.get(sessaoId);
+        if (sessao && this._sessaoValida(sessaoId, false)) {
+            return this._html(res, 200, PAGINA_LOGADA);
+        }
+        if (sessao && !sessao.loginEm) {
+            return this._html(res, 200, PAGINA_ANONIMA);
+        }
+        if (sessao) this.sessoes.delete(sessaoId);
+        const novaSessao = crypto.randomBytes(13).toString('hex');
+        this.sessoes.set(novaSessao, { autenticada: false, loginEm: 0, requisicoes: 0 });
+        return this._html(res, 200, PAGINA_ANONIMA, { 'Set-Cookie': `PHPSESSID=${novaSessao}; path=/` });
+    }
+
+    _login(res, sessaoId, form) {
+        const sessao = this.sessoes.get(sessaoId);
+        if (!sessao || !form.get('user') || !form.get('pass')) {
+            return this._html(res, 200, 'ERRO');
+        }
+        sessao.autenticada = true;
+        sessao.loginEm = Date.now();
+        sessao.requisicoes = 0;
+        this.stats.logins++;
+        return this._html(res, 200, 'OK');
+    }
+
+    /**
+     * Sessão autenticada e dentro do TTL / cota de requisições.
+     * @param {boolean} [contar=true] - consome uma requisição da cota
+     */
+    _sessaoValida(sessaoId, contar = true) {
+        const sessao = this.sessoes.get(sessaoId);
+        if (!sessao || !sessao.autenticada) return false;
+        if (this.sessaoTtlMs > 0 && Date.now() - sessao.loginEm > this.sessaoTtlMs) {
+            sessao.autenticada = false;
+            return false;
+        }
+        if (contar) {
+            if (this.expirarACada > 0 && sessao.requisicoes >= this.expirarACada) {
+                sessao.autenticada = false;
+                return false;
+            }
+            sessao.requisicoes++;
+        }
+        return true;
+    }
+
+    _lerSessao(req) {
+        const match = /(?:^|;\s*)PHPSESSID=([^;]+)/.exec(req.headers.cookie || '');
+        return match ? match[1] : null;
+    }
+
+    _aguardarLatencia() {
+        const ms = this.latenciaMs + Math.random() * this.jitterMs;
+        return ms > 0 ? new Promise(resolve => setTimeout(resolve, ms)) : Promise.resolve();
+    }
+
+    _lerCorpo(req) {
+        return new Promise((resolve, reject) => {
+            const partes = [];
+            req.on('data', parte => partes.push(parte));
+            req.on('end', () => resolve(Buffer.concat(partes).toString('utf8')));
+            req.on('error', reject);
+        });
+    }
+
+    _html(res, status, corpo, headers = {}) {
+        res.writeHead(status, { 'Content-Type': 'text/html; charset=utf-8', ...headers });
+        res.end(corpo);
+    }
+
+    _json(res, status, dados) {
+        res.writeHead(status, { 'Content-Type': 'application/json' });
+        res.end(JSON.stringify(dados));
+    }
+}
+
+function lerArgs(argv) {
+    const valor = (nome) => (argv.find(a => a.startsWith(`--${nome}=`)) || '').split('=')[1];
+    const numero = (nome, parse = parseInt) => {
+        const bruto = valor(nome);
+        return bruto === undefined ? undefined : parse(bruto);
+    };
+    return {
+        porta: numero('porta') ?? (parseInt(process.env.FAKE_HICD_PORT) || 8089),
+        latenciaMs: numero('latencia'),
+        jitterMs: numero('jitter'),
+        taxaErro: numero('erro', parseFloat),
+        sessaoTtlMs: numero('sessao-ttl'),
+        expirarACada: numero('expirar-a-cada')
+    };
+}
+
+async function main() {
+    const { porta, ...opcoes } = lerArgs(process.argv.slice(2));
+    const servidor = new FakeHicdServer(opcoes);
+    const portaUsada = await servidor.iniciar(porta);
+
+    console.log(`🧪 HICD falso em http://localhost:${portaUsada}`);
+    console.log(`   latência ${servidor.latenciaMs}ms ± ${servidor.jitterMs}ms | erro ${servidor.taxaErro * 100}% | ` +
+        `sessão: ttl ${servidor.sessaoTtlMs || '∞'}ms, expira a cada ${servidor.expirarACada || '∞'} requisições`);
+    console.log(`   API: HICD_PROTOCOL=http HICD_HOST=localhost:${portaUsada} npm start`);
+}
+
+if (require.main === module) {
+    main().catch(error => {
+        console.error('❌ Falha ao subir o HICD falso:', error.message);
+        process.exitCode = 1;
+    });
+}
+
+module.exports = FakeHicdServer;
+module.exports.lerArgs = lerArgs;
@@ -0,0 +1,236 @@
+#!/usr/bin/env node
+
+/**
+ * Gerador de carga para os endpoints /api/pacientes/:prontuario/*.
+ *
+ * Dispara requisições em malha aberta (o ritmo não espera as respostas, para
+ * não esconder a fila) na taxa alvo e reporta vazão, latência p50/p95/p99 por
+ * endpoint e, com o HICD falso (loadtest/fake-hicd-server.js), quantas
+ * requisições ao HICD cada requisição da API gerou.
+ *
+ * Uso:
+ *   node loadtest/load-driver.js [--api=http://localhost:3000] [--hicd=http://localhost:8089]
+ *        [--rps=5] [--duracao=30] [--prontuarios=100037,100100-100149]
+ *        [--endpoints=detalhes,evolucoes,exames,prescricoes,analise] [--max-em-voo=200]
+ *        [--saida=relatorio.json]
+ *
+ * Autenticação: com LOGIN_ENCRYPT_KEY no .env o driver envia o header
+ * Authorization (auto-login do requireCrawler) com HICD_USERNAME/HICD_PASSWORD
+ * — o HICD falso aceita qualquer credencial.
+ */
+
+require('dotenv').config();
+const fs = require('fs');
+const crypto = require('crypto');
+const { performance } = require('perf_hooks');
+const { resumirDuracoes } = require('../src/core/timing');
+
+/** Endpoints exercitados: nome → caminho relativo ao prontuário. */
+const ENDPOINTS = {
+    detalhes: '',
+    evolucoes: '/evolucoes',
+    'evolucoes-ultimo-dia': '/evolucoes/ultimo-dia',
+    exames: '/exames',
+    prescricoes: '/prescricoes',
+    analise: '/analise'
+};
+const ENDPOINTS_PADRAO = ['detalhes', 'evolucoes', 'exames', 'prescricoes', 'analise'];
+
+/** "100037,100100-100102" → ['100037', '100100', '100101', '100102'] */
+function expandirProntuarios(especificacao) {
+    const prontuarios = [];
+    for (const parte of String(especificacao).split(',').map(p => p.trim()).filter(Boolean)) {
+        const faixa = /^(\d+)-(\d+)$/.exec(parte);
+        if (!faixa) {
+            prontuarios.push(parte);
+            continue;
+        }
+        const largura = faixa[1].length;
+        for (let n = parseInt(faixa[1]); n <= parseInt(faixa[2]); n++) {
+            prontuarios.push(String(n).padStart(largura, '0'));
+        }
+    }
+    return prontuarios;
+}
+
+function lerArgs(argv) {
+    const valor = (nome) => (argv.find(a => a.startsWith(`--${nome}=`)) || '').split('=').slice(1).join('=') || undefined;
+    const endpoints = (valor('endpoints') || ENDPOINTS_PADRAO.join(',')).split(',').map(e => e.trim()).filter(Boolean);
+    const invalidos = endpoints.filter(e => !(e in ENDPOINTS));
+    if (invalidos.length > 0) {
+        throw new Error(`ENDPOINT_INVALIDO: ${invalidos.join(', ')} (aceitos: ${Object.keys(ENDPOINTS).join(', ')})`);
+    }
+    return {
+        api: (valor('api') || process.env.LOADTEST_API_URL || 'http://localhost:3000').replace(/\/$/, ''),
+        hicd: (valor('hicd') || process.env.LOADTEST_HICD_URL || '').replace(/\/$/, ''),
+        rps: parseFloat(valor('rps')) || 5,
+        duracaoS: parseFloat(valor('duracao')) || 30,
+        prontuarios: expandirProntuarios(valor('prontuarios') || '100037'),
+        endpoints,
+        maxEmVoo: parseInt(valor('max-em-voo')) || 200,
+        saida: valor('saida') || null
+    };
+}
+
+/** Mesmo formato do payload.js: base64(IV | AUTH_TAG | CIPHERTEXT) de "usuario:senha". */
+function gerarAuthorization() {
+    const chave = process.env.LOGIN_ENCRYPT_KEY;
+    if (!chave || chave.length !== 64) return null;
+    const texto = `${process.env.HICD_USERNAME || 'carga'}:${process.env.HICD_PASSWORD || 'carga'}`;
+    const iv = crypto.randomBytes(12);
+    const cipher = crypto.createCipheriv('aes-256-gcm', Buffer.from(chave, 'hex'), iv);
+    const cifrado = Buffer.concat([cipher.update(texto, 'utf8'), cipher.final()]);
+    return `Bearer ${Buffer.concat([iv, cipher.getAuthTag(), cifrado]).toString('base64')}`;
+}
+
+async function lerStatsHicd(hicd) {
+    if (!hicd) return null;
+    try {
+        const resposta = await fetch(`${hicd}/__stats`);
+        return resposta.ok ? await resposta.json() : null;
+    } catch {
+        return null;
+    }
+}
+
+/** Diferença entre duas leituras de /__stats do HICD falso. */
+function diferencaHicd(antes, depois) {
+    if (!antes || !depois) return null;
+    const porRota = {};
+    for (const [rota, total] of Object.entries(depois.porRota)) {
+        const delta = total - (antes.porRota[rota] || 0);
+        if (delta > 0) porRota[rota] = delta;
+    }
+    return {
+        total: depois.total - antes.total,
+        erros: depois.erros - antes.erros,
+        sessoesExpiradas: depois.sessoesExpiradas - antes.sessoesExpiradas,
+        logins: depois.logins - antes.logins,
+        porRota
+    };
+}
+
+/**
+ * Monta o relatório a partir das amostras.
+ * @param {Array<{ endpoint, duracaoMs, ok }>} amostras - requisições concluídas
+ * @param {object} contexto - { duracaoS, enviadas, descartadas, hicd }
+ */
+function montarRelatorio(amostras, { duracaoS, enviadas, descartadas = 0, hicd = null }) {
+    const porEndpoint = {};
+    for (const amostra of amostras) {
+        const e = porEndpoint[amostra.endpoint] || (porEndpoint[amostra.endpoint] = { requisicoes: 0, erros: 0, duracoes: [] });
+        e.requisicoes++;
+        if (!amostra.ok) e.erros++;
+        e.duracoes.push(amostra.duracaoMs);
+    }
+
+    const concluidas = amostras.length;
+    return {
+        duracaoS,
+        enviadas,
+        concluidas,
+        descartadas,
+        erros: amostras.filter(a => !a.ok).length,
+        vazaoRps: duracaoS > 0 ? Math.round((concluidas / duracaoS) * 100) / 100 : null,
+        latencia: resumirDuracoes(amostras.map(a => a.duracaoMs)),
+        porEndpoint: Object.fromEntries(Object.entries(porEndpoint).map(([nome, e]) => [
+            nome,
+            { requisicoes: e.requisicoes, erros: e.erros, latencia: resumirDuracoes(e.duracoes) }
+        ])),
+        hicd: hicd && {
+            ...hicd,
+            requisicoesPorRequisicaoApi: concluidas > 0 ? Math.round((hicd.total / concluidas) * 100) / 100 : null
+        }
+    };
+}
+
+async function executarRequisicao(args, authorization, sequencia) {
+    const endpoint = args.endpoints[sequencia % args.endpoints.length];
+    const prontuario = args.prontuarios[Math.floor(sequencia / args.endpoints.length) % args.prontuarios.length];
+    const url = `${args.api}/api/pacientes/${encodeURIComponent(prontuario)}${ENDPOINTS[endpoint]}`;
+
+    const inicio = performance.now();
+    try {
+        const resposta = await fetch(url, { headers: authorization ? { Authorization: authorization } : {} });
+        await resposta.arrayBuffer();
+        return { endpoint, duracaoMs: performance.now() - inicio, ok: resposta.ok, status: resposta.status };
+    } catch (error) {
+        return { endpoint, duracaoMs: performance.now() - inicio, ok: false, status: 0, erro: error.message };
+    }
+}
+
+async function main() {
+    const args = lerArgs(process.argv.slice(2));
+    const authorization = gerarAuthorization();
+
+    console.log(`\n=== CARGA: ${args.rps} req/s × ${args.duracaoS}s → ${args.api} ===`);
+    console.log(`Endpoints: ${args.endpoints.join(', ')} | ${args.prontuarios.length} prontuário(s)`);
+    if (!authorization) console.warn('⚠️ LOGIN_ENCRYPT_KEY ausente — a API precisa já estar autenticada.');
+
+    const statsAntes = await lerStatsHicd(args.hicd);
+    if (args.hicd && !statsAntes) console.warn(`⚠️ ${args.hicd}/__stats indisponível — sem contagem de requisições ao HICD.`);
+
+    const amostras = [];
+    const pendentes = new Set();
+    const intervaloMs = 1000 / args.rps;
+    const total = Math.round(args.rps * args.duracaoS);
+    let descartadas = 0;
+    const inicio = performance.now();
+
+    for (let i = 0; i < total; i++) {
+        const espera = inicio + i * intervaloMs - performance.now();
+        if (espera > 0) await new Promise(resolve => setTimeout(resolve, espera));
+
+        if (pendentes.size >= args.maxEmVoo) {
+            descartadas++;
+            continue;
+        }
+        const promessa = executarRequisicao(args, authorization, i).then(amostra => {
+            amostras.push(amostra);
+            pendentes.delete(promessa);
+            if (amostra.status === 401 || amostra.status === 503) {
+                console.warn(`⚠️ ${amostra.endpoint}: HTTP ${amostra.status} (API não autenticada?)`);
+            }
+        });
+        pendentes.add(promessa);
+    }
+    await Promise.all(pendentes);
+    const duracaoS = Math.round((performance.now() - inicio) / 10) / 100;
+
+    const relatorio = montarRelatorio(amostras, {
+        duracaoS,
+        enviadas: total - descartadas,
+        descartadas,
+        hicd: diferencaHicd(statsAntes, await lerStatsHicd(args.hicd))
+    });
+
+    const linha = (rotulo, r, l) => console.log(
+        `${rotulo.padEnd(22)} ${String(r.requisicoes ?? r.concluidas).padStart(6)} req  ${String(r.erros).padStart(4)} erros  ` +
+        `p50 ${String(l.p50Ms).padStart(8)} ms  p95 ${String(l.p95Ms).padStart(8)} ms  p99 ${String(l.p99Ms).padStart(8)} ms`
+    );
+    console.log('');
+    for (const [nome, e] of Object.entries(relatorio.porEndpoint)) linha(nome, e, e.latencia);
+    linha('TOTAL', relatorio, relatorio.latencia);
+    console.log(`\nVazão: ${relatorio.vazaoRps} req/s (alvo ${args.rps}) em ${relatorio.duracaoS}s` +
+        (descartadas ? ` — ${descartadas} descartada(s) com ${args.maxEmVoo} em voo` : ''));
+    if (relatorio.hicd) {
+        console.log(`HICD: ${relatorio.hicd.total} requisições (${relatorio.hicd.requisicoesPorRequisicaoApi} por requisição da API), ` +
+            `${relatorio.hicd.logins} login(s), ${relatorio.hicd.sessoesExpiradas} sessão(ões) expirada(s)`);
+        console.log('      por rota:', JSON.stringify(relatorio.hicd.porRota));
+    }
+
+    if (args.saida) {
+        fs.writeFileSync(args.saida, JSON.stringify({ geradoEm: new Date().toISOString(), args, ...relatorio }, null, 2) + '\n', 'utf8');
+        console.log(`\n💾 Relatório gravado em ${args.saida}`);
+    }
+    if (relatorio.erros > 0) process.exitCode = 1;
+}
+
+if (require.main === module) {
+    main().catch(error => {
+        console.error('❌ Carga interrompida:', error.message);
+        process.exitCode = 1;
+    });
+}
+
+module.exports = { expandirProntuarios, lerArgs, montarRelatorio, diferencaHicd };
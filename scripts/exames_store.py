@@ -22,7 +22,7 @@ Estrutura gravada:
   "bruto":  [ <requisições originais da API, intactas> ]
 }
 """
-import json, argparse, os, sys, time, urllib.request
+import json, argparse, os, sys, time, urllib.error, urllib.request
 from datetime import datetime, timezone
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -32,11 +32,38 @@ DEFAULT_BASE = "http://localhost:3000"
 DEFAULT_DIR = "output/exames"
 
 
-def buscar_api(prontuario, base_url):
-    url = ("%s/api/pacientes/%s/exames?formato=resultados&incluirResultados=true"
-           % (base_url.rstrip("/"), prontuario))
-    with urllib.request.urlopen(url, timeout=300) as resp:
-        payload = json.loads(resp.read().decode("utf-8", "replace"))
+def _json(url, dados=None):
+    req = urllib.request.Request(url)
+    if dados is not None:
+        req.data = json.dumps(dados).encode("utf-8")
+        req.add_header("Content-Type", "application/json")
+    try:
+        with urllib.request.urlopen(req, timeout=30) as resp:
+            return resp.status, json.loads(resp.read().decode("utf-8", "replace"))
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read().decode("utf-8", "replace") or "{}")
+
+
+def buscar_api(prontuario, base_url, intervalo=2.0):
+    """Busca via job assíncrono (POST /api/jobs): sem socket aberto por minutos, com progresso."""
+    base = base_url.rstrip("/")
+    _, criado = _json("%s/api/jobs" % base, {
+        "tipo": "exames", "prontuario": prontuario,
+        "parametros": {"formato": "resultados", "incluirResultados": "true"},
+    })
+    if not criado.get("success"):
+        raise SystemExit("API retornou erro: %s" % criado.get("message", criado))
+    job_id = criado["job"]["id"]
+
+    while True:
+        status, payload = _json("%s/api/jobs/%s/resultado" % (base, job_id))
+        if status != 202:
+            break
+        prog = payload.get("job", {}).get("progresso", {})
+        if prog.get("total"):
+            print("  ... %s/%s requisições" % (prog.get("feitas"), prog.get("total")), file=sys.stderr)
+        time.sleep(intervalo)
+
     if not payload.get("success"):
         raise SystemExit("API retornou erro: %s" % payload.get("message", payload))
     return payload.get("data", [])
@@ -15,16 +15,32 @@ function getToken() {
   return Buffer.concat([iv, ci.getAuthTag(), e]).toString('base64');
 }
 
-function get(path, token) {
+// POST /api/pacientes/lote: lê o NDJSON e chama onEvento a cada linha
+function postLote(body, token, onEvento) {
   return new Promise((resolve, reject) => {
-    const url = new URL(BASE + path);
-    const req = https.request({ hostname: url.hostname, port: url.port, path: url.pathname + url.search, headers: { Authorization: token } }, res => {
-      let d = '';
-      res.on('data', c => d += c);
-      res.on('end', () => { try { resolve(JSON.parse(d)); } catch(e) { reject(e); } });
+    const url = new URL(BASE + '/api/pacientes/lote?modo=ndjson');
+    const payload = JSON.stringify(body);
+    const req = https.request({
+      method: 'POST', hostname: url.hostname, port: url.port, path: url.pathname + url.search,
+      headers: { Authorization: token, 'Content-Type': 'application/json', 'Content-Length': Buffer.byteLength(payload) }
+    }, res => {
+      if (res.statusCode !== 200) {
+        let d = '';
+        res.on('data', c => d += c);
+        res.on('end', () => reject(new Error(`HTTP ${res.statusCode}: ${d}`)));
+        return;
+      }
+      let resto = '';
+      res.setEncoding('utf8');
+      res.on('data', c => {
+        const linhas = (resto + c).split('\n');
+        resto = linhas.pop();
+        for (const linha of linhas) if (linha.trim()) onEvento(JSON.parse(linha));
+      });
+      res.on('end', resolve);
     });
     req.on('error', reject);
-    req.end();
+    req.end(payload);
   });
 }
 
@@ -36,14 +52,9 @@ function parseDate(s) {
   return new Date(s);
 }
 
-async function processPaciente(pront, token) {
-  const [evRes, exRes] = await Promise.all([
-    get(`/api/pacientes/${pront}/evolucoes?formato=detalhado&limite=100`, token),
-    get(`/api/pacientes/${pront}/exames?formato=detalhado&incluirResultados=true`, token),
-  ]);
-
-  const evs = evRes.data || [];
-  const exames = exRes.data || [];
+function processPaciente(pront, { cadastro, evolucoes, exames: examesRes }) {
+  const evs = evolucoes?.data || [];
+  const exames = examesRes?.data || [];
 
   // Find last gastroped evolution
   const gastroEvs = evs.filter(e => {
@@ -66,14 +77,13 @@ async function processPaciente(pront, token) {
 
   // Get patient name
   let nome = `Prontuário ${pront}`;
-  try {
-    const pRes = await get(`/api/pacientes/${pront}`, token);
-    nome = pRes.data?.dadosBasicos?.nome || nome;
-    const intern = pRes.data?.internacao || {};
+  if (cadastro?.data) {
+    nome = cadastro.data.dadosBasicos?.nome || nome;
+    const intern = cadastro.data.internacao || {};
     const leito = intern.numeroLeito || '';
     const clinica = intern.nomeClinica || '';
     nome = `${nome} — ${clinica} leito ${leito}`;
-  } catch(_) {}
+  }
 
   return { pront, nome, lastEv, examesFiltrados };
 }
@@ -100,16 +110,29 @@ function formatExames(exames) {
 
 async function main() {
   const token = getToken();
-  const results = [];
-
-  for (const pront of PRONTUARIOS) {
-    process.stderr.write(`Buscando ${pront}...\n`);
-    try {
-      const r = await processPaciente(pront, token);
-      if (r) results.push(r);
-    } catch(e) {
-      process.stderr.write(`Erro ${pront}: ${e.message}\n`);
+  const porPaciente = new Map(PRONTUARIOS.map(p => [String(p), {}]));
+
+  // Um lote só: itens em cache voltam na hora, o resto chega conforme fica pronto
+  await postLote({
+    prontuarios: PRONTUARIOS,
+    recursos: ['cadastro', 'evolucoes', 'exames'],
+    parametros: {
+      evolucoes: { formato: 'detalhado', limite: 100 },
+      exames: { formato: 'detalhado', incluirResultados: true }
     }
+  }, token, ({ evento, dados }) => {
+    if (evento === 'resultado') {
+      process.stderr.write(`${dados.prontuario} ${dados.recurso}: ${dados.status}${dados.doCache ? ' (cache)' : ''}\n`);
+      if (dados.status < 400) porPaciente.get(dados.prontuario)[dados.recurso] = dados.body;
+    } else if (evento === 'erro') {
+      process.stderr.write(`Erro no lote: ${dados.message}\n`);
+    }
+  });
+
+  const results = [];
+  for (const [pront, recursos] of porPaciente) {
+    const r = processPaciente(pront, recursos);
+    if (r) results.push(r);
   }
 
   for (const r of results) {
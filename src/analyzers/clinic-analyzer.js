@@ -1,5 +1,6 @@
 const fs = require('fs').promises;
 const path = require('path');
+const { resumirDuracoes } = require('../core/timing');
 
 /**
  * Analisador de clínicas - responsável pela análise completa de clínicas específicas
@@ -13,13 +14,28 @@ class ClinicAnalyzer {
 
     /**
      * Analisa todos os pacientes de uma clínica específica extraindo dados clínicos da última evolução médica
+     *
+     * Modo concorrente: com `concorrencia` > 1, N workers analisam pacientes em
+     * paralelo e o ritmo fica a cargo do rate limiter do http-client (por host),
+     * sem a pausa fixa entre pacientes do modo sequencial.
+     *
+     * @param {string} nomeClinica
+     * @param {object} [opcoes]
+     * @param {number} [opcoes.concorrencia] - workers (default CLINIC_ANALYSIS_CONCURRENCY ou 1)
+     * @param {number} [opcoes.delayEntrePacientes] - pausa por worker (default 2000 no modo sequencial, 0 no concorrente)
+     * @param {Function} [opcoes.onResultado] - (resultado, { concluidos, total }) chamado a cada paciente concluído
      */
     async analisarClinica(nomeClinica, opcoes = {}) {
         const {
             salvarArquivo = true,
             incluirDetalhes = true,
-            diretorioSaida = 'output'
+            diretorioSaida = 'output',
+            concorrencia = parseInt(process.env.CLINIC_ANALYSIS_CONCURRENCY) || 1,
+            onResultado = null
         } = opcoes;
+        const workers = Math.max(1, parseInt(concorrencia) || 1);
+        const delayEntrePacientes = opcoes.delayEntrePacientes ?? (workers > 1 ? 0 : 2000);
+        const inicioAnalise = Date.now();
 
         console.log(`🏥 ANÁLISE COMPLETA - ${nomeClinica.toUpperCase()}`);
         console.log('='.repeat(60));
@@ -54,63 +70,58 @@ class ClinicAnalyzer {
                 return resultado;
             }
             
-            const resultados = [];
-            let sucessos = 0;
-            let falhas = 0;
-            
-            // Analisar cada paciente
-            for (let i = 0; i < pacientesClinica.length; i++) {
-                const paciente = pacientesClinica[i];
-                console.log(`\n📋 PACIENTE ${i+1}/${pacientesClinica.length} - Leito: ${paciente.clinicaLeito}`);
-                console.log('-'.repeat(50));
-                console.log(`• Prontuário: ${paciente.prontuario}`);
-                console.log(`• Nome: ${paciente.nome}`);
-                console.log(`• Leito: ${paciente.clinicaLeito}`);
-                
-                try {
-                    console.log(`🔬 Extraindo dados clínicos...`);
-                    const analise = await this.analisarPaciente(paciente.prontuario);
-                    
-                    if (analise) {
-                        sucessos++;
-                        this.logAnaliseSuccesso(analise);
-                        
-                        resultados.push({
-                            paciente: this.extrairDadosPaciente(paciente),
-                            analise: incluirDetalhes ? analise : this.resumirAnalise(analise),
-                            status: 'sucesso'
-                        });
-                    } else {
-                        falhas++;
-                        console.log(`❌ Falha na análise - nenhum dado extraído`);
-                        resultados.push({
-                            paciente: this.extrairDadosPaciente(paciente),
-                            analise: null,
-                            erro: 'Falha na extração de dados clínicos',
-                            status: 'falha'
-                        });
+            const total = pacientesClinica.length;
+            const resultados = new Array(total);
+            const duracoes = [];
+            let proximo = 0;
+            let concluidos = 0;
+
+            console.log(`⚙️  Analisando com ${Math.min(workers, total)} worker(s)`);
+
+            // Cada worker pega o próximo paciente da fila até esvaziá-la
+            const worker = async () => {
+                while (proximo < total) {
+                    const i = proximo++;
+                    const paciente = pacientesClinica[i];
+                    console.log(`\n📋 PACIENTE ${i+1}/${total} - Leito: ${paciente.clinicaLeito} - ${paciente.nome} (${paciente.prontuario})`);
+
+                    const inicio = Date.now();
+                    const resultado = await this.analisarPacienteDaClinica(paciente, incluirDetalhes);
+                    const duracaoMs = Date.now() - inicio;
+
+                    duracoes.push(duracaoMs);
+                    resultado.duracaoMs = duracaoMs;
+                    resultados[i] = resultado;
+                    concluidos++;
+
+                    if (typeof onResultado === 'function') {
+                        try {
+                            onResultado(resultado, { concluidos, total });
+                        } catch (error) {
+                            console.error(`❌ Erro no callback onResultado: ${error.message}`);
+                        }
+                    }
+
+                    // Pausa entre análises para evitar sobrecarga
+                    if (delayEntrePacientes > 0 && proximo < total) {
+                        console.log('⏳ Aguardando antes da próxima análise...');
+                        await this.delay(delayEntrePacientes);
                     }
-                    
-                } catch (error) {
-                    falhas++;
-                    console.log(`❌ Erro na análise: ${error.message}`);
-                    resultados.push({
-                        paciente: this.extrairDadosPaciente(paciente),
-                        analise: null,
-                        erro: error.message,
-                        status: 'erro'
-                    });
-                }
-                
-                // Pausa entre análises para evitar sobrecarga
-                if (i < pacientesClinica.length - 1) {
-                    console.log('⏳ Aguardando antes da próxima análise...');
-                    await this.delay(2000);
                 }
-            }
+            };
+
+            await Promise.all(Array.from({ length: Math.min(workers, total) }, worker));
+
+            const sucessos = resultados.filter(r => r.status === 'sucesso').length;
+            const falhas = resultados.length - sucessos;
+            const tempos = {
+                concorrencia: workers,
+                totalMs: Date.now() - inicioAnalise,
+                porPaciente: resumirDuracoes(duracoes)
+            };
             
             // Gerar relatório
-            const relatorio = this.gerarRelatorio(nomeClinica, pacientesClinica, resultados, sucessos, falhas);
+            const relatorio = this.gerarRelatorio(nomeClinica, pacientesClinica, resultados, sucessos, falhas, tempos);
             
             // Salvar arquivo se solicitado
             if (salvarArquivo) {
@@ -128,6 +139,41 @@ class ClinicAnalyzer {
         }
     }
 
+    /**
+     * Analisa um paciente da clínica e monta a entrada do relatório
+     * ({ paciente, analise, status, erro? }). Nunca lança.
+     */
+    async analisarPacienteDaClinica(paciente, incluirDetalhes = true) {
+        try {
+            const analise = await this.analisarPaciente(paciente.prontuario);
+
+            if (analise) {
+                this.logAnaliseSuccesso(analise);
+                return {
+                    paciente: this.extrairDadosPaciente(paciente),
+                    analise: incluirDetalhes ? analise : this.resumirAnalise(analise),
+                    status: 'sucesso'
+                };
+            }
+
+            console.log(`❌ Falha na análise do paciente ${paciente.prontuario} - nenhum dado extraído`);
+            return {
+                paciente: this.extrairDadosPaciente(paciente),
+                analise: null,
+                erro: 'Falha na extração de dados clínicos',
+                status: 'falha'
+            };
+        } catch (error) {
+            console.log(`❌ Erro na análise do paciente ${paciente.prontuario}: ${error.message}`);
+            return {
+                paciente: this.extrairDadosPaciente(paciente),
+                analise: null,
+                erro: error.message,
+                status: 'erro'
+            };
+        }
+    }
+
     /**
      * Analisa um paciente específico
      */
@@ -234,7 +280,7 @@ class ClinicAnalyzer {
     /**
      * Gera relatório completo da análise
      */
-    gerarRelatorio(nomeClinica, pacientesClinica, resultados, sucessos, falhas) {
+    gerarRelatorio(nomeClinica, pacientesClinica, resultados, sucessos, falhas, tempos = null) {
         // Calcular estatísticas
         const pacientesComHDA = resultados.filter(r => 
             r.analise && (r.analise.hda || (typeof r.analise.hda === 'string' && r.analise.hda !== 'Não encontrada'))
@@ -257,6 +303,7 @@ class ClinicAnalyzer {
             pacientesComHDA: pacientesComHDA,
             pacientesComDiagnosticos: pacientesComDiagnosticos,
             taxaSucesso: ((sucessos / resultados.length) * 100).toFixed(1),
+            tempos: tempos,
             resultados: resultados,
             resumo: `Análise de ${pacientesClinica.length} pacientes da ${nomeClinica}. ${sucessos} sucessos, ${falhas} falhas. ${pacientesComHDA} com HDA, ${pacientesComDiagnosticos} com diagnósticos.`
         };
@@ -291,6 +338,10 @@ class ClinicAnalyzer {
         console.log(`📊 Total de pacientes: ${relatorio.totalPacientes}`);
         console.log(`✅ Análises bem-sucedidas: ${relatorio.sucessos} (${relatorio.taxaSucesso}%)`);
         console.log(`❌ Falhas: ${relatorio.falhas}`);
+        if (relatorio.tempos) {
+            const t = relatorio.tempos;
+            console.log(`⏱️  Tempo total: ${(t.totalMs / 1000).toFixed(1)}s com ${t.concorrencia} worker(s) — por paciente p50 ${t.porPaciente.p50Ms}ms, p95 ${t.porPaciente.p95Ms}ms, máx ${t.porPaciente.maxMs}ms`);
+        }
         console.log(`\n📋 DADOS CLÍNICOS EXTRAÍDOS:`);
         console.log(`   • Pacientes com HDA: ${relatorio.pacientesComHDA} (${((relatorio.pacientesComHDA/relatorio.sucessos)*100).toFixed(1)}% dos sucessos)`);
         console.log(`   • Pacientes com hipóteses diagnósticas: ${relatorio.pacientesComDiagnosticos} (${((relatorio.pacientesComDiagnosticos/relatorio.sucessos)*100).toFixed(1)}% dos sucessos)`);
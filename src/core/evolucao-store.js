@@ -0,0 +1,223 @@
+/**
+ * Armazenamento deduplicado dos textos de evolução de um paciente.
+ *
+ * Evoluções de UTI são, em boa parte, cópia da anterior com alguns ajustes.
+ * Em vez de guardar o texto completo de cada uma, o texto é quebrado em
+ * linhas (chunks) e cada linha distinta é guardada uma única vez, indexada
+ * pelo próprio conteúdo; cada evolução passa a ser uma sequência de ids de
+ * chunk (Uint32Array). O mesmo índice permite descrever uma evolução como
+ * delta em relação à anterior sem comparar strings.
+ *
+ * Formato do delta (`ops`), aplicado sobre as linhas da evolução anterior:
+ *   [inicio, quantidade] → copia `quantidade` linhas da anterior a partir de `inicio`
+ *   "texto"              → insere a linha
+ */
+class EvolucaoStore {
+    constructor() {
+        this.idPorChunk = new Map();
+        this.chunks = [];
+        this.totalReferencias = 0;
+        this.bytesReferenciados = 0;
+    }
+
+    /**
+     * Guarda o texto e devolve a sequência de ids dos seus chunks.
+     * @param {string|null} texto
+     * @returns {Uint32Array|null} null quando não há texto
+     */
+    adicionar(texto) {
+        if (texto === null || texto === undefined) return null;
+
+        const linhas = String(texto).split('\n');
+        const ids = new Uint32Array(linhas.length);
+        for (let i = 0; i < linhas.length; i++) {
+            const linha = linhas[i];
+            let id = this.idPorChunk.get(linha);
+            if (id === undefined) {
+                id = this.chunks.length;
+                this.chunks.push(linha);
+                this.idPorChunk.set(linha, id);
+            }
+            ids[i] = id;
+            this.bytesReferenciados += linha.length + 1;
+        }
+        this.totalReferencias += linhas.length;
+        return ids;
+    }
+
+    /**
+     * Reconstrói o texto a partir dos ids.
+     * @param {Uint32Array|null} ids
+     * @returns {string|null}
+     */
+    texto(ids) {
+        if (!ids) return null;
+        const linhas = new Array(ids.length);
+        for (let i = 0; i < ids.length; i++) linhas[i] = this.chunks[ids[i]];
+        return linhas.join('\n');
+    }
+
+    /**
+     * Delta de `ids` em relação a `idsAnterior`: cópias de trechos da anterior
+     * (maior sequência coincidente a cada posição) e linhas novas.
+     * @param {Uint32Array|null} idsAnterior
+     * @param {Uint32Array} ids
+     * @returns {Array<[number, number]|string>}
+     */
+    delta(idsAnterior, ids) {
+        const ops = [];
+        if (!ids) return ops;
+
+        // Posições de cada chunk na evolução anterior
+        const posicoes = new Map();
+        if (idsAnterior) {
+            for (let j = 0; j < idsAnterior.length; j++) {
+                const lista = posicoes.get(idsAnterior[j]);
+                if (lista) lista.push(j);
+                else posicoes.set(idsAnterior[j], [j]);
+            }
+        }
+
+        let i = 0;
+        while (i < ids.length) {
+            const candidatos = posicoes.get(ids[i]);
+            let melhorInicio = -1;
+            let melhorTamanho = 0;
+            if (candidatos) {
+                for (const j of candidatos) {
+                    let tamanho = 1;
+                    while (i + tamanho < ids.length && j + tamanho < idsAnterior.length &&
+                           ids[i + tamanho] === idsAnterior[j + tamanho]) {
+                        tamanho++;
+                    }
+                    if (tamanho > melhorTamanho) {
+                        melhorTamanho = tamanho;
+                        melhorInicio = j;
+                    }
+                }
+            }
+
+            if (melhorTamanho > 0) {
+                ops.push([melhorInicio, melhorTamanho]);
+                i += melhorTamanho;
+            } else {
+                ops.push(this.chunks[ids[i]]);
+                i++;
+            }
+        }
+        return ops;
+    }
+
+    /**
+     * Aplica um delta sobre o texto anterior (mesma operação que o cliente faz).
+     * @param {string|null} textoAnterior
+     * @param {Array<[number, number]|string>} ops
+     * @returns {string}
+     */
+    static aplicarDelta(textoAnterior, ops) {
+        const anteriores = textoAnterior === null || textoAnterior === undefined ? [] : textoAnterior.split('\n');
+        const linhas = [];
+        for (const op of ops) {
+            if (typeof op === 'string') linhas.push(op);
+            else for (let k = op[0]; k < op[0] + op[1]; k++) linhas.push(anteriores[k]);
+        }
+        return linhas.join('\n');
+    }
+
+    /**
+     * Forma guardada no cache: só dados simples. O cache do modo cluster passa
+     * pelo IPC (structured clone), que não preserva a classe — a entrada chega
+     * aos outros workers como objeto comum.
+     * @returns {{ chunks: string[] }}
+     */
+    paraCache() {
+        return { chunks: this.chunks };
+    }
+
+    /**
+     * Store de leitura (texto, delta) a partir de paraCache(). Não indexa os
+     * chunks de novo: não serve para adicionar textos.
+     * @param {{ chunks: string[] }} guardado
+     * @returns {EvolucaoStore}
+     */
+    static doCache({ chunks }) {
+        const store = new EvolucaoStore();
+        store.chunks = chunks;
+        return store;
+    }
+
+    /**
+     * Remonta os textos das evoluções de uma entrada de cache { data, textos, idsTexto }
+     * (textos = paraCache()). Com `comoDelta`, cada evolução a partir da segunda
+     * traz `conteudo.delta` em relação à anterior na lista, em vez do texto completo.
+     */
+    static materializar({ data, textos, idsTexto }, comoDelta) {
+        const store = EvolucaoStore.doCache(textos);
+        return data.map((evolucao, i) => {
+            const ids = idsTexto[i];
+            if (comoDelta && i > 0 && ids && idsTexto[i - 1]) {
+                const delta = { base: data[i - 1].id, ops: store.delta(idsTexto[i - 1], ids) };
+                return { ...evolucao, conteudo: { delta, ...evolucao.conteudo } };
+            }
+            return { ...evolucao, conteudo: { textoCompleto: store.texto(ids), ...evolucao.conteudo } };
+        });
+    }
+
+    /**
+     * Separa o texto de uma evolução do parser dos demais campos. O parser põe o
+     * mesmo texto em textoCompleto, descricao e textoLimpo; os três saem do item.
+     * @param {object} evolucao
+     * @returns {[object, string|null]} [evolução sem texto, texto]
+     */
+    static separarTexto(evolucao) {
+        const { textoCompleto, descricao, textoLimpo, ...semTexto } = evolucao;
+        const texto = textoCompleto ?? descricao ?? textoLimpo;
+        return [semTexto, texto === undefined ? null : texto];
+    }
+
+    /** Inverso de separarTexto. */
+    static juntarTexto(semTexto, texto) {
+        if (texto === null) return semTexto;
+        return { ...semTexto, descricao: texto, textoCompleto: texto, textoLimpo: texto };
+    }
+
+    /**
+     * Lista de evoluções do parser na forma guardada no cache: itens sem texto e
+     * os textos em chunks (uma cópia de cada linha para a lista inteira).
+     * @param {object[]} evolucoes
+     * @returns {{ itens: object[], textos: { chunks: string[] }, idsTexto: Array<Uint32Array|null> }}
+     */
+    static compactarEvolucoes(evolucoes) {
+        const store = new EvolucaoStore();
+        const itens = [];
+        const idsTexto = [];
+        for (const evolucao of evolucoes) {
+            const [semTexto, texto] = EvolucaoStore.separarTexto(evolucao);
+            itens.push(semTexto);
+            idsTexto.push(store.adicionar(texto));
+        }
+        return { itens, textos: store.paraCache(), idsTexto };
+    }
+
+    /** Lista de evoluções do parser a partir de compactarEvolucoes (textos remontados). */
+    static expandirEvolucoes({ itens, textos, idsTexto }) {
+        const store = EvolucaoStore.doCache(textos);
+        return itens.map((semTexto, i) => EvolucaoStore.juntarTexto(semTexto, store.texto(idsTexto[i])));
+    }
+
+    getStats() {
+        let bytesUnicos = 0;
+        for (const chunk of this.chunks) bytesUnicos += chunk.length + 1;
+        return {
+            chunksUnicos: this.chunks.length,
+            totalReferencias: this.totalReferencias,
+            bytesUnicos,
+            bytesReferenciados: this.bytesReferenciados,
+            taxaDeduplicacao: this.bytesReferenciados > 0
+                ? Math.round((1 - bytesUnicos / this.bytesReferenciados) * 1000) / 1000
+                : 0
+        };
+    }
+}
+
+module.exports = EvolucaoStore;
@@ -2,6 +2,11 @@ const axios = require('axios');
 require('dotenv').config();
 const config = require('../../config');
 const { isSessionExpiredHtml, sessionExpiredError } = require('./session');
+const RateLimiter = require('./rate-limiter');
+const { contextoSegundoPlano } = require('./segundo-plano');
+const { medicaoAtual, medir } = require('./medicao');
+const { Metricas } = require('./metricas');
+const { performance } = require('perf_hooks');
 
 /**
  * Cliente HTTP responsável pela comunicação com o sistema HICD
@@ -47,6 +52,10 @@ class HICDHttpClient {
         // Configurações de rate limiting
         this.requestDelay = parseInt(process.env.REQUEST_DELAY) || 1000;
         this.maxRetries = parseInt(process.env.MAX_RETRIES) || 3;
+
+        // Limite de concorrência/intervalo por host. Toda requisição de dados
+        // passa por aqui; quem paraleliza (workers, batches) não precisa de delay próprio.
+        this.rateLimiter = RateLimiter.fromEnv();
     }
 
     /**
@@ -82,9 +91,32 @@ class HICDHttpClient {
      * @param {boolean} [retried=false] - guarda de retentativa (evita loop).
      */
     async _request(method, url, data, config, retried = false) {
-        const response = method === 'get'
-            ? await this.client.get(url, config)
-            : await this.client.post(url, data, config);
+        // Trabalho de segundo plano (pré-aquecimento) conta as próprias requisições
+        // e usa a fila de baixa prioridade do limitador
+        const segundoPlano = contextoSegundoPlano();
+        if (segundoPlano) segundoPlano.requisicoes++;
+
+        // A tarefa roda quando o limitador libera, possivelmente no contexto de outra
+        // requisição: a medição de quem pediu é capturada aqui
+        const medicao = medicaoAtual();
+        const endpoint = this._endpointDe(url);
+        const enfileiradaEm = performance.now();
+        const executar = () => {
+            const esperaMs = performance.now() - enfileiradaEm;
+            if (medicao) medicao.adicionar('hicd-fila', esperaMs);
+            Metricas.compartilhado.hicdFila.observar([segundoPlano ? 'segundo-plano' : 'normal'], esperaMs / 1000);
+
+            return medir('hicd', () => method === 'get'
+                ? this.client.get(url, config)
+                : this.client.post(url, data, config),
+            (ms) => Metricas.compartilhado.hicd.observar([method.toUpperCase(), endpoint], ms / 1000), medicao);
+        };
+
+        // Login/logout não disputam vaga: o re-login roda com requisições de
+        // dados em voo e não pode ficar preso atrás delas.
+        const response = this.authPhase
+            ? await executar()
+            : await this.rateLimiter.schedule(executar, { segundoPlano: Boolean(segundoPlano) });
 
         // Durante o próprio login/logout não interferir.
         if (this.authPhase) return response;
@@ -100,6 +132,18 @@ class HICDHttpClient {
         throw sessionExpiredError();
     }
 
+    /**
+     * Caminho do script do HICD, sem query string (rótulo das métricas por endpoint)
+     * @private
+     */
+    _endpointDe(url) {
+        try {
+            return new URL(url, this.origin || 'http://hicd').pathname;
+        } catch (error) {
+            return 'desconhecido';
+        }
+    }
+
     /**
      * Atualiza os cookies do cliente
      */
@@ -0,0 +1,200 @@
+/**
+ * Logger estruturado com níveis, por módulo.
+ *
+ * `criarLogger('cache')` devolve o logger do módulo (um por nome). Cada linha
+ * leva data, nível, módulo, mensagem e campos — em texto (`chave=valor`) ou
+ * JSON por linha (LOG_FORMATO=json). O nível vem de LOG_LEVEL e pode ser
+ * trocado por módulo em LOG_MODULOS (`cache=debug,resultados=warn`).
+ *
+ * Eventos de alta frequência (hit/miss do cache, cada requisição de um lote de
+ * exames) não viram uma linha por ocorrência: `evento(nome)` só incrementa um
+ * contador e devolve true para 1 a cada LOG_AMOSTRA ocorrências, e só se o nível
+ * pedido estiver ligado. A cada LOG_RESUMO_MS sai uma linha `info` por módulo
+ * com as contagens do período.
+ *
+ *     if (log.evento('hit')) log.debug('Cache HIT', { chave: key });
+ *
+ * Com o nível desligado, o custo é o incremento do contador: a mensagem e os
+ * campos nem chegam a ser montados.
+ */
+
+const NIVEIS = { silencioso: 0, error: 1, warn: 2, info: 3, debug: 4, trace: 5 };
+
+/**
+ * Lê a configuração do ambiente.
+ * LOG_MODULOS aceita `modulo=nivel` ou `modulo=nivel:amostra` separados por vírgula.
+ */
+function configuracaoDoAmbiente(env = process.env) {
+    const modulos = {};
+    for (const item of (env.LOG_MODULOS || '').split(',')) {
+        const [modulo, valor] = item.split('=').map(s => (s || '').trim());
+        if (!modulo || !valor) continue;
+        const [nivel, amostra] = valor.split(':');
+        modulos[modulo] = { nivel: nivel.toLowerCase(), amostra: parseInt(amostra) || null };
+    }
+
+    const resumoMs = parseInt(env.LOG_RESUMO_MS);
+    return {
+        nivel: (env.LOG_LEVEL || 'info').toLowerCase(),
+        modulos,
+        amostra: parseInt(env.LOG_AMOSTRA) || 100,
+        formato: env.LOG_FORMATO === 'json' ? 'json' : 'texto',
+        // 0 desliga o resumo periódico
+        resumoMs: Number.isNaN(resumoMs) ? 60 * 1000 : resumoMs,
+        saida: null
+    };
+}
+
+let configuracao = configuracaoDoAmbiente();
+const loggers = new Map();
+let timerResumo = null;
+
+/** Valor de campo em texto: erros pela mensagem, objetos em JSON, strings com espaço entre aspas. */
+function valorTexto(valor) {
+    if (valor instanceof Error) return JSON.stringify(valor.message);
+    if (valor !== null && typeof valor === 'object') return JSON.stringify(valor);
+    const texto = String(valor);
+    return /[\s"=]/.test(texto) ? JSON.stringify(texto) : texto;
+}
+
+function formatar(nivel, modulo, mensagem, campos) {
+    const ts = new Date().toISOString();
+    if (configuracao.formato === 'json') {
+        return JSON.stringify({ ts, nivel, modulo, msg: mensagem, ...campos },
+            (chave, valor) => (valor instanceof Error ? valor.message : valor));
+    }
+    let linha = `${ts} ${nivel.toUpperCase().padEnd(5)} [${modulo}] ${mensagem}`;
+    if (campos) {
+        for (const chave of Object.keys(campos)) {
+            if (campos[chave] !== undefined) linha += ` ${chave}=${valorTexto(campos[chave])}`;
+        }
+    }
+    return linha;
+}
+
+function escrever(nivel, linha) {
+    if (configuracao.saida) return configuracao.saida(linha, nivel);
+    const destino = NIVEIS[nivel] <= NIVEIS.warn ? process.stderr : process.stdout;
+    destino.write(`${linha}\n`);
+}
+
+class Logger {
+    constructor(modulo) {
+        this.modulo = modulo;
+        // evento → { total, noResumo } (noResumo: total já reportado no último resumo)
+        this.contadores = new Map();
+        this.aplicar();
+    }
+
+    /** Recalcula nível e amostragem a partir da configuração atual. @private */
+    aplicar() {
+        const doModulo = configuracao.modulos[this.modulo] || {};
+        this.nivel = NIVEIS[doModulo.nivel] ?? NIVEIS[configuracao.nivel] ?? NIVEIS.info;
+        this.amostra = doModulo.amostra || configuracao.amostra;
+    }
+
+    /** @param {string} nivel */
+    ativo(nivel) {
+        return NIVEIS[nivel] <= this.nivel;
+    }
+
+    /**
+     * Evento de alta frequência: conta sempre; devolve true quando esta ocorrência
+     * deve ser logada (nível ligado e 1 a cada `amostra`, a primeira inclusive).
+     * @param {string} nome
+     * @param {string} [nivel='debug'] - nível em que a linha amostrada sairia
+     * @returns {boolean}
+     */
+    evento(nome, nivel = 'debug') {
+        let contador = this.contadores.get(nome);
+        if (!contador) {
+            contador = { total: 0, noResumo: 0 };
+            this.contadores.set(nome, contador);
+            agendarResumo();
+        }
+        contador.total++;
+        return NIVEIS[nivel] <= this.nivel && (contador.total - 1) % this.amostra === 0;
+    }
+
+    /** Totais por evento desde o início do processo. */
+    totais() {
+        const totais = {};
+        for (const [nome, { total }] of this.contadores) totais[nome] = total;
+        return totais;
+    }
+
+    log(nivel, mensagem, campos) {
+        if (NIVEIS[nivel] > this.nivel) return;
+        escrever(nivel, formatar(nivel, this.modulo, mensagem, campos));
+    }
+
+    error(mensagem, campos) { this.log('error', mensagem, campos); }
+    warn(mensagem, campos) { this.log('warn', mensagem, campos); }
+    info(mensagem, campos) { this.log('info', mensagem, campos); }
+    debug(mensagem, campos) { this.log('debug', mensagem, campos); }
+    trace(mensagem, campos) { this.log('trace', mensagem, campos); }
+
+    /**
+     * Linha `info` com as contagens desde o último resumo; nada se não houve eventos.
+     * @param {number} periodoMs
+     */
+    resumir(periodoMs) {
+        const eventos = {};
+        let algum = false;
+        for (const [nome, contador] of this.contadores) {
+            if (contador.total === contador.noResumo) continue;
+            eventos[nome] = contador.total - contador.noResumo;
+            contador.noResumo = contador.total;
+            algum = true;
+        }
+        if (algum) this.info('Resumo de eventos', { periodoS: Math.round(periodoMs / 1000), eventos });
+    }
+}
+
+/** Logger do módulo (sempre a mesma instância para o mesmo nome). */
+function criarLogger(modulo) {
+    let logger = loggers.get(modulo);
+    if (!logger) {
+        logger = new Logger(modulo);
+        loggers.set(modulo, logger);
+    }
+    return logger;
+}
+
+function resumirTodos(periodoMs = configuracao.resumoMs) {
+    for (const logger of loggers.values()) logger.resumir(periodoMs);
+}
+
+function agendarResumo() {
+    if (timerResumo || configuracao.resumoMs <= 0) return;
+    const periodoMs = configuracao.resumoMs;
+    timerResumo = setInterval(() => resumirTodos(periodoMs), periodoMs);
+    // Não segura o event loop (testes/scripts)
+    if (typeof timerResumo.unref === 'function') timerResumo.unref();
+}
+
+/**
+ * Troca a configuração (testes, benchmark). Sem argumentos, relê o ambiente.
+ * @param {object} [opcoes] - sobrepõe campos de configuracaoDoAmbiente();
+ *                            `saida(linha, nivel)` substitui stdout/stderr
+ */
+function configurarLogs(opcoes = {}) {
+    configuracao = { ...configuracaoDoAmbiente(), ...opcoes };
+    for (const logger of loggers.values()) logger.aplicar();
+    if (timerResumo) {
+        clearInterval(timerResumo);
+        timerResumo = null;
+    }
+    if ([...loggers.values()].some(logger => logger.contadores.size > 0)) agendarResumo();
+}
+
+/** Totais por módulo e evento, para as estatísticas da API. */
+function contadoresDosLogs() {
+    const porModulo = {};
+    for (const [modulo, logger] of loggers) {
+        if (logger.contadores.size > 0) porModulo[modulo] = logger.totais();
+    }
+    return porModulo;
+}
+
+module.exports = { NIVEIS, criarLogger, configurarLogs, configuracaoDoAmbiente, resumirTodos, contadoresDosLogs };
@@ -0,0 +1,94 @@
+/**
+ * Medição por requisição (Server-Timing).
+ *
+ * O middleware da API cria uma `Medicao` e roda o restante da requisição em
+ * `executarMedindo`; tudo o que acontece dentro dela — inclusive as chamadas
+ * assíncronas do crawler — enxerga a mesma medição via AsyncLocalStorage, como
+ * em segundo-plano.js. `medir` soma a duração de cada trecho (requisição ao
+ * HICD, parse, consulta ao cache...) no span do nome dado; o middleware
+ * escreve o total por span no cabeçalho Server-Timing.
+ *
+ * Trechos simultâneos (requisições ao HICD em paralelo) somam: a duração de
+ * um span pode passar do tempo total da requisição.
+ */
+const { AsyncLocalStorage } = require('async_hooks');
+const { performance } = require('perf_hooks');
+
+const armazenamento = new AsyncLocalStorage();
+
+class Medicao {
+    constructor() {
+        this.inicio = performance.now();
+        // nome → { ms, vezes }, na ordem da primeira ocorrência
+        this.spans = new Map();
+    }
+
+    adicionar(nome, ms) {
+        const span = this.spans.get(nome);
+        if (span) {
+            span.ms += ms;
+            span.vezes++;
+        } else {
+            this.spans.set(nome, { ms, vezes: 1 });
+        }
+    }
+
+    /** Valor do cabeçalho Server-Timing: um item por span e o total até agora. */
+    serverTiming() {
+        const itens = [...this.spans].map(([nome, { ms, vezes }]) => `${nome};dur=${ms.toFixed(1)};desc="${vezes}x"`);
+        itens.push(`total;dur=${(performance.now() - this.inicio).toFixed(1)}`);
+        return itens.join(', ');
+    }
+}
+
+/**
+ * @template T
+ * @param {Medicao} medicao
+ * @param {() => T} fn
+ * @returns {T}
+ */
+function executarMedindo(medicao, fn) {
+    return armazenamento.run(medicao, fn);
+}
+
+/** Medição da requisição em andamento, ou undefined fora de uma. */
+function medicaoAtual() {
+    return armazenamento.getStore();
+}
+
+/**
+ * Executa `fn` (síncrona ou assíncrona) e soma a duração no span `nome`.
+ * @template T
+ * @param {string} nome - span do Server-Timing (token ASCII)
+ * @param {() => T} fn
+ * @param {(ms: number) => void} [aoTerminar] - recebe a duração (métricas agregadas)
+ * @param {Medicao} [medicao] - explícita quando `fn` roda fora do contexto de quem pediu
+ *                              (ex.: tarefa executada pela fila do RateLimiter)
+ * @returns {T}
+ */
+function medir(nome, fn, aoTerminar, medicao = medicaoAtual()) {
+    const inicio = performance.now();
+    const terminar = () => {
+        const ms = performance.now() - inicio;
+        if (medicao) medicao.adicionar(nome, ms);
+        if (aoTerminar) aoTerminar(ms);
+    };
+
+    let resultado;
+    try {
+        resultado = fn();
+    } catch (error) {
+        terminar();
+        throw error;
+    }
+    if (resultado && typeof resultado.then === 'function') {
+        return resultado.then(
+            (valor) => { terminar(); return valor; },
+            (error) => { terminar(); throw error; }
+        );
+    }
+    terminar();
+    return resultado;
+}
+
+module.exports = { Medicao, executarMedindo, medicaoAtual, medir };
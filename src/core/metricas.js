@@ -0,0 +1,124 @@
+/**
+ * Métricas agregadas do processo no formato texto do Prometheus.
+ *
+ * Histogramas de latência (por rota da API, por endpoint do HICD, por parser)
+ * e contadores, exportados em GET /metrics. Os rótulos são fixos por métrica;
+ * cada combinação de valores vira uma série (mantenha a cardinalidade baixa:
+ * rotas com `:param`, endpoints do HICD sem query string).
+ */
+
+// Segundos. Requisições com N+1 ao HICD passam facilmente de 10 s.
+const LIMITES_REQUISICAO = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60];
+const LIMITES_PARSE = [0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1];
+
+const escapar = (valor) => String(valor).replace(/\\/g, '\\\\').replace(/\n/g, '\\n').replace(/"/g, '\\"');
+
+function rotulosTexto(nomes, valores, extra) {
+    const pares = nomes.map((nome, i) => `${nome}="${escapar(valores[i])}"`);
+    if (extra) pares.push(extra);
+    return pares.length > 0 ? `{${pares.join(',')}}` : '';
+}
+
+class Histograma {
+    /**
+     * @param {string} nome
+     * @param {string} ajuda
+     * @param {string[]} rotulos
+     * @param {number[]} limites - limites superiores dos buckets (crescentes)
+     */
+    constructor(nome, ajuda, rotulos, limites) {
+        this.nome = nome;
+        this.ajuda = ajuda;
+        this.rotulos = rotulos;
+        this.limites = limites;
+        // valores dos rótulos (JSON) → { buckets (não cumulativos), soma, total }
+        this.series = new Map();
+    }
+
+    /**
+     * @param {string[]} valores - na ordem de `rotulos`
+     * @param {number} segundos
+     */
+    observar(valores, segundos) {
+        const chave = JSON.stringify(valores);
+        let serie = this.series.get(chave);
+        if (!serie) {
+            serie = { valores, buckets: new Array(this.limites.length).fill(0), soma: 0, total: 0 };
+            this.series.set(chave, serie);
+        }
+        const indice = this.limites.findIndex(limite => segundos <= limite);
+        if (indice !== -1) serie.buckets[indice]++;
+        serie.soma += segundos;
+        serie.total++;
+    }
+
+    texto() {
+        const linhas = [`# HELP ${this.nome} ${this.ajuda}`, `# TYPE ${this.nome} histogram`];
+        for (const { valores, buckets, soma, total } of this.series.values()) {
+            let acumulado = 0;
+            this.limites.forEach((limite, i) => {
+                acumulado += buckets[i];
+                linhas.push(`${this.nome}_bucket${rotulosTexto(this.rotulos, valores, `le="${limite}"`)} ${acumulado}`);
+            });
+            linhas.push(`${this.nome}_bucket${rotulosTexto(this.rotulos, valores, 'le="+Inf"')} ${total}`);
+            linhas.push(`${this.nome}_sum${rotulosTexto(this.rotulos, valores)} ${soma}`);
+            linhas.push(`${this.nome}_count${rotulosTexto(this.rotulos, valores)} ${total}`);
+        }
+        return linhas.join('\n');
+    }
+}
+
+class Contador {
+    constructor(nome, ajuda, rotulos) {
+        this.nome = nome;
+        this.ajuda = ajuda;
+        this.rotulos = rotulos;
+        this.series = new Map();
+    }
+
+    incrementar(valores, quanto = 1) {
+        const chave = JSON.stringify(valores);
+        const serie = this.series.get(chave) || { valores, total: 0 };
+        serie.total += quanto;
+        this.series.set(chave, serie);
+    }
+
+    texto() {
+        const linhas = [`# HELP ${this.nome} ${this.ajuda}`, `# TYPE ${this.nome} counter`];
+        for (const { valores, total } of this.series.values()) {
+            linhas.push(`${this.nome}${rotulosTexto(this.rotulos, valores)} ${total}`);
+        }
+        return linhas.join('\n');
+    }
+}
+
+class Metricas {
+    constructor() {
+        this.metricas = [];
+
+        this.requisicoes = this.registrar(new Histograma('hicd_api_request_duration_seconds',
+            'Duração das requisições à API por rota', ['method', 'route', 'status'], LIMITES_REQUISICAO));
+        this.hicd = this.registrar(new Histograma('hicd_upstream_request_duration_seconds',
+            'Duração das requisições ao HICD por endpoint (sem a espera no limitador)', ['method', 'endpoint'], LIMITES_REQUISICAO));
+        this.hicdFila = this.registrar(new Histograma('hicd_upstream_queue_wait_seconds',
+            'Espera na fila do limitador de requisições ao HICD', ['lane'], LIMITES_REQUISICAO));
+        this.parse = this.registrar(new Histograma('hicd_parse_duration_seconds',
+            'Duração do parse de HTML do HICD por método', ['parser'], LIMITES_PARSE));
+        this.consultasCache = this.registrar(new Contador('hicd_cache_lookups_total',
+            'Consultas ao cache em memória por resultado', ['result']));
+    }
+
+    registrar(metrica) {
+        this.metricas.push(metrica);
+        return metrica;
+    }
+
+    /** Todas as métricas no formato de exposição texto do Prometheus (0.0.4). */
+    paraPrometheus() {
+        return `${this.metricas.map(m => m.texto()).join('\n\n')}\n`;
+    }
+}
+
+Metricas.compartilhado = new Metricas();
+
+module.exports = { Histograma, Contador, Metricas, LIMITES_REQUISICAO, LIMITES_PARSE };
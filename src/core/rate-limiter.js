@@ -0,0 +1,127 @@
+/**
+ * Limitador de requisições ao HICD, compartilhado por host.
+ *
+ * Cada HICDHttpClient (um por host, via shared-crawler) tem uma instância, de
+ * modo que todo código que fala com aquele host — API, analisador de clínicas,
+ * crawls — disputa o mesmo orçamento:
+ *   - maxConcurrent: requisições simultâneas em voo
+ *   - minIntervalMs: intervalo mínimo entre o início de duas requisições
+ *
+ * Quem quiser paralelizar (workers, batches) só dispara as tarefas; o limitador
+ * enfileira o excedente em ordem FIFO.
+ *
+ * Há duas filas: a normal (requisições de usuários) e a de segundo plano
+ * (pré-aquecimento do cache etc.). Uma tarefa de segundo plano só começa quando
+ * não há nenhuma normal esperando, e no máximo `maxSegundoPlano` delas ficam em
+ * voo — sobra sempre vaga para quem está com a tela aberta.
+ */
+class RateLimiter {
+    /**
+     * @param {object} [options]
+     * @param {number} [options.maxConcurrent=Infinity]
+     * @param {number} [options.minIntervalMs=0]
+     * @param {number} [options.maxSegundoPlano] - tarefas de segundo plano em voo (padrão: metade de maxConcurrent)
+     */
+    constructor(options = {}) {
+        this.maxConcurrent = options.maxConcurrent > 0 ? options.maxConcurrent : Infinity;
+        this.minIntervalMs = options.minIntervalMs > 0 ? options.minIntervalMs : 0;
+        this.maxSegundoPlano = options.maxSegundoPlano > 0
+            ? Math.min(options.maxSegundoPlano, this.maxConcurrent)
+            : (this.maxConcurrent === Infinity ? Infinity : Math.max(1, Math.floor(this.maxConcurrent / 2)));
+
+        this.ativos = 0;
+        this.ativosSegundoPlano = 0;
+        this.fila = [];
+        this.filaSegundoPlano = [];
+        this.ultimoInicio = 0;
+        this._timer = null;
+
+        this.stats = { executadas: 0, enfileiradas: 0, esperaTotalMs: 0, executadasSegundoPlano: 0 };
+    }
+
+    /**
+     * Cria o limitador a partir do ambiente (HICD_MAX_CONCURRENCY, HICD_MIN_INTERVAL_MS,
+     * HICD_MAX_CONCURRENCY_SEGUNDO_PLANO).
+     */
+    static fromEnv(env = process.env) {
+        return new RateLimiter({
+            maxConcurrent: parseInt(env.HICD_MAX_CONCURRENCY) || 6,
+            minIntervalMs: parseInt(env.HICD_MIN_INTERVAL_MS) || 0,
+            maxSegundoPlano: parseInt(env.HICD_MAX_CONCURRENCY_SEGUNDO_PLANO) || 0
+        });
+    }
+
+    /**
+     * Executa `fn` quando houver vaga; resolve/rejeita com o resultado de `fn`.
+     * @param {Function} fn - () => Promise
+     * @param {object} [opcoes]
+     * @param {boolean} [opcoes.segundoPlano=false] - fila de segundo plano (só anda sem fila normal)
+     * @returns {Promise<*>}
+     */
+    schedule(fn, opcoes = {}) {
+        return new Promise((resolve, reject) => {
+            const segundoPlano = Boolean(opcoes.segundoPlano);
+            (segundoPlano ? this.filaSegundoPlano : this.fila)
+                .push({ fn, resolve, reject, segundoPlano, enfileiradaEm: Date.now() });
+            this.stats.enfileiradas++;
+            this._drenar();
+        });
+    }
+
+    /** Estado atual do limitador (para métricas/diagnóstico). */
+    getStats() {
+        return {
+            maxConcurrent: this.maxConcurrent === Infinity ? null : this.maxConcurrent,
+            minIntervalMs: this.minIntervalMs,
+            ativos: this.ativos,
+            naFila: this.fila.length,
+            maxSegundoPlano: this.maxSegundoPlano === Infinity ? null : this.maxSegundoPlano,
+            ativosSegundoPlano: this.ativosSegundoPlano,
+            naFilaSegundoPlano: this.filaSegundoPlano.length,
+            ...this.stats
+        };
+    }
+
+    /** Próxima fila com tarefa que pode começar agora (a normal tem precedência). */
+    _filaDaVez() {
+        if (this.fila.length > 0) return this.fila;
+        if (this.filaSegundoPlano.length > 0 && this.ativosSegundoPlano < this.maxSegundoPlano) return this.filaSegundoPlano;
+        return null;
+    }
+
+    _drenar() {
+        while (this._filaDaVez() && this.ativos < this.maxConcurrent) {
+            const espera = this.ultimoInicio + this.minIntervalMs - Date.now();
+            if (espera > 0) {
+                if (!this._timer) {
+                    this._timer = setTimeout(() => {
+                        this._timer = null;
+                        this._drenar();
+                    }, espera);
+                }
+                return;
+            }
+
+            const tarefa = this._filaDaVez().shift();
+            this.ativos++;
+            if (tarefa.segundoPlano) this.ativosSegundoPlano++;
+            this.ultimoInicio = Date.now();
+            this.stats.esperaTotalMs += this.ultimoInicio - tarefa.enfileiradaEm;
+
+            Promise.resolve()
+                .then(tarefa.fn)
+                .then(tarefa.resolve, tarefa.reject)
+                .finally(() => {
+                    this.ativos--;
+                    this.stats.executadas++;
+                    if (tarefa.segundoPlano) {
+                        this.ativosSegundoPlano--;
+                        this.stats.executadasSegundoPlano++;
+                    }
+                    this._drenar();
+                });
+        }
+    }
+}
+
+module.exports = RateLimiter;
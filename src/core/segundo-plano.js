@@ -0,0 +1,29 @@
+/**
+ * Contexto de trabalho em segundo plano (pré-aquecimento do cache etc.).
+ *
+ * Tudo o que roda dentro de `executarEmSegundoPlano` — inclusive as chamadas
+ * assíncronas que o crawler faz por dentro — enxerga o mesmo contexto via
+ * AsyncLocalStorage. O HICDHttpClient usa isso para mandar as requisições para
+ * a fila de segundo plano do RateLimiter e contá-las em `contexto.requisicoes`,
+ * sem que crawler, serviços e controllers precisem repassar opções.
+ */
+const { AsyncLocalStorage } = require('async_hooks');
+
+const armazenamento = new AsyncLocalStorage();
+
+/**
+ * @template T
+ * @param {{ requisicoes: number }} contexto - objeto do chamador; `requisicoes` é incrementado a cada requisição ao HICD
+ * @param {() => Promise<T>} fn
+ * @returns {Promise<T>}
+ */
+function executarEmSegundoPlano(contexto, fn) {
+    return armazenamento.run(contexto, fn);
+}
+
+/** Contexto de segundo plano ativo, ou undefined numa requisição normal. */
+function contextoSegundoPlano() {
+    return armazenamento.getStore();
+}
+
+module.exports = { executarEmSegundoPlano, contextoSegundoPlano };
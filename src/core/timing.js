@@ -0,0 +1,40 @@
+/**
+ * Utilitários de medição de tempo (resumos com percentis).
+ */
+
+/**
+ * Percentil pelo método nearest-rank sobre um array JÁ ORDENADO.
+ * @param {number[]} ordenados
+ * @param {number} p - 0..100
+ */
+function percentil(ordenados, p) {
+    if (ordenados.length === 0) return null;
+    const rank = Math.ceil((p / 100) * ordenados.length);
+    return ordenados[Math.min(ordenados.length, Math.max(1, rank)) - 1];
+}
+
+/**
+ * Resume uma lista de durações (ms) em total, média e percentis.
+ * @param {number[]} duracoes
+ * @returns {{ amostras: number, totalMs: number, mediaMs: number|null, minMs: number|null,
+ *            p50Ms: number|null, p90Ms: number|null, p95Ms: number|null, p99Ms: number|null, maxMs: number|null }}
+ */
+function resumirDuracoes(duracoes) {
+    const ordenados = (duracoes || []).filter(d => Number.isFinite(d)).sort((a, b) => a - b);
+    const total = ordenados.reduce((sum, d) => sum + d, 0);
+    const arred = (v) => (v === null ? null : Math.round(v * 100) / 100);
+
+    return {
+        amostras: ordenados.length,
+        totalMs: arred(total),
+        mediaMs: ordenados.length ? arred(total / ordenados.length) : null,
+        minMs: arred(ordenados.length ? ordenados[0] : null),
+        p50Ms: arred(percentil(ordenados, 50)),
+        p90Ms: arred(percentil(ordenados, 90)),
+        p95Ms: arred(percentil(ordenados, 95)),
+        p99Ms: arred(percentil(ordenados, 99)),
+        maxMs: arred(ordenados.length ? ordenados[ordenados.length - 1] : null)
+    };
+}
+
+module.exports = { percentil, resumirDuracoes };
@@ -0,0 +1,28 @@
+/**
+ * Identidade e instante de uma evolução, a partir dos campos do cabeçalho
+ * (os únicos lidos antes do parse do texto). Usados na busca incremental:
+ * o parser só processa por completo as evoluções a partir da marca d'água.
+ */
+
+/** "DD/MM/AAAA HH:MM" → "AAAA/MM/DD HH:MM" (comparável como string); '' se não reconhecido. */
+function instanteComparavel(data) {
+    const match = String(data || '').trim().match(/^(\d{2})\/(\d{2})\/(\d{4})(?:\s+(\d{2}:\d{2}(?::\d{2})?))?/);
+    if (!match) return '';
+    return `${match[3]}/${match[2]}/${match[1]}${match[4] ? ' ' + match[4] : ''}`;
+}
+
+/** Instante mais recente da evolução (data da evolução ou da última atualização). */
+function instanteEvolucao(evolucao) {
+    const evolucaoEm = instanteComparavel(evolucao.dataEvolucao);
+    const atualizadaEm = instanteComparavel(evolucao.dataAtualizacao);
+    return atualizadaEm > evolucaoEm ? atualizadaEm : evolucaoEm;
+}
+
+/** Chave estável da evolução na lista do HICD (que não expõe id). */
+function chaveEvolucao(evolucao) {
+    return [evolucao.dataEvolucao, evolucao.dataAtualizacao, evolucao.profissional, evolucao.atividade, evolucao.clinicaLeito]
+        .map(campo => campo || '')
+        .join('|');
+}
+
+module.exports = { instanteComparavel, instanteEvolucao, chaveEvolucao };
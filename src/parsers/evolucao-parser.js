@@ -1,6 +1,26 @@
 const BaseParser = require('./base-parser');
 const HICDParser = require('./hicd-parser-original');
 const cheerio = require('cheerio');
+const { tokenizarSecoes, corpoDaSecao, textoAPartirDe } = require('./secoes-evolucao');
+const { instanteEvolucao, chaveEvolucao } = require('./evolucao-identidade');
+// Regexes das seções, compilados uma vez no carregamento do módulo
+const RE_HISTORICO = {
+    queixaPrincipal: /QP:\s*”([^”]+)”/,
+    hda: /HDA:\s*([\s\S]*?)(?=HPP:|Admissão emergência:)/,
+    hpp: /HPP:\s*([\s\S]*?)(?=HO:|Admissão emergência:)/,
+    historiaObstetrica: /HO:\s*([\s\S]*?)(?=HF:)/,
+    historiaFamiliar: /HF:\s*([\s\S]*?)(?=HSE:)/,
+    historiaSocioeconomica: /HSE:\s*([\s\S]*?)(?=Admissão emergência:)/,
+};
+const RE_ADMISSAO_EMERGENCIA = /Admissão emergência:\s*([\s\S]*?)(?=Admissão UTIP:)/i;
+const RE_ADMISSAO_UTIP = /Admissão UTIP:\s*([\s\S]*?)(?=Evolução médica:)/i;
+const RE_EVOLUCAO_MEDICA = /Evolução médica:\s*([\s\S]*?)(?=Controle 24 h:|Controle 24h:|Exame F[íi]sico:|AO EXAME|Conduta:)/i;
+const RE_CONTROLE_24H = /Controle 24 h?:\s*([\s\S]*?)(?=Exame F[íi]sico:|AO EXAME|Diurese:|BH 24 h?:|Conduta:)/i;
+const RE_DIURESE = /Diurese:\s*([\s\S]*?)(?=BH 24 h?:|Balan[çc]o h[íi]drico:|Exame F[íi]sico:|AO EXAME|Conduta:|$)/i;
+const RE_BH_24H = /BH 24 h?:\s*([\s\S]*?)(?=Exame F[íi]sico:|AO EXAME|Conduta:|$)/i;
+const RE_EXAME_FISICO = /(?:Exame F[íi]sico|AO EXAME\s+F[IÍ]SICO):\s*([\s\S]*?)(?=Conduta:|Pend[êe]ncias:|Medicaç|$)/i;
+const RE_EXAMES_COMPLEMENTARES = /Exames Complementares:([\s\S]*?)(?=Gasometria|Conduta:|$)/i;
+
 /**
  * Parser para evoluções de pacientes do sistema HICD.
  * Refatorado a partir da lógica do hicd-parser-original.js.
@@ -16,8 +36,11 @@ class EvolucaoParser extends BaseParser {
     /**
      * Parse principal para extrair a lista de evoluções de um paciente.
      * Lógica baseada em `parseEvolucoes` de `hicd-parser-original.js`.
+     * @param {object} [opcoes]
+     * @param {string} [opcoes.marcaDagua] - instante comparável (ver evolucao-identidade);
+     *        evoluções anteriores a ele vêm só como `{ chave, conhecida: true }`, sem parse do texto
      */
-    parse(html, prontuario = null) {
+    parse(html, prontuario = null, opcoes = {}) {
         this.debug(`Iniciando parse de evoluções para prontuário: ${prontuario}`);
         try {
             const $ = cheerio.load(html);
@@ -28,7 +51,7 @@ class EvolucaoParser extends BaseParser {
 
             // Estratégia 1: Buscar pela nova estrutura com #areaHistEvol
             $('#areaHistEvol').each((index, areaElement) => {
-                const evolucoesDetalhadamente = this.parseEvolucaoDetalhada($, areaElement, prontuario, index);
+                const evolucoesDetalhadamente = this.parseEvolucaoDetalhada($, areaElement, prontuario, index, opcoes.marcaDagua);
                 if (evolucoesDetalhadamente && evolucoesDetalhadamente.length > 0) {
                     evolucoes.push(...evolucoesDetalhadamente);
                 }
@@ -54,7 +77,7 @@ class EvolucaoParser extends BaseParser {
      * Parse detalhado da nova estrutura de evolução.
      * Lógica estritamente baseada em `parseEvolucaoDetalhada` de `hicd-parser-original.js`.
      */
-    parseEvolucaoDetalhada($, areaElement, prontuario, index) {
+    parseEvolucaoDetalhada($, areaElement, prontuario, index, marcaDagua = null) {
         const evolucoes = [];
         try {
             const area = $(areaElement);
@@ -83,6 +106,13 @@ class EvolucaoParser extends BaseParser {
                 evolucao.atividade      = this.extrairCampoDaLinha($, rowDois, 'Atividade:');
                 evolucao.dataAtualizacao= this.extrairCampoDaLinha($, rowDois, 'Data de Atualização:');
                 evolucao.clinicaLeito   = this.extrairCampoDaLinha($, rowTres, 'Clínica/Leito:');
+
+                // Busca incremental: anterior à marca d'água = já processada; o chamador reaproveita a sua cópia
+                if (marcaDagua && evolucao.dataEvolucao && instanteEvolucao(evolucao) < marcaDagua) {
+                    evolucoes.push({ chave: chaveEvolucao(evolucao), conhecida: true });
+                    continue;
+                }
+
                 evolucao.descricao      = this.extrairCampoDaLinha($, rowQuatro, 'Descrição:');
                 evolucao.textoCompleto  = evolucao.descricao;
 
@@ -90,6 +120,7 @@ class EvolucaoParser extends BaseParser {
                 if (!evolucao.dataEvolucao) {
                     continue;
                 }
+                evolucao.chave = chaveEvolucao(evolucao);
 
                 // textoLimpo: o texto já vem limpo de extrairCampoDaLinha; apenas copiar.
                 evolucao.textoLimpo = evolucao.descricao;
@@ -303,37 +334,47 @@ class EvolucaoParser extends BaseParser {
     }
 
     /**
-     * Extrai dados estruturados do texto da evolução
+     * Extrai dados estruturados do texto da evolução.
+     * O texto é tokenizado uma vez (secoes-evolucao.js); seções com título
+     * fixo recebem o trecho delimitado ou são puladas quando o título não
+     * aparece. Os regexes de título flexível (hipóteses, medicações em uso,
+     * gasometria, controle/BH 24h, exame físico) continuam sobre o texto todo.
      */
     extrairDadosEstruturadosEvolucao(texto) {
         if (!texto) return {};
 
+        const secoes = tokenizarSecoes(texto);
+        const aPartirDe = (titulo, regex) => {
+            const trecho = textoAPartirDe(secoes, titulo);
+            return trecho === null ? '' : this.extrairValor(trecho, regex);
+        };
+
         const dados = {
             identificacao: this.parseSecaoIdentificacao(texto),
             hipotesesDiagnosticas: this.parseHipotesesDiagnosticas(texto),
-            diagnosticosAnteriores: this.parseSecaoSimples(texto, 'Diagnósticos anteriores'),
+            diagnosticosAnteriores: this.parseSecaoSimples(texto, 'Diagnósticos anteriores', secoes),
             medicamentosEmUso: this.parseMedicamentosEmUso(texto),
-            medicamentosAnteriores: this.parseSecaoSimples(texto, 'Fez uso'),
-            dispositivos: this.parseSecaoSimples(texto, 'Dispositivos'),
-            examesComplementares: this.parseSecaoExames(texto),
+            medicamentosAnteriores: this.parseSecaoSimples(texto, 'Fez uso', secoes),
+            dispositivos: this.parseSecaoSimples(texto, 'Dispositivos', secoes),
+            examesComplementares: this.parseSecaoExames(texto, secoes),
             gasometrias: this.parseSecaoGasometria(texto),
             historico: {
-                queixaPrincipal: this.extrairValor(texto, /QP:\s*”([^”]+)”/),
-                hda: this.extrairValor(texto, /HDA:\s*([\s\S]*?)(?=HPP:|Admissão emergência:)/),
-                hpp: this.extrairValor(texto, /HPP:\s*([\s\S]*?)(?=HO:|Admissão emergência:)/),
-                historiaObstetrica: this.extrairValor(texto, /HO:\s*([\s\S]*?)(?=HF:)/),
-                historiaFamiliar: this.extrairValor(texto, /HF:\s*([\s\S]*?)(?=HSE:)/),
-                historiaSocioeconomica: this.extrairValor(texto, /HSE:\s*([\s\S]*?)(?=Admissão emergência:)/),
+                queixaPrincipal: this.extrairValor(texto, RE_HISTORICO.queixaPrincipal),
+                hda: aPartirDe('HDA', RE_HISTORICO.hda),
+                hpp: aPartirDe('HPP', RE_HISTORICO.hpp),
+                historiaObstetrica: this.extrairValor(texto, RE_HISTORICO.historiaObstetrica),
+                historiaFamiliar: aPartirDe('HF', RE_HISTORICO.historiaFamiliar),
+                historiaSocioeconomica: aPartirDe('HSE', RE_HISTORICO.historiaSocioeconomica),
             },
-            admissaoEmergencia: this.extrairValor(texto, /Admissão emergência:\s*([\s\S]*?)(?=Admissão UTIP:)/i),
-            admissaoUTIP: this.extrairValor(texto, /Admissão UTIP:\s*([\s\S]*?)(?=Evolução médica:)/i),
-            evolucaoMedica: this.extrairValor(texto, /Evolução médica:\s*([\s\S]*?)(?=Controle 24 h:|Controle 24h:|Exame F[íi]sico:|AO EXAME|Conduta:)/i),
-            controle24h: this.extrairValor(texto, /Controle 24 h?:\s*([\s\S]*?)(?=Exame F[íi]sico:|AO EXAME|Diurese:|BH 24 h?:|Conduta:)/i),
-            diurese: this.extrairValor(texto, /Diurese:\s*([\s\S]*?)(?=BH 24 h?:|Balan[çc]o h[íi]drico:|Exame F[íi]sico:|AO EXAME|Conduta:|$)/i),
-            bh24h: this.extrairValor(texto, /BH 24 h?:\s*([\s\S]*?)(?=Exame F[íi]sico:|AO EXAME|Conduta:|$)/i),
-            exameFisico: this.extrairValor(texto, /(?:Exame F[íi]sico|AO EXAME\s+F[IÍ]SICO):\s*([\s\S]*?)(?=Conduta:|Pend[êe]ncias:|Medicaç|$)/i),
-            conduta: this.parseSecaoSimples(texto, 'Conduta'),
-            pendencias: this.parseSecaoSimples(texto, 'Pendências'),
+            admissaoEmergencia: aPartirDe('Admissão emergência', RE_ADMISSAO_EMERGENCIA),
+            admissaoUTIP: aPartirDe('Admissão UTIP', RE_ADMISSAO_UTIP),
+            evolucaoMedica: aPartirDe('Evolução médica', RE_EVOLUCAO_MEDICA),
+            controle24h: this.extrairValor(texto, RE_CONTROLE_24H),
+            diurese: aPartirDe('Diurese', RE_DIURESE),
+            bh24h: this.extrairValor(texto, RE_BH_24H),
+            exameFisico: this.extrairValor(texto, RE_EXAME_FISICO),
+            conduta: this.parseSecaoSimples(texto, 'Conduta', secoes),
+            pendencias: this.parseSecaoSimples(texto, 'Pendências', secoes),
         };
 
         return dados;
@@ -380,42 +421,13 @@ class EvolucaoParser extends BaseParser {
 
     /**
      * Parse de seções que contêm listas simples de itens.
+     * @param {object} [secoes] - tokenização do texto (tokenizarSecoes), reaproveitada entre seções
      */
-    parseSecaoSimples(texto, tituloSecao) {
-        // Usa as seções conhecidas do HICD como delimitadores de fim de seção.
-        // Evita falsos positivos de lookahead genérico com textos clínicos.
-        const SECOES_DELIMITADORAS = [
-            'Hipóteses Diagnósticas', 'Hipóteses diagnósticas',
-            'Diagnósticos anteriores',
-            'Em uso', 'Medicações em Uso', 'Medicações em uso',
-            'Fez uso', 'Fez Uso', 'Dispositivos', 'Conduta', 'Pendências',
-            'Exames Complementares', 'Gasometria',
-            'Controle 24h', 'Controle 24 h', 'BH 24h', 'BH 24 h',
-            'Diurese', 'Balanço hídrico',
-            'Evolução médica', 'Exame Físico', 'AO EXAME FISICO',
-            'Nome', 'Identificação',
-            'HDA', 'HPP', 'HF', 'HSE', 'Admissão emergência', 'Admissão UTIP',
-            // Subseções comuns em evoluções cirúrgicas / UTI
-            'Hemoderivados', 'Culturas', 'Procedimentos', 'Pareceres',
-            'Diagnóstico Pré-Operatório', 'Diagnóstico Pós-Operatório',
-        ];
-
-        const esc = s => s.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
-
-        const lookahead = SECOES_DELIMITADORAS
-            .filter(s => s !== tituloSecao)
-            .map(esc)
-            .join('|');
-
-        const regex = new RegExp(
-            `${esc(tituloSecao)}:\\s*([\\s\\S]*?)(?=(?:${lookahead}):|$)`,
-            'i'
-        );
-
-        const match = texto.match(regex);
-        if (!match || !match[1]) return [];
+    parseSecaoSimples(texto, tituloSecao, secoes = tokenizarSecoes(texto)) {
+        const corpo = corpoDaSecao(secoes, tituloSecao);
+        if (!corpo) return [];
 
-        return match[1]
+        return corpo
             .trim()
             .split(/[\n\r]+/)
             .map(item => item.replace(/^[-•]\s*/, '').trim())
@@ -448,9 +460,11 @@ class EvolucaoParser extends BaseParser {
     /**
      * Parse da seção de exames complementares.
      */
-    parseSecaoExames(texto) {
-        const regex = /Exames Complementares:([\s\S]*?)(?=Gasometria|Conduta:|$)/i;
-        const match = texto.match(regex);
+    parseSecaoExames(texto, secoes = null) {
+        // Com a tokenização, só roda o regex a partir do título (e nem roda sem ele)
+        const trecho = secoes ? textoAPartirDe(secoes, 'Exames Complementares') : texto;
+        if (trecho === null) return [];
+        const match = trecho.match(RE_EXAMES_COMPLEMENTARES);
         if (!match || !match[1]) return [];
 
         const textoExames = match[1];
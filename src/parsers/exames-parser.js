@@ -17,6 +17,22 @@ const AGRUPAMENTOS = {
     SOROLOGIA:    { codigo: 'SOROLOGIA',        descricao: 'Sorologia' },
 };
 
+/**
+ * Estruturas de tabela testadas (em ordem) pela estratégia "tabelas" de
+ * parseResultadosExames. Índices das células de sigla, valor e referência.
+ */
+const ESTRUTURAS_TABELA = [
+    // Estrutura 1: Sigla | Descrição | Valor | Referência
+    { siglaIndex: 0, valorIndex: 2, referenciaIndex: 3 },
+    // Estrutura 2: Descrição | Valor | Referência
+    { siglaIndex: 0, valorIndex: 1, referenciaIndex: 2 },
+    // Estrutura 3: Sigla | Valor
+    { siglaIndex: 0, valorIndex: 1, referenciaIndex: -1 }
+];
+
+/** Ordem padrão das estratégias de extração de resultados. */
+const ESTRATEGIAS_RESULTADO = ['table1', 'tabelas', 'texto', 'alternativo'];
+
 /**
  * Parser para exames laboratoriais e de imagem do sistema HICD.
  * Refatorado a partir da lógica do hicd-parser-original.js.
@@ -28,16 +44,26 @@ class ExamesParser extends BaseParser {
     constructor(origin = config.origin) {
         super();
         this.origin = origin;
+        this.estatisticasLayout = { paginas: 0, estrategiasExecutadas: 0, estrategiasPuladas: 0, vencedoras: {} };
         this.debug('ExamesParser (refatorado) inicializado');
     }
 
+    /**
+     * Aceita HTML (string) ou um documento cheerio já carregado, para que quem
+     * precisa de várias extrações da mesma página faça um único parse do DOM.
+     */
+    _carregar(html) {
+        if (typeof html === 'function' && typeof html.root === 'function') return html;
+        return cheerio.load(html);
+    }
+
     /**
      * Parse principal para extrair a lista de requisições de exames.
      */
     parse(html, prontuario = null) {
         this.debug(`Iniciando parse da lista de exames para prontuário: ${prontuario}`);
         try {
-            const $ = cheerio.load(html);
+            const $ = this._carregar(html);
             const exames = [];
 
             // Buscar todas as seções de fieldset que contêm exames
@@ -266,153 +292,21 @@ class ExamesParser extends BaseParser {
     }
 
     /**
-     * Parse dos resultados dos exames a partir do HTML da URL de impressão
+     * Parse dos resultados dos exames a partir do HTML da URL de impressão.
+     *
+     * O HTML é carregado uma única vez; a impressão digital do layout descarta
+     * as estratégias que não têm como casar (ver _extrairResultadosBrutos).
+     *
+     * @param {string|Function} html - HTML da página ou documento cheerio já carregado
+     * @param {string} requisicaoId
      */
     parseResultadosExames(html, requisicaoId) {
         console.log(`[PARSER] Extraindo resultados dos exames da requisição ${requisicaoId}...`);
         
         try {
-            const $ = cheerio.load(html);
-            const resultados = [];
-
-            // ─── Estratégia 0 (prioritária): <table class="table1"> com <tr id="SIGLA"> ───
-            // Estrutura nativa do exame.php do HICD: sigla no atributo id da linha,
-            // conteúdo do laudo na 2ª célula.  A 3ª célula é sempre um div de gráfico vazio.
-            const tabelaPrincipal = $('table.table1');
-            if (tabelaPrincipal.length > 0) {
-                tabelaPrincipal.find('tr[id]').each((i, row) => {
-                    const $row  = $(row);
-                    const sigla = ($row.attr('id') || '').trim();
-                    if (!sigla) return;
-
-                    const cells = $row.find('td');
-                    if (cells.length < 2) return;
-
-                    const textoConteudo = cells.eq(1).text();
-                    if (!textoConteudo.trim()) return;
-                    if (/AGUARDANDO\s+RESULTADO\s+DO\s+EXAME/i.test(textoConteudo)) return;
-
-                    // Resultado simples: linha "Resultado---------------> VALOR UNIDADE [VR: REF]"
-                    const matchResultado = textoConteudo.match(
-                        /Resultado-+>\s*([\d,]+)\s+([\w\/%µ.]+)/i
-                    );
-                    if (matchResultado) {
-                        const valor   = matchResultado[1];
-                        const unidade = matchResultado[2].trim();
-
-                        // Referência: inline na mesma linha após "VR:" …
-                        let referencia = '';
-                        const matchVRInline = textoConteudo.match(
-                            /Resultado-+>.*?VR\s*:\s*([^\n]+)/i
-                        );
-                        if (matchVRInline) {
-                            referencia = matchVRInline[1].trim();
-                        } else {
-                            // … ou em linha separada "V.R     : REF" / "VR: REF"
-                            const matchVRLinha = textoConteudo.match(
-                                /V\.?\s*R\.?\s*:\s*([^\n]+)/i
-                            );
-                            if (matchVRLinha) referencia = matchVRLinha[1].trim();
-                        }
-
-                        resultados.push({
-                            requisicaoId,
-                            sigla,
-                            valor,
-                            unidade,
-                            referencia,
-                            valorNumerico: this.extrairValorNumerico(valor),
-                            status: this.determinarStatusExame(valor, referencia)
-                        });
-                    } else {
-                        // Bloco complexo (hemograma, coagulograma...): armazenar texto bruto.
-                        // expandirBlocoTextual o processará na etapa seguinte.
-                        const valorBruto = textoConteudo.trim();
-                        if (valorBruto.includes('\n')) {
-                            resultados.push({
-                                requisicaoId,
-                                sigla,
-                                valor:         valorBruto,
-                                unidade:       '',
-                                referencia:    '',
-                                valorNumerico: null,
-                                status:        'bloco_textual'
-                            });
-                        }
-                    }
-                });
-            }
-
-            // ─── Estratégias de fallback (somente quando table.table1 não está presente) ───
-            if (resultados.length === 0) {
-                // Buscar tabelas que contêm os resultados dos exames
-                $('table').each((tableIndex, tableElement) => {
-                    const table = $(tableElement);
-
-                    // Procurar por linhas que contêm resultados de exames
-                    table.find('tr').each((rowIndex, rowElement) => {
-                        const row = $(rowElement);
-                        const cells = row.find('td');
-
-                        if (cells.length >= 3) {
-                            // Tentar diferentes estruturas de tabela
-                            const possibleStructures = [
-                                // Estrutura 1: Sigla | Descrição | Valor | Referência
-                                {
-                                    siglaIndex: 0,
-                                    valorIndex: 2,
-                                    referenciaIndex: 3
-                                },
-                                // Estrutura 2: Descrição | Valor | Referência
-                                {
-                                    siglaIndex: 0,
-                                    valorIndex: 1,
-                                    referenciaIndex: 2
-                                },
-                                // Estrutura 3: Sigla | Valor
-                                {
-                                    siglaIndex: 0,
-                                    valorIndex: 1,
-                                    referenciaIndex: -1
-                                }
-                            ];
-
-                            for (const structure of possibleStructures) {
-                                const siglaText = cells.eq(structure.siglaIndex).text().trim();
-                                const valorText = cells.eq(structure.valorIndex).text().trim();
-                                const referenciaText = structure.referenciaIndex >= 0
-                                    ? cells.eq(structure.referenciaIndex).text().trim()
-                                    : '';
-
-                                // Verificar se parece ser um resultado de exame válido
-                                if (this.isValidExameResult(siglaText, valorText)) {
-                                    const resultado = {
-                                        requisicaoId: requisicaoId,
-                                        sigla: siglaText,
-                                        valor: valorText,
-                                        referencia: referenciaText,
-                                        unidade: this.extrairUnidade(valorText),
-                                        valorNumerico: this.extrairValorNumerico(valorText),
-                                        status: this.determinarStatusExame(valorText, referenciaText)
-                                    };
-
-                                    resultados.push(resultado);
-                                    break; // Sair do loop de estruturas se encontrou uma válida
-                                }
-                            }
-                        }
-                    });
-                });
-            }
-
-            if (resultados.length === 0) {
-                const resultadosTexto = this.parseResultadosTexto($, requisicaoId);
-                resultados.push(...resultadosTexto);
-            }
-
-            if (resultados.length === 0) {
-                resultados.push(...this.parseResultadosExamesAlternativo($, requisicaoId));
-            }
+            const $ = this._carregar(html);
+            const layout = this.identificarLayout($);
+            const resultados = this._extrairResultadosBrutos($, requisicaoId, layout);
 
             // Expandir blocos textuais conhecidos (HPL, PFR, BFR, TAP, TTPA...)
             // Usa identidade de objeto para distinguir itens expandidos (novos) dos
@@ -470,6 +364,192 @@ class ExamesParser extends BaseParser {
         }
     }
 
+    /**
+     * Impressão digital estrutural da página de resultados: só o que decide quais
+     * estratégias podem casar — presença da tabela nativa (table.table1 com
+     * <tr id>) e total de tabelas.
+     * @returns {{ nativo: boolean, tabelas: number }}
+     */
+    identificarLayout($) {
+        return {
+            nativo: $('table.table1 tr[id]').length > 0,
+            tabelas: $('table').length
+        };
+    }
+
+    /**
+     * Roda as estratégias de extração na ordem padrão (table1 → tabelas → texto
+     * → alternativo) até uma produzir resultados.
+     *
+     * A impressão digital só pula estratégias que não têm como casar: table1
+     * sem table.table1 com <tr id>, tabelas numa página sem <table>. A saída é
+     * sempre a da cascata completa — não depende de páginas parseadas antes
+     * (páginas com a mesma impressão digital podem precisar de estratégias
+     * diferentes).
+     */
+    _extrairResultadosBrutos($, requisicaoId, layout) {
+        const stats = this.estatisticasLayout;
+        stats.paginas++;
+
+        for (const estrategia of ESTRATEGIAS_RESULTADO) {
+            if (!this._estrategiaAplicavel(estrategia, layout)) {
+                stats.estrategiasPuladas++;
+                continue;
+            }
+            stats.estrategiasExecutadas++;
+            const resultados = this._executarEstrategia(estrategia, $, requisicaoId);
+            if (resultados.length > 0) {
+                stats.vencedoras[estrategia] = (stats.vencedoras[estrategia] || 0) + 1;
+                return resultados;
+            }
+        }
+        return [];
+    }
+
+    /** Pré-condição estrutural de cada estratégia (sem ela o resultado é sempre vazio). */
+    _estrategiaAplicavel(estrategia, layout) {
+        switch (estrategia) {
+            case 'table1': return layout.nativo;
+            case 'tabelas': return layout.tabelas > 0;
+            default: return true;
+        }
+    }
+
+    _executarEstrategia(estrategia, $, requisicaoId) {
+        switch (estrategia) {
+            case 'table1': return this.parseResultadosTabelaNativa($, requisicaoId);
+            case 'tabelas': return this.parseResultadosTabelas($, requisicaoId);
+            case 'texto': return this.parseResultadosTexto($, requisicaoId);
+            case 'alternativo': return this.parseResultadosExamesAlternativo($, requisicaoId);
+            default: return [];
+        }
+    }
+
+    /**
+     * Estatísticas do despacho por layout (para diagnóstico/benchmark).
+     */
+    getEstatisticasLayout() {
+        return { ...this.estatisticasLayout, vencedoras: { ...this.estatisticasLayout.vencedoras } };
+    }
+
+    /**
+     * Estratégia table1: <table class="table1"> com <tr id="SIGLA">.
+     * Estrutura nativa do exame.php do HICD: sigla no atributo id da linha,
+     * conteúdo do laudo na 2ª célula. A 3ª célula é sempre um div de gráfico vazio.
+     */
+    parseResultadosTabelaNativa($, requisicaoId) {
+        const resultados = [];
+
+        $('table.table1').find('tr[id]').each((i, row) => {
+            const $row  = $(row);
+            const sigla = ($row.attr('id') || '').trim();
+            if (!sigla) return;
+
+            const cells = $row.find('td');
+            if (cells.length < 2) return;
+
+            const textoConteudo = cells.eq(1).text();
+            if (!textoConteudo.trim()) return;
+            if (/AGUARDANDO\s+RESULTADO\s+DO\s+EXAME/i.test(textoConteudo)) return;
+
+            // Resultado simples: linha "Resultado---------------> VALOR UNIDADE [VR: REF]"
+            const matchResultado = textoConteudo.match(
+                /Resultado-+>\s*([\d,]+)\s+([\w\/%µ.]+)/i
+            );
+            if (matchResultado) {
+                const valor   = matchResultado[1];
+                const unidade = matchResultado[2].trim();
+
+                // Referência: inline na mesma linha após "VR:" …
+                let referencia = '';
+                const matchVRInline = textoConteudo.match(
+                    /Resultado-+>.*?VR\s*:\s*([^\n]+)/i
+                );
+                if (matchVRInline) {
+                    referencia = matchVRInline[1].trim();
+                } else {
+                    // … ou em linha separada "V.R     : REF" / "VR: REF"
+                    const matchVRLinha = textoConteudo.match(
+                        /V\.?\s*R\.?\s*:\s*([^\n]+)/i
+                    );
+                    if (matchVRLinha) referencia = matchVRLinha[1].trim();
+                }
+
+                resultados.push({
+                    requisicaoId,
+                    sigla,
+                    valor,
+                    unidade,
+                    referencia,
+                    valorNumerico: this.extrairValorNumerico(valor),
+                    status: this.determinarStatusExame(valor, referencia)
+                });
+            } else {
+                // Bloco complexo (hemograma, coagulograma...): armazenar texto bruto.
+                // expandirBlocoTextual o processará na etapa seguinte.
+                const valorBruto = textoConteudo.trim();
+                if (valorBruto.includes('\n')) {
+                    resultados.push({
+                        requisicaoId,
+                        sigla,
+                        valor:         valorBruto,
+                        unidade:       '',
+                        referencia:    '',
+                        valorNumerico: null,
+                        status:        'bloco_textual'
+                    });
+                }
+            }
+        });
+
+        return resultados;
+    }
+
+    /**
+     * Estratégia tabelas: linhas com 3+ células em qualquer tabela, testando as
+     * estruturas de ESTRUTURAS_TABELA. O texto de cada célula é lido uma vez
+     * por linha, não uma vez por estrutura testada.
+     */
+    parseResultadosTabelas($, requisicaoId) {
+        const resultados = [];
+
+        $('table').each((tableIndex, tableElement) => {
+            $(tableElement).find('tr').each((rowIndex, rowElement) => {
+                const cells = $(rowElement).find('td');
+                if (cells.length < 3) return;
+
+                const textos = [];
+                for (let i = 0; i < Math.min(cells.length, 4); i++) {
+                    textos.push(cells.eq(i).text().trim());
+                }
+
+                for (const structure of ESTRUTURAS_TABELA) {
+                    const siglaText = textos[structure.siglaIndex] || '';
+                    const valorText = textos[structure.valorIndex] || '';
+                    const referenciaText = structure.referenciaIndex >= 0
+                        ? (textos[structure.referenciaIndex] || '')
+                        : '';
+
+                    // Verificar se parece ser um resultado de exame válido
+                    if (this.isValidExameResult(siglaText, valorText)) {
+                        resultados.push({
+                            requisicaoId: requisicaoId,
+                            sigla: siglaText,
+                            valor: valorText,
+                            referencia: referenciaText,
+                            unidade: this.extrairUnidade(valorText),
+                            valorNumerico: this.extrairValorNumerico(valorText),
+                            status: this.determinarStatusExame(valorText, referenciaText)
+                        });
+                        break; // Sair do loop de estruturas se encontrou uma válida
+                    }
+                }
+            });
+        });
+
+        return resultados;
+    }
+
     /**
      * Parse de resultados em formato de texto estruturado.
      * Usa cheerio para percorrer o DOM — não opera sobre texto plano,
@@ -741,7 +821,7 @@ class ExamesParser extends BaseParser {
         };
 
         try {
-            const $ = this.loadHTML(html);
+            const $ = typeof html === 'string' ? this.loadHTML(html) : this._carregar(html);
 
             detalhes.cabecalho = this.extrairCabecalhoExame($);
 
@@ -866,7 +946,7 @@ class ExamesParser extends BaseParser {
      */
     extractAvailableTypes(html) {
         try {
-            const $ = cheerio.load(html);
+            const $ = this._carregar(html);
             const tipos = new Set();
             $('a[onclick*="selecionaEx"]').each((i, el) => {
                 const nome = $(el).text().trim();
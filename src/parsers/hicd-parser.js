@@ -4,6 +4,28 @@ const ExamesParser = require('./exames-parser');
 const EvolucaoParser = require('./evolucao-parser');
 const ProntuarioParser = require('./prontuario-parser');
 const PrescricaoParser = require('./prescricao-parser');
+const { obterParsePool } = require('./parse-pool');
+const KeywordScorer = require('./keyword-scorer');
+const { medir } = require('../core/medicao');
+const { Metricas } = require('../core/metricas');
+
+// Palavras-chave por tipo de página (sem diferenciar maiúsculas/minúsculas).
+// A ordem dos tipos desempata scores iguais.
+const PALAVRAS_TIPO_PAGINA = {
+    clinicas: ['clínica', 'clinica', 'clinic', 'código da clínica', 'lista de clínicas'],
+    pacientes: ['paciente', 'patient', 'prontuário', 'prontuario', 'lista de pacientes'],
+    exames: ['exame', 'exam', 'resultado', 'laboratorial', 'lista de exames'],
+    evolucoes: ['evolução', 'evolucao', 'evolution', 'nota médica', 'evolução médica'],
+    prontuario: ['prontuário completo', 'dados do paciente', 'histórico médico', 'ficha médica']
+};
+
+// Autômato montado uma vez: pontua todos os tipos numa passada pelo HTML
+const PONTUADOR_TIPO_PAGINA = new KeywordScorer(PALAVRAS_TIPO_PAGINA, { ignorarCaixa: true });
+
+/** Parse medido: span `parse` do Server-Timing e histograma por método. */
+function medirParse(metodo, fn) {
+    return medir('parse', fn, (ms) => Metricas.compartilhado.parse.observar([metodo], ms / 1000));
+}
 
 /**
  * Parser principal do HICD que unifica todos os parsers especializados
@@ -24,6 +46,9 @@ class HICDParser {
         this.evolucaoParser = new EvolucaoParser();
         this.prontuarioParser = new ProntuarioParser();
         this.prescricaoParser = new PrescricaoParser();
+
+        // Pool de workers (PARSE_POOL_ENABLED); desligado = parse na própria thread
+        this.parsePool = options.parsePool || obterParsePool();
         
         this.debug('HICDParser inicializado com parsers especializados');
     }
@@ -57,6 +82,18 @@ class HICDParser {
         console.error(`[HICD-PARSER ERROR] ${message}`, error || '');
     }
 
+    /**
+     * Executa um método de parse pelo pool de workers (ou localmente, com o
+     * pool desligado). Usado pelos services para HTML pesado — resultados de
+     * exames, evoluções, prescrições — sem travar o event loop da API.
+     * @param {string} metodo - ex.: 'parseResultadosExames'
+     * @param {...*} args - HTML bruto e demais argumentos do método
+     * @returns {Promise<*>}
+     */
+    parseAsync(metodo, ...args) {
+        return medirParse(metodo, () => this.parsePool.executar(metodo, args, { origin: this.examesParser.origin, local: this }));
+    }
+
     // ==========================================
     // MÉTODOS DE CLÍNICAS
     // ==========================================
@@ -67,7 +104,7 @@ class HICDParser {
     parseClinicas(html) {
         this.debug('Delegando parse de clínicas para ClinicaParser');
         try {
-            return this.clinicaParser.parse(html);
+            return medirParse('parseClinicas', () => this.clinicaParser.parse(html));
         } catch (error) {
             this.error('Erro no parse de clínicas:', error);
             throw error;
@@ -98,7 +135,7 @@ class HICDParser {
     parsePacientes(html, codigoClinica = null) {
         this.debug('Delegando parse de pacientes para PacienteParser', { codigoClinica });
         try {
-            return this.pacienteParser.parse(html, codigoClinica);
+            return medirParse('parsePacientes', () => this.pacienteParser.parse(html, codigoClinica));
         } catch (error) {
             this.error('Erro no parse de pacientes:', error);
             throw error;
@@ -107,7 +144,7 @@ class HICDParser {
     parsePacienteCadastro(html, codigoClinica = null) {
         this.debug('Delegando parse de pacientes para PacienteParser', { codigoClinica });
         try {
-            return this.pacienteParser.parsePacienteCadastro(html, codigoClinica);
+            return medirParse('parsePacienteCadastro', () => this.pacienteParser.parsePacienteCadastro(html, codigoClinica));
         } catch (error) {
             this.error('Erro no parse de pacientes:', error);
             throw error;
@@ -255,10 +292,10 @@ class HICDParser {
     /**
      * Parse de evoluções (mantém compatibilidade)
      */
-    parseEvolucoes(html, prontuario = null) {
+    parseEvolucoes(html, prontuario = null, opcoes = {}) {
         this.debug('Delegando parse de evoluções para EvolucaoParser', { prontuario });
         try {
-            return this.evolucaoParser.parse(html, prontuario);
+            return this.evolucaoParser.parse(html, prontuario, opcoes);
         } catch (error) {
             this.error('Erro no parse de evoluções:', error);
             throw error;
@@ -388,36 +425,23 @@ class HICDParser {
         }
     }
 
+    /**
+     * Pontua cada tipo de página pelas ocorrências das suas palavras-chave
+     * (uma passada pelo HTML).
+     * @returns {Object<string, number>} tipo → score
+     */
+    scorePageTypes(html) {
+        if (!html) return Object.fromEntries(Object.keys(PALAVRAS_TIPO_PAGINA).map(tipo => [tipo, 0]));
+        return PONTUADOR_TIPO_PAGINA.pontuar(html);
+    }
+
     /**
      * Detecta o tipo de página baseado no conteúdo HTML
      */
     detectPageType(html) {
         if (!html) return 'unknown';
 
-        const htmlLower = html.toLowerCase();
-
-        // Palavras-chave para diferentes tipos
-        const patterns = {
-            clinicas: ['clínica', 'clinica', 'clinic', 'código da clínica', 'lista de clínicas'],
-            pacientes: ['paciente', 'patient', 'prontuário', 'prontuario', 'lista de pacientes'],
-            exames: ['exame', 'exam', 'resultado', 'laboratorial', 'lista de exames'],
-            evolucoes: ['evolução', 'evolucao', 'evolution', 'nota médica', 'evolução médica'],
-            prontuario: ['prontuário completo', 'dados do paciente', 'histórico médico', 'ficha médica']
-        };
-
-        let scores = {};
-        
-        // Calcula score para cada tipo baseado nas palavras-chave
-        for (const [tipo, keywords] of Object.entries(patterns)) {
-            scores[tipo] = 0;
-            for (const keyword of keywords) {
-                const regex = new RegExp(keyword, 'gi');
-                const matches = htmlLower.match(regex);
-                if (matches) {
-                    scores[tipo] += matches.length;
-                }
-            }
-        }
+        const scores = this.scorePageTypes(html);
 
         // Retorna o tipo com maior score
         const maxScore = Math.max(...Object.values(scores));
@@ -427,7 +451,8 @@ class HICDParser {
     }
 
     /**
-     * Parse múltiplo - tenta todos os parsers
+     * Parse múltiplo - aplica os parsers dos tipos com score > 0, do maior para
+     * o menor score. Sem nenhuma palavra-chave reconhecida, tenta todos.
      */
     parseMultiple(html, context = {}) {
         const resultados = {
@@ -435,26 +460,32 @@ class HICDParser {
             dados: {}
         };
 
-        // Tenta cada parser
-        const parsers = [
-            { nome: 'clinicas', metodo: () => this.parseClinicas(html) },
-            { nome: 'pacientes', metodo: () => this.parsePacientes(html, context.codigoClinica) },
-            { nome: 'exames', metodo: () => this.parseExames(html, context.prontuario) },
-            { nome: 'evolucoes', metodo: () => this.parseEvolucoes(html, context.prontuario) },
-            { nome: 'prontuario', metodo: () => this.parseProntuario(html, context.prontuario) }
-        ];
+        const parsers = {
+            clinicas: () => this.parseClinicas(html),
+            pacientes: () => this.parsePacientes(html, context.codigoClinica),
+            exames: () => this.parseExames(html, context.prontuario),
+            evolucoes: () => this.parseEvolucoes(html, context.prontuario),
+            prontuario: () => this.parseProntuario(html, context.prontuario)
+        };
+
+        const scores = this.scorePageTypes(html);
+        let tipos = Object.keys(parsers)
+            .filter(tipo => scores[tipo] > 0)
+            .sort((a, b) => scores[b] - scores[a]);
+        if (tipos.length === 0) tipos = Object.keys(parsers);
+        this.debug('Parse múltiplo - tipos candidatos:', tipos.join(', '));
 
-        for (const parser of parsers) {
+        for (const nome of tipos) {
             try {
-                const resultado = parser.metodo();
+                const resultado = parsers[nome]();
                 if (resultado && (Array.isArray(resultado) ? resultado.length > 0 : Object.keys(resultado).length > 0)) {
-                    resultados.dados[parser.nome] = resultado;
-                    this.debug(`Parse ${parser.nome} bem-sucedido:`, { 
+                    resultados.dados[nome] = resultado;
+                    this.debug(`Parse ${nome} bem-sucedido:`, { 
                         count: Array.isArray(resultado) ? resultado.length : 'objeto' 
                     });
                 }
             } catch (error) {
-                this.debug(`Parse ${parser.nome} falhou:`, error.message);
+                this.debug(`Parse ${nome} falhou:`, error.message);
             }
         }
 
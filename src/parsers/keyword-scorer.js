@@ -0,0 +1,143 @@
+/**
+ * Contador de palavras-chave por grupo em uma única passada (Aho–Corasick).
+ *
+ * O autômato é montado uma vez com todas as palavras de todos os grupos e
+ * compilado numa tabela de transições densa (estado × símbolo), de modo que
+ * `pontuar(texto)` lê cada caractere uma vez, com uma consulta de tabela por
+ * caractere. O resultado é, por grupo, o número de ocorrências das suas
+ * palavras — o mesmo que somar `texto.match(new RegExp(palavra, 'gi')).length`
+ * palavra a palavra (para palavras que não se sobrepõem a si mesmas).
+ *
+ * Palavras são literais (sem regex), comparadas por unidade UTF-16. Com
+ * `ignorarCaixa` a normalização é feita na própria tabela de símbolos
+ * (maiúscula e minúscula de cada caractere das palavras levam ao mesmo
+ * símbolo), sem copiar o texto com toLowerCase().
+ */
+class KeywordScorer {
+    /**
+     * @param {Object<string, string[]>} grupos - nome do grupo → palavras-chave
+     * @param {object} [opcoes]
+     * @param {boolean} [opcoes.ignorarCaixa=false]
+     */
+    constructor(grupos, opcoes = {}) {
+        this.grupos = Object.keys(grupos);
+        this.ignorarCaixa = Boolean(opcoes.ignorarCaixa);
+
+        const palavras = [];
+        this.grupos.forEach((grupo, indice) => {
+            for (const palavra of grupos[grupo]) {
+                if (palavra) palavras.push({ texto: this.ignorarCaixa ? palavra.toLowerCase() : palavra, grupo: indice });
+            }
+        });
+
+        this._montarAlfabeto(palavras);
+        const trie = this._montarTrie(palavras);
+        this._compilar(trie);
+    }
+
+    /**
+     * Conta as ocorrências das palavras de cada grupo no texto.
+     * @param {string} texto
+     * @returns {Object<string, number>} grupo → ocorrências (todos os grupos presentes)
+     */
+    pontuar(texto) {
+        const contagem = new Array(this.grupos.length).fill(0);
+        const { simbolos, tabela, largura, saidas } = this;
+        let estado = 0;
+
+        for (let i = 0; i < texto.length; i++) {
+            const simbolo = simbolos[texto.charCodeAt(i)];
+            // Caractere fora de todas as palavras: nenhuma correspondência em andamento sobrevive
+            if (simbolo === 0) {
+                estado = 0;
+                continue;
+            }
+            estado = tabela[estado * largura + simbolo];
+            const saida = saidas[estado];
+            if (saida !== null) {
+                for (let k = 0; k < saida.length; k++) contagem[saida[k]]++;
+            }
+        }
+
+        const resultado = {};
+        this.grupos.forEach((grupo, indice) => { resultado[grupo] = contagem[indice]; });
+        return resultado;
+    }
+
+    // ── Construção ───────────────────────────────────────────────────────────
+
+    /** Símbolo por unidade UTF-16 (0 = caractere que não aparece em nenhuma palavra). */
+    _montarAlfabeto(palavras) {
+        this.simbolos = new Uint16Array(65536);
+        let proximo = 1;
+        for (const { texto } of palavras) {
+            for (const ch of texto) {
+                const codigo = ch.charCodeAt(0);
+                if (this.simbolos[codigo] !== 0) continue;
+                this.simbolos[codigo] = proximo;
+                if (this.ignorarCaixa) {
+                    const maiuscula = ch.toUpperCase();
+                    if (maiuscula.length === 1) this.simbolos[maiuscula.charCodeAt(0)] = proximo;
+                }
+                proximo++;
+            }
+        }
+        this.largura = proximo;
+    }
+
+    _montarTrie(palavras) {
+        const trie = [{ filhos: new Map(), falha: 0, saida: [] }];
+        for (const { texto, grupo } of palavras) {
+            let estado = 0;
+            for (let i = 0; i < texto.length; i++) {
+                const simbolo = this.simbolos[texto.charCodeAt(i)];
+                let filho = trie[estado].filhos.get(simbolo);
+                if (filho === undefined) {
+                    filho = trie.length;
+                    trie.push({ filhos: new Map(), falha: 0, saida: [] });
+                    trie[estado].filhos.set(simbolo, filho);
+                }
+                estado = filho;
+            }
+            trie[estado].saida.push(grupo);
+        }
+        return trie;
+    }
+
+    /**
+     * BFS a partir da raiz calculando as falhas e preenchendo a tabela densa:
+     * transição ausente = transição do estado de falha (já calculada, por ser mais raso).
+     */
+    _compilar(trie) {
+        const largura = this.largura;
+        this.tabela = new Int32Array(trie.length * largura);
+        this.saidas = new Array(trie.length).fill(null);
+
+        const fila = [];
+        for (const [simbolo, filho] of trie[0].filhos) {
+            this.tabela[simbolo] = filho;
+            fila.push(filho);
+        }
+
+        for (let cabeca = 0; cabeca < fila.length; cabeca++) {
+            const estado = fila[cabeca];
+            const no = trie[estado];
+            // Palavras que terminam no sufixo (estado de falha) também terminam aqui
+            const saida = no.saida.concat(this.saidas[no.falha] || []);
+            this.saidas[estado] = saida.length > 0 ? saida : null;
+
+            for (let simbolo = 1; simbolo < largura; simbolo++) {
+                const filho = no.filhos.get(simbolo);
+                if (filho === undefined) {
+                    this.tabela[estado * largura + simbolo] = this.tabela[no.falha * largura + simbolo];
+                } else {
+                    trie[filho].falha = estado === 0 ? 0 : this.tabela[no.falha * largura + simbolo];
+                    this.tabela[estado * largura + simbolo] = filho;
+                    fila.push(filho);
+                }
+            }
+        }
+    }
+}
+
+module.exports = KeywordScorer;
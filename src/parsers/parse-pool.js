@@ -0,0 +1,223 @@
+const os = require('os');
+const path = require('path');
+const { Worker } = require('worker_threads');
+const { performance } = require('perf_hooks');
+const { resumirDuracoes } = require('../core/timing');
+
+/**
+ * Pool de worker_threads para parse de HTML fora do event loop da API.
+ *
+ * Os services entregam o HTML bruto (via HICDParser.parseAsync) e recebem de
+ * volta objetos simples. Com o pool desligado (PARSE_POOL_ENABLED != 'true',
+ * o default) o parse roda na própria thread, como antes — mesma interface e
+ * mesmas métricas, para comparar os dois modos.
+ *
+ * Métricas (getStats): profundidade da fila, tarefas em voo e, por método de
+ * parse, chamadas/erros e tempo de CPU do parse medido dentro da thread que
+ * o executou (o parse é síncrono, então tempo de parede ≈ CPU).
+ */
+
+/** Métodos do HICDParser que podem ser executados no pool. */
+const METODOS_PERMITIDOS = [
+    'parseResultadosExames',
+    'parseExames',
+    'parseEvolucoes',
+    'parseProntuario',
+    'parsePrescricoes',
+    'parsePrescricaoDetalhes'
+];
+
+const WORKER_SCRIPT = path.join(__dirname, 'parse-worker.js');
+// Amostras de duração guardadas por método (janela para os percentis)
+const MAX_AMOSTRAS = 1000;
+
+class ParsePool {
+    /**
+     * @param {object} [options]
+     * @param {boolean} [options.habilitado] - default PARSE_POOL_ENABLED === 'true'
+     * @param {number} [options.tamanho] - workers (default PARSE_POOL_SIZE ou nº de CPUs - 1, mínimo 1)
+     * @param {string} [options.script] - script do worker (testes)
+     */
+    constructor(options = {}) {
+        this.habilitado = options.habilitado ?? process.env.PARSE_POOL_ENABLED === 'true';
+        this.tamanho = Math.max(1, options.tamanho || parseInt(process.env.PARSE_POOL_SIZE) || os.cpus().length - 1);
+        this.script = options.script || WORKER_SCRIPT;
+
+        this.workers = [];
+        this.livres = [];
+        this.fila = [];
+        this.emVoo = new Map(); // id -> { tarefa, worker }
+        this.proximoId = 1;
+
+        this.stats = { executadas: 0, erros: 0, maxFila: 0, workersReiniciados: 0 };
+        this.porMetodo = new Map();
+    }
+
+    /**
+     * Executa `metodo` do HICDParser com `args`.
+     * @param {string} metodo - um de METODOS_PERMITIDOS
+     * @param {Array} args - argumentos (clonáveis: HTML, ids...)
+     * @param {object} [contexto]
+     * @param {string} [contexto.origin] - origin do host (URLs montadas pelo parser)
+     * @param {object} [contexto.local] - HICDParser para o modo em processo
+     * @returns {Promise<*>} resultado do parse
+     */
+    executar(metodo, args, contexto = {}) {
+        if (!METODOS_PERMITIDOS.includes(metodo)) {
+            return Promise.reject(new Error(`METODO_NAO_PERMITIDO: ${metodo}`));
+        }
+        if (!this.habilitado) {
+            return this._executarLocal(metodo, args, contexto.local);
+        }
+
+        return new Promise((resolve, reject) => {
+            this.fila.push({ id: this.proximoId++, metodo, args, origin: contexto.origin, resolve, reject });
+            this.stats.maxFila = Math.max(this.stats.maxFila, this.fila.length);
+            this._despachar();
+        });
+    }
+
+    /** Liga/desliga o pool em tempo de execução (desligar encerra os workers). */
+    async setHabilitado(habilitado) {
+        this.habilitado = Boolean(habilitado);
+        if (!this.habilitado) await this.encerrar();
+    }
+
+    /** Métricas do pool. */
+    getStats() {
+        const porMetodo = {};
+        for (const [metodo, m] of this.porMetodo) {
+            porMetodo[metodo] = { chamadas: m.chamadas, erros: m.erros, cpuMs: resumirDuracoes(m.duracoes) };
+        }
+        return {
+            modo: this.habilitado ? 'workers' : 'local',
+            workers: this.workers.length,
+            tamanho: this.tamanho,
+            naFila: this.fila.length,
+            emVoo: this.emVoo.size,
+            ...this.stats,
+            porMetodo
+        };
+    }
+
+    /** Encerra os workers; tarefas pendentes são rejeitadas. */
+    async encerrar() {
+        const workers = this.workers;
+        this.workers = [];
+        this.livres = [];
+        for (const tarefa of this.fila.splice(0)) {
+            tarefa.reject(new Error('PARSE_POOL_ENCERRADO: pool encerrado com tarefa na fila'));
+        }
+        await Promise.all(workers.map(w => w.terminate()));
+    }
+
+    // ── Internos ─────────────────────────────────────────────────────────────
+
+    async _executarLocal(metodo, args, local) {
+        if (!local || typeof local[metodo] !== 'function') {
+            throw new Error(`PARSER_LOCAL_AUSENTE: ${metodo}`);
+        }
+        const inicio = performance.now();
+        try {
+            const resultado = local[metodo](...args);
+            this._registrar(metodo, performance.now() - inicio, true);
+            return resultado;
+        } catch (error) {
+            this._registrar(metodo, performance.now() - inicio, false);
+            throw error;
+        }
+    }
+
+    _despachar() {
+        while (this.fila.length > 0) {
+            let worker = this.livres.pop();
+            if (!worker) {
+                if (this.workers.length >= this.tamanho) return;
+                worker = this._criarWorker();
+            }
+            const tarefa = this.fila.shift();
+            this.emVoo.set(tarefa.id, { tarefa, worker });
+            worker.ref();
+            worker.postMessage({ id: tarefa.id, metodo: tarefa.metodo, args: tarefa.args, origin: tarefa.origin });
+        }
+    }
+
+    _criarWorker() {
+        const worker = new Worker(this.script);
+        this.workers.push(worker);
+
+        worker.on('message', (msg) => {
+            const voo = this.emVoo.get(msg.id);
+            if (!voo) return;
+            this.emVoo.delete(msg.id);
+            this._registrar(voo.tarefa.metodo, msg.duracaoMs, msg.ok);
+
+            if (msg.ok) {
+                voo.tarefa.resolve(msg.resultado);
+            } else {
+                const erro = new Error(msg.erro.message);
+                if (msg.erro.code) erro.code = msg.erro.code;
+                voo.tarefa.reject(erro);
+            }
+
+            if (this.workers.includes(worker)) {
+                this.livres.push(worker);
+                // Ocioso não segura o processo aberto
+                if (this.fila.length === 0) worker.unref();
+            }
+            this._despachar();
+        });
+
+        worker.on('error', (error) => this._descartarWorker(worker, error));
+        worker.on('exit', (codigo) => {
+            if (codigo !== 0) this._descartarWorker(worker, new Error(`PARSE_WORKER_ENCERRADO: código ${codigo}`));
+        });
+
+        return worker;
+    }
+
+    /** Worker morreu: rejeita o que estava nele e segue com os demais (novo worker sob demanda). */
+    _descartarWorker(worker, error) {
+        if (!this.workers.includes(worker)) return;
+        console.error('[PARSE-POOL] Worker de parse falhou:', error.message);
+        this.workers = this.workers.filter(w => w !== worker);
+        this.livres = this.livres.filter(w => w !== worker);
+        this.stats.workersReiniciados++;
+
+        for (const [id, voo] of this.emVoo) {
+            if (voo.worker !== worker) continue;
+            this.emVoo.delete(id);
+            this._registrar(voo.tarefa.metodo, 0, false);
+            voo.tarefa.reject(error);
+        }
+        this._despachar();
+    }
+
+    _registrar(metodo, duracaoMs, ok) {
+        let m = this.porMetodo.get(metodo);
+        if (!m) {
+            m = { chamadas: 0, erros: 0, duracoes: [] };
+            this.porMetodo.set(metodo, m);
+        }
+        m.chamadas++;
+        this.stats.executadas++;
+        if (!ok) {
+            m.erros++;
+            this.stats.erros++;
+        }
+        m.duracoes.push(duracaoMs);
+        if (m.duracoes.length > MAX_AMOSTRAS) m.duracoes.shift();
+    }
+}
+
+// Pool único do processo (dimensionado pelos núcleos, compartilhado entre hosts)
+let instancia = null;
+
+function obterParsePool() {
+    if (!instancia) instancia = new ParsePool();
+    return instancia;
+}
+
+module.exports = ParsePool;
+module.exports.METODOS_PERMITIDOS = METODOS_PERMITIDOS;
+module.exports.obterParsePool = obterParsePool;
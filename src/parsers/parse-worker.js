@@ -0,0 +1,43 @@
+/**
+ * Worker de parse (worker_threads) usado pelo ParsePool.
+ *
+ * Recebe { id, metodo, args, origin }, executa o método do HICDParser sobre o
+ * HTML bruto e devolve { id, ok, resultado, duracaoMs } — só objetos simples
+ * atravessam a fronteira da thread. Um HICDParser por origin (host), criado
+ * sob demanda e reaproveitado.
+ */
+const { parentPort } = require('worker_threads');
+const { performance } = require('perf_hooks');
+const HICDParser = require('./hicd-parser');
+const { METODOS_PERMITIDOS } = require('./parse-pool');
+
+const parsers = new Map();
+
+function obterParser(origin) {
+    const chave = origin || '';
+    let parser = parsers.get(chave);
+    if (!parser) {
+        parser = new HICDParser({ origin: origin || undefined });
+        parser.setDebugMode(false);
+        parsers.set(chave, parser);
+    }
+    return parser;
+}
+
+parentPort.on('message', ({ id, metodo, args, origin }) => {
+    const inicio = performance.now();
+    try {
+        if (!METODOS_PERMITIDOS.includes(metodo)) {
+            throw new Error(`METODO_NAO_PERMITIDO: ${metodo}`);
+        }
+        const resultado = obterParser(origin)[metodo](...args);
+        parentPort.postMessage({ id, ok: true, resultado, duracaoMs: performance.now() - inicio });
+    } catch (error) {
+        parentPort.postMessage({
+            id,
+            ok: false,
+            erro: { message: error.message, code: error.code },
+            duracaoMs: performance.now() - inicio
+        });
+    }
+});
@@ -0,0 +1,134 @@
+/**
+ * Tokenizador de seções do texto de uma evolução.
+ *
+ * Uma evolução do HICD é texto corrido com títulos de seção ("Conduta:",
+ * "Dispositivos:", "HDA:"...). Em vez de montar um RegExp por título a cada
+ * evolução, todos os títulos conhecidos ficam num único padrão compilado no
+ * carregamento do módulo e o texto é varrido uma vez, registrando onde cada
+ * título aparece. Os parsers de seção recebem então o trecho já delimitado.
+ *
+ * A delimitação reproduz a de EvolucaoParser.parseSecaoSimples: o corpo de
+ * uma seção vai do primeiro "Título:" (sem diferenciar caixa) até o próximo
+ * título de OUTRA seção seguido de ":" — ou o fim do texto.
+ */
+
+// Seções conhecidas do HICD, usadas como delimitadores de fim de seção.
+// Evita falsos positivos de lookahead genérico com textos clínicos.
+const SECOES_DELIMITADORAS = [
+    'Hipóteses Diagnósticas', 'Hipóteses diagnósticas',
+    'Diagnósticos anteriores',
+    'Em uso', 'Medicações em Uso', 'Medicações em uso',
+    'Fez uso', 'Fez Uso', 'Dispositivos', 'Conduta', 'Pendências',
+    'Exames Complementares', 'Gasometria',
+    'Controle 24h', 'Controle 24 h', 'BH 24h', 'BH 24 h',
+    'Diurese', 'Balanço hídrico',
+    'Evolução médica', 'Exame Físico', 'AO EXAME FISICO',
+    'Nome', 'Identificação',
+    'HDA', 'HPP', 'HF', 'HSE', 'Admissão emergência', 'Admissão UTIP',
+    // Subseções comuns em evoluções cirúrgicas / UTI
+    'Hemoderivados', 'Culturas', 'Procedimentos', 'Pareceres',
+    'Diagnóstico Pré-Operatório', 'Diagnóstico Pós-Operatório',
+];
+
+const escapar = s => s.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
+const chaveDe = titulo => titulo.toLowerCase();
+
+// Um único padrão para todos os títulos (mais longos primeiro, para a
+// alternância não parar num prefixo)
+const RE_TITULOS = new RegExp(
+    `(?:${[...SECOES_DELIMITADORAS].sort((a, b) => b.length - a.length).map(escapar).join('|')}):`,
+    'gi'
+);
+const RE_ESPACOS = /\s*/y;
+
+// Título → chaves que encerram a sua seção (todas menos o próprio título,
+// comparado como em parseSecaoSimples: pela grafia exata)
+const terminadoresPorTitulo = new Map();
+// Títulos fora da lista: RegExp compilado uma vez por título
+const regexPorTituloAvulso = new Map();
+
+function terminadoresDe(titulo) {
+    let terminadores = terminadoresPorTitulo.get(titulo);
+    if (!terminadores) {
+        terminadores = new Set(SECOES_DELIMITADORAS.filter(s => s !== titulo).map(chaveDe));
+        terminadoresPorTitulo.set(titulo, terminadores);
+    }
+    return terminadores;
+}
+
+/**
+ * Varre o texto uma vez e localiza todos os títulos de seção.
+ * @param {string} texto
+ * @returns {{ texto: string, marcadores: Array<{ chave: string, inicio: number, fim: number }>,
+ *            primeiro: Map<string, { chave, inicio, fim }> }}
+ *          marcadores em ordem de posição (inclusive títulos sobrepostos, ex.:
+ *          "em uso:" dentro de "Medicações em uso:"); `fim` = logo após o ":".
+ */
+function tokenizarSecoes(texto) {
+    const marcadores = [];
+    const primeiro = new Map();
+    if (!texto) return { texto: texto || '', marcadores, primeiro };
+
+    RE_TITULOS.lastIndex = 0;
+    let match;
+    while ((match = RE_TITULOS.exec(texto)) !== null) {
+        const marcador = { chave: chaveDe(match[0].slice(0, -1)), inicio: match.index, fim: match.index + match[0].length };
+        marcadores.push(marcador);
+        if (!primeiro.has(marcador.chave)) primeiro.set(marcador.chave, marcador);
+        // Continua do caractere seguinte: um título pode começar dentro de outro
+        RE_TITULOS.lastIndex = match.index + 1;
+    }
+    return { texto, marcadores, primeiro };
+}
+
+/**
+ * Corpo bruto (sem trim) da seção `titulo`, ou null se o título não aparece.
+ * @param {ReturnType<typeof tokenizarSecoes>} secoes
+ * @param {string} titulo - grafia como em SECOES_DELIMITADORAS
+ */
+function corpoDaSecao(secoes, titulo) {
+    const { texto, marcadores } = secoes;
+    const abertura = secoes.primeiro.get(chaveDe(titulo));
+
+    if (!abertura) {
+        if (SECOES_DELIMITADORAS.includes(titulo)) return null;
+        return corpoDeTituloAvulso(texto, titulo);
+    }
+
+    RE_ESPACOS.lastIndex = abertura.fim;
+    RE_ESPACOS.test(texto);
+    const inicio = RE_ESPACOS.lastIndex;
+
+    const terminadores = terminadoresDe(titulo);
+    let fim = texto.length;
+    for (const marcador of marcadores) {
+        if (marcador.inicio >= inicio && terminadores.has(marcador.chave)) {
+            fim = marcador.inicio;
+            break;
+        }
+    }
+    return texto.slice(inicio, fim);
+}
+
+/** Título fora da lista conhecida: mesma regra, com o RegExp do título em cache. */
+function corpoDeTituloAvulso(texto, titulo) {
+    let regex = regexPorTituloAvulso.get(titulo);
+    if (!regex) {
+        const lookahead = SECOES_DELIMITADORAS.map(escapar).join('|');
+        regex = new RegExp(`${escapar(titulo)}:\\s*([\\s\\S]*?)(?=(?:${lookahead}):|$)`, 'i');
+        regexPorTituloAvulso.set(titulo, regex);
+    }
+    const match = texto.match(regex);
+    return match ? match[1] : null;
+}
+
+/**
+ * Texto a partir do primeiro `titulo` (ou null se ausente). Para rodar
+ * o regex específico de uma seção sem varrer o que vem antes do título.
+ */
+function textoAPartirDe(secoes, titulo) {
+    const marcador = secoes.primeiro.get(chaveDe(titulo));
+    return marcador ? secoes.texto.slice(marcador.inicio) : null;
+}
+
+module.exports = { SECOES_DELIMITADORAS, tokenizarSecoes, corpoDaSecao, textoAPartirDe };
@@ -0,0 +1,243 @@
+const fs = require('fs').promises;
+const path = require('path');
+
+/**
+ * Crawl completo do hospital com saída NDJSON incremental e retomada.
+ *
+ * Cada registro de paciente é anexado ao arquivo NDJSON assim que produzido
+ * (uma linha JSON por paciente), e um checkpoint ao lado do arquivo guarda as
+ * clínicas já concluídas. Numa nova execução com o mesmo arquivo:
+ *   - clínicas concluídas são puladas;
+ *   - o cursor de pacientes de clínicas em andamento vem do próprio NDJSON
+ *     (pares clínica/prontuário já gravados), então nada é duplicado mesmo se
+ *     o processo morrer entre a gravação do registro e a do checkpoint;
+ *   - uma última linha truncada (queda no meio da escrita) é descartada.
+ *
+ * As clínicas rodam em paralelo (`concorrencia` workers); o ritmo real de
+ * requisições é do rate limiter por host do http-client.
+ */
+class CheckpointedCrawl {
+    /**
+     * @param {object} crawler - expõe getClinicas() e buscarPacientesClinica(codigo) (HICDCrawler).
+     *        Usa a variante que lança erro: getPacientesClinica devolve [] numa falha, e a
+     *        clínica seria marcada como concluída sem nenhum paciente.
+     * @param {object} opcoes
+     * @param {string} opcoes.arquivo - caminho do NDJSON de saída
+     * @param {string} [opcoes.checkpoint] - caminho do checkpoint (default `${arquivo}.checkpoint.json`)
+     * @param {number} [opcoes.concorrencia] - clínicas em paralelo (default CRAWL_CONCURRENCY ou 3)
+     * @param {Function} [opcoes.enriquecer] - async (paciente, clinica) => objeto extra mesclado ao registro
+     * @param {Function} [opcoes.onProgresso] - (stats) chamado a cada clínica concluída
+     */
+    constructor(crawler, opcoes = {}) {
+        if (!opcoes.arquivo) {
+            throw new Error('ARQUIVO_OBRIGATORIO: informe o caminho do NDJSON de saída');
+        }
+        this.crawler = crawler;
+        this.arquivo = opcoes.arquivo;
+        this.arquivoCheckpoint = opcoes.checkpoint || `${opcoes.arquivo}.checkpoint.json`;
+        this.concorrencia = Math.max(1, parseInt(opcoes.concorrencia) || parseInt(process.env.CRAWL_CONCURRENCY) || 3);
+        this.enriquecer = opcoes.enriquecer || null;
+        this.onProgresso = opcoes.onProgresso || null;
+
+        this.checkpoint = null;
+        // "clinica|prontuario" já gravados no NDJSON
+        this.gravados = new Set();
+        this.registros = 0;
+        this.registrosSessao = 0;
+        this.inicioSessao = 0;
+        // Escritas serializadas (append do NDJSON e checkpoint)
+        this._escrita = Promise.resolve();
+    }
+
+    /**
+     * Executa (ou retoma) o crawl.
+     * @returns {Promise<object>} resumo { arquivo, clinicas, clinicasConcluidas, falhas,
+     *          registros, registrosSessao, duracaoMs, registrosPorMinuto, retomado }
+     */
+    async executar() {
+        this.inicioSessao = Date.now();
+        await fs.mkdir(path.dirname(path.resolve(this.arquivo)), { recursive: true });
+
+        const retomado = await this._carregarEstado();
+        if (retomado) {
+            console.log(`[CRAWL] ↻ Retomando ${this.arquivo}: ${this.registros} registros, ` +
+                `${this.checkpoint.concluidas.length} clínica(s) concluída(s)`);
+        }
+
+        const clinicas = (await this.crawler.getClinicas()).filter(c => c.codigo !== '0');
+        const concluidas = new Set(this.checkpoint.concluidas);
+        const pendentes = clinicas.filter(c => !concluidas.has(String(c.codigo)));
+        const falhas = [];
+
+        console.log(`[CRAWL] ${pendentes.length}/${clinicas.length} clínica(s) pendente(s), ${this.concorrencia} em paralelo`);
+
+        let proxima = 0;
+        const worker = async () => {
+            while (proxima < pendentes.length) {
+                const clinica = pendentes[proxima++];
+                try {
+                    await this._processarClinica(clinica);
+                    this.checkpoint.concluidas.push(String(clinica.codigo));
+                    await this._salvarCheckpoint();
+                    this._reportar(clinica);
+                } catch (error) {
+                    console.error(`[CRAWL] ❌ ${clinica.nome}: ${error.message}`);
+                    falhas.push({ codigo: clinica.codigo, nome: clinica.nome, erro: error.message });
+                    // Sessão morta e sem re-login: não adianta seguir — o checkpoint permite retomar.
+                    if (error.code === 'SESSION_EXPIRED') throw error;
+                }
+            }
+        };
+
+        try {
+            await Promise.all(Array.from({ length: Math.min(this.concorrencia, pendentes.length) }, worker));
+        } finally {
+            await this._salvarCheckpoint();
+        }
+
+        const resumo = {
+            arquivo: this.arquivo,
+            clinicas: clinicas.length,
+            clinicasConcluidas: this.checkpoint.concluidas.length,
+            falhas,
+            registros: this.registros,
+            registrosSessao: this.registrosSessao,
+            ...this._ritmo(),
+            retomado
+        };
+
+        if (falhas.length === 0 && resumo.clinicasConcluidas >= clinicas.length) {
+            this.checkpoint.finalizadoEm = new Date().toISOString();
+            await this._salvarCheckpoint();
+        }
+
+        console.log(`[CRAWL] ✅ ${resumo.registrosSessao} registro(s) nesta execução ` +
+            `(${resumo.registros} no arquivo) em ${Math.round(resumo.duracaoMs / 1000)}s — ` +
+            `${resumo.registrosPorMinuto} registros/min`);
+        return resumo;
+    }
+
+    // ── Internos ─────────────────────────────────────────────────────────────
+
+    async _processarClinica(clinica) {
+        const codigo = String(clinica.codigo);
+        const pacientes = await this.crawler.buscarPacientesClinica(clinica.codigo);
+
+        for (const paciente of pacientes) {
+            const chave = `${codigo}|${paciente.prontuario}`;
+            if (this.gravados.has(chave)) continue;
+
+            const extra = this.enriquecer ? await this.enriquecer(paciente, clinica) : null;
+            const registro = {
+                clinica: clinica.nome,
+                clinicaCodigo: codigo,
+                paciente,
+                ...(extra || {}),
+                timestamp: new Date().toISOString()
+            };
+
+            await this._anexar(registro);
+            this.gravados.add(chave);
+            this.registros++;
+            this.registrosSessao++;
+        }
+    }
+
+    _anexar(registro) {
+        const linha = JSON.stringify(registro) + '\n';
+        return this._enfileirarEscrita(() => fs.appendFile(this.arquivo, linha, 'utf8'));
+    }
+
+    _salvarCheckpoint() {
+        return this._enfileirarEscrita(async () => {
+            const dados = {
+                ...this.checkpoint,
+                registros: this.registros,
+                atualizadoEm: new Date().toISOString()
+            };
+            // Escrita atômica: um checkpoint pela metade não pode impedir a retomada
+            const temporario = `${this.arquivoCheckpoint}.tmp`;
+            await fs.writeFile(temporario, JSON.stringify(dados, null, 2), 'utf8');
+            await fs.rename(temporario, this.arquivoCheckpoint);
+        });
+    }
+
+    // Uma escrita que falha rejeita só quem a pediu; a fila segue para as próximas.
+    _enfileirarEscrita(fn) {
+        const escrita = this._escrita.then(fn);
+        this._escrita = escrita.catch(() => {});
+        return escrita;
+    }
+
+    /**
+     * Carrega checkpoint e NDJSON existentes. Retorna true se é uma retomada.
+     */
+    async _carregarEstado() {
+        let checkpoint = null;
+        try {
+            checkpoint = JSON.parse(await fs.readFile(this.arquivoCheckpoint, 'utf8'));
+        } catch (error) {
+            if (error.code !== 'ENOENT') {
+                console.warn(`[CRAWL] Checkpoint ilegível (${error.message}) — reconstruindo a partir do NDJSON`);
+            }
+        }
+
+        let conteudo = '';
+        try {
+            conteudo = await fs.readFile(this.arquivo, 'utf8');
+        } catch (error) {
+            if (error.code !== 'ENOENT') throw error;
+        }
+
+        if (conteudo) {
+            // Linha final sem '\n' = escrita interrompida; descarta e regrava o arquivo sem ela
+            const fim = conteudo.lastIndexOf('\n') + 1;
+            if (fim < conteudo.length) {
+                conteudo = conteudo.slice(0, fim);
+                await fs.writeFile(this.arquivo, conteudo, 'utf8');
+            }
+            for (const linha of conteudo.split('\n')) {
+                if (!linha) continue;
+                try {
+                    const registro = JSON.parse(linha);
+                    this.gravados.add(`${registro.clinicaCodigo}|${registro.paciente && registro.paciente.prontuario}`);
+                    this.registros++;
+                } catch (_) {
+                    // linha corrompida: ignorada (o paciente será regravado)
+                }
+            }
+        }
+
+        this.checkpoint = {
+            iniciadoEm: (checkpoint && checkpoint.iniciadoEm) || new Date().toISOString(),
+            arquivo: this.arquivo,
+            concluidas: (checkpoint && Array.isArray(checkpoint.concluidas)) ? checkpoint.concluidas : []
+        };
+        return Boolean(checkpoint || conteudo);
+    }
+
+    _ritmo() {
+        const duracaoMs = Date.now() - this.inicioSessao;
+        const minutos = duracaoMs / 60000;
+        return {
+            duracaoMs,
+            registrosPorMinuto: minutos > 0 ? Math.round(this.registrosSessao / minutos) : 0
+        };
+    }
+
+    _reportar(clinica) {
+        const { registrosPorMinuto } = this._ritmo();
+        console.log(`[CRAWL] ✔ ${clinica.nome} — ${this.registros} registros no total, ${registrosPorMinuto} registros/min`);
+        if (this.onProgresso) {
+            this.onProgresso({
+                clinica: clinica.nome,
+                clinicasConcluidas: this.checkpoint.concluidas.length,
+                registros: this.registros,
+                registrosSessao: this.registrosSessao,
+                registrosPorMinuto
+            });
+        }
+    }
+}
+
+module.exports = CheckpointedCrawl;
@@ -0,0 +1,35 @@
+/**
+ * Estado de serviço que pertence ao host HICD, não à sessão.
+ *
+ * O crawler de um host é recriado a cada login, renovação de sessão e, no modo
+ * cluster, adoção da sessão aberta por outro worker (api/shared-crawler.js).
+ * Índices caros de reconstruir (leitos, diretório por nome, histórico de
+ * evoluções) ficam aqui, no módulo, como SignedPrescriptionCache.compartilhado:
+ * o crawler novo do host encontra os do anterior em vez de recomeçar frio.
+ */
+
+// Classe → Map<host, instância>
+const porClasse = new Map();
+
+/**
+ * Instância de `Classe` do host, criada na primeira vez. Sem host, uma nova
+ * (serviço usado fora de um crawler, como nos testes).
+ * @param {Function} Classe - construída sem argumentos
+ * @param {string|null} [host]
+ */
+function estadoDoHost(Classe, host) {
+    if (!host) return new Classe();
+    let porHost = porClasse.get(Classe);
+    if (!porHost) {
+        porHost = new Map();
+        porClasse.set(Classe, porHost);
+    }
+    let instancia = porHost.get(host);
+    if (!instancia) {
+        instancia = new Classe();
+        porHost.set(host, instancia);
+    }
+    return instancia;
+}
+
+module.exports = { estadoDoHost };
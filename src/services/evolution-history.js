@@ -0,0 +1,111 @@
+/**
+ * Histórico de evoluções já processadas, por prontuário, com marca d'água.
+ *
+ * A lista de evoluções do HICD vem inteira numa única requisição, mas o
+ * custo está no parse do texto de cada evolução. O EvolutionService guarda
+ * aqui as evoluções já processadas e o instante da mais recente (marca
+ * d'água); na próxima busca o parser só processa as evoluções a partir da
+ * marca e devolve as anteriores como `{ chave, conhecida: true }`, que são
+ * trocadas pela cópia guardada. A ordem e o conjunto continuam sendo os da
+ * lista recém-buscada (evolução removida no HICD some do resultado).
+ *
+ * As cópias são guardadas sem o texto, que fica em chunks (EvolucaoStore) —
+ * o histórico não mantém uma cópia inteira de cada texto além da do cache.
+ *
+ * O histórico é por host + prontuário: cada host tem o seu (estado-por-host.js),
+ * mantido quando o crawler do host é recriado por um novo login.
+ */
+const { instanteEvolucao } = require('../parsers/evolucao-identidade');
+const EvolucaoStore = require('../core/evolucao-store');
+
+class EvolutionHistory {
+    /**
+     * @param {object} [options]
+     * @param {number} [options.maxPacientes] - prontuários guardados (os menos usados saem primeiro)
+     */
+    constructor(options = {}) {
+        this.maxPacientes = options.maxPacientes || parseInt(process.env.EVOLUCAO_HISTORICO_MAX_PACIENTES) || 500;
+
+        // prontuario -> { marcaDagua, textos: EvolucaoStore, porChave: Map<chave, [evolução sem texto, ids]> }
+        this.pacientes = new Map();
+        this.stats = { buscasIncrementais: 0, reaproveitadas: 0, processadas: 0, recomecos: 0 };
+    }
+
+    /**
+     * Opções de parse para a próxima busca do prontuário ({} = parse completo).
+     * @param {string} prontuario
+     */
+    opcoesParse(prontuario) {
+        const entrada = this.pacientes.get(String(prontuario));
+        return entrada && entrada.marcaDagua ? { marcaDagua: entrada.marcaDagua } : {};
+    }
+
+    /**
+     * Troca as evoluções conhecidas pela cópia guardada e atualiza o histórico.
+     * @param {string} prontuario
+     * @param {Array<object>} parseadas - saída do parser (com ou sem entradas `conhecida`)
+     * @returns {Array<object>|null} lista completa, ou null se alguma evolução
+     *          conhecida não está no histórico (o chamador refaz o parse completo)
+     */
+    mesclar(prontuario, parseadas) {
+        const chaveProntuario = String(prontuario);
+        const anterior = this.pacientes.get(chaveProntuario);
+        const evolucoes = [];
+        let reaproveitadas = 0;
+
+        for (const evolucao of parseadas) {
+            if (!evolucao.conhecida) {
+                evolucoes.push(evolucao);
+                continue;
+            }
+            const guardada = anterior && anterior.porChave.get(evolucao.chave);
+            if (!guardada) {
+                this.stats.recomecos++;
+                this.pacientes.delete(chaveProntuario);
+                return null;
+            }
+            evolucoes.push(EvolucaoStore.juntarTexto(guardada[0], anterior.textos.texto(guardada[1])));
+            reaproveitadas++;
+        }
+
+        if (reaproveitadas > 0) this.stats.buscasIncrementais++;
+        this.stats.reaproveitadas += reaproveitadas;
+        this.stats.processadas += evolucoes.length - reaproveitadas;
+        this.registrar(chaveProntuario, evolucoes);
+        return evolucoes;
+    }
+
+    /** Substitui o histórico do prontuário pela lista completa. */
+    registrar(prontuario, evolucoes) {
+        const chaveProntuario = String(prontuario);
+        let marcaDagua = '';
+        const textos = new EvolucaoStore();
+        const porChave = new Map();
+        for (const evolucao of evolucoes) {
+            if (evolucao.chave) {
+                const [semTexto, texto] = EvolucaoStore.separarTexto(evolucao);
+                porChave.set(evolucao.chave, [semTexto, textos.adicionar(texto)]);
+            }
+            const instante = instanteEvolucao(evolucao);
+            if (instante > marcaDagua) marcaDagua = instante;
+        }
+
+        // Reinsere no fim do Map: a ordem de inserção vira ordem de uso
+        this.pacientes.delete(chaveProntuario);
+        this.pacientes.set(chaveProntuario, { marcaDagua, textos, porChave });
+        while (this.pacientes.size > this.maxPacientes) {
+            this.pacientes.delete(this.pacientes.keys().next().value);
+        }
+    }
+
+    /** Esquece o prontuário (próxima busca faz parse completo). */
+    esquecer(prontuario) {
+        return this.pacientes.delete(String(prontuario));
+    }
+
+    getStats() {
+        return { pacientes: this.pacientes.size, ...this.stats };
+    }
+}
+
+module.exports = EvolutionHistory;
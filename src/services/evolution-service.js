@@ -1,10 +1,26 @@
+const EvolutionHistory = require('./evolution-history');
+const { estadoDoHost } = require('./estado-por-host');
+const { criarLogger } = require('../core/logger');
+
+// Uma linha por requisição de impressão inundava o log em pacientes com centenas de exames:
+// cada página é contada e só amostrada em debug; o lote termina com um resumo em info
+const logResultados = criarLogger('resultados');
+
 /**
  * Serviço para buscar e gerenciar evoluções médicas
  */
 class EvolutionService {
-    constructor(httpClient, parser) {
+    /**
+     * @param {object} httpClient
+     * @param {object} parser
+     * @param {object} [options]
+     * @param {string} [options.host] - host HICD: o histórico é o do host (sobrevive ao novo login)
+     */
+    constructor(httpClient, parser, options = {}) {
         this.httpClient = httpClient;
         this.parser = parser;
+        // Evoluções já processadas por prontuário: a busca sem filtro só faz o parse das novas
+        this.historicoEvolucoes = estadoDoHost(EvolutionHistory, options.host);
     }
 
     /**
@@ -63,7 +79,23 @@ class EvolutionService {
                 }
             });
             console.log(`[EVOLUCOES] Resposta recebida - tamanho: ${response.data.length} caracteres`);
-            const evolucoes = this.parser.parseEvolucoes(response.data, pacienteId);
+
+            // Com filtro a lista é parcial: não usa nem alimenta o histórico
+            if (filtros.filtro) {
+                return await this.parser.parseAsync('parseEvolucoes', response.data, pacienteId);
+            }
+
+            const opcoes = this.historicoEvolucoes.opcoesParse(pacienteId);
+            const parseadas = await this.parser.parseAsync('parseEvolucoes', response.data, pacienteId, opcoes);
+            let evolucoes = this.historicoEvolucoes.mesclar(pacienteId, parseadas);
+            if (!evolucoes) {
+                console.log(`[EVOLUCOES] Histórico de ${pacienteId} incompleto — refazendo parse completo`);
+                evolucoes = await this.parser.parseAsync('parseEvolucoes', response.data, pacienteId);
+                this.historicoEvolucoes.registrar(pacienteId, evolucoes);
+            } else if (opcoes.marcaDagua) {
+                const novas = parseadas.filter(e => !e.conhecida).length;
+                console.log(`[EVOLUCOES] Incremental: ${novas} processadas, ${evolucoes.length - novas} reaproveitadas`);
+            }
 
             // Remover duplicatas e mesclar evoluções similares
             // const evolucoesUnicas = this.removerDuplicatasEvolucoes(evolucoes);
@@ -165,7 +197,7 @@ class EvolutionService {
 
             console.log(`[EXAMES] Resposta recebida - tamanho: ${response.data.length} caracteres`);
             console.log(this.parser);
-            const exames = this.parser.parseExames(response.data, pacienteId);
+            const exames = await this.parser.parseAsync('parseExames', response.data, pacienteId);
 
 
             console.log(`✅ ${exames.length} requisições de exames encontradas para o paciente ${pacienteId}`);
@@ -191,16 +223,21 @@ class EvolutionService {
      * @param {string} pacienteId
      * @param {object} filtros
      * @param {Array|null} examesPreCarregados - lista já buscada pelo caller para evitar dupla requisição
+     * @param {object} [opcoes]
+     * @param {Function} [opcoes.onProgresso] - chamado com { feitas, total } (requisições de impressão) a cada batch
+     * @param {Function} [opcoes.onRequisicao] - chamado com cada requisição assim que a sua página é parseada
+     *        (ordem de chegada, não a da lista)
+     * @param {AbortSignal} [opcoes.sinal] - interrompe antes do próximo batch (ex.: cliente de stream desconectou)
      */
-    async getResultadosExames(pacienteId, filtros = {}, examesPreCarregados = null) {
+    async getResultadosExames(pacienteId, filtros = {}, examesPreCarregados = null, opcoes = {}) {
         try {
-            console.log(`🔬 Buscando resultados completos dos exames do paciente ${pacienteId}...`);
+            logResultados.debug('Buscando resultados completos dos exames', { paciente: pacienteId });
 
             // Reutilizar lista já buscada pelo caller quando disponível, evitando requisição duplicada
             const exames = examesPreCarregados ?? await this.getExames(pacienteId, filtros);
 
             if (exames.length === 0) {
-                console.log(`[RESULTADOS] Nenhum exame encontrado para o paciente ${pacienteId}`);
+                logResultados.info('Nenhum exame encontrado', { paciente: pacienteId });
                 return [];
             }
 
@@ -208,7 +245,7 @@ class EvolutionService {
             const urls = this.parser.gerarUrlsImpressao(exames, pacienteId, 'PRONT');
 
             if (urls.length === 0) {
-                console.log(`[RESULTADOS] Nenhuma URL de impressão gerada para o paciente ${pacienteId}`);
+                logResultados.info('Nenhuma URL de impressão gerada', { paciente: pacienteId });
                 return [];
             }
 
@@ -216,16 +253,29 @@ class EvolutionService {
             const DELAY_ENTRE_BATCHES_MS = parseInt(process.env.EXAM_BATCH_DELAY_MS) || 100;
             const REQUEST_TIMEOUT_MS = parseInt(process.env.EXAM_REQUEST_TIMEOUT_MS) || 15000;
 
-            console.log(`[RESULTADOS] ${urls.length} URLs — batches de ${BATCH_SIZE}, delay ${DELAY_ENTRE_BATCHES_MS}ms`);
+            logResultados.debug('Buscando páginas de impressão', {
+                paciente: pacienteId, urls: urls.length, batch: BATCH_SIZE, delayMs: DELAY_ENTRE_BATCHES_MS
+            });
 
             const resultadosCompletos = [];
+            const onProgresso = opcoes.onProgresso || (() => {});
+            const onRequisicao = opcoes.onRequisicao || (() => {});
+            onProgresso({ feitas: 0, total: urls.length });
 
             for (let i = 0; i < urls.length; i += BATCH_SIZE) {
+                if (opcoes.sinal && opcoes.sinal.aborted) {
+                    logResultados.info('Busca interrompida', { paciente: pacienteId, feitas: i, total: urls.length });
+                    break;
+                }
                 const batch = urls.slice(i, i + BATCH_SIZE);
 
                 const batchSettled = await Promise.allSettled(batch.map(async (urlInfo, batchIndex) => {
                     const globalIndex = i + batchIndex;
-                    console.log(`[RESULTADOS] Processando ${globalIndex + 1}/${urls.length} - Requisição: ${urlInfo.requisicao}`);
+                    if (logResultados.evento('pagina')) {
+                        logResultados.debug('Processando página', {
+                            paciente: pacienteId, pagina: `${globalIndex + 1}/${urls.length}`, requisicao: urlInfo.requisicao
+                        });
+                    }
 
                     const response = await this.httpClient.get(urlInfo.url, {
                         timeout: REQUEST_TIMEOUT_MS,
@@ -237,42 +287,50 @@ class EvolutionService {
                         }
                     });
 
-                    const resultados = this.parser.parseResultadosExames(response.data, urlInfo.requisicao);
+                    const resultados = await this.parser.parseAsync('parseResultadosExames', response.data, urlInfo.requisicao);
 
                     if (!resultados.length) {
-                        console.log(`[RESULTADOS] ⚠️ Nenhum resultado na requisição ${urlInfo.requisicao}`);
+                        if (logResultados.evento('pagina-vazia')) {
+                            logResultados.debug('Nenhum resultado na requisição', { requisicao: urlInfo.requisicao });
+                        }
                         return null;
                     }
 
-                    console.log(`[RESULTADOS] ✅ ${resultados.length} resultados extraídos da requisição ${urlInfo.requisicao}`);
-                    return {
+                    const resultadoCompleto = {
                         ...urlInfo,
                         resultados,
                         totalResultados: resultados.length,
                         dataProcessamento: new Date().toISOString()
                     };
+                    onRequisicao(resultadoCompleto, globalIndex);
+                    return resultadoCompleto;
                 }));
 
                 for (const settled of batchSettled) {
                     if (settled.status === 'fulfilled' && settled.value !== null) {
                         resultadosCompletos.push(settled.value);
                     } else if (settled.status === 'rejected') {
-                        console.error(`[RESULTADOS] Falha em requisição do batch:`, settled.reason?.message);
+                        logResultados.evento('pagina-falha');
+                        logResultados.warn('Falha em requisição do batch', { paciente: pacienteId, erro: settled.reason });
                     }
                 }
 
+                onProgresso({ feitas: Math.min(i + BATCH_SIZE, urls.length), total: urls.length });
+
                 if (i + BATCH_SIZE < urls.length) {
                     await new Promise(resolve => setTimeout(resolve, DELAY_ENTRE_BATCHES_MS));
                 }
             }
 
             const totalResultados = resultadosCompletos.reduce((sum, exame) => sum + exame.totalResultados, 0);
-            console.log(`[RESULTADOS] ✅ Concluído: ${resultadosCompletos.length} requisições com ${totalResultados} resultados`);
+            logResultados.info('Resultados concluídos', {
+                paciente: pacienteId, paginas: urls.length, requisicoes: resultadosCompletos.length, resultados: totalResultados
+            });
 
             return resultadosCompletos;
 
         } catch (error) {
-            console.error(`[RESULTADOS] Erro ao buscar resultados dos exames do paciente ${pacienteId}:`, error.message);
+            logResultados.error('Erro ao buscar resultados dos exames', { paciente: pacienteId, erro: error });
             return [];
         }
     }
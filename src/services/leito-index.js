@@ -0,0 +1,182 @@
+/**
+ * Índice leito → (clínica, prontuário) mantido em memória.
+ *
+ * Alimentado pelas listas de pacientes por clínica que já passam pelo
+ * PatientService (inclusive as que o ClinicasController busca para contar
+ * pacientes), de modo que a busca por leito vira um lookup em Map em vez de
+ * percorrer todas as clínicas no HICD.
+ *
+ * O índice só é considerado "fresco" quando TODAS as clínicas conhecidas foram
+ * indexadas há menos de `ttl` ms — uma clínica ausente ou velha torna o índice
+ * obsoleto e o PatientService cai no scan completo.
+ */
+
+const WS_RE = /\s+/g;
+
+/** Normaliza o leito para chave do índice (sem espaços, maiúsculo). */
+function normalizarLeito(leito) {
+    return leito ? String(leito).replace(WS_RE, '').toUpperCase() : '';
+}
+
+class LeitoIndex {
+    /**
+     * @param {object} [options]
+     * @param {number} [options.ttl] - idade máxima (ms) de cada clínica indexada
+     */
+    constructor(options = {}) {
+        this.ttl = options.ttl || parseInt(process.env.LEITO_INDEX_TTL_MS) || 10 * 60 * 1000;
+
+        // leitoNormalizado -> [{ leito, prontuario, clinicaCodigo, paciente }]
+        this.porLeito = new Map();
+        // clinicaCodigo -> { nome, atualizadoEm, leitos: Set<leitoNormalizado> }
+        this.clinicas = new Map();
+    }
+
+    /**
+     * Registra a lista de clínicas conhecidas (define o que é "índice completo").
+     * Clínicas que sumiram da lista são removidas do índice.
+     * @param {Array<{codigo: string, nome: string}>} clinicas
+     */
+    registrarClinicas(clinicas) {
+        const codigos = new Set();
+        for (const clinica of clinicas || []) {
+            const codigo = String(clinica.codigo);
+            codigos.add(codigo);
+            const entry = this.clinicas.get(codigo);
+            if (entry) {
+                entry.nome = clinica.nome;
+            } else {
+                this.clinicas.set(codigo, { nome: clinica.nome, atualizadoEm: 0, leitos: new Set() });
+            }
+        }
+
+        for (const codigo of [...this.clinicas.keys()]) {
+            if (!codigos.has(codigo)) this.removerClinica(codigo);
+        }
+    }
+
+    /**
+     * Substitui as entradas de uma clínica pela lista de pacientes recém-buscada.
+     * @param {string} codigoClinica
+     * @param {Array} pacientes - saída de PacienteParser.parse()
+     */
+    atualizarClinica(codigoClinica, pacientes) {
+        const codigo = String(codigoClinica);
+        const anterior = this.clinicas.get(codigo);
+        this.removerClinica(codigo);
+
+        const entry = {
+            nome: anterior ? anterior.nome : null,
+            atualizadoEm: Date.now(),
+            leitos: new Set()
+        };
+
+        for (const paciente of pacientes || []) {
+            const chave = normalizarLeito(paciente.leito || paciente.clinicaLeito);
+            if (!chave) continue;
+
+            const item = { leito: paciente.leito, prontuario: paciente.prontuario, clinicaCodigo: codigo, paciente };
+            const lista = this.porLeito.get(chave);
+            if (lista) lista.push(item);
+            else this.porLeito.set(chave, [item]);
+            entry.leitos.add(chave);
+        }
+
+        this.clinicas.set(codigo, entry);
+    }
+
+    /**
+     * Remove todas as entradas de uma clínica.
+     * @param {string} codigoClinica
+     */
+    removerClinica(codigoClinica) {
+        const codigo = String(codigoClinica);
+        const entry = this.clinicas.get(codigo);
+        if (!entry) return;
+
+        for (const chave of entry.leitos) {
+            const restantes = (this.porLeito.get(chave) || []).filter(i => i.clinicaCodigo !== codigo);
+            if (restantes.length > 0) this.porLeito.set(chave, restantes);
+            else this.porLeito.delete(chave);
+        }
+        this.clinicas.delete(codigo);
+    }
+
+    /**
+     * Indica se todas as clínicas conhecidas foram indexadas dentro do TTL.
+     * @param {number} [maxAge=this.ttl]
+     */
+    isFresh(maxAge = this.ttl) {
+        if (this.clinicas.size === 0) return false;
+        const limite = Date.now() - maxAge;
+        for (const entry of this.clinicas.values()) {
+            if (entry.atualizadoEm < limite) return false;
+        }
+        return true;
+    }
+
+    /**
+     * Indica se uma clínica específica foi indexada dentro do TTL.
+     * @param {string} codigoClinica
+     * @param {number} [maxAge=this.ttl]
+     */
+    isClinicaFresh(codigoClinica, maxAge = this.ttl) {
+        const entry = this.clinicas.get(String(codigoClinica));
+        return !!entry && entry.atualizadoEm >= Date.now() - maxAge;
+    }
+
+    /** Timestamp da clínica indexada há mais tempo (0 se alguma nunca foi indexada). */
+    atualizadoEm() {
+        let min = Infinity;
+        for (const entry of this.clinicas.values()) min = Math.min(min, entry.atualizadoEm);
+        return min === Infinity ? 0 : min;
+    }
+
+    /**
+     * Busca pacientes pelos formatos de leito informados.
+     * Primeiro tenta lookup exato no Map; se nenhum formato bater, faz um scan
+     * em memória com o comparador (mesma semântica de PatientService.compararLeitos).
+     * @param {string[]} formatos - variações de leito (PatientService.formatarLeito)
+     * @param {Function} [comparar] - (leitoSistema, leitoBusca) => boolean
+     * @returns {Array} pacientes com clinicaCodigo/clinicaNome preenchidos
+     */
+    buscar(formatos, comparar = null) {
+        const encontrados = new Map();
+
+        for (const formato of formatos) {
+            for (const item of this.porLeito.get(normalizarLeito(formato)) || []) {
+                encontrados.set(`${item.clinicaCodigo}:${item.prontuario}`, item);
+            }
+        }
+
+        if (encontrados.size === 0 && typeof comparar === 'function') {
+            for (const lista of this.porLeito.values()) {
+                for (const item of lista) {
+                    if (formatos.some(formato => comparar(item.leito, formato))) {
+                        encontrados.set(`${item.clinicaCodigo}:${item.prontuario}`, item);
+                    }
+                }
+            }
+        }
+
+        return [...encontrados.values()].map(item => ({
+            ...item.paciente,
+            clinicaCodigo: item.clinicaCodigo,
+            clinicaNome: this.clinicas.get(item.clinicaCodigo)?.nome || null
+        }));
+    }
+
+    /** Estatísticas do índice (para logs/diagnóstico). */
+    getStats() {
+        const atualizadoEm = this.atualizadoEm();
+        return {
+            clinicas: this.clinicas.size,
+            leitos: this.porLeito.size,
+            fresco: this.isFresh(),
+            atualizadoEm: atualizadoEm ? new Date(atualizadoEm).toISOString() : null
+        };
+    }
+}
+
+module.exports = LeitoIndex;
+module.exports.normalizarLeito = normalizarLeito;
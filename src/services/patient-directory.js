@@ -0,0 +1,205 @@
+/**
+ * Diretório de pacientes em memória para busca por nome.
+ *
+ * Guarda, por prontuário, o nome normalizado em tokens, clínica, leito, data
+ * de internação e (quando já buscado) o cadastro parseado. É alimentado pelas
+ * listas de clínica e pelos cadastros que já passam pelo crawler, e responde
+ * buscas por prefixo de tokens sem acento/caixa ("jose sil" → "JOSÉ DA SILVA")
+ * sem ir ao HICD.
+ *
+ * Índice: Map<prefixo, Set<prontuario>> com todos os prefixos de cada token,
+ * de modo que cada token da consulta é um único lookup; o resultado é a
+ * interseção dos conjuntos.
+ */
+
+const DIACRITICS_RE = /[\u0300-\u036f]/g;
+const TOKEN_SPLIT_RE = /[^A-Z0-9]+/;
+
+/** Normaliza um nome: sem acentos, maiúsculo, quebrado em tokens. */
+function tokenizarNome(nome) {
+    if (!nome) return [];
+    return String(nome)
+        .normalize('NFD')
+        .replace(DIACRITICS_RE, '')
+        .toUpperCase()
+        .split(TOKEN_SPLIT_RE)
+        .filter(Boolean);
+}
+
+class PatientDirectory {
+    /**
+     * @param {object} [options]
+     * @param {number} [options.ttl] - validade (ms) de cada entrada e do cadastro guardado
+     */
+    constructor(options = {}) {
+        this.ttl = options.ttl || parseInt(process.env.PATIENT_DIRECTORY_TTL_MS) || 30 * 60 * 1000;
+
+        // prontuario -> entrada
+        this.entradas = new Map();
+        // prefixo de token -> Set<prontuario>
+        this.prefixos = new Map();
+    }
+
+    /**
+     * Registra (ou atualiza) pacientes vindos de uma lista de clínica.
+     * @param {Array} pacientes - saída de PacienteParser.parse()
+     * @param {string|null} [codigoClinica] - null para listas sem clínica definida (clínica 0)
+     */
+    registrarLista(pacientes, codigoClinica = null) {
+        for (const p of pacientes || []) {
+            if (!p || !p.prontuario || !p.nome) continue;
+            this._upsert(String(p.prontuario), p.nome, {
+                clinicaCodigo: codigoClinica != null ? String(codigoClinica) : undefined,
+                leito: p.leito || undefined,
+                clinicaLeito: p.clinicaLeito || p.leito || undefined,
+                dataInternacao: p.dataInternacao || undefined
+            });
+        }
+    }
+
+    /**
+     * Registra o cadastro parseado de um paciente (PacienteParser.parsePacienteCadastro).
+     * @param {string} prontuario
+     * @param {object} cadastro
+     */
+    registrarCadastro(prontuario, cadastro) {
+        if (!cadastro) return;
+        const basicos = cadastro.dadosBasicos || {};
+        const internacao = cadastro.internacao || {};
+        const id = String(basicos.prontuario || prontuario);
+        if (!basicos.nome) return;
+
+        const entrada = this._upsert(id, basicos.nome, {
+            clinicaCodigo: internacao.codigoClinica || undefined,
+            leito: internacao.numeroLeito || undefined,
+            clinicaLeito: internacao.clinicaLeito || undefined,
+            dataInternacao: internacao.dataInternacao || undefined
+        });
+        entrada.cadastro = cadastro;
+        entrada.cadastroEm = Date.now();
+    }
+
+    /**
+     * Busca pacientes cujo nome contenha todos os tokens da consulta como prefixo
+     * de algum token do nome (sem acento/caixa).
+     * @param {string} consulta
+     * @param {object} [opcoes]
+     * @param {number} [opcoes.limite=50]
+     * @returns {Array} entradas { prontuario, nome, clinicaCodigo, leito, clinicaLeito,
+     *                  dataInternacao, cadastro } — cadastro é null se ausente/expirado
+     */
+    buscar(consulta, { limite = 50 } = {}) {
+        const tokens = tokenizarNome(consulta);
+        if (tokens.length === 0) return [];
+
+        // Interseção começando pelo menor conjunto
+        const conjuntos = tokens.map(t => this.prefixos.get(t) || new Set());
+        conjuntos.sort((a, b) => a.size - b.size);
+
+        const agora = Date.now();
+        const resultado = [];
+        for (const prontuario of conjuntos[0]) {
+            if (!conjuntos.every(c => c.has(prontuario))) continue;
+
+            const entrada = this.entradas.get(prontuario);
+            if (agora - entrada.atualizadoEm > this.ttl) {
+                this.remover(prontuario);
+                continue;
+            }
+
+            const cadastroValido = entrada.cadastro && agora - entrada.cadastroEm <= this.ttl;
+            resultado.push({
+                prontuario: entrada.prontuario,
+                nome: entrada.nome,
+                clinicaCodigo: entrada.clinicaCodigo,
+                leito: entrada.leito,
+                clinicaLeito: entrada.clinicaLeito,
+                dataInternacao: entrada.dataInternacao,
+                cadastro: cadastroValido ? entrada.cadastro : null
+            });
+        }
+
+        // Ordena antes de cortar: o limite fica com os primeiros por nome, não
+        // com um subconjunto arbitrário da ordem de inserção
+        resultado.sort((a, b) => a.nome.localeCompare(b.nome));
+        return resultado.length > limite ? resultado.slice(0, limite) : resultado;
+    }
+
+    /**
+     * Remove um paciente do diretório.
+     * @param {string} prontuario
+     */
+    remover(prontuario) {
+        const entrada = this.entradas.get(String(prontuario));
+        if (!entrada) return;
+        this._desindexar(entrada);
+        this.entradas.delete(entrada.prontuario);
+    }
+
+    /** Estatísticas do diretório. */
+    getStats() {
+        let comCadastro = 0;
+        for (const entrada of this.entradas.values()) if (entrada.cadastro) comCadastro++;
+        return {
+            pacientes: this.entradas.size,
+            comCadastro,
+            prefixosIndexados: this.prefixos.size
+        };
+    }
+
+    // ── Internos ─────────────────────────────────────────────────────────────
+
+    _upsert(prontuario, nome, campos) {
+        let entrada = this.entradas.get(prontuario);
+        const tokens = tokenizarNome(nome);
+
+        if (!entrada) {
+            entrada = { prontuario, nome, tokens: [], cadastro: null, cadastroEm: 0 };
+            this.entradas.set(prontuario, entrada);
+        } else if (entrada.nome !== nome) {
+            this._desindexar(entrada);
+            entrada.tokens = [];
+        }
+
+        entrada.nome = nome;
+        for (const [campo, valor] of Object.entries(campos)) {
+            if (valor !== undefined) entrada[campo] = valor;
+        }
+        entrada.atualizadoEm = Date.now();
+
+        if (entrada.tokens.length === 0) {
+            entrada.tokens = tokens;
+            this._indexar(entrada);
+        }
+        return entrada;
+    }
+
+    _indexar(entrada) {
+        for (const token of entrada.tokens) {
+            for (let i = 1; i <= token.length; i++) {
+                const prefixo = token.slice(0, i);
+                let conjunto = this.prefixos.get(prefixo);
+                if (!conjunto) {
+                    conjunto = new Set();
+                    this.prefixos.set(prefixo, conjunto);
+                }
+                conjunto.add(entrada.prontuario);
+            }
+        }
+    }
+
+    _desindexar(entrada) {
+        for (const token of entrada.tokens) {
+            for (let i = 1; i <= token.length; i++) {
+                const prefixo = token.slice(0, i);
+                const conjunto = this.prefixos.get(prefixo);
+                if (!conjunto) continue;
+                conjunto.delete(entrada.prontuario);
+                if (conjunto.size === 0) this.prefixos.delete(prefixo);
+            }
+        }
+    }
+}
+
+module.exports = PatientDirectory;
+module.exports.tokenizarNome = tokenizarNome;
@@ -1,12 +1,39 @@
 const config = require('../../config');
+const LeitoIndex = require('./leito-index');
+const PatientDirectory = require('./patient-directory');
+const { estadoDoHost } = require('./estado-por-host');
+const { criarLogger } = require('../core/logger');
+
+const logBusca = criarLogger('busca-pacientes');
+
+// Idade mínima do índice para que um miss na busca por leito dispare
+// re-indexação (evita varrer o hospital a cada consulta de leito vazio).
+const LEITO_MISS_REFRESH_MS = parseInt(process.env.LEITO_INDEX_MISS_REFRESH_MS) || 60 * 1000;
 
 /**
  * Serviço para buscar e gerenciar dados de pacientes
  */
 class PatientService {
-    constructor(httpClient, parser) {
+    /**
+     * @param {object} httpClient
+     * @param {object} parser
+     * @param {object} [options]
+     * @param {string} [options.host] - host HICD: índice e diretório são os do host
+     *        (sobrevivem ao novo login, que recria o crawler)
+     */
+    constructor(httpClient, parser, options = {}) {
         this.httpClient = httpClient;
         this.parser = parser;
+
+        // Índice leito → (clínica, prontuário), alimentado por toda lista de
+        // clínica que passa por getPacientesClinica (inclusive as buscadas pelo
+        // ClinicasController). Ver buscarPacientePorLeito().
+        this.leitoIndex = estadoDoHost(LeitoIndex, options.host);
+        this._leitoIndexRefresh = null;
+
+        // Diretório por nome (busca de pacientes sem ida ao HICD). Alimentado
+        // pelas listas de clínica e pelos cadastros buscados via crawler.
+        this.diretorio = estadoDoHost(PatientDirectory, options.host);
     }
 
     /**
@@ -45,6 +72,7 @@ class PatientService {
 
             // Parse do HTML de resposta para extrair as clínicas
             const clinicas = this.parser.parseClinicas(clinicasResponse.data);
+            this.leitoIndex.registrarClinicas(clinicas);
             
             console.log(`[CLÍNICAS] ✅ Encontradas ${clinicas.length} clínicas disponíveis`);
             
@@ -68,7 +96,7 @@ class PatientService {
      * Busca todos os pacientes de todas as clínicas
      */
     async buscarPacientes() {
-        console.log('[BUSCAR PACIENTES] Buscando todos os pacientes do sistema...');
+        logBusca.debug('Buscando todos os pacientes do sistema');
         
         try {
             // Buscar todas as clínicas
@@ -76,15 +104,16 @@ class PatientService {
             const todosPacientes = [];
 
             if (clinicas.length === 0) {
-                console.log('[BUSCAR PACIENTES] ❌ Nenhuma clínica encontrada');
+                logBusca.warn('Nenhuma clínica encontrada');
                 return [];
             }
 
             // Para cada clínica, buscar os pacientes
             for (let i = 0; i < clinicas.length; i++) {
                 const clinica = clinicas[i];
-                console.log(`[BUSCAR PACIENTES] Processando clínica ${i+1}/${clinicas.length}: ${clinica.nome}`);
-                console.log(`[BUSCAR PACIENTES] Código da clínica: ${clinica.codigo}`);
+                if (logBusca.evento('clinica')) {
+                    logBusca.debug('Processando clínica', { clinica: `${i + 1}/${clinicas.length}`, codigo: clinica.codigo, nome: clinica.nome });
+                }
                 try {
                     const pacientes = await this.getPacientesClinica(clinica.codigo);
                     
@@ -95,7 +124,6 @@ class PatientService {
                     });
                     
                     todosPacientes.push(...pacientes);
-                    console.log(`[BUSCAR PACIENTES] ${pacientes.length} pacientes encontrados na ${clinica.nome}`);
                     
                     // Delay entre requisições para evitar sobrecarga
                     if (i < clinicas.length - 1) {
@@ -103,25 +131,40 @@ class PatientService {
                     }
                     
                 } catch (error) {
-                    console.error(`[BUSCAR PACIENTES] Erro ao buscar pacientes da clínica ${clinica.nome}:`, error.message);
+                    logBusca.warn('Erro ao buscar pacientes da clínica', { codigo: clinica.codigo, nome: clinica.nome, erro: error });
                     // Continuar com as outras clínicas mesmo se uma falhar
                     continue;
                 }
             }
 
-            console.log(`[BUSCAR PACIENTES] ✅ Total: ${todosPacientes.length} pacientes encontrados em ${clinicas.length} clínicas`);
+            logBusca.info('Pacientes encontrados', { pacientes: todosPacientes.length, clinicas: clinicas.length });
             return todosPacientes;
 
         } catch (error) {
-            console.error('[BUSCAR PACIENTES] Erro ao buscar pacientes:', error.message);
+            logBusca.error('Erro ao buscar pacientes', { erro: error });
             throw error;
         }
     }
 
     /**
-     * Busca pacientes de uma clínica específica
+     * Busca pacientes de uma clínica específica.
+     * Falhas (rede, sessão expirada) viram lista vazia — para distinguir uma
+     * clínica vazia de uma busca que falhou, use buscarPacientesClinica().
      */
     async getPacientesClinica(codigoClinica, referencia = '', filtroNome = '', ordem = '') {
+        try {
+            return await this.buscarPacientesClinica(codigoClinica, referencia, filtroNome, ordem);
+        } catch (_) {
+            return [];
+        }
+    }
+
+    /**
+     * Busca pacientes de uma clínica específica, propagando o erro quando a
+     * busca falha (usado pelo crawl com checkpoint, que não pode marcar como
+     * concluída uma clínica que não foi lida).
+     */
+    async buscarPacientesClinica(codigoClinica, referencia = '', filtroNome = '', ordem = '') {
         console.log(`[PACIENTES] Buscando pacientes da clínica ${codigoClinica}...`);
 
         try {
@@ -163,6 +206,14 @@ class PatientService {
             // Parse do HTML de resposta para extrair os pacientes
             const pacientes = this.parser.parsePacientes(pacientesResponse.data, codigoClinica);
 
+            this.diretorio.registrarLista(pacientes, String(codigoClinica) !== '0' ? codigoClinica : null);
+
+            // Só listas completas de uma clínica alimentam o índice de leitos
+            // (clínica 0 = "todos" e buscas filtradas por nome não contam).
+            if (String(codigoClinica) !== '0' && !referencia && !filtroNome) {
+                this.leitoIndex.atualizarClinica(codigoClinica, pacientes);
+            }
+
             console.log(`[PACIENTES] ✅ Encontrados ${pacientes.length} pacientes na clínica ${codigoClinica}`);
             
             // Log detalhado dos primeiros pacientes para debug
@@ -185,12 +236,16 @@ class PatientService {
                 console.error(`[PACIENTES] Dados da resposta: ${error.response.data?.substring(0, 200)}...`);
             }
             
-            return [];
+            throw error;
         }
     }
 
     /**
-     * Busca pacientes por leito específico
+     * Busca pacientes por leito específico.
+     *
+     * Resolve pelo índice em memória (leitoIndex). O scan clínica a clínica no
+     * HICD só acontece quando o índice está obsoleto; com o índice perto de
+     * expirar, ou num miss, a re-indexação roda em segundo plano.
      */
     async buscarPacientePorLeito(leitoDesejado) {
         console.log(`[BUSCA LEITO] Procurando paciente no leito ${leitoDesejado}...`);
@@ -200,30 +255,25 @@ class PatientService {
             const leitoFormatado = this.formatarLeito(leitoDesejado);
             console.log(`[BUSCA LEITO] Formatos de busca: ${leitoFormatado.join(', ')}`);
 
-            // Primeiro tentar buscar em todas as clínicas para encontrar o paciente
-            const clinicas = await this.getClinicas();
-            let pacientesEncontrados = [];
-
-            for (const clinica of clinicas) {
-                const pacientes = await this.getPacientesClinica(clinica.codigo);
-                
-                // Verificar se algum paciente está no leito desejado
-                const pacientesNoLeito = pacientes.filter(p => {
-                    return leitoFormatado.some(formato => this.compararLeitos(p.leito, formato));
-                });
-                
-                if (pacientesNoLeito.length > 0) {
-                    pacientesNoLeito.forEach(p => {
-                        p.clinicaCodigo = clinica.codigo;
-                        p.clinicaNome = clinica.nome;
-                    });
-                    pacientesEncontrados.push(...pacientesNoLeito);
-                }
-                
-                await this.httpClient.delay(1000);
+            let varreuHICD = false;
+            if (!this.leitoIndex.isFresh()) {
+                console.log('[BUSCA LEITO] Índice de leitos obsoleto — varrendo clínicas no HICD');
+                await this.atualizarIndiceLeitos();
+                varreuHICD = true;
+            } else if (!this.leitoIndex.isFresh(this.leitoIndex.ttl / 2)) {
+                this.atualizarIndiceLeitosEmSegundoPlano();
             }
 
+            const pacientesEncontrados = this.leitoIndex.buscar(
+                leitoFormatado,
+                (leitoSistema, leitoBusca) => this.compararLeitos(leitoSistema, leitoBusca)
+            );
+
             if (pacientesEncontrados.length === 0) {
+                // Paciente pode ter sido admitido depois da última indexação
+                if (!varreuHICD && !this.leitoIndex.isFresh(LEITO_MISS_REFRESH_MS)) {
+                    this.atualizarIndiceLeitosEmSegundoPlano({ forcar: true });
+                }
                 console.log(`[BUSCA LEITO] ❌ Nenhum paciente encontrado no leito ${leitoDesejado}`);
                 return [];
             }
@@ -243,6 +293,53 @@ class PatientService {
         }
     }
 
+    /**
+     * (Re)constrói o índice de leitos percorrendo as clínicas no HICD.
+     * Clínicas já indexadas dentro do TTL são puladas, a menos que `forcar`.
+     * Chamadas concorrentes compartilham a mesma varredura.
+     * @param {object} [opcoes]
+     * @param {boolean} [opcoes.forcar=false] - re-buscar inclusive clínicas frescas
+     * @returns {Promise<object>} estatísticas do índice
+     */
+    async atualizarIndiceLeitos({ forcar = false } = {}) {
+        if (this._leitoIndexRefresh) return this._leitoIndexRefresh;
+
+        this._leitoIndexRefresh = (async () => {
+            const clinicas = await this.getClinicas();
+            const pendentes = forcar
+                ? clinicas
+                : clinicas.filter(c => !this.leitoIndex.isClinicaFresh(c.codigo));
+
+            console.log(`[ÍNDICE LEITOS] Indexando ${pendentes.length}/${clinicas.length} clínicas`);
+
+            for (let i = 0; i < pendentes.length; i++) {
+                await this.getPacientesClinica(pendentes[i].codigo);
+
+                // Delay entre requisições para evitar sobrecarga
+                if (i < pendentes.length - 1) {
+                    await this.httpClient.delay(1000);
+                }
+            }
+
+            const stats = this.leitoIndex.getStats();
+            console.log(`[ÍNDICE LEITOS] ✅ ${stats.leitos} leitos indexados em ${stats.clinicas} clínicas`);
+            return stats;
+        })().finally(() => {
+            this._leitoIndexRefresh = null;
+        });
+
+        return this._leitoIndexRefresh;
+    }
+
+    /**
+     * Dispara atualizarIndiceLeitos() sem aguardar; erros só são logados.
+     */
+    atualizarIndiceLeitosEmSegundoPlano(opcoes = {}) {
+        this.atualizarIndiceLeitos(opcoes).catch(error => {
+            console.error('[ÍNDICE LEITOS] Erro na atualização em segundo plano:', error.message);
+        });
+    }
+
     /**
      * Formatar leito para diferentes possibilidades do sistema
      */
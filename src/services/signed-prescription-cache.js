@@ -0,0 +1,79 @@
+/**
+ * Cache de longa duração dos detalhes de prescrições já assinadas.
+ *
+ * Uma prescrição com data de assinatura (cabecalho.dataAssinatura) não muda
+ * mais no HICD, então os seus detalhes já parseados podem ser reaproveitados
+ * sem TTL: nas buscas seguintes do paciente só as prescrições novas ou ainda
+ * não assinadas vão ao imprime.php. A chave é host + id da prescrição.
+ *
+ * A instância compartilhada (`SignedPrescriptionCache.compartilhado`) fica no
+ * módulo, fora do crawler, para sobreviver ao novo login (que recria o crawler
+ * do host). Limitado por PRESCRICOES_ASSINADAS_MAX (os menos usados saem primeiro).
+ */
+class SignedPrescriptionCache {
+    /**
+     * @param {object} [options]
+     * @param {number} [options.maxEntradas]
+     */
+    constructor(options = {}) {
+        this.maxEntradas = options.maxEntradas || parseInt(process.env.PRESCRICOES_ASSINADAS_MAX) || 20000;
+        this.entradas = new Map();
+        this.stats = { buscasEvitadas: 0, buscasRealizadas: 0, armazenadas: 0 };
+    }
+
+    static chave(host, idPrescricao) {
+        return `${host || ''}:${idPrescricao}`;
+    }
+
+    /** Detalhes que podem ser guardados: só os de prescrição assinada. */
+    static estaAssinada(detalhes) {
+        return Boolean(detalhes && detalhes.cabecalho && detalhes.cabecalho.dataAssinatura);
+    }
+
+    /**
+     * Detalhes guardados ou null. Um acerto conta como busca evitada.
+     * @param {string} host
+     * @param {string} idPrescricao
+     */
+    obter(host, idPrescricao) {
+        const chave = SignedPrescriptionCache.chave(host, idPrescricao);
+        const detalhes = this.entradas.get(chave);
+        if (detalhes === undefined) return null;
+
+        // Reinsere no fim do Map: a ordem de inserção vira ordem de uso
+        this.entradas.delete(chave);
+        this.entradas.set(chave, detalhes);
+        this.stats.buscasEvitadas++;
+        return detalhes;
+    }
+
+    /**
+     * Registra detalhes recém-buscados; guarda apenas se a prescrição está assinada.
+     * @returns {boolean} true se guardou
+     */
+    registrar(host, idPrescricao, detalhes) {
+        this.stats.buscasRealizadas++;
+        if (!SignedPrescriptionCache.estaAssinada(detalhes)) return false;
+
+        const chave = SignedPrescriptionCache.chave(host, idPrescricao);
+        this.entradas.delete(chave);
+        this.entradas.set(chave, detalhes);
+        this.stats.armazenadas++;
+        while (this.entradas.size > this.maxEntradas) {
+            this.entradas.delete(this.entradas.keys().next().value);
+        }
+        return true;
+    }
+
+    clear() {
+        this.entradas.clear();
+    }
+
+    getStats() {
+        return { entradas: this.entradas.size, maxEntradas: this.maxEntradas, ...this.stats };
+    }
+}
+
+SignedPrescriptionCache.compartilhado = new SignedPrescriptionCache();
+
+module.exports = SignedPrescriptionCache;
@@ -0,0 +1,103 @@
+/**
+ * Testes do agendamento de lotes multi-paciente (api/utils/agendador-lote.js).
+ *
+ * Cobre:
+ *  1. Itens em cache são entregues antes de qualquer busca agendada terminar
+ *  2. Buscas fora do cache respeitam a concorrência; itens repetidos rodam uma vez
+ *  3. Falhas (exceção ou status >= 400) não interrompem o lote
+ *  4. Sinal abortado: nenhuma busca nova começa; as restantes contam como canceladas
+ *
+ * Runner: node --test (Node >= 18). Sem dependências externas nem rede.
+ */
+const { test } = require('node:test');
+const assert = require('node:assert');
+
+const { executarLote } = require('../api/utils/agendador-lote');
+
+const tarefa = (prontuario, recurso) => ({ chave: `${recurso}:${prontuario}`, prontuario, recurso });
+const esperar = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+
+test('itens em cache saem antes das buscas agendadas', async () => {
+    const entregues = [];
+    const emCache = new Set(['cadastro:2', 'exames:3']);
+
+    const stats = await executarLote(
+        [tarefa('1', 'exames'), tarefa('2', 'cadastro'), tarefa('1', 'cadastro'), tarefa('3', 'exames')],
+        {
+            concorrencia: 1,
+            emCache: (t) => emCache.has(t.chave),
+            executar: async (t) => {
+                if (!emCache.has(t.chave)) await esperar(10);
+                return { status: 200, body: { chave: t.chave } };
+            },
+            onResultado: (t, resultado, doCache) => entregues.push(`${t.chave}${doCache ? ' (cache)' : ''}`)
+        }
+    );
+
+    assert.deepStrictEqual(entregues.slice(0, 2).sort(), ['cadastro:2 (cache)', 'exames:3 (cache)']);
+    assert.deepStrictEqual(entregues.slice(2), ['exames:1', 'cadastro:1'], 'agendadas na ordem do pedido');
+    assert.deepStrictEqual(stats, { total: 4, doCache: 2, agendadas: 2, sucesso: 4, falhas: 0, canceladas: 0 });
+});
+
+test('concorrência limitada e itens repetidos executados uma vez', async () => {
+    let emVoo = 0;
+    let pico = 0;
+    const executadas = [];
+    const tarefas = ['1', '2', '3', '4', '5', '1', '2'].map(p => tarefa(p, 'evolucoes'));
+
+    const stats = await executarLote(tarefas, {
+        concorrencia: 2,
+        emCache: () => false,
+        executar: async (t) => {
+            executadas.push(t.chave);
+            pico = Math.max(pico, ++emVoo);
+            await esperar(5);
+            emVoo--;
+            return { status: 200, body: {} };
+        },
+        onResultado: () => {}
+    });
+
+    assert.strictEqual(pico, 2);
+    assert.strictEqual(executadas.length, 5);
+    assert.strictEqual(stats.total, 5);
+});
+
+test('falhas são reportadas sem interromper o lote', async () => {
+    const status = {};
+    const stats = await executarLote([tarefa('1', 'exames'), tarefa('2', 'exames'), tarefa('3', 'exames')], {
+        emCache: () => false,
+        executar: async (t) => {
+            if (t.prontuario === '1') throw new Error('HICD fora do ar');
+            if (t.prontuario === '2') return { status: 404, body: { success: false } };
+            return { status: 200, body: { success: true } };
+        },
+        onResultado: (t, resultado) => { status[t.prontuario] = resultado; }
+    });
+
+    assert.strictEqual(status['1'].status, 500);
+    assert.strictEqual(status['1'].body.message, 'HICD fora do ar');
+    assert.strictEqual(status['2'].status, 404);
+    assert.strictEqual(status['3'].status, 200);
+    assert.deepStrictEqual([stats.sucesso, stats.falhas, stats.canceladas], [1, 2, 0]);
+});
+
+test('sinal abortado impede novas buscas', async () => {
+    const controle = new AbortController();
+    const executadas = [];
+
+    const stats = await executarLote(['1', '2', '3', '4'].map(p => tarefa(p, 'prescricoes')), {
+        concorrencia: 1,
+        sinal: controle.signal,
+        emCache: () => false,
+        executar: async (t) => {
+            executadas.push(t.prontuario);
+            if (t.prontuario === '2') controle.abort();
+            return { status: 200, body: {} };
+        },
+        onResultado: () => {}
+    });
+
+    assert.deepStrictEqual(executadas, ['1', '2']);
+    assert.strictEqual(stats.canceladas, 2);
+});
@@ -0,0 +1,54 @@
+/**
+ * Testes da comparação com baseline do benchmark de parsers.
+ *
+ * Cobre:
+ *  1. Piora acima do limiar vira regressão (tempo e heap)
+ *  2. Piora dentro do limiar ou abaixo da tolerância absoluta é ignorada
+ *  3. Casos novos (fora do baseline) e baseline ausente não falham
+ *  4. Leitura dos argumentos da linha de comando
+ *
+ * Runner: node --test (Node >= 18). Sem dependências externas nem rede.
+ */
+const { test } = require('node:test');
+const assert = require('node:assert');
+
+const { compararComBaseline, lerArgs } = require('../benchmark-parsers');
+
+const BASELINE = {
+    casos: {
+        'evolucao:evolucoes/evolucoes.html': { p50Ms: 2.0, heapKBPorPagina: 400 },
+        'clinica:clinicas/lista-clinicas.html': { p50Ms: 0.02, heapKBPorPagina: 4 }
+    }
+};
+
+test('piora acima do limiar é reportada como regressão', () => {
+    const atual = { casos: { 'evolucao:evolucoes/evolucoes.html': { p50Ms: 3.0, heapKBPorPagina: 600 } } };
+    const regressoes = compararComBaseline(atual, BASELINE, 0.25);
+
+    assert.deepStrictEqual(regressoes.map(r => r.metrica), ['p50Ms', 'heapKBPorPagina']);
+    assert.strictEqual(regressoes[0].variacao, 0.5);
+});
+
+test('piora dentro do limiar ou abaixo da tolerância absoluta é ignorada', () => {
+    const atual = {
+        casos: {
+            'evolucao:evolucoes/evolucoes.html': { p50Ms: 2.4, heapKBPorPagina: 450 },
+            'clinica:clinicas/lista-clinicas.html': { p50Ms: 0.05, heapKBPorPagina: 10 }
+        }
+    };
+    assert.deepStrictEqual(compararComBaseline(atual, BASELINE, 0.25), []);
+});
+
+test('casos novos e baseline ausente não geram regressão', () => {
+    const atual = { casos: { 'novo:x.html': { p50Ms: 99, heapKBPorPagina: 9999 } } };
+    assert.deepStrictEqual(compararComBaseline(atual, BASELINE), []);
+    assert.deepStrictEqual(compararComBaseline(atual, null), []);
+});
+
+test('lerArgs interpreta iterações, limiar, filtro e atualização do baseline', () => {
+    assert.deepStrictEqual(
+        lerArgs(['--iteracoes=50', '--limiar=0.1', '--filtro=exames', '--atualizar-baseline']),
+        { iteracoes: 50, limiar: 0.1, filtro: 'exames', atualizarBaseline: true }
+    );
+    assert.strictEqual(lerArgs([]).atualizarBaseline, false);
+});
@@ -0,0 +1,132 @@
+/**
+ * Testes do feed de mudanças (api/utils/change-feed.js).
+ *
+ * Cobre:
+ *  1. observar — primeira observação é linha de base; itens novos e alterados publicam
+ *  2. desde — cursor, filtros (host, tipos, prontuários), limite/mais
+ *  3. completo: false — cursor de outra instância ou anterior ao buffer
+ *  4. Linhas de base limitadas (a menos recente sai) e evento `evento` para assinantes
+ *  5. SSE — `id:` do evento quando informado
+ *
+ * Runner: node --test (Node >= 18). Sem dependências externas nem rede.
+ */
+const { test } = require('node:test');
+const assert = require('node:assert');
+
+const { ChangeFeed } = require('../api/utils/change-feed');
+const { abrirStream } = require('../api/utils/stream');
+
+const itens = (pares) => new Map(Object.entries(pares));
+
+test('primeira observação é linha de base; novos e alterados publicam', () => {
+    const feed = new ChangeFeed();
+
+    assert.strictEqual(feed.observar('resultados-exames', 'h1', '111', itens({ r1: '3', r2: '0' })), null);
+    assert.strictEqual(feed.observar('resultados-exames', 'h1', '111', itens({ r1: '3', r2: '0' })), null, 'sem mudança');
+
+    const evento = feed.observar('resultados-exames', 'h1', '111', itens({ r1: '3', r2: '5', r3: '1' }));
+    assert.deepStrictEqual(evento.novos, ['r3']);
+    assert.deepStrictEqual(evento.alterados, ['r2']);
+    assert.strictEqual(evento.prontuario, '111');
+    assert.strictEqual(evento.host, 'h1');
+    assert.strictEqual(evento.cursor, feed.cursorAtual());
+
+    // Item que some não é mudança publicada; outro host/tipo tem linha de base própria
+    assert.strictEqual(feed.observar('resultados-exames', 'h1', '111', itens({ r3: '1' })), null);
+    assert.strictEqual(feed.observar('resultados-exames', 'h2', '111', itens({ r9: '1' })), null);
+    assert.strictEqual(feed.observar('evolucoes', 'h1', '111', itens({ e1: '' })), null);
+    assert.strictEqual(feed.getStats().publicados, 1);
+});
+
+test('desde filtra por cursor, host, tipo e prontuário, com limite', () => {
+    const feed = new ChangeFeed();
+    const inicial = feed.cursorAtual();
+    feed.publicar({ tipo: 'evolucoes', host: 'h1', prontuario: '111', novos: ['a'], alterados: [] });
+    feed.publicar({ tipo: 'resultados-exames', host: 'h1', prontuario: '222', novos: ['b'], alterados: [] });
+    feed.publicar({ tipo: 'evolucoes', host: 'h2', prontuario: '111', novos: ['c'], alterados: [] });
+    feed.publicar({ tipo: 'evolucoes', host: 'h1', prontuario: '333', novos: ['d'], alterados: [] });
+
+    const todos = feed.desde(inicial);
+    assert.strictEqual(todos.eventos.length, 4);
+    assert.strictEqual(todos.completo, true);
+    assert.strictEqual(todos.cursor, feed.cursorAtual());
+
+    const h1 = feed.desde(inicial, { host: 'h1', tipos: ['evolucoes'] });
+    assert.deepStrictEqual(h1.eventos.map(e => e.novos[0]), ['a', 'd']);
+    // O cursor avança mesmo sobre eventos filtrados: a próxima chamada não os revê
+    assert.strictEqual(h1.cursor, feed.cursorAtual());
+    assert.deepStrictEqual(feed.desde(inicial, { prontuarios: ['222'] }).eventos.map(e => e.novos[0]), ['b']);
+
+    const pagina = feed.desde(inicial, { limite: 2 });
+    assert.deepStrictEqual(pagina.eventos.map(e => e.novos[0]), ['a', 'b']);
+    assert.strictEqual(pagina.mais, true);
+    const resto = feed.desde(pagina.cursor, { limite: 2 });
+    assert.deepStrictEqual(resto.eventos.map(e => e.novos[0]), ['c', 'd']);
+    assert.strictEqual(resto.mais, false);
+
+    assert.deepStrictEqual(feed.desde(feed.cursorAtual()).eventos, []);
+});
+
+test('cursor de outra instância ou anterior ao buffer não é completo', () => {
+    const feed = new ChangeFeed({ maxEventos: 3 });
+    const inicial = feed.cursorAtual();
+    for (let i = 0; i < 5; i++) {
+        feed.publicar({ tipo: 'evolucoes', host: null, prontuario: '111', novos: [String(i)], alterados: [] });
+    }
+
+    const atrasado = feed.desde(inicial);
+    assert.strictEqual(atrasado.completo, false, 'eventos 1 e 2 já saíram do buffer');
+    assert.deepStrictEqual(atrasado.eventos.map(e => e.novos[0]), ['2', '3', '4']);
+    assert.strictEqual(feed.desde(`${feed.instancia}.2`).completo, true);
+
+    const reiniciado = feed.desde('outra.3');
+    assert.strictEqual(reiniciado.completo, false);
+    assert.strictEqual(reiniciado.eventos.length, 3);
+    assert.strictEqual(feed.desde().completo, true, 'sem cursor = primeira leitura');
+});
+
+test('cursor de outro feed não é aceito, mesmo criado no mesmo instante', () => {
+    // Modo cluster: um feed por worker, com sequências independentes
+    const a = new ChangeFeed();
+    const b = new ChangeFeed();
+    assert.notStrictEqual(a.instancia, b.instancia);
+    assert.ok(a.instancia.startsWith(`${process.pid.toString(36)}-`));
+    assert.ok(!a.instancia.includes('.'), 'o cursor separa instância e sequência por ponto');
+
+    for (const feed of [a, b]) {
+        feed.publicar({ tipo: 'evolucoes', host: null, prontuario: '111', novos: ['x'], alterados: [] });
+    }
+    a.publicar({ tipo: 'evolucoes', host: null, prontuario: '222', novos: ['y'], alterados: [] });
+
+    const deB = a.desde(b.cursorAtual());
+    assert.strictEqual(deB.completo, false);
+    assert.strictEqual(deB.eventos.length, 2, 'reenvia o buffer em vez de pular eventos');
+    assert.strictEqual(deB.cursor, a.cursorAtual());
+});
+
+test('linhas de base limitadas e evento para assinantes', () => {
+    const feed = new ChangeFeed({ maxPacientes: 2 });
+    const recebidos = [];
+    feed.on('evento', e => recebidos.push(e.prontuario));
+
+    feed.observar('evolucoes', null, '1', itens({ a: '' }));
+    feed.observar('evolucoes', null, '2', itens({ a: '' }));
+    feed.observar('evolucoes', null, '1', itens({ a: '' })); // 1 volta a ser o mais recente
+    feed.observar('evolucoes', null, '3', itens({ a: '' })); // descarta 2
+    assert.strictEqual(feed.getStats().pacientesObservados, 2);
+
+    feed.observar('evolucoes', null, '1', itens({ a: '', b: '' }));
+    assert.strictEqual(feed.observar('evolucoes', null, '2', itens({ a: '', b: '' })), null, 'linha de base nova');
+    assert.deepStrictEqual(recebidos, ['1']);
+    assert.strictEqual(feed.getStats().assinantes, 1);
+});
+
+test('SSE escreve o id do evento quando informado', () => {
+    const escrito = [];
+    const res = { writeHead: () => {}, write: (t) => escrito.push(t) };
+    const emitir = abrirStream(res, 'sse');
+    emitir('mudanca', { x: 1 }, 'abc.7');
+    emitir('heartbeat', {});
+    assert.strictEqual(escrito[0], 'id: abc.7\nevent: mudanca\ndata: {"x":1}\n\n');
+    assert.strictEqual(escrito[1], 'event: heartbeat\ndata: {}\n\n');
+});
@@ -0,0 +1,156 @@
+/**
+ * Testes do crawl completo em NDJSON com checkpoint.
+ *
+ * Cobre:
+ *  1. Um registro NDJSON por paciente e checkpoint com as clínicas concluídas
+ *  2. Retomada após queda no meio de uma clínica, sem duplicar registros
+ *  3. Linha final truncada é descartada e o paciente regravado
+ *  4. Clínicas processadas em paralelo
+ *  5. Clínica cuja lista falhou (erro ou sessão expirada) não entra no checkpoint
+ *     e é buscada de novo na retomada
+ *
+ * Runner: node --test (Node >= 18). Sem dependências externas nem rede.
+ */
+const { test } = require('node:test');
+const assert = require('node:assert');
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+
+const CheckpointedCrawl = require('../src/services/checkpointed-crawl');
+
+const CLINICAS = [
+    { codigo: '0', nome: 'TODAS' },
+    { codigo: '007', nome: 'U T I' },
+    { codigo: '012', nome: 'ENFERMARIA G' }
+];
+
+const LISTAS = {
+    '007': [{ prontuario: '1', nome: 'ANA' }, { prontuario: '2', nome: 'BIA' }],
+    '012': [{ prontuario: '3', nome: 'CAIO' }, { prontuario: '4', nome: 'DANI' }, { prontuario: '5', nome: 'EVA' }]
+};
+
+const esperar = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+
+function arquivoTemporario() {
+    const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'crawl-'));
+    return path.join(dir, 'saida.ndjson');
+}
+
+function criarCrawler({ atraso = 0, falhas = {} } = {}) {
+    const chamadas = { listas: [], emVoo: 0, maxEmVoo: 0 };
+    return {
+        chamadas,
+        getClinicas: async () => CLINICAS,
+        buscarPacientesClinica: async (codigo) => {
+            chamadas.listas.push(codigo);
+            chamadas.emVoo++;
+            chamadas.maxEmVoo = Math.max(chamadas.maxEmVoo, chamadas.emVoo);
+            await esperar(atraso);
+            chamadas.emVoo--;
+            if (falhas[codigo]) throw falhas[codigo];
+            return LISTAS[codigo] || [];
+        }
+    };
+}
+
+function lerRegistros(arquivo) {
+    return fs.readFileSync(arquivo, 'utf8').split('\n').filter(Boolean).map(l => JSON.parse(l));
+}
+
+async function semLogs(fn) {
+    const original = console.log;
+    console.log = () => {};
+    try {
+        return await fn();
+    } finally {
+        console.log = original;
+    }
+}
+
+test('grava um registro por paciente e marca as clínicas concluídas', async () => {
+    const arquivo = arquivoTemporario();
+    const resumo = await semLogs(() => new CheckpointedCrawl(criarCrawler(), { arquivo }).executar());
+
+    const registros = lerRegistros(arquivo);
+    assert.deepStrictEqual(registros.map(r => r.paciente.prontuario).sort(), ['1', '2', '3', '4', '5']);
+    assert.strictEqual(registros.find(r => r.paciente.prontuario === '3').clinica, 'ENFERMARIA G');
+
+    const checkpoint = JSON.parse(fs.readFileSync(`${arquivo}.checkpoint.json`, 'utf8'));
+    assert.deepStrictEqual(checkpoint.concluidas.sort(), ['007', '012']);
+    assert.ok(checkpoint.finalizadoEm);
+    assert.strictEqual(resumo.registros, 5);
+    assert.strictEqual(resumo.retomado, false);
+    assert.ok(Number.isFinite(resumo.registrosPorMinuto));
+});
+
+test('retoma após queda no meio da clínica sem duplicar registros', async () => {
+    const arquivo = arquivoTemporario();
+    let enriquecidos = 0;
+    const quebraNoQuarto = async () => {
+        if (++enriquecidos === 4) throw Object.assign(new Error('queda'), { code: 'SESSION_EXPIRED' });
+        return {};
+    };
+
+    await assert.rejects(
+        semLogs(() => new CheckpointedCrawl(criarCrawler(), { arquivo, concorrencia: 1, enriquecer: quebraNoQuarto }).executar()),
+        /queda/
+    );
+    assert.strictEqual(lerRegistros(arquivo).length, 3);
+
+    const crawler = criarCrawler();
+    const resumo = await semLogs(() => new CheckpointedCrawl(crawler, { arquivo, concorrencia: 1 }).executar());
+
+    const prontuarios = lerRegistros(arquivo).map(r => r.paciente.prontuario).sort();
+    assert.deepStrictEqual(prontuarios, ['1', '2', '3', '4', '5']);
+    assert.deepStrictEqual(crawler.chamadas.listas, ['012'], 'clínica 007 já concluída não é revisitada');
+    assert.strictEqual(resumo.retomado, true);
+    assert.strictEqual(resumo.registrosSessao, 2);
+});
+
+test('linha final truncada é descartada na retomada', async () => {
+    const arquivo = arquivoTemporario();
+    const completo = JSON.stringify({ clinicaCodigo: '007', paciente: { prontuario: '1' } });
+    fs.writeFileSync(arquivo, `${completo}\n{"clinicaCodigo":"007","pac`);
+
+    await semLogs(() => new CheckpointedCrawl(criarCrawler(), { arquivo }).executar());
+
+    const registros = lerRegistros(arquivo);
+    assert.strictEqual(registros.length, 5);
+    assert.strictEqual(registros.filter(r => r.paciente.prontuario === '1').length, 1);
+});
+
+test('clínicas rodam em paralelo', async () => {
+    const crawler = criarCrawler({ atraso: 20 });
+    await semLogs(() => new CheckpointedCrawl(crawler, { arquivo: arquivoTemporario(), concorrencia: 2 }).executar());
+    assert.strictEqual(crawler.chamadas.maxEmVoo, 2);
+});
+
+test('clínica cuja lista falhou não é marcada como concluída e volta na retomada', async () => {
+    const arquivo = arquivoTemporario();
+    const erros = console.error;
+    console.error = () => {};
+    try {
+        const falhou = criarCrawler({ falhas: { '012': new Error('HTTP 500') } });
+        const resumo = await semLogs(() => new CheckpointedCrawl(falhou, { arquivo, concorrencia: 1 }).executar());
+        assert.deepStrictEqual(resumo.falhas.map(f => f.codigo), ['012']);
+        const checkpoint = JSON.parse(fs.readFileSync(`${arquivo}.checkpoint.json`, 'utf8'));
+        assert.deepStrictEqual(checkpoint.concluidas, ['007']);
+        assert.strictEqual(checkpoint.finalizadoEm, undefined);
+
+        // Sessão expirada na lista: interrompe o crawl, sem marcar a clínica
+        const expirada = Object.assign(new Error('sessão expirada'), { code: 'SESSION_EXPIRED' });
+        await assert.rejects(
+            semLogs(() => new CheckpointedCrawl(criarCrawler({ falhas: { '012': expirada } }), { arquivo }).executar()),
+            /sessão expirada/
+        );
+    } finally {
+        console.error = erros;
+    }
+
+    const crawler = criarCrawler();
+    const resumo = await semLogs(() => new CheckpointedCrawl(crawler, { arquivo }).executar());
+    assert.deepStrictEqual(crawler.chamadas.listas, ['012']);
+    assert.deepStrictEqual(lerRegistros(arquivo).map(r => r.paciente.prontuario).sort(), ['1', '2', '3', '4', '5']);
+    assert.strictEqual(resumo.falhas.length, 0);
+});
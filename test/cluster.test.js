@@ -0,0 +1,234 @@
+/**
+ * Testes da coordenação do modo cluster (api/utils/cluster.js) com o MemoryCache.
+ *
+ * Cobre:
+ *  1. Camada compartilhada — dois workers pedindo a mesma chave: uma busca só, o outro
+ *     espera a gravação; entrada gravada por um é servida ao outro sem buscar
+ *  2. Falha ou morte de quem busca — a vez passa para o próximo da fila
+ *  3. Invalidações — chegam ao primário e aos caches locais dos outros workers
+ *  4. Sessão por host — um login só; quem chega depois adota; sessão expirada
+ *     renovada por outro worker é adotada sem novo login
+ *  5. Visão de evoluções (formato detalhado) gravada por um worker é remontada por outro
+ *  6. Busca mais longa que a concessão: renovada enquanto roda, não é repetida
+ *  7. Jobs no registro do primário — consultados e acompanhados de outro worker;
+ *     job ativo de worker que morre é dado como falho
+ *
+ * Os workers são simulados no mesmo processo: mensagens clonadas e entregues na
+ * próxima volta do event loop, como no IPC do cluster.
+ * Runner: node --test (Node >= 18). Sem dependências externas nem rede.
+ */
+const { test } = require('node:test');
+const assert = require('node:assert');
+const { EventEmitter } = require('events');
+
+const { CoordenadorCluster, ClienteCluster } = require('../api/utils/cluster');
+const MemoryCache = require('../api/utils/cache').constructor;
+const EvolucaoStore = require('../src/core/evolucao-store');
+const JobManager = require('../api/utils/job-manager');
+
+const esperar = (ms) => new Promise(r => setTimeout(r, ms));
+
+function criarCluster(workers = 2, options = {}) {
+    const coordenador = new CoordenadorCluster({ cache: new MemoryCache(), ...options });
+    const lados = [];
+    for (let i = 0; i < workers; i++) {
+        const noPrimario = new EventEmitter();
+        const noWorker = new EventEmitter();
+        noPrimario.send = (msg) => setImmediate(() => noWorker.emit('message', structuredClone(msg)));
+        noWorker.send = (msg) => setImmediate(() => noPrimario.emit('message', structuredClone(msg)));
+        coordenador.anexar(noPrimario);
+
+        const cliente = new ClienteCluster(noWorker);
+        const cache = new MemoryCache();
+        cache.usarCamadaCompartilhada(cliente);
+        lados.push({ cliente, cache, processo: noPrimario });
+    }
+    return { coordenador, lados };
+}
+
+test('mesma chave em dois workers: uma busca, o outro espera a gravação', async () => {
+    const { coordenador, lados: [a, b] } = criarCluster();
+    let buscas = 0;
+    const buscar = async () => { buscas++; await esperar(20); return { exames: [1, 2] }; };
+
+    const [da, db] = await Promise.all([
+        a.cache.getOrSet('exames-raw:123', buscar),
+        b.cache.getOrSet('exames-raw:123', buscar)
+    ]);
+
+    assert.strictEqual(buscas, 1);
+    assert.deepStrictEqual(da, { exames: [1, 2] });
+    assert.deepStrictEqual(db, { exames: [1, 2] });
+    assert.strictEqual(coordenador.stats.concedidas, 1);
+    assert.strictEqual(coordenador.stats.esperas, 1);
+
+    // Validade e idade vêm da gravação original
+    assert.strictEqual(b.cache.getCreatedAt('exames-raw:123'), coordenador.cache.getCreatedAt('exames-raw:123'));
+    // Já no cache local: nem consulta o primário
+    await b.cache.getOrSet('exames-raw:123', buscar);
+    assert.strictEqual(b.cliente.stats.consultas, 1);
+});
+
+test('falha ou morte de quem busca passa a vez para o próximo', async () => {
+    const { coordenador, lados: [a, b, c] } = criarCluster(3);
+
+    const falha = a.cache.getOrSet('k', async () => { await esperar(10); throw new Error('HICD fora'); });
+    const espera = b.cache.getOrSet('k', async () => 'de-b');
+    await assert.rejects(falha, /HICD fora/);
+    assert.strictEqual(await espera, 'de-b');
+
+    // Worker morre com a vez: o próximo da fila assume
+    let buscouC = false;
+    await a.cliente.obter('outra');
+    const pedidoC = c.cache.getOrSet('outra', async () => { buscouC = true; return 'de-c'; });
+    await esperar(5);
+    assert.strictEqual(buscouC, false);
+    a.processo.emit('exit');
+    assert.strictEqual(await pedidoC, 'de-c');
+    await esperar(5);
+    assert.strictEqual(coordenador.concessoes.size, 0);
+});
+
+test('vez expira e o próximo da fila assume', async () => {
+    const { lados: [a, b] } = criarCluster(2, { concessaoMs: 20 });
+    await a.cliente.obter('lenta');
+    const inicio = Date.now();
+    // O timer da concessão não segura o event loop (no cluster, o IPC segura)
+    const [dados] = await Promise.all([b.cache.getOrSet('lenta', async () => 'de-b'), esperar(40)]);
+    assert.strictEqual(dados, 'de-b');
+    assert.ok(Date.now() - inicio >= 15);
+});
+
+test('invalidações chegam ao primário e aos outros workers', async () => {
+    const { coordenador, lados: [a, b] } = criarCluster();
+    await a.cache.getOrSet('analise:123:host:h1', async () => 'analise');
+    await esperar(5);
+    await b.cache.getOrSet('analise:123:host:h1', async () => assert.fail('não deveria buscar'));
+    assert.strictEqual(b.cache.getExpiresAt('analise:123:host:h1') !== null, true);
+
+    a.cache.invalidatePatientTypes('123', ['analise'], 'h1');
+    await esperar(5);
+    assert.strictEqual(coordenador.cache.getExpiresAt('analise:123:host:h1'), null);
+    assert.strictEqual(b.cache.getExpiresAt('analise:123:host:h1'), null);
+    // A invalidação recebida não volta ao primário
+    assert.strictEqual(coordenador.stats.invalidacoes, 1);
+
+    // Regravação por um worker descarta a cópia local dos outros
+    await b.cache.getOrSet('cadastro:9', async () => 'v1');
+    a.cache.set('cadastro:9', 'v2');
+    await esperar(5);
+    assert.strictEqual(b.cache.getExpiresAt('cadastro:9'), null);
+    assert.strictEqual(await b.cache.getOrSet('cadastro:9', async () => 'nao'), 'v2');
+});
+
+test('sessão por host: um login, os outros adotam; renovação coordenada', async () => {
+    const { coordenador, lados: [a, b, c] } = criarCluster(3);
+    let logins = 0;
+    const login = (cookies) => async () => { logins++; await esperar(10); return { username: 'u', password: 'p', cookies }; };
+
+    const [ra, rb] = await Promise.all([
+        a.cliente.sessao('h1', null, login('sess=1')),
+        b.cliente.sessao('h1', null, login('sess=outra'))
+    ]);
+    assert.strictEqual(logins, 1);
+    assert.deepStrictEqual([ra.adotada, rb.adotada], [false, true]);
+    assert.strictEqual(rb.sessao.cookies, 'sess=1');
+
+    // Sessões publicadas também chegam a quem não pediu
+    const recebidas = [];
+    c.cliente.on('sessao', (evento) => recebidas.push(evento));
+
+    // b detecta expiração e renova; a, com os mesmos cookies expirados, adota a nova
+    const renovada = await b.cliente.sessao('h1', 'sess=1', login('sess=2'));
+    assert.strictEqual(renovada.adotada, false);
+    const adotada = await a.cliente.sessao('h1', 'sess=1', login('sess=3'));
+    assert.deepStrictEqual([adotada.adotada, adotada.sessao.cookies, logins], [true, 'sess=2', 2]);
+    assert.deepStrictEqual(recebidas.map(e => e.sessao.cookies), ['sess=2']);
+
+    // Login que falha libera a vez
+    const falha = await c.cliente.sessao('h2', null, async () => null);
+    assert.deepStrictEqual(falha, { sessao: null, adotada: false });
+    const stats = await c.cliente.statsCoordenador();
+    assert.deepStrictEqual([stats.hostsComSessao, stats.concessoesAtivas], [['h1'], 0]);
+});
+
+test('evoluções detalhadas gravadas por um worker são remontadas por outro', async () => {
+    const { lados: [a, b] } = criarCluster();
+    const textos = ['DIH: 1\n- Meropenem\n- TOT', 'DIH: 2\n- Meropenem\n- TOT'];
+    // Mesmo formato que obterEvolucoesPaciente guarda com formato=detalhado
+    const montar = async () => {
+        const store = new EvolucaoStore();
+        const idsTexto = textos.map(t => store.adicionar(t));
+        return { data: [{ id: 'e1', conteudo: {} }, { id: 'e2', conteudo: {} }], textos: store.paraCache(), idsTexto };
+    };
+
+    const chave = 'evolucoes:123:formato:detalhado|host:h1|limite:1000';
+    const local = await a.cache.getOrSet(chave, montar);
+    const remota = await b.cache.getOrSet(chave, async () => assert.fail('não deveria buscar'));
+
+    assert.notStrictEqual(remota, local, 'chegou pelo IPC (clonada)');
+    assert.deepStrictEqual(EvolucaoStore.materializar(remota, false).map(e => e.conteudo.textoCompleto), textos);
+    assert.deepStrictEqual(EvolucaoStore.materializar(remota, true)[1].conteudo.delta,
+        EvolucaoStore.materializar(local, true)[1].conteudo.delta);
+});
+
+test('busca mais longa que a concessão é renovada e não se repete', async () => {
+    const { coordenador, lados: [a, b] } = criarCluster(2, { concessaoMs: 20 });
+    let buscas = 0;
+    const buscar = async () => { buscas++; await esperar(90); return 'resultados'; };
+
+    const pedidoA = a.cache.getOrSet('exames-resultados:1', buscar);
+    await esperar(5);
+    const [da, db] = await Promise.all([pedidoA, b.cache.getOrSet('exames-resultados:1', buscar)]);
+
+    assert.strictEqual(buscas, 1);
+    assert.deepStrictEqual([da, db], ['resultados', 'resultados']);
+    assert.ok(coordenador.stats.renovacoes >= 3, `${coordenador.stats.renovacoes} renovações`);
+    const renovacoes = coordenador.stats.renovacoes;
+    await esperar(30);
+    assert.strictEqual(coordenador.stats.renovacoes, renovacoes, 'parou de renovar');
+    assert.strictEqual(coordenador.concessoes.size, 0);
+});
+
+test('job criado num worker é consultado e acompanhado de outro', async () => {
+    const { lados: [a, b] } = criarCluster();
+    const [jobsA, jobsB] = [new JobManager(), new JobManager()];
+    jobsA.usarRegistroCompartilhado(a.cliente);
+    jobsB.usarRegistroCompartilhado(b.cliente);
+
+    let liberar;
+    const { job } = jobsA.criar({ tipo: 'exames', host: 'h1', prontuario: '123' }, async (reportar) => {
+        reportar({ feitas: 1, total: 3 });
+        await new Promise(r => { liberar = r; });
+        return { status: 200, body: { success: true, data: [1, 2, 3] } };
+    });
+    await esperar(5);
+
+    const remoto = await jobsB.localizar(job.id);
+    assert.strictEqual(remoto.estado, 'executando');
+    assert.deepStrictEqual(remoto.progresso, { feitas: 1, total: 3 });
+    assert.strictEqual(await jobsB.localizar('nao-existe'), null);
+
+    const fim = new Promise(resolve => jobsB.on(job.id, (resumo) => !resumo.ativo && resolve(resumo)));
+    liberar();
+    assert.strictEqual((await fim).estado, 'concluido');
+    assert.deepStrictEqual((await jobsB.localizar(job.id)).resultado.body.data, [1, 2, 3]);
+});
+
+test('job ativo de worker que morre é dado como falho', async () => {
+    const { lados: [a, b] } = criarCluster();
+    const [jobsA, jobsB] = [new JobManager(), new JobManager()];
+    jobsA.usarRegistroCompartilhado(a.cliente);
+    jobsB.usarRegistroCompartilhado(b.cliente);
+
+    const { job } = jobsA.criar({ tipo: 'exames', host: 'h1', prontuario: '456' }, () => new Promise(() => {}));
+    // O primário já sabe do job (e de quem o executa)
+    while (!(await jobsB.localizar(job.id))) await esperar(1);
+    const fim = new Promise(resolve => jobsB.on(job.id, (resumo) => !resumo.ativo && resolve(resumo)));
+    a.processo.emit('exit');
+
+    assert.strictEqual((await fim).estado, 'falhou');
+    const remoto = await jobsB.localizar(job.id);
+    assert.strictEqual(remoto.resultado.status, 500);
+    assert.match(remoto.erro, /encerrado/);
+});
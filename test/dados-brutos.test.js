@@ -0,0 +1,250 @@
+/**
+ * Testes da camada de dados brutos do paciente (api/utils/dados-brutos.js).
+ *
+ * Cobre:
+ *  1. Visões diferentes do mesmo paciente reaproveitam o bruto (uma busca ao HICD),
+ *     inclusive em chamadas simultâneas; contadores por recurso e por visão
+ *  2. Resultados dependem da lista de exames e a reaproveitam
+ *  3. Rebusca invalida as visões derivadas do paciente (só do mesmo host) e
+ *     alimenta o feed de mudanças; maxIdadeMs força a rebusca
+ *  4. Lista vazia não vai para o cache
+ *  5. cache.invalidatePatientTypes não casa prefixos de outro prontuário
+ *  6. Quem entra numa busca em andamento recebe o progresso dela
+ *  7. Busca com sinal (stream): interrompida só se ninguém mais espera; interrompida
+ *     não vai para o cache
+ *  8. Evoluções guardadas com os textos em chunks; obter devolve os textos
+ *
+ * Runner: node --test (Node >= 18). Sem dependências externas nem rede.
+ */
+const { test } = require('node:test');
+const assert = require('node:assert');
+
+const cache = require('../api/utils/cache');
+const { ChangeFeed } = require('../api/utils/change-feed');
+const { DadosBrutos } = require('../api/utils/dados-brutos');
+
+const silenciar = async (fn) => {
+    const [log, warn] = [console.log, console.warn];
+    console.log = console.warn = () => {};
+    try { return await fn(); } finally { console.log = log; console.warn = warn; }
+};
+
+function criarCrawler() {
+    const buscas = [];
+    let evolucoes = [{ dataEvolucao: '01/01/2025 08:00', profissional: 'A' }];
+    const crawler = {
+        getPacienteCadastro: async (p) => { buscas.push(`cadastro:${p}`); return { dadosBasicos: { nome: 'X' } }; },
+        getEvolucoes: async (p) => { buscas.push(`evolucoes:${p}`); return evolucoes; },
+        getExames: async (p) => {
+            buscas.push(`exames:${p}`);
+            await new Promise(r => setImmediate(r));
+            return p === 'vazio' ? [] : [{ requisicao: 'r1' }, { requisicao: 'r2' }];
+        },
+        evolutionService: {
+            getResultadosExames: async (p, filtros, exames) => {
+                buscas.push(`resultados:${p}`);
+                return exames.map(e => ({ requisicao: e.requisicao, totalResultados: 1 }));
+            }
+        },
+        novaEvolucao: () => { evolucoes = [...evolucoes, { dataEvolucao: '02/01/2025 09:00', profissional: 'B' }]; }
+    };
+    return { crawler, buscas };
+}
+
+test('visões do mesmo paciente compartilham cada bruto e são contadas', async () => {
+    const dados = new DadosBrutos({ feed: new ChangeFeed() });
+    const { crawler, buscas } = criarCrawler();
+    const contexto = { crawler, prontuario: '100', host: 'h-compartilha' };
+
+    await silenciar(async () => {
+        const analise = dados.paraVisao('analise', contexto);
+        const exames = dados.paraVisao('exames', contexto);
+        // Simultâneas: a segunda entra na busca em andamento
+        await Promise.all([analise.obter('exames'), exames.obter('exames'), analise.obter('cadastro')]);
+        assert.strictEqual(analise.buscas + exames.buscas, 2);
+
+        await exames.obter('resultados');
+        await dados.paraVisao('exames', contexto).obter('resultados');
+    });
+
+    assert.deepStrictEqual(buscas.sort(), ['cadastro:100', 'exames:100', 'resultados:100']);
+    const stats = dados.getStats();
+    // Exames: a busca da análise, a chamada simultânea da visão de exames e a dependência dos resultados
+    assert.deepStrictEqual(stats.porRecurso.exames, { buscas: 1, reaproveitadas: 2 });
+    assert.deepStrictEqual(stats.porRecurso.resultados, { buscas: 1, reaproveitadas: 1 });
+    assert.deepStrictEqual(stats.porVisao.analise,
+        { requisicoes: 1, buscasHicd: 2, reaproveitadas: 0, buscasPorRequisicao: 2 });
+    assert.deepStrictEqual(stats.porVisao.exames,
+        { requisicoes: 2, buscasHicd: 1, reaproveitadas: 3, buscasPorRequisicao: 0.5 });
+});
+
+test('rebusca invalida visões derivadas do mesmo host e publica no feed', async () => {
+    const feed = new ChangeFeed();
+    const dados = new DadosBrutos({ feed });
+    const { crawler, buscas } = criarCrawler();
+    const contexto = { crawler, prontuario: '200', host: 'h-deriva' };
+
+    const visaoEvolucoes = cache.generateKey('evolucoes', '200', { limite: 1000, formato: 'detalhado' }, 'h-deriva');
+    const analise = cache.generateKey('analise', '200', {}, 'h-deriva');
+    const outroHost = cache.generateKey('analise', '200', {}, 'h-outro');
+
+    await silenciar(async () => {
+        await dados.obter('evolucoes', contexto);
+        [visaoEvolucoes, analise, outroHost].forEach(chave => cache.set(chave, { visao: true }));
+
+        // Dentro da idade máxima: reaproveita
+        await dados.obter('evolucoes', contexto, { maxIdadeMs: 60 * 1000 });
+        assert.strictEqual(buscas.length, 1);
+        assert.notStrictEqual(cache.getExpiresAt(analise), null);
+
+        crawler.novaEvolucao();
+        await new Promise(r => setTimeout(r, 5));
+        await dados.obter('evolucoes', contexto, { maxIdadeMs: 1 });
+    });
+
+    assert.strictEqual(buscas.length, 2);
+    assert.strictEqual(cache.getExpiresAt(visaoEvolucoes), null);
+    assert.strictEqual(cache.getExpiresAt(analise), null);
+    assert.notStrictEqual(cache.getExpiresAt(outroHost), null, 'outro host não é afetado');
+
+    const { eventos } = feed.desde();
+    assert.strictEqual(eventos.length, 1);
+    assert.strictEqual(eventos[0].tipo, 'evolucoes');
+    assert.strictEqual(eventos[0].novos.length, 1);
+});
+
+test('lista vazia não vai para o cache', async () => {
+    const dados = new DadosBrutos({ feed: new ChangeFeed() });
+    const { crawler, buscas } = criarCrawler();
+    const contexto = { crawler, prontuario: 'vazio', host: 'h-vazio' };
+
+    for (let i = 0; i < 2; i++) {
+        await assert.rejects(silenciar(() => dados.obter('exames', contexto)), /^Error: EXAMES_NAO_ENCONTRADOS:/);
+    }
+    assert.strictEqual(buscas.length, 2);
+    assert.strictEqual(cache.getExpiresAt(dados.chave('exames', 'vazio', 'h-vazio')), null);
+});
+
+test('invalidatePatientTypes respeita prontuário e host', async () => {
+    await silenciar(async () => {
+        cache.set(cache.generateKey('analise', '12', {}, 'h-inv'), 1);
+        cache.set(cache.generateKey('analise', '123', {}, 'h-inv'), 1);
+        cache.set(cache.generateKey('evolucoes', '12', { limite: 5, formato: 'clinico' }, 'h-inv'), 1);
+        cache.set(cache.generateKey('evolucoes-raw', '12', {}, 'h-inv'), 1);
+        cache.set(cache.generateKey('analise', '12'), 1);
+
+        assert.strictEqual(cache.invalidatePatientTypes('12', ['analise', 'evolucoes'], 'h-inv'), 2);
+    });
+    assert.notStrictEqual(cache.getExpiresAt(cache.generateKey('analise', '123', {}, 'h-inv')), null);
+    assert.notStrictEqual(cache.getExpiresAt(cache.generateKey('evolucoes-raw', '12', {}, 'h-inv')), null);
+    assert.notStrictEqual(cache.getExpiresAt(cache.generateKey('analise', '12')), null, 'chave sem host');
+});
+
+test('quem entra numa busca em andamento recebe o progresso dela', async () => {
+    const dados = new DadosBrutos({ feed: new ChangeFeed() });
+    let avancar;
+    const crawler = {
+        getPrescricoesPaciente: async (p, { onProgresso }) => {
+            onProgresso({ feitas: 0, total: 4 });
+            await new Promise(r => { avancar = r; });
+            onProgresso({ feitas: 4, total: 4 });
+            return [{ id: 'p1' }];
+        }
+    };
+    const contexto = { crawler, prontuario: '300', host: 'h-progresso' };
+
+    await silenciar(async () => {
+        // Requisição síncrona sem progresso começa a busca; o job chega depois
+        const sincrona = dados.obter('prescricoes', contexto);
+        await new Promise(r => setImmediate(r));
+        const recebidos = [];
+        const job = dados.obter('prescricoes', contexto, { onProgresso: p => recebidos.push(p) });
+
+        assert.deepStrictEqual(recebidos, [{ feitas: 0, total: 4 }]);
+        avancar();
+        await Promise.all([sincrona, job]);
+        assert.deepStrictEqual(recebidos, [{ feitas: 0, total: 4 }, { feitas: 4, total: 4 }]);
+    });
+    assert.strictEqual(dados.emVoo.size, 0);
+    assert.strictEqual(dados.getStats().porRecurso.prescricoes.buscas, 1);
+});
+
+function crawlerDeResultados() {
+    const buscas = [];
+    return {
+        buscas,
+        getExames: async () => [{ requisicao: 'r1' }, { requisicao: 'r2' }, { requisicao: 'r3' }],
+        evolutionService: {
+            getResultadosExames: async (p, filtros, exames, { onRequisicao = () => {}, sinal } = {}) => {
+                buscas.push(p);
+                const resultados = [];
+                for (const [i, e] of exames.entries()) {
+                    if (sinal && sinal.aborted) break;
+                    await new Promise(r => setImmediate(r));
+                    resultados.push({ requisicao: e.requisicao, totalResultados: 1 });
+                    onRequisicao(resultados[i], i);
+                }
+                return resultados;
+            }
+        }
+    };
+}
+
+test('stream interrompido segue buscando para quem entrou na busca dele', async () => {
+    const dados = new DadosBrutos({ feed: new ChangeFeed() });
+    const crawler = crawlerDeResultados();
+    const contexto = { crawler, prontuario: '400', host: 'h-stream' };
+    const controle = new AbortController();
+    const enviados = [];
+
+    await silenciar(async () => {
+        const stream = dados.obter('resultados', contexto, {
+            onItem: (r) => { enviados.push(r.requisicao); controle.abort(); },
+            sinal: controle.signal
+        });
+        await new Promise(r => setImmediate(r));
+        // Requisição síncrona chega durante o stream: entra na mesma busca
+        const sincrona = dados.obter('resultados', contexto);
+
+        const [doStream, daSincrona] = await Promise.all([stream, sincrona]);
+        assert.strictEqual(daSincrona.length, 3);
+        assert.strictEqual(doStream, daSincrona);
+    });
+    assert.deepStrictEqual(crawler.buscas, ['400']);
+    assert.strictEqual(cache.get(dados.chave('resultados', '400', 'h-stream')).length, 3);
+});
+
+test('stream interrompido sem ninguém esperando não grava lista parcial', async () => {
+    const dados = new DadosBrutos({ feed: new ChangeFeed() });
+    const crawler = crawlerDeResultados();
+    const contexto = { crawler, prontuario: '401', host: 'h-stream' };
+    const controle = new AbortController();
+
+    await assert.rejects(silenciar(() => dados.obter('resultados', contexto, {
+        onItem: () => controle.abort(),
+        sinal: controle.signal
+    })), /^Error: BUSCA_INTERROMPIDA:/);
+    const chave = dados.chave('resultados', '401', 'h-stream');
+    assert.strictEqual(cache.get(chave), null);
+    assert.strictEqual(cache.pending.has(chave), false);
+    assert.strictEqual(dados.emVoo.size, 0);
+});
+
+test('evoluções são guardadas com os textos em chunks', async () => {
+    const dados = new DadosBrutos({ feed: new ChangeFeed() });
+    const texto = 'Conduta:\n- Manter ATB';
+    const evolucoes = [
+        { chave: 'e2', dataEvolucao: '02/01/2025 08:00', descricao: texto, textoCompleto: texto, textoLimpo: texto },
+        { chave: 'e1', dataEvolucao: '01/01/2025 08:00', descricao: texto, textoCompleto: texto, textoLimpo: texto }
+    ];
+    const crawler = { getEvolucoes: async () => evolucoes };
+    const contexto = { crawler, prontuario: '800', host: 'h-chunks' };
+
+    const lista = await silenciar(() => dados.obter('evolucoes', contexto));
+    assert.deepStrictEqual(lista, evolucoes);
+
+    const guardado = cache.get(dados.chave('evolucoes', '800', 'h-chunks'));
+    assert.deepStrictEqual(guardado.textos.chunks, ['Conduta:', '- Manter ATB'], 'as duas evoluções dividem as linhas');
+    assert.ok(guardado.itens.every(item => item.textoCompleto === undefined));
+    assert.strictEqual(await dados.obter('evolucoes', contexto, { compacto: true }), guardado);
+});
@@ -0,0 +1,93 @@
+/**
+ * Testes do GET condicional sobre entradas do cache (api/utils/etag.js).
+ *
+ * Cobre:
+ *  1. MemoryCache.getEntryTag — hash calculado uma vez por entrada; novo set gera novo hash
+ *  2. correspondeIfNoneMatch — lista, W/ e `*`
+ *  3. naoModificado — define ETag/Last-Modified; 304 com If-None-Match correspondente;
+ *     sem entrada no cache não há validadores
+ *
+ * Runner: node --test (Node >= 18). Sem dependências externas nem rede.
+ */
+const { test } = require('node:test');
+const assert = require('node:assert');
+
+const cache = require('../api/utils/cache');
+const { naoModificado, validadoresDe, correspondeIfNoneMatch } = require('../api/utils/etag');
+
+const silenciar = (fn) => {
+    const log = console.log;
+    console.log = () => {};
+    try { return fn(); } finally { console.log = log; }
+};
+
+function criarRes() {
+    const res = {
+        cabecalhos: {}, statusCode: 200, encerrado: false,
+        setHeader(nome, valor) { res.cabecalhos[nome] = valor; return res; },
+        status(codigo) { res.statusCode = codigo; return res; },
+        end() { res.encerrado = true; return res; }
+    };
+    return res;
+}
+
+test('getEntryTag calcula o hash uma vez por entrada', () => {
+    silenciar(() => cache.set('etag-teste:1', { a: 1 }));
+    const primeiro = cache.getEntryTag('etag-teste:1');
+    assert.ok(primeiro.hash);
+
+    const stringify = JSON.stringify;
+    let chamadas = 0;
+    JSON.stringify = (...args) => { chamadas++; return stringify(...args); };
+    try {
+        assert.strictEqual(cache.getEntryTag('etag-teste:1').hash, primeiro.hash);
+    } finally {
+        JSON.stringify = stringify;
+    }
+    assert.strictEqual(chamadas, 0, 'hash memoizado não reserializa');
+
+    silenciar(() => cache.set('etag-teste:1', { a: 2 }));
+    assert.notStrictEqual(cache.getEntryTag('etag-teste:1').hash, primeiro.hash);
+    assert.strictEqual(cache.getEntryTag('etag-teste:inexistente'), null);
+});
+
+test('If-None-Match aceita lista, W/ e *', () => {
+    assert.strictEqual(correspondeIfNoneMatch(undefined, '"x"'), false);
+    assert.strictEqual(correspondeIfNoneMatch('"a", "x"', '"x"'), true);
+    assert.strictEqual(correspondeIfNoneMatch('W/"x"', '"x"'), true);
+    assert.strictEqual(correspondeIfNoneMatch('"x"', 'W/"x"'), true);
+    assert.strictEqual(correspondeIfNoneMatch('W/"x"', 'W/"x"'), true);
+    assert.strictEqual(correspondeIfNoneMatch('*', '"x"'), true);
+    assert.strictEqual(correspondeIfNoneMatch('"y"', '"x"'), false);
+});
+
+test('naoModificado responde 304 quando o cliente já tem a versão', () => {
+    silenciar(() => cache.set('etag-teste:2', { exames: [1, 2, 3] }));
+    const req = { originalUrl: '/api/pacientes/123/exames?formato=resumido', hicdHost: 'hicd', headers: {} };
+
+    const primeira = criarRes();
+    assert.strictEqual(naoModificado(req, primeira, ['etag-teste:2']), false);
+    const etag = primeira.cabecalhos.ETag;
+    assert.match(etag, /^W\/"[\w-]+"$/, 'ETag fraco: o corpo é comprimido depois');
+    assert.ok(primeira.cabecalhos['Last-Modified']);
+
+    const revalidacao = criarRes();
+    assert.strictEqual(naoModificado({ ...req, headers: { 'if-none-match': etag } }, revalidacao, ['etag-teste:2']), true);
+    assert.strictEqual(revalidacao.statusCode, 304);
+    assert.strictEqual(revalidacao.encerrado, true);
+
+    // Outro formato (URL) ou outro host: outro ETag
+    assert.notStrictEqual(validadoresDe({ ...req, originalUrl: '/api/pacientes/123/exames' }, ['etag-teste:2']).etag, etag);
+    assert.notStrictEqual(validadoresDe({ ...req, hicdHost: 'outro' }, ['etag-teste:2']).etag, etag);
+
+    // Dado mudou: o ETag antigo não vale mais
+    silenciar(() => cache.set('etag-teste:2', { exames: [1, 2, 3, 4] }));
+    const mudou = criarRes();
+    assert.strictEqual(naoModificado({ ...req, headers: { 'if-none-match': etag } }, mudou, ['etag-teste:2']), false);
+    assert.notStrictEqual(mudou.cabecalhos.ETag, etag);
+
+    // Sem entrada no cache: nenhum validador
+    const semCache = criarRes();
+    assert.strictEqual(naoModificado(req, semCache, ['etag-teste:2', 'etag-teste:ausente']), false);
+    assert.deepStrictEqual(semCache.cabecalhos, {});
+});
@@ -0,0 +1,89 @@
+/**
+ * Testes do armazenamento deduplicado de textos de evolução (src/core/evolucao-store.js).
+ *
+ * Cobre:
+ *  1. Ida e volta: texto → ids → texto (linhas vazias, texto vazio, null)
+ *  2. Linhas repetidas entre evoluções (copy-forward) guardadas uma única vez
+ *  3. Delta em relação à anterior reconstrói o texto e copia os trechos repetidos
+ *  4. Lista do parser compactada (itens sem texto + chunks) e expandida de volta
+ *
+ * Runner: node --test (Node >= 18). Sem dependências externas nem rede.
+ */
+const { test } = require('node:test');
+const assert = require('node:assert');
+
+const EvolucaoStore = require('../src/core/evolucao-store');
+
+/** Evoluções diárias de uma internação: cada dia copia o anterior e muda algumas linhas. */
+function internacao(dias) {
+    const base = [
+        'Hipóteses Diagnósticas:', '1. Choque séptico', '2. Pneumonia',
+        'Medicações em uso:', '- Meropenem', '- Vancomicina', '- Noradrenalina',
+        'Dispositivos:', '- CVC em VJID', '- TOT', '- SVD',
+        'Conduta:', '- Manter ATB', '- Desmame de DVA'
+    ];
+    const textos = [];
+    for (let dia = 1; dia <= dias; dia++) {
+        const linhas = [`DIH: ${dia}`, ...base];
+        linhas.splice(5, 0, `- Meropenem D${dia}`);
+        if (dia % 3 === 0) linhas.push(`- Coletar culturas (D${dia})`);
+        if (dia > 5) linhas.splice(linhas.indexOf('- Noradrenalina'), 1);
+        textos.push(linhas.join('\n'));
+    }
+    return textos;
+}
+
+test('ida e volta preserva o texto', () => {
+    const store = new EvolucaoStore();
+    for (const texto of ['', 'uma linha', 'a\n\nb\n', '\n', 'Conduta:\r\n- manter']) {
+        assert.strictEqual(store.texto(store.adicionar(texto)), texto);
+    }
+    assert.strictEqual(store.adicionar(null), null);
+    assert.strictEqual(store.texto(null), null);
+});
+
+test('linhas repetidas entre evoluções são guardadas uma vez', () => {
+    const store = new EvolucaoStore();
+    const textos = internacao(30);
+    const ids = textos.map(t => store.adicionar(t));
+
+    ids.forEach((sequencia, i) => assert.strictEqual(store.texto(sequencia), textos[i]));
+
+    const stats = store.getStats();
+    assert.strictEqual(stats.bytesReferenciados, textos.reduce((soma, t) => soma + t.length + 1, 0));
+    assert.ok(stats.chunksUnicos < stats.totalReferencias / 5, `${stats.chunksUnicos} chunks para ${stats.totalReferencias} linhas`);
+    assert.ok(stats.taxaDeduplicacao > 0.8, `taxa ${stats.taxaDeduplicacao}`);
+});
+
+test('delta em relação à anterior reconstrói o texto', () => {
+    const store = new EvolucaoStore();
+    const textos = [...internacao(12), 'texto sem relação\ncom a anterior', ''];
+    const ids = textos.map(t => store.adicionar(t));
+
+    // Primeira evolução (sem anterior): só inserções
+    assert.deepStrictEqual(store.delta(null, ids[0]), textos[0].split('\n'));
+
+    for (let i = 1; i < textos.length; i++) {
+        const ops = store.delta(ids[i - 1], ids[i]);
+        assert.strictEqual(EvolucaoStore.aplicarDelta(textos[i - 1], ops), textos[i], `evolução ${i}`);
+    }
+
+    // Copy-forward: o delta é bem menor que o texto
+    const ops = store.delta(ids[7], ids[8]);
+    assert.ok(JSON.stringify(ops).length < textos[8].length / 3, JSON.stringify(ops));
+    assert.ok(ops.some(op => Array.isArray(op) && op[1] > 3));
+});
+
+test('lista do parser compactada guarda cada linha uma vez e volta igual', () => {
+    const evolucoes = internacao(10).map((texto, i) => ({
+        chave: `e${i}`, dataEvolucao: `0${i}/01/2025`, descricao: texto, textoCompleto: texto, textoLimpo: texto
+    }));
+    evolucoes.push({ chave: 'sem-texto', dataEvolucao: '11/01/2025' });
+
+    const guardado = structuredClone(EvolucaoStore.compactarEvolucoes(evolucoes));
+    assert.ok(guardado.itens.every(item => !('textoCompleto' in item) && !('descricao' in item)));
+    const linhas = evolucoes.reduce((soma, e) => soma + (e.descricao ? e.descricao.split('\n').length : 0), 0);
+    assert.ok(guardado.textos.chunks.length < linhas / 4, `${guardado.textos.chunks.length} chunks para ${linhas} linhas`);
+
+    assert.deepStrictEqual(EvolucaoStore.expandirEvolucoes(guardado), evolucoes);
+});
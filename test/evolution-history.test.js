@@ -0,0 +1,136 @@
+/**
+ * Testes da busca incremental de evoluções (marca d'água por prontuário).
+ *
+ * Cobre:
+ *  1. evolucao-identidade — instante comparável (evolução × atualização) e chave
+ *  2. EvolutionService — 1ª busca completa; seguintes só processam evoluções novas
+ *     e preservam ordem/conjunto da lista do HICD
+ *  3. Evolução "conhecida" ausente do histórico → parse completo refeito
+ *  4. Busca com filtro não usa nem alimenta o histórico; limite de prontuários
+ *  5. Histórico é do host: o serviço recriado (novo login) continua incremental
+ *
+ * Runner: node --test (Node >= 18). Sem dependências externas nem rede.
+ */
+const { test } = require('node:test');
+const assert = require('node:assert');
+
+const { instanteComparavel, instanteEvolucao, chaveEvolucao } = require('../src/parsers/evolucao-identidade');
+const EvolutionHistory = require('../src/services/evolution-history');
+const EvolutionService = require('../src/services/evolution-service');
+
+function evolucao(dia, hora = '08:00', extra = {}) {
+    const data = `${String(dia).padStart(2, '0')}/09/2026 ${hora}`;
+    const e = { dataEvolucao: data, dataAtualizacao: data, profissional: 'DRA ANA', atividade: 'EVOLUÇÃO', clinicaLeito: 'UTI/01', descricao: `Dia ${dia}`, ...extra };
+    // Como o EvolucaoParser: o mesmo texto em descricao, textoCompleto e textoLimpo
+    return { ...e, textoCompleto: e.descricao, textoLimpo: e.descricao };
+}
+
+/**
+ * Parser falso com a mesma regra do EvolucaoParser: evoluções anteriores à
+ * marca d'água vêm como { chave, conhecida: true }. A "página" é a lista em `html`.
+ */
+function criarServico(paginas, options) {
+    const chamadas = { requisicoes: 0, processadas: 0, parses: [] };
+    const httpClient = {
+        getUrls: () => ({ login: 'u', index: 'i' }),
+        post: async () => { chamadas.requisicoes++; return { data: paginas.atual }; }
+    };
+    const parser = {
+        parseAsync: async (metodo, html, prontuario, opcoes = {}) => {
+            chamadas.parses.push(opcoes);
+            return html.map(e => {
+                if (opcoes.marcaDagua && instanteEvolucao(e) < opcoes.marcaDagua) return { chave: chaveEvolucao(e), conhecida: true };
+                chamadas.processadas++;
+                return { ...e, chave: chaveEvolucao(e), prontuario };
+            });
+        }
+    };
+    const log = console.log;
+    const servico = new EvolutionService(httpClient, parser, options);
+    return { servico, chamadas, silenciar: async (fn) => { console.log = () => {}; try { return await fn(); } finally { console.log = log; } } };
+}
+
+test('instante considera a atualização e é comparável como string', () => {
+    assert.strictEqual(instanteComparavel('05/09/2026 14:30'), '2026/09/05 14:30');
+    assert.strictEqual(instanteComparavel('05/09/2026'), '2026/09/05');
+    assert.strictEqual(instanteComparavel('sem data'), '');
+    assert.ok(instanteComparavel('31/08/2026 23:59') < instanteComparavel('01/09/2026 00:00'));
+
+    const editada = evolucao(3, '08:00', { dataAtualizacao: '10/09/2026 12:00' });
+    assert.strictEqual(instanteEvolucao(editada), '2026/09/10 12:00');
+    assert.notStrictEqual(chaveEvolucao(editada), chaveEvolucao(evolucao(3)));
+});
+
+test('buscas seguintes só processam as evoluções novas', async () => {
+    const paginas = { atual: [evolucao(3), evolucao(2), evolucao(1)] };
+    const { servico, chamadas, silenciar } = criarServico(paginas);
+
+    const primeira = await silenciar(() => servico.getEvolucoes('123'));
+    assert.strictEqual(primeira.length, 3);
+    assert.strictEqual(chamadas.processadas, 3);
+    assert.deepStrictEqual(chamadas.parses[0], {});
+
+    // Nova evolução no topo; a mais antiga saiu da lista do HICD
+    paginas.atual = [evolucao(4), evolucao(3), evolucao(2)];
+    const segunda = await silenciar(() => servico.getEvolucoes('123'));
+    assert.deepStrictEqual(chamadas.parses[1], { marcaDagua: '2026/09/03 08:00' });
+    // Processadas: a nova e a que está exatamente na marca
+    assert.strictEqual(chamadas.processadas, 5);
+    assert.deepStrictEqual(segunda.map(e => e.descricao), ['Dia 4', 'Dia 3', 'Dia 2']);
+    assert.deepStrictEqual(segunda[2], primeira[1], 'evolução anterior à marca vem da cópia já processada');
+    assert.strictEqual(chamadas.requisicoes, 2);
+
+    // Evolução antiga editada: a atualização a coloca depois da marca
+    paginas.atual = [evolucao(4), evolucao(3), evolucao(2, '08:00', { dataAtualizacao: '05/09/2026 10:00', descricao: 'Dia 2 corrigido' })];
+    const terceira = await silenciar(() => servico.getEvolucoes('123'));
+    assert.deepStrictEqual(terceira.map(e => e.descricao), ['Dia 4', 'Dia 3', 'Dia 2 corrigido']);
+    assert.strictEqual(chamadas.processadas, 7);
+
+    const stats = servico.historicoEvolucoes.getStats();
+    assert.strictEqual(stats.pacientes, 1);
+    assert.strictEqual(stats.buscasIncrementais, 2);
+});
+
+test('evolução conhecida fora do histórico refaz o parse completo', async () => {
+    const paginas = { atual: [evolucao(5), evolucao(4)] };
+    const { servico, chamadas, silenciar } = criarServico(paginas);
+    await silenciar(() => servico.getEvolucoes('123'));
+
+    // Evolução retroativa sem atualização posterior: fica antes da marca mas nunca foi vista
+    paginas.atual = [evolucao(5), evolucao(4), evolucao(4, '07:00', { profissional: 'DR BRUNO' })];
+    const resultado = await silenciar(() => servico.getEvolucoes('123'));
+
+    assert.strictEqual(resultado.length, 3);
+    assert.ok(resultado.every(e => !e.conhecida));
+    assert.deepStrictEqual(chamadas.parses.at(-1), {});
+    assert.strictEqual(servico.historicoEvolucoes.getStats().recomecos, 1);
+});
+
+test('busca com filtro ignora o histórico; limite de prontuários', async () => {
+    const paginas = { atual: [evolucao(2), evolucao(1)] };
+    const { servico, chamadas, silenciar } = criarServico(paginas);
+
+    await silenciar(() => servico.getEvolucoes('123', { filtro: 'UTI' }));
+    assert.deepStrictEqual(chamadas.parses[0], {});
+    assert.strictEqual(servico.historicoEvolucoes.getStats().pacientes, 0);
+
+    const historico = new EvolutionHistory({ maxPacientes: 2 });
+    historico.registrar('1', [evolucao(1)]);
+    historico.registrar('2', [evolucao(1)]);
+    historico.registrar('1', [evolucao(2)]);
+    historico.registrar('3', [evolucao(1)]);
+    assert.deepStrictEqual([...historico.pacientes.keys()], ['1', '3']);
+    assert.deepStrictEqual(historico.opcoesParse('1'), { marcaDagua: '2026/09/02 08:00' });
+    assert.deepStrictEqual(historico.opcoesParse('2'), {});
+});
+
+test('serviço recriado para o mesmo host continua incremental', async () => {
+    const paginas = { atual: [evolucao(2), evolucao(1)] };
+    const antes = criarServico(paginas, { host: 'hicd-relogin.test' });
+    await antes.silenciar(() => antes.servico.getEvolucoes('321'));
+
+    const depois = criarServico(paginas, { host: 'hicd-relogin.test' });
+    await depois.silenciar(() => depois.servico.getEvolucoes('321'));
+    assert.deepStrictEqual(depois.chamadas.parses, [{ marcaDagua: '2026/09/02 08:00' }]);
+    assert.strictEqual(depois.servico.historicoEvolucoes, antes.servico.historicoEvolucoes);
+});
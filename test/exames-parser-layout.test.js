@@ -0,0 +1,103 @@
+/**
+ * Testes do pipeline de resultados de exames do ExamesParser (páginas de impressão).
+ *
+ * Cobre:
+ *  1. Layout nativo (table.table1) — resultados simples, blocos expandidos, pendentes ignorados
+ *  2. Layouts de fallback (tabela legada, texto com "VR:")
+ *  3. Impressão digital de layout só pula estratégias impossíveis; a saída não
+ *     depende das páginas parseadas antes
+ *  4. Documento cheerio já carregado é aceito no lugar do HTML
+ *
+ * Fixtures sintéticas/anonimizadas em test/fixtures/exames.
+ * Runner: node --test (Node >= 18). Sem rede.
+ */
+const { test } = require('node:test');
+const assert = require('node:assert');
+const fs = require('fs');
+const path = require('path');
+const cheerio = require('cheerio');
+
+const ExamesParser = require('../src/parsers/exames-parser');
+
+const FIXTURES = path.join(__dirname, 'fixtures', 'exames');
+const fixture = (nome) => fs.readFileSync(path.join(FIXTURES, nome), 'utf8');
+
+function semLogs(fn) {
+    const original = console.log;
+    console.log = () => {};
+    try {
+        return fn();
+    } finally {
+        console.log = original;
+    }
+}
+
+test('layout nativo: resultados simples, blocos expandidos e pendentes ignorados', () => {
+    const parser = new ExamesParser('https://hicd.test');
+    const resultados = semLogs(() => parser.parseResultadosExames(fixture('impressao-table1.html'), 'R1'));
+    const porSigla = new Map(resultados.map(r => [r.sigla, r]));
+
+    assert.strictEqual(porSigla.get('GLI').valor, '98');
+    assert.strictEqual(porSigla.get('GLI').referencia, '70 a 99');
+    assert.strictEqual(porSigla.get('CRE').referencia, '0,6 a 1,2');
+    assert.strictEqual(porSigla.get('HTO').agrupamento.codigo, 'HEMOGRAMA');
+    assert.strictEqual(porSigla.get('INR').agrupamento.codigo, 'TAP');
+    assert.ok(!porSigla.has('URE'), 'exame aguardando resultado não entra');
+    assert.ok(!porSigla.has('HPL'), 'bloco do hemograma é substituído pelos itens');
+});
+
+test('layouts de fallback: tabela legada e texto com VR', () => {
+    const parser = new ExamesParser('https://hicd.test');
+
+    const tabela = semLogs(() => parser.parseResultadosExames(fixture('impressao-tabela.html'), 'R2'));
+    assert.deepStrictEqual(tabela.map(r => r.sigla), ['NA', 'POT', 'MG', 'PCR']);
+    assert.strictEqual(tabela[1].referencia, '3,5 a 5,1');
+
+    const texto = semLogs(() => parser.parseResultadosExames(fixture('impressao-texto-vr.html'), 'R3'));
+    assert.deepStrictEqual(texto.map(r => r.sigla), ['TGO', 'TGP', 'Amilase']);
+    assert.strictEqual(texto[1].referencia, 'até 41');
+});
+
+test('mesma página, mesmo resultado, qualquer que seja o histórico do parser', () => {
+    const misto = fixture('impressao-misto.html');
+    const textoVr = fixture('impressao-texto-vr.html');
+
+    const parser = new ExamesParser('https://hicd.test');
+    assert.deepStrictEqual(
+        parser.identificarLayout(cheerio.load(misto)),
+        parser.identificarLayout(cheerio.load(textoVr)),
+        'as duas páginas têm a mesma impressão digital'
+    );
+
+    const isolado = semLogs(() => new ExamesParser('https://hicd.test').parseResultadosExames(misto, 'R4'));
+    assert.deepStrictEqual(isolado.map(r => r.sigla), ['NA']);
+
+    // Depois de uma página do mesmo layout resolvida pela estratégia texto
+    semLogs(() => parser.parseResultadosExames(textoVr, 'R3'));
+    const depois = semLogs(() => parser.parseResultadosExames(misto, 'R4'));
+    assert.deepStrictEqual(depois, isolado);
+    assert.deepStrictEqual(parser.getEstatisticasLayout().vencedoras, { texto: 1, tabelas: 1 });
+});
+
+test('table1 só roda no layout nativo', () => {
+    const parser = new ExamesParser('https://hicd.test');
+    const $ = cheerio.load(fixture('impressao-table1.html'));
+
+    assert.strictEqual(parser.identificarLayout($).nativo, true);
+    semLogs(() => parser.parseResultadosExames($, 'R1'));
+    semLogs(() => parser.parseResultadosExames(fixture('impressao-tabela.html'), 'R2'));
+
+    const stats = parser.getEstatisticasLayout();
+    assert.deepStrictEqual(stats.vencedoras, { table1: 1, tabelas: 1 });
+    assert.strictEqual(stats.estrategiasPuladas, 1);
+    assert.strictEqual(stats.estrategiasExecutadas, 2);
+});
+
+test('aceita documento cheerio já carregado com o mesmo resultado do HTML', () => {
+    const parser = new ExamesParser('https://hicd.test');
+    const html = fixture('impressao-tabela.html');
+
+    const deString = semLogs(() => parser.parseResultadosExames(html, 'R2'));
+    const deDocumento = semLogs(() => parser.parseResultadosExames(cheerio.load(html), 'R2'));
+    assert.deepStrictEqual(deDocumento, deString);
+});
@@ -0,0 +1,94 @@
+/**
+ * Testes do envio incremental de resultados de exames.
+ *
+ * Cobre:
+ *  1. getResultadosExames — onRequisicao chamado por requisição assim que parseada,
+ *     antes do fim do batch loop; progresso por batch
+ *  2. getResultadosExames — sinal abortado interrompe antes do próximo batch
+ *  3. abrirStream — formato SSE e NDJSON
+ *
+ * Runner: node --test (Node >= 18). Sem dependências externas nem rede.
+ */
+const { test } = require('node:test');
+const assert = require('node:assert');
+
+const EvolutionService = require('../src/services/evolution-service');
+const { abrirStream } = require('../api/utils/stream');
+
+process.env.EXAM_BATCH_SIZE = '2';
+process.env.EXAM_BATCH_DELAY_MS = '1';
+
+function criarServico(eventos) {
+    const httpClient = {
+        getUrls: () => ({ login: 'u', index: 'i' }),
+        get: async (url) => {
+            eventos.push(`get ${url}`);
+            return { data: url };
+        }
+    };
+    const parser = {
+        gerarUrlsImpressao: (exames) => exames.map(e => ({ requisicao: e.requisicao, url: `imprime/${e.requisicao}` })),
+        parseAsync: async (metodo, html, requisicao) => [{ sigla: 'HB', valor: '12', requisicao }]
+    };
+    return new EvolutionService(httpClient, parser);
+}
+
+const silenciar = async (fn) => {
+    const [log, error] = [console.log, console.error];
+    console.log = console.error = () => {};
+    try { return await fn(); } finally { console.log = log; console.error = error; }
+};
+
+test('cada requisição é entregue assim que parseada, com progresso por batch', async () => {
+    const eventos = [];
+    const requisicoes = ['R1', 'R2', 'R3', 'R4', 'R5'].map(requisicao => ({ requisicao }));
+    const servico = criarServico(eventos);
+
+    const resultado = await silenciar(() => servico.getResultadosExames('123', {}, requisicoes, {
+        onProgresso: (p) => eventos.push(`progresso ${p.feitas}/${p.total}`),
+        onRequisicao: (r, indice) => eventos.push(`requisicao ${r.requisicao} #${indice}`)
+    }));
+
+    assert.strictEqual(resultado.length, 5);
+    // A primeira requisição sai antes de o segundo batch começar
+    assert.ok(eventos.indexOf('requisicao R1 #0') < eventos.indexOf('get imprime/R3'));
+    assert.deepStrictEqual(eventos.filter(e => e.startsWith('progresso')),
+        ['progresso 0/5', 'progresso 2/5', 'progresso 4/5', 'progresso 5/5']);
+    assert.strictEqual(eventos.filter(e => e.startsWith('requisicao')).length, 5);
+});
+
+test('sinal abortado interrompe antes do próximo batch', async () => {
+    const eventos = [];
+    const requisicoes = ['R1', 'R2', 'R3', 'R4'].map(requisicao => ({ requisicao }));
+    const servico = criarServico(eventos);
+    const controle = new AbortController();
+
+    const resultado = await silenciar(() => servico.getResultadosExames('123', {}, requisicoes, {
+        onRequisicao: () => controle.abort(),
+        sinal: controle.signal
+    }));
+
+    assert.strictEqual(resultado.length, 2);
+    assert.ok(!eventos.includes('get imprime/R3'));
+});
+
+test('abrirStream escreve SSE e NDJSON', () => {
+    const criarRes = () => ({
+        cabecalhos: null, escrito: '',
+        writeHead(status, cabecalhos) { this.status = status; this.cabecalhos = cabecalhos; },
+        write(trecho) { this.escrito += trecho; }
+    });
+
+    const sse = criarRes();
+    abrirStream(sse, 'sse')('progresso', { feitas: 1, total: 3 });
+    assert.match(sse.cabecalhos['Content-Type'], /^text\/event-stream/);
+    assert.strictEqual(sse.escrito, 'event: progresso\ndata: {"feitas":1,"total":3}\n\n');
+
+    const ndjson = criarRes();
+    const emitir = abrirStream(ndjson, 'ndjson');
+    emitir('inicio', { total: 2 });
+    emitir('fim', {});
+    assert.match(ndjson.cabecalhos['Content-Type'], /^application\/x-ndjson/);
+    assert.deepStrictEqual(ndjson.escrito.trim().split('\n').map(l => JSON.parse(l)),
+        [{ evento: 'inicio', dados: { total: 2 } }, { evento: 'fim', dados: {} }]);
+});
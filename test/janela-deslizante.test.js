@@ -0,0 +1,133 @@
+/**
+ * Testes do rate limiting por cliente (api/utils/janela-deslizante.js e
+ * rateLimit em api/middleware/auth.js).
+ *
+ * Cobre:
+ *  1. Janela deslizante — limite dentro da janela, peso da janela anterior caindo
+ *     com o tempo, Retry-After até a estimativa ficar abaixo do limite
+ *  2. Memória — clientes parados saem na virada da janela; acima de maxClientes sai o mais antigo
+ *  3. Middleware — 429 com Retry-After e RateLimit-*, limites por grupo e desligado com 0
+ *     (e por padrão, sem RATE_LIMIT_MAX)
+ *
+ * Runner: node --test (Node >= 18). Sem dependências externas nem rede.
+ */
+const { test } = require('node:test');
+const assert = require('node:assert');
+
+const JanelaDeslizante = require('../api/utils/janela-deslizante');
+const { rateLimit, rateLimitStats } = require('../api/middleware/auth');
+
+const MIN = 60 * 1000;
+
+test('limite por janela com o peso da anterior caindo com o tempo', () => {
+    const janela = new JanelaDeslizante({ max: 10, janelaMs: MIN });
+    const t0 = 10 * MIN;
+
+    for (let i = 0; i < 10; i++) assert.strictEqual(janela.registrar('a', t0 + i).permitida, true);
+    const bloqueada = janela.registrar('a', t0 + 30 * 1000);
+    assert.strictEqual(bloqueada.permitida, false);
+    // Só na próxima janela, quando as 10 passam a pesar menos que o limite
+    assert.strictEqual(bloqueada.retryAfterMs, 30 * 1000 + 1);
+    // Outro cliente tem o próprio contador
+    assert.strictEqual(janela.registrar('b', t0).restantes, 9);
+
+    // Metade da janela seguinte: as 10 anteriores pesam 5 → cabem mais 5
+    const meio = t0 + MIN + MIN / 2;
+    const permitidas = [];
+    for (let i = 0; i < 6; i++) permitidas.push(janela.registrar('a', meio).permitida);
+    assert.deepStrictEqual(permitidas, [true, true, true, true, true, false]);
+
+    // O peso cai continuamente: 1 ms depois cabe mais uma; a seguinte, só 6 s depois
+    // (10 × 6 s / 60 s = 1 requisição)
+    assert.strictEqual(janela.registrar('a', meio + 1).permitida, true);
+    const espera = janela.registrar('a', meio + 1);
+    assert.deepStrictEqual([espera.permitida, espera.retryAfterMs], [false, 6000]);
+    assert.strictEqual(janela.registrar('a', meio + 6000).permitida, false);
+    assert.strictEqual(janela.registrar('a', meio + 1 + espera.retryAfterMs).permitida, true);
+
+    assert.deepStrictEqual([janela.stats.permitidas, janela.stats.bloqueadas], [18, 4]);
+});
+
+test('clientes parados saem na virada da janela; acima do máximo sai o mais antigo', () => {
+    const janela = new JanelaDeslizante({ max: 5, janelaMs: MIN, maxClientes: 3 });
+    janela.registrar('a', 0);
+    janela.registrar('b', MIN);
+    janela.registrar('c', MIN);
+    assert.strictEqual(janela.clientes.size, 3);
+
+    // 'a' não fez nada na janela anterior: sai; 'b' e 'c' ainda pesam
+    janela.registrar('b', 2 * MIN);
+    assert.deepStrictEqual([...janela.clientes.keys()], ['b', 'c']);
+    assert.strictEqual(janela.stats.expirados, 1);
+
+    janela.registrar('d', 2 * MIN);
+    janela.registrar('e', 2 * MIN);
+    assert.deepStrictEqual([...janela.clientes.keys()], ['c', 'd', 'e']);
+    assert.strictEqual(janela.stats.despejados, 1);
+
+    // Muito tempo depois, todos saem de uma vez
+    janela.registrar('f', 100 * MIN);
+    assert.deepStrictEqual([...janela.clientes.keys()], ['f']);
+});
+
+function chamar(middleware, ip = '10.0.0.1') {
+    const cabecalhos = {};
+    const res = {
+        statusCode: 200,
+        setHeader(nome, valor) { cabecalhos[nome] = valor; },
+        status(codigo) { this.statusCode = codigo; return this; },
+        json(corpo) { this.corpo = corpo; return this; }
+    };
+    let seguiu = false;
+    middleware({ ip }, res, () => { seguiu = true; });
+    return { seguiu, res, cabecalhos };
+}
+
+test('middleware responde 429 com Retry-After e cabeçalhos RateLimit', () => {
+    const limitar = rateLimit({ grupo: 'teste', max: 2, janelaMs: MIN });
+    assert.deepStrictEqual(chamar(limitar).cabecalhos, { 'RateLimit-Limit': 2, 'RateLimit-Remaining': 1 });
+    assert.strictEqual(chamar(limitar).seguiu, true);
+
+    const { seguiu, res, cabecalhos } = chamar(limitar);
+    assert.strictEqual(seguiu, false);
+    assert.strictEqual(res.statusCode, 429);
+    assert.strictEqual(res.corpo.success, false);
+    assert.strictEqual(res.corpo.error, 'Muitas requisições');
+    assert.strictEqual(res.corpo.message, 'Limite de 2 requisições por 60s excedido');
+    assert.ok(cabecalhos['Retry-After'] >= 1 && cabecalhos['Retry-After'] === res.corpo.retryAfter);
+    assert.strictEqual(chamar(limitar, '10.0.0.2').seguiu, true);
+    assert.strictEqual(rateLimitStats().teste.bloqueadas, 1);
+});
+
+test('limites por grupo vêm do ambiente; 0 desliga', () => {
+    const anterior = { ...process.env };
+    try {
+        Object.assign(process.env, { RATE_LIMIT_MAX: '50', RATE_LIMIT_PACIENTES_MAX: '3', RATE_LIMIT_PACIENTES_JANELA_MS: '1000' });
+        rateLimit({ grupo: 'pacientes' });
+        rateLimit({ grupo: 'auth' });
+        rateLimit({ grupo: 'cache' });
+        const stats = rateLimitStats();
+        assert.deepStrictEqual([stats.pacientes.max, stats.pacientes.janelaMs], [3, 1000]);
+        assert.deepStrictEqual([stats.auth.max, stats.cache.max, stats.cache.janelaMs], [10, 50, MIN]);
+
+        process.env.RATE_LIMIT_CACHE_MAX = '0';
+        const desligado = rateLimit({ grupo: 'cache' });
+        for (let i = 0; i < 100; i++) assert.strictEqual(chamar(desligado).seguiu, true);
+
+        process.env.RATE_LIMIT_MAX = '0';
+        const todosDesligados = rateLimit({ grupo: 'auth' });
+        for (let i = 0; i < 20; i++) assert.strictEqual(chamar(todosDesligados).seguiu, true);
+
+        // Sem RATE_LIMIT_MAX: desligado, exceto o grupo com limite próprio
+        delete process.env.RATE_LIMIT_MAX;
+        const padrao = rateLimit({ grupo: 'feed' });
+        for (let i = 0; i < 200; i++) assert.strictEqual(chamar(padrao).seguiu, true);
+        assert.strictEqual(rateLimitStats().feed, undefined);
+        const proprio = rateLimit({ grupo: 'pacientes' });
+        const seguiram = Array.from({ length: 4 }, () => chamar(proprio, '10.9.9.9').seguiu);
+        assert.deepStrictEqual(seguiram, [true, true, true, false]);
+    } finally {
+        for (const chave of Object.keys(process.env)) if (!(chave in anterior)) delete process.env[chave];
+        Object.assign(process.env, anterior);
+    }
+});
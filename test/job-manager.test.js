@@ -0,0 +1,125 @@
+/**
+ * Testes do gerenciador de jobs assíncronos (api/utils/job-manager.js).
+ *
+ * Cobre:
+ *  1. Criação devolve o id antes de o trabalho começar; progresso e conclusão
+ *  2. Single-flight: job idêntico em andamento é reaproveitado; terminado, não
+ *  3. Falha (exceção ou status >= 400) e eventos emitidos até o fim
+ *  4. Expiração de jobs terminados
+ *
+ * Runner: node --test (Node >= 18). Sem dependências externas nem rede.
+ */
+const { test } = require('node:test');
+const assert = require('node:assert');
+
+const JobManager = require('../api/utils/job-manager');
+
+const DESCRICAO = { tipo: 'exames', host: 'hicd', prontuario: '123', parametros: { formato: 'resultados', incluirResultados: 'true' } };
+
+function adiado() {
+    let resolver;
+    const promessa = new Promise(resolve => { resolver = resolve; });
+    return { promessa, resolver };
+}
+
+const aguardarFim = (manager, job) => new Promise(resolve => {
+    if (job.estado === 'concluido' || job.estado === 'falhou') return resolve(job);
+    const ouvir = (resumo) => {
+        if (!resumo.ativo) { manager.off(job.id, ouvir); resolve(job); }
+    };
+    manager.on(job.id, ouvir);
+});
+
+test('job devolve o id na hora, reporta progresso e guarda o resultado', async () => {
+    const manager = new JobManager();
+    const liberar = adiado();
+    let iniciou = false;
+
+    const { job, reaproveitado } = manager.criar(DESCRICAO, async (reportar) => {
+        iniciou = true;
+        reportar({ feitas: 0, total: 4 });
+        await liberar.promessa;
+        reportar({ feitas: 2, total: 4 });
+        return { status: 200, body: { success: true, data: [1, 2] } };
+    });
+
+    assert.strictEqual(reaproveitado, false);
+    assert.strictEqual(job.estado, 'pendente');
+    assert.strictEqual(iniciou, false, 'trabalho começa depois de devolver o id');
+
+    await new Promise(setImmediate);
+    assert.strictEqual(job.estado, 'executando');
+    assert.deepStrictEqual(manager.resumo(job).progresso, { feitas: 0, total: 4 });
+
+    liberar.resolver();
+    await aguardarFim(manager, job);
+    assert.strictEqual(job.estado, 'concluido');
+    assert.deepStrictEqual(job.progresso, { feitas: 4, total: 4 });
+    assert.deepStrictEqual(job.resultado, { status: 200, body: { success: true, data: [1, 2] } });
+    assert.strictEqual('resultado' in manager.resumo(job), false);
+});
+
+test('job idêntico em andamento é reaproveitado', async () => {
+    const manager = new JobManager();
+    const liberar = adiado();
+    let execucoes = 0;
+    const executar = async () => { execucoes++; await liberar.promessa; return { status: 200, body: {} }; };
+
+    const a = manager.criar(DESCRICAO, executar);
+    const b = manager.criar({ ...DESCRICAO, parametros: { incluirResultados: 'true', formato: 'resultados' } }, executar);
+    const outroHost = manager.criar({ ...DESCRICAO, host: 'outro' }, executar);
+
+    assert.strictEqual(b.reaproveitado, true);
+    assert.strictEqual(b.job, a.job);
+    assert.notStrictEqual(outroHost.job, a.job);
+
+    liberar.resolver();
+    await aguardarFim(manager, a.job);
+    await aguardarFim(manager, outroHost.job);
+    assert.strictEqual(execucoes, 2);
+
+    // Terminado: novo pedido cria outro job
+    const c = manager.criar(DESCRICAO, executar);
+    assert.strictEqual(c.reaproveitado, false);
+    await aguardarFim(manager, c.job);
+    assert.deepStrictEqual(manager.getStats(), { jobs: 3, ativos: 0, criados: 3, reaproveitados: 1, concluidos: 3, falhas: 0 });
+});
+
+test('falhas ficam registradas e os eventos chegam até o fim', async () => {
+    const manager = new JobManager();
+    const estados = [];
+
+    const erro = manager.criar(DESCRICAO, async () => { throw new Error('HICD fora do ar'); });
+    manager.on(erro.job.id, resumo => estados.push(resumo.estado));
+    await aguardarFim(manager, erro.job);
+    assert.deepStrictEqual(estados, ['executando', 'falhou']);
+    assert.strictEqual(erro.job.erro, 'HICD fora do ar');
+    assert.strictEqual(erro.job.resultado.status, 500);
+
+    const naoEncontrado = manager.criar({ ...DESCRICAO, prontuario: '999' }, async () => ({
+        status: 404, body: { success: false, error: 'Exames não encontrados', message: 'Nenhum exame' }
+    }));
+    await aguardarFim(manager, naoEncontrado.job);
+    assert.strictEqual(naoEncontrado.job.estado, 'falhou');
+    assert.strictEqual(naoEncontrado.job.erro, 'Nenhum exame');
+    assert.strictEqual(manager.getStats().falhas, 2);
+});
+
+test('jobs terminados expiram', async () => {
+    const manager = new JobManager({ ttlMs: 1000, maxJobs: 2 });
+    const jobs = [];
+    for (const prontuario of ['1', '2', '3']) {
+        const { job } = manager.criar({ ...DESCRICAO, prontuario }, async () => ({ status: 200, body: {} }));
+        await aguardarFim(manager, job);
+        jobs.push(job);
+    }
+
+    manager.limparExpirados();
+    assert.strictEqual(manager.obter(jobs[0].id), null, 'acima de maxJobs sai o terminado mais antigo');
+    assert.ok(manager.obter(jobs[2].id));
+
+    jobs[2].concluidoEm = new Date(Date.now() - 5000).toISOString();
+    manager.limparExpirados();
+    assert.strictEqual(manager.obter(jobs[2].id), null);
+    assert.ok(manager.obter(jobs[1].id));
+});
@@ -0,0 +1,70 @@
+/**
+ * Testes do KeywordScorer (Aho–Corasick) usado na detecção de tipo de página.
+ *
+ * Cobre:
+ *  1. Mesmos scores da contagem por RegExp palavra a palavra nas fixtures
+ *  2. Palavras sobrepostas e com prefixo comum contadas por grupo
+ *  3. ignorarCaixa sem copiar o texto (acentos incluídos)
+ *
+ * Runner: node --test (Node >= 18). Sem dependências externas nem rede.
+ */
+const { test } = require('node:test');
+const assert = require('node:assert');
+const fs = require('fs');
+const path = require('path');
+
+const KeywordScorer = require('../src/parsers/keyword-scorer');
+
+const PALAVRAS = {
+    clinicas: ['clínica', 'clinica', 'clinic', 'código da clínica', 'lista de clínicas'],
+    pacientes: ['paciente', 'patient', 'prontuário', 'prontuario', 'lista de pacientes'],
+    exames: ['exame', 'exam', 'resultado', 'laboratorial', 'lista de exames'],
+    evolucoes: ['evolução', 'evolucao', 'evolution', 'nota médica', 'evolução médica'],
+    prontuario: ['prontuário completo', 'dados do paciente', 'histórico médico', 'ficha médica']
+};
+
+function pontuarPorRegex(html) {
+    const htmlLower = html.toLowerCase();
+    const scores = {};
+    for (const [tipo, palavras] of Object.entries(PALAVRAS)) {
+        scores[tipo] = palavras.reduce((total, p) => total + (htmlLower.match(new RegExp(p, 'gi')) || []).length, 0);
+    }
+    return scores;
+}
+
+function listarFixtures(dir) {
+    return fs.readdirSync(dir, { withFileTypes: true }).flatMap(entrada => {
+        const caminho = path.join(dir, entrada.name);
+        if (entrada.isDirectory()) return listarFixtures(caminho);
+        return entrada.name.endsWith('.html') ? [caminho] : [];
+    });
+}
+
+test('mesmos scores da contagem por RegExp em todas as fixtures', () => {
+    const pontuador = new KeywordScorer(PALAVRAS, { ignorarCaixa: true });
+    const fixtures = listarFixtures(path.join(__dirname, 'fixtures'));
+    assert.ok(fixtures.length > 5);
+
+    for (const arquivo of fixtures) {
+        const html = fs.readFileSync(arquivo, 'utf8');
+        assert.deepStrictEqual(pontuador.pontuar(html), pontuarPorRegex(html), arquivo);
+    }
+});
+
+test('palavras sobrepostas e com prefixo comum contam para cada grupo', () => {
+    const pontuador = new KeywordScorer({ a: ['exam', 'exame'], b: ['xame', 'me'], c: ['zzz'] });
+
+    assert.deepStrictEqual(pontuador.pontuar('exame; exames, exam'), { a: 5, b: 4, c: 0 });
+    assert.deepStrictEqual(pontuador.pontuar(''), { a: 0, b: 0, c: 0 });
+    // Sem ignorarCaixa a comparação é exata
+    assert.deepStrictEqual(pontuador.pontuar('EXAME'), { a: 0, b: 0, c: 0 });
+});
+
+test('ignorarCaixa reconhece maiúsculas acentuadas', () => {
+    const pontuador = new KeywordScorer({ clinicas: ['clínica'], evolucoes: ['evolução médica'] }, { ignorarCaixa: true });
+
+    assert.deepStrictEqual(
+        pontuador.pontuar('<h1>CLÍNICA MÉDICA</h1><p>Evolução Médica — clínica</p>'),
+        { clinicas: 2, evolucoes: 1 }
+    );
+});
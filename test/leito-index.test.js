@@ -0,0 +1,129 @@
+/**
+ * Testes do índice leito → (clínica, prontuário) usado na busca por leito.
+ *
+ * Cobre:
+ *  1. LeitoIndex — lookup exato, fallback por comparador, substituição por clínica
+ *  2. LeitoIndex — frescor (clínica nunca indexada / TTL)
+ *  3. PatientService — índice fresco resolve sem varrer o HICD
+ *  4. PatientService — índice obsoleto faz o scan e passa a responder do índice
+ *  5. Índice e diretório são do host: o serviço recriado (novo login) os reaproveita
+ *
+ * Runner: node --test (Node >= 18). Sem dependências externas nem rede.
+ */
+const { test } = require('node:test');
+const assert = require('node:assert');
+
+const LeitoIndex = require('../src/services/leito-index');
+const PatientService = require('../src/services/patient-service');
+
+const CLINICAS = [
+    { codigo: '007', nome: 'U T I' },
+    { codigo: '012', nome: 'ENFERMARIA G' }
+];
+
+const LISTAS = {
+    '007': [{ prontuario: '111', nome: 'ANA', leito: '007.007-0002' }],
+    '012': [{ prontuario: '222', nome: 'BIA', leito: '012.012-0007' }]
+};
+
+// ============ Item 1-2: LeitoIndex ============
+
+test('LeitoIndex resolve leito exato com clínica preenchida', () => {
+    const idx = new LeitoIndex();
+    idx.registrarClinicas(CLINICAS);
+    idx.atualizarClinica('012', LISTAS['012']);
+
+    const [p] = idx.buscar(['012.012-0007']);
+    assert.strictEqual(p.prontuario, '222');
+    assert.strictEqual(p.clinicaCodigo, '012');
+    assert.strictEqual(p.clinicaNome, 'ENFERMARIA G');
+});
+
+test('LeitoIndex usa o comparador quando nenhum formato bate exato', () => {
+    const idx = new LeitoIndex();
+    idx.atualizarClinica('012', LISTAS['012']);
+    const contem = (sistema, busca) => sistema.includes(busca);
+
+    assert.strictEqual(idx.buscar(['0007']).length, 0);
+    assert.strictEqual(idx.buscar(['0007'], contem).length, 1);
+});
+
+test('LeitoIndex substitui as entradas da clínica a cada atualização', () => {
+    const idx = new LeitoIndex();
+    idx.atualizarClinica('012', LISTAS['012']);
+    idx.atualizarClinica('012', [{ prontuario: '333', nome: 'CAIO', leito: '012.012-0001' }]);
+
+    assert.strictEqual(idx.buscar(['012.012-0007']).length, 0);
+    assert.strictEqual(idx.buscar(['012.012-0001'])[0].prontuario, '333');
+});
+
+test('LeitoIndex só é fresco com todas as clínicas indexadas dentro do TTL', () => {
+    const idx = new LeitoIndex({ ttl: 1000 });
+    assert.strictEqual(idx.isFresh(), false);
+
+    idx.registrarClinicas(CLINICAS);
+    idx.atualizarClinica('007', LISTAS['007']);
+    assert.strictEqual(idx.isFresh(), false, 'clínica 012 ainda não indexada');
+
+    idx.atualizarClinica('012', LISTAS['012']);
+    assert.strictEqual(idx.isFresh(), true);
+    assert.strictEqual(idx.isFresh(-1), false, 'idade acima do limite = obsoleto');
+});
+
+// ============ Item 3-4: PatientService ============
+
+function criarService(options) {
+    const chamadas = { clinicas: 0, pacientes: 0 };
+    const httpClient = {
+        origin: 'https://hicd.test',
+        getUrls: () => ({ login: 'u', index: 'i' }),
+        delay: async () => {},
+        post: async (url, data) => ({ data: data.get('ParamModule') === '2904' ? 'clinicas' : data.get('clinica') })
+    };
+    const parser = {
+        parseClinicas: () => { chamadas.clinicas++; return CLINICAS; },
+        parsePacientes: (html) => { chamadas.pacientes++; return LISTAS[html] || []; }
+    };
+    return { service: new PatientService(httpClient, parser, options), chamadas };
+}
+
+test('índice fresco: busca por leito não toca o HICD', async () => {
+    const { service, chamadas } = criarService();
+    service.leitoIndex.registrarClinicas(CLINICAS);
+    service.leitoIndex.atualizarClinica('007', LISTAS['007']);
+    service.leitoIndex.atualizarClinica('012', LISTAS['012']);
+
+    const pacientes = await service.buscarPacientePorLeito('G7');
+
+    assert.strictEqual(pacientes.length, 1);
+    assert.strictEqual(pacientes[0].prontuario, '222');
+    assert.deepStrictEqual(chamadas, { clinicas: 0, pacientes: 0 });
+});
+
+test('índice obsoleto: varre as clínicas uma vez e depois responde do índice', async () => {
+    const { service, chamadas } = criarService();
+
+    const primeira = await service.buscarPacientePorLeito('007.007-0002');
+    assert.strictEqual(primeira[0].prontuario, '111');
+    assert.strictEqual(chamadas.pacientes, 2);
+
+    const segunda = await service.buscarPacientePorLeito('G7');
+    assert.strictEqual(segunda[0].clinicaNome, 'ENFERMARIA G');
+    assert.strictEqual(chamadas.pacientes, 2, 'segunda busca deve sair do índice');
+});
+
+test('serviço recriado para o mesmo host reaproveita índice e diretório', async () => {
+    const { service: antes } = criarService({ host: 'hicd-relogin.test' });
+    await antes.buscarPacientePorLeito('007.007-0002');
+
+    // Novo login: crawler (e serviço) novos para o mesmo host
+    const { service: depois, chamadas } = criarService({ host: 'hicd-relogin.test' });
+    assert.strictEqual(depois.leitoIndex, antes.leitoIndex);
+    assert.strictEqual(depois.diretorio, antes.diretorio);
+    assert.strictEqual((await depois.buscarPacientePorLeito('G7'))[0].prontuario, '222');
+    assert.deepStrictEqual(chamadas, { clinicas: 0, pacientes: 0 });
+
+    const { service: outroHost } = criarService({ host: 'hicd-outro.test' });
+    assert.notStrictEqual(outroHost.leitoIndex, antes.leitoIndex);
+    assert.strictEqual(outroHost.leitoIndex.isFresh(), false);
+});
@@ -0,0 +1,145 @@
+/**
+ * Testes do HICD falso e do gerador de carga (loadtest/).
+ *
+ * Cobre:
+ *  1. Fluxo de login (index → LOGIN → index logado) e páginas por Param/ParamModule
+ *  2. Sessão expira após N requisições e renova no próximo GET index
+ *  3. Taxa de erro 100% devolve HTTP 500 nas rotas de dados
+ *  4. Relatório do gerador: percentis por endpoint e requisições HICD por requisição da API
+ *
+ * Runner: node --test (Node >= 18). Sem dependências externas nem rede (servidor em localhost).
+ */
+const { test } = require('node:test');
+const assert = require('node:assert');
+
+const FakeHicdServer = require('../loadtest/fake-hicd-server');
+const { expandirProntuarios, montarRelatorio, diferencaHicd } = require('../loadtest/load-driver');
+
+const CONTROLLER = '/prontuario/frontend/controller/controller.php';
+const INDEX = '/prontuario/frontend/index.php';
+
+async function comServidor(opcoes, fn) {
+    const servidor = new FakeHicdServer({ latenciaMs: 0, jitterMs: 0, taxaErro: 0, sessaoTtlMs: 0, expirarACada: 0, ...opcoes });
+    const porta = await servidor.iniciar(0);
+    try {
+        await fn(`http://localhost:${porta}`, servidor);
+    } finally {
+        await servidor.encerrar();
+    }
+}
+
+/** Cliente mínimo com cookie, como o HICDHttpClient. */
+function criarCliente(base) {
+    let cookie = '';
+    const guardarCookie = (resposta) => {
+        const setCookie = resposta.headers.get('set-cookie');
+        if (setCookie) cookie = setCookie.split(';')[0];
+    };
+    return {
+        async get(caminho) {
+            const resposta = await fetch(base + caminho, { headers: { Cookie: cookie } });
+            guardarCookie(resposta);
+            return { status: resposta.status, texto: await resposta.text() };
+        },
+        async post(caminho, campos) {
+            const resposta = await fetch(base + caminho, {
+                method: 'POST',
+                headers: { Cookie: cookie, 'Content-Type': 'application/x-www-form-urlencoded' },
+                body: new URLSearchParams(campos).toString()
+            });
+            guardarCookie(resposta);
+            return { status: resposta.status, texto: await resposta.text() };
+        },
+        async login() {
+            await this.get(INDEX);
+            await this.post(CONTROLLER, { Param: 'LOGIN', user: 'u', pass: 'p', session: 'undefined' });
+        }
+    };
+}
+
+test('login e páginas de dados por Param/ParamModule', async () => {
+    await comServidor({}, async (base, servidor) => {
+        const cliente = criarCliente(base);
+
+        const anonima = await cliente.get(INDEX);
+        assert.match(anonima.texto, /ANONYMOUS/);
+
+        const semLogin = await cliente.post(CONTROLLER, { Param: 'REGE', ParamModule: 'Evo', IdPac: '1' });
+        assert.match(semLogin.texto, /Sess&atilde;o Expirada/);
+
+        await cliente.post(CONTROLLER, { Param: 'LOGIN', user: 'u', pass: 'p' });
+        assert.doesNotMatch((await cliente.get(INDEX)).texto, /ANONYMOUS/);
+
+        const evolucoes = await cliente.post(CONTROLLER, { Param: 'REGE', ParamModule: 'Evo', IdPac: '1' });
+        assert.match(evolucoes.texto, /areaHistEvol/);
+        const exames = await cliente.post(CONTROLLER, { Param: 'REGE', ParamModule: 'Exames', IdPac: '1' });
+        assert.match(exames.texto, /imprimirEvo/);
+        const impressao = await cliente.get('/prontuario/generator/sadt/app/exame.php?requisicao=0001001');
+        assert.strictEqual(impressao.status, 200);
+        const prescricao = await cliente.get('/prescricao_medica3/interface/imprime.php?id_prescricao=700000');
+        assert.strictEqual(prescricao.status, 200);
+
+        const stats = servidor.getStats();
+        assert.strictEqual(stats.logins, 1);
+        assert.strictEqual(stats.sessoesExpiradas, 1);
+        assert.strictEqual(stats.porRota.evolucoes, 2);
+        assert.strictEqual(stats.porRota.exames, 1);
+        assert.strictEqual(stats.porRota['exame-impressao'], 1);
+        assert.strictEqual(stats.porRota['prescricao-impressao'], 1);
+        assert.strictEqual(stats.total, 8);
+    });
+});
+
+test('sessão expira após N requisições e o GET index emite sessão nova', async () => {
+    await comServidor({ expirarACada: 2 }, async (base, servidor) => {
+        const cliente = criarCliente(base);
+        await cliente.login();
+
+        const clinicas = { Param: 'SIGHO', ParamModule: '2904' };
+        assert.doesNotMatch((await cliente.post(CONTROLLER, clinicas)).texto, /Expirada/);
+        assert.doesNotMatch((await cliente.post(CONTROLLER, clinicas)).texto, /Expirada/);
+        assert.match((await cliente.post(CONTROLLER, clinicas)).texto, /Expirada/);
+
+        // Re-login como o auth-service faz: index (cookie novo) + LOGIN
+        await cliente.login();
+        assert.doesNotMatch((await cliente.post(CONTROLLER, clinicas)).texto, /Expirada/);
+        assert.strictEqual(servidor.getStats().logins, 2);
+        assert.strictEqual(servidor.getStats().sessoesExpiradas, 1);
+    });
+});
+
+test('taxa de erro 100% devolve 500 nas rotas de dados, mas não no login', async () => {
+    await comServidor({ taxaErro: 1 }, async (base, servidor) => {
+        const cliente = criarCliente(base);
+        await cliente.login();
+
+        const resposta = await cliente.post(CONTROLLER, { Param: 'SIGHO', ParamModule: '544', clinica: '012' });
+        assert.strictEqual(resposta.status, 500);
+        assert.strictEqual(servidor.getStats().erros, 1);
+        assert.strictEqual(servidor.getStats().logins, 1);
+    });
+});
+
+test('relatório do gerador de carga', () => {
+    assert.deepStrictEqual(expandirProntuarios('100037,000098-000100'), ['100037', '000098', '000099', '000100']);
+
+    const amostras = [
+        ...[10, 20, 30, 40].map(duracaoMs => ({ endpoint: 'evolucoes', duracaoMs, ok: true })),
+        { endpoint: 'exames', duracaoMs: 100, ok: true },
+        { endpoint: 'exames', duracaoMs: 200, ok: false }
+    ];
+    const hicd = diferencaHicd(
+        { total: 10, erros: 0, sessoesExpiradas: 0, logins: 1, porRota: { evolucoes: 2 } },
+        { total: 25, erros: 1, sessoesExpiradas: 1, logins: 2, porRota: { evolucoes: 6, 'exame-impressao': 9 } }
+    );
+    const relatorio = montarRelatorio(amostras, { duracaoS: 2, enviadas: 6, hicd });
+
+    assert.strictEqual(relatorio.concluidas, 6);
+    assert.strictEqual(relatorio.erros, 1);
+    assert.strictEqual(relatorio.vazaoRps, 3);
+    assert.strictEqual(relatorio.porEndpoint.evolucoes.requisicoes, 4);
+    assert.strictEqual(relatorio.porEndpoint.exames.erros, 1);
+    assert.strictEqual(relatorio.latencia.amostras, 6);
+    assert.deepStrictEqual(relatorio.hicd.porRota, { evolucoes: 4, 'exame-impressao': 9 });
+    assert.strictEqual(relatorio.hicd.requisicoesPorRequisicaoApi, 2.5);
+});
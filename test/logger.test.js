@@ -0,0 +1,109 @@
+/**
+ * Testes do logger estruturado (src/core/logger.js) e do log do cache.
+ *
+ * Cobre:
+ *  1. Configuração — LOG_LEVEL, nível e amostragem por módulo em LOG_MODULOS
+ *  2. Níveis e formatos — nada abaixo do nível; texto `chave=valor` e JSON por linha, erros pela mensagem
+ *  3. evento — conta sempre, devolve true 1 a cada `amostra` só com o nível ligado; resumo do período
+ *  4. Cache — hit/miss viram contadores, sem linha por consulta fora do debug
+ *
+ * Runner: node --test (Node >= 18). Sem dependências externas nem rede.
+ */
+const { test, afterEach } = require('node:test');
+const assert = require('node:assert');
+
+const { criarLogger, configurarLogs, configuracaoDoAmbiente, resumirTodos, contadoresDosLogs } = require('../src/core/logger');
+const cache = require('../api/utils/cache');
+
+function capturar(opcoes = {}) {
+    const linhas = [];
+    configurarLogs({ resumoMs: 0, saida: (linha, nivel) => linhas.push({ linha, nivel }), ...opcoes });
+    return linhas;
+}
+
+afterEach(() => configurarLogs({ resumoMs: 0 }));
+
+test('configuração do ambiente com nível e amostragem por módulo', () => {
+    const config = configuracaoDoAmbiente({
+        LOG_LEVEL: 'WARN',
+        LOG_MODULOS: 'cache=debug:10, resultados=error,invalido',
+        LOG_FORMATO: 'json'
+    });
+    assert.strictEqual(config.nivel, 'warn');
+    assert.deepStrictEqual(config.modulos, {
+        cache: { nivel: 'debug', amostra: 10 },
+        resultados: { nivel: 'error', amostra: null }
+    });
+    assert.strictEqual(config.amostra, 100);
+    assert.strictEqual(config.formato, 'json');
+    assert.strictEqual(config.resumoMs, 60000);
+    assert.strictEqual(configuracaoDoAmbiente({ LOG_RESUMO_MS: '0' }).resumoMs, 0);
+
+    capturar({ nivel: 'warn', modulos: config.modulos });
+    assert.strictEqual(criarLogger('cache').ativo('debug'), true);
+    assert.strictEqual(criarLogger('resultados').ativo('warn'), false);
+    assert.strictEqual(criarLogger('outro').ativo('warn'), true);
+    assert.strictEqual(criarLogger('outro').ativo('info'), false);
+    assert.strictEqual(criarLogger('cache'), criarLogger('cache'));
+});
+
+test('níveis e formatos texto e JSON', () => {
+    let linhas = capturar({ nivel: 'info' });
+    const log = criarLogger('teste-formato');
+    log.debug('não sai');
+    log.info('Pacientes encontrados', { pacientes: 3, nome: 'CLINICA MEDICA', vazio: undefined });
+    log.error('Falhou', { erro: new Error('timeout') });
+
+    assert.strictEqual(linhas.length, 2);
+    assert.match(linhas[0].linha, /^\d{4}-\d\d-\d\dT\S+Z INFO  \[teste-formato\] Pacientes encontrados pacientes=3 nome="CLINICA MEDICA"$/);
+    assert.match(linhas[1].linha, /ERROR \[teste-formato\] Falhou erro="timeout"$/);
+    assert.strictEqual(linhas[1].nivel, 'error');
+
+    linhas = capturar({ nivel: 'info', formato: 'json' });
+    log.warn('Falha', { paciente: '123', erro: new Error('boom') });
+    const { ts, ...resto } = JSON.parse(linhas[0].linha);
+    assert.ok(ts);
+    assert.deepStrictEqual(resto, { nivel: 'warn', modulo: 'teste-formato', msg: 'Falha', paciente: '123', erro: 'boom' });
+});
+
+test('evento conta sempre e amostra só com o nível ligado', () => {
+    let linhas = capturar({ nivel: 'info', amostra: 3 });
+    const log = criarLogger('teste-evento');
+    const logados = [];
+    for (let i = 0; i < 7; i++) if (log.evento('pagina')) logados.push(i);
+    assert.deepStrictEqual(logados, []);
+
+    linhas = capturar({ nivel: 'debug', amostra: 3 });
+    for (let i = 7; i < 14; i++) if (log.evento('pagina')) logados.push(i);
+    // 1ª, 4ª, 7ª... ocorrência desde o início do processo
+    assert.deepStrictEqual(logados, [9, 12]);
+    assert.deepStrictEqual(log.totais(), { pagina: 14 });
+    assert.deepStrictEqual(contadoresDosLogs()['teste-evento'], { pagina: 14 });
+
+    resumirTodos(60000);
+    const resumo = linhas.find(l => l.linha.includes('[teste-evento]'));
+    assert.match(resumo.linha, /INFO  \[teste-evento\] Resumo de eventos periodoS=60 eventos=\{"pagina":14\}$/);
+
+    // Sem eventos novos no período: nenhuma linha
+    linhas.length = 0;
+    resumirTodos(60000);
+    assert.strictEqual(linhas.filter(l => l.linha.includes('[teste-evento]')).length, 0);
+});
+
+test('cache conta hit/miss sem uma linha por consulta', () => {
+    let linhas = capturar({ nivel: 'info' });
+    const antes = contadoresDosLogs().cache || {};
+    cache.set('logger-teste:1', { ok: true });
+    for (let i = 0; i < 5; i++) cache.get('logger-teste:1');
+    cache.get('logger-teste:ausente');
+
+    assert.strictEqual(linhas.length, 0);
+    const depois = contadoresDosLogs().cache;
+    assert.strictEqual(depois.hit - (antes.hit || 0), 5);
+    assert.strictEqual(depois.miss - (antes.miss || 0), 1);
+
+    linhas = capturar({ nivel: 'info', modulos: { cache: { nivel: 'debug', amostra: 1 } } });
+    cache.get('logger-teste:1');
+    assert.match(linhas[0].linha, /DEBUG \[cache\] Cache HIT chave=logger-teste:1 idadeS=0$/);
+    cache.delete('logger-teste:1');
+});
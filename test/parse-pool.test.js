@@ -0,0 +1,98 @@
+/**
+ * Testes do pool de parse em worker_threads.
+ *
+ * Cobre:
+ *  1. Modo local (pool desligado) — executa no parser local e registra métricas
+ *  2. Modo workers — resultados devolvidos, fila limitada ao tamanho do pool
+ *  3. Erros do parse chegam como rejeição com a mensagem original
+ *  4. Worker que morre rejeita só a tarefa em voo e o pool segue atendendo
+ *  5. Métodos fora da lista são recusados
+ *
+ * O worker real depende do cheerio; aqui um script de worker mínimo com o
+ * mesmo protocolo ({ id, ok, resultado, duracaoMs }) substitui o parse.
+ *
+ * Runner: node --test (Node >= 18). Sem dependências externas nem rede.
+ */
+const { test } = require('node:test');
+const assert = require('node:assert');
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+
+const ParsePool = require('../src/parsers/parse-pool');
+
+const WORKER_FAKE = path.join(fs.mkdtempSync(path.join(os.tmpdir(), 'parse-pool-')), 'worker.js');
+fs.writeFileSync(WORKER_FAKE, `
+const { parentPort } = require('worker_threads');
+parentPort.on('message', ({ id, metodo, args, origin }) => {
+    const [html] = args;
+    if (html === 'CRASH') process.exit(3);
+    if (html === 'ERRO') return parentPort.postMessage({ id, ok: false, erro: { message: 'html inválido' }, duracaoMs: 1 });
+    const fim = Date.now() + 20;
+    while (Date.now() < fim) {} // simula parse síncrono
+    parentPort.postMessage({ id, ok: true, resultado: { metodo, html: html.toUpperCase(), origin }, duracaoMs: 20 });
+});
+`);
+
+test('modo local usa o parser da própria thread e registra métricas', async () => {
+    const pool = new ParsePool({ habilitado: false });
+    const local = { parseEvolucoes: (html, prontuario) => [{ html, prontuario }] };
+
+    const resultado = await pool.executar('parseEvolucoes', ['<p>x</p>', '123'], { local });
+
+    assert.deepStrictEqual(resultado, [{ html: '<p>x</p>', prontuario: '123' }]);
+    const stats = pool.getStats();
+    assert.strictEqual(stats.modo, 'local');
+    assert.strictEqual(stats.porMetodo.parseEvolucoes.chamadas, 1);
+    assert.strictEqual(stats.porMetodo.parseEvolucoes.cpuMs.amostras, 1);
+});
+
+test('modo workers devolve objetos simples e enfileira além do tamanho do pool', async () => {
+    const pool = new ParsePool({ habilitado: true, tamanho: 2, script: WORKER_FAKE });
+    try {
+        const tarefas = ['a', 'b', 'c', 'd'].map(html =>
+            pool.executar('parseResultadosExames', [html, 'R1'], { origin: 'https://hicd.test' }));
+        assert.strictEqual(pool.getStats().naFila, 2);
+        assert.strictEqual(pool.getStats().emVoo, 2);
+
+        const resultados = await Promise.all(tarefas);
+        assert.deepStrictEqual(resultados.map(r => r.html), ['A', 'B', 'C', 'D']);
+        assert.strictEqual(resultados[0].origin, 'https://hicd.test');
+
+        const stats = pool.getStats();
+        assert.strictEqual(stats.workers, 2);
+        assert.strictEqual(stats.maxFila, 2);
+        assert.strictEqual(stats.porMetodo.parseResultadosExames.cpuMs.p50Ms, 20);
+    } finally {
+        await pool.encerrar();
+    }
+});
+
+test('erro do parse vira rejeição com a mensagem original', async () => {
+    const pool = new ParsePool({ habilitado: true, tamanho: 1, script: WORKER_FAKE });
+    try {
+        await assert.rejects(pool.executar('parseEvolucoes', ['ERRO']), /html inválido/);
+        assert.strictEqual(pool.getStats().erros, 1);
+    } finally {
+        await pool.encerrar();
+    }
+});
+
+test('worker que morre rejeita a tarefa em voo e o pool continua', async () => {
+    const pool = new ParsePool({ habilitado: true, tamanho: 1, script: WORKER_FAKE });
+    const log = console.error;
+    console.error = () => {};
+    try {
+        await assert.rejects(pool.executar('parseEvolucoes', ['CRASH']), /PARSE_WORKER_ENCERRADO/);
+        assert.strictEqual((await pool.executar('parseEvolucoes', ['ok'])).html, 'OK');
+        assert.strictEqual(pool.getStats().workersReiniciados, 1);
+    } finally {
+        console.error = log;
+        await pool.encerrar();
+    }
+});
+
+test('métodos fora da lista permitida são recusados', async () => {
+    const pool = new ParsePool({ habilitado: false });
+    await assert.rejects(pool.executar('constructor', []), /METODO_NAO_PERMITIDO/);
+});
@@ -0,0 +1,85 @@
+/**
+ * Testes do diretório de pacientes (busca por nome sem ida ao HICD).
+ *
+ * Cobre:
+ *  1. tokenizarNome — remove acentos, caixa e pontuação
+ *  2. buscar — prefixo por token, todos os tokens obrigatórios, ordem livre;
+ *     limite aplicado depois da ordenação por nome
+ *  3. registrarCadastro — cadastro guardado e devolvido na busca
+ *  4. reindexação quando o nome muda e expiração por TTL
+ *
+ * Runner: node --test (Node >= 18). Sem dependências externas nem rede.
+ */
+const { test } = require('node:test');
+const assert = require('node:assert');
+
+const PatientDirectory = require('../src/services/patient-directory');
+const { tokenizarNome } = PatientDirectory;
+
+const LISTA = [
+    { prontuario: '101', nome: 'JOSÉ DA SILVA', leito: '007.007-0002', dataInternacao: '2026-05-01T00:00:00.000Z' },
+    { prontuario: '102', nome: 'JOÃO SILVEIRA', leito: '012.012-0007' },
+    { prontuario: '103', nome: 'MARIA JOSEFA', leito: '009.009-0001' }
+];
+
+test('tokenizarNome remove acentos, caixa e pontuação', () => {
+    assert.deepStrictEqual(tokenizarNome('  José-da  Conceição '), ['JOSE', 'DA', 'CONCEICAO']);
+    assert.deepStrictEqual(tokenizarNome(''), []);
+});
+
+test('buscar casa prefixos sem acento em qualquer ordem', () => {
+    const dir = new PatientDirectory();
+    dir.registrarLista(LISTA, '007');
+
+    assert.deepStrictEqual(dir.buscar('sil jose').map(p => p.prontuario), ['101']);
+    assert.deepStrictEqual(dir.buscar('joão').map(p => p.prontuario), ['102']);
+    assert.deepStrictEqual(dir.buscar('josé').map(p => p.prontuario).sort(), ['101', '103']);
+});
+
+test('buscar exige todos os tokens e devolve [] para nomes desconhecidos', () => {
+    const dir = new PatientDirectory();
+    dir.registrarLista(LISTA, '007');
+
+    assert.deepStrictEqual(dir.buscar('jose pereira'), []);
+    assert.deepStrictEqual(dir.buscar('   '), []);
+});
+
+test('limite corta depois de ordenar por nome', () => {
+    const dir = new PatientDirectory();
+    dir.registrarLista([
+        { prontuario: '1', nome: 'ZULMIRA SOUZA' },
+        { prontuario: '2', nome: 'BEATRIZ SOUZA' },
+        { prontuario: '3', nome: 'ANA SOUZA' }
+    ]);
+
+    assert.deepStrictEqual(dir.buscar('souza', { limite: 2 }).map(p => p.nome), ['ANA SOUZA', 'BEATRIZ SOUZA']);
+});
+
+test('registrarCadastro guarda o cadastro e atualiza clínica/leito', () => {
+    const dir = new PatientDirectory();
+    dir.registrarLista(LISTA);
+    const cadastro = {
+        dadosBasicos: { nome: 'JOSÉ DA SILVA', prontuario: '101' },
+        internacao: { codigoClinica: '007', clinicaLeito: '007-U T I 0002', numeroLeito: '0002' }
+    };
+
+    dir.registrarCadastro('101', cadastro);
+    const [p] = dir.buscar('jose silva');
+
+    assert.strictEqual(p.cadastro, cadastro);
+    assert.strictEqual(p.clinicaCodigo, '007');
+    assert.strictEqual(p.clinicaLeito, '007-U T I 0002');
+});
+
+test('nome alterado é reindexado e entradas expiram pelo TTL', () => {
+    const dir = new PatientDirectory({ ttl: 60 * 1000 });
+    dir.registrarLista([{ prontuario: '200', nome: 'RN DE ANA' }]);
+    dir.registrarLista([{ prontuario: '200', nome: 'PEDRO ALVES' }]);
+
+    assert.deepStrictEqual(dir.buscar('ana'), []);
+    assert.strictEqual(dir.buscar('pedro')[0].prontuario, '200');
+
+    dir.entradas.get('200').atualizadoEm = Date.now() - 2 * 60 * 1000;
+    assert.deepStrictEqual(dir.buscar('pedro'), []);
+    assert.strictEqual(dir.getStats().pacientes, 0);
+});
@@ -0,0 +1,153 @@
+/**
+ * Testes do pré-aquecimento do cache (api/utils/prewarm-scheduler.js).
+ *
+ * Cobre:
+ *  1. Janelas de horário — parse, janela que passa da meia-noite, entradas inválidas
+ *  2. Execução — aquece os recursos de cada paciente das clínicas, conta as
+ *     requisições ao HICD feitas em segundo plano e pula entradas ainda quentes
+ *  3. Verificação — fora da janela ou sem sessão não executa
+ *  4. Renovação — entrada perto de expirar continua servida até a nova ser gravada;
+ *     busca que falha mantém a atual
+ *
+ * Runner: node --test (Node >= 18). Sem dependências externas nem rede.
+ */
+const { test } = require('node:test');
+const assert = require('node:assert');
+
+const cache = require('../api/utils/cache');
+const PrewarmScheduler = require('../api/utils/prewarm-scheduler');
+const { RECURSOS_PACIENTE } = require('../api/utils/recursos-paciente');
+const { contextoSegundoPlano } = require('../src/core/segundo-plano');
+
+const silenciar = async (fn) => {
+    const [log, warn] = [console.log, console.warn];
+    console.log = console.warn = () => {};
+    try { return await fn(); } finally { console.log = log; console.warn = warn; }
+};
+
+function criarScheduler(opcoes = {}) {
+    const buscas = [];
+    const crawler = {
+        getPacientesClinica: async (codigo) => {
+            contextoSegundoPlano().requisicoes++;
+            return codigo === '007'
+                ? [{ prontuario: '111' }, { prontuario: '222' }, { prontuario: '111' }]
+                : [{ prontuario: '333' }];
+        }
+    };
+    const scheduler = new PrewarmScheduler({
+        clinicas: ['007', '012'],
+        host: 'hicd-teste',
+        recursos: ['evolucoes', 'prescricoes'],
+        obterCrawler: () => crawler,
+        buscarRecurso: async (recurso, prontuario, query, host) => {
+            // Simula o handler: uma requisição ao HICD e a entrada gravada no cache
+            contextoSegundoPlano().requisicoes++;
+            buscas.push(`${recurso}:${prontuario}`);
+            RECURSOS_PACIENTE[recurso].chaves(prontuario, query, host)
+                .forEach(chave => cache.set(chave, { recurso, prontuario }));
+            return { status: 200, body: { success: true } };
+        },
+        ...opcoes
+    });
+    return { scheduler, buscas };
+}
+
+test('janelas de horário', async () => {
+    const janelas = await silenciar(async () => PrewarmScheduler.parseJanelas('06:00-08:00, 22:30-01:00, 9h-10h'));
+    assert.deepStrictEqual(janelas, [{ inicio: 360, fim: 480 }, { inicio: 1350, fim: 60 }]);
+
+    const { scheduler } = criarScheduler({ janelas });
+    const as = (h, m) => new Date(2025, 0, 1, h, m);
+    assert.strictEqual(scheduler.dentroDaJanela(as(7, 59)), true);
+    assert.strictEqual(scheduler.dentroDaJanela(as(8, 0)), false);
+    assert.strictEqual(scheduler.dentroDaJanela(as(23, 0)), true);
+    assert.strictEqual(scheduler.dentroDaJanela(as(0, 30)), true);
+    assert.strictEqual(scheduler.dentroDaJanela(as(12, 0)), false);
+    assert.deepStrictEqual(scheduler.getStatus().configuracao.janelas, ['06:00-08:00', '22:30-01:00']);
+    assert.strictEqual(criarScheduler().scheduler.dentroDaJanela(as(12, 0)), true, 'sem janelas = o dia todo');
+});
+
+test('execução aquece cada paciente uma vez e conta as requisições ao HICD', async () => {
+    const { scheduler, buscas } = criarScheduler();
+
+    const execucao = await silenciar(() => scheduler.verificar());
+    assert.deepStrictEqual(buscas.sort(), [
+        'evolucoes:111', 'evolucoes:222', 'evolucoes:333',
+        'prescricoes:111', 'prescricoes:222', 'prescricoes:333'
+    ]);
+    assert.strictEqual(execucao.clinicas, 2);
+    assert.strictEqual(execucao.pacientes, 3);
+    assert.strictEqual(execucao.aquecidos, 6);
+    assert.strictEqual(execucao.requisicoesHicd, 2 + 6);
+    assert.strictEqual(scheduler.getStatus().ultimaExecucao, execucao);
+
+    // Logo em seguida as entradas estão quentes (TTL de 10 min > margem de 1 min): nada a buscar
+    buscas.length = 0;
+    const { scheduler: segundo } = criarScheduler({ margemMs: 60 * 1000 });
+    segundo.buscarRecurso = scheduler.buscarRecurso;
+    const repetida = await silenciar(() => segundo.verificar());
+    assert.strictEqual(buscas.length, 0);
+    assert.strictEqual(repetida.jaQuentes, 6);
+    assert.strictEqual(repetida.requisicoesHicd, 2, 'só as listas de pacientes');
+});
+
+test('fora da janela ou sem sessão não executa', async () => {
+    const agora = new Date(2025, 0, 1, 12, 0);
+
+    const { scheduler: foraDaJanela, buscas } = criarScheduler({ janelas: [{ inicio: 360, fim: 480 }] });
+    assert.strictEqual(await foraDaJanela.verificar(agora), null);
+    assert.strictEqual(foraDaJanela.getStatus().puladasForaDaJanela, 1);
+
+    const { scheduler: semSessao } = criarScheduler({ obterCrawler: () => null });
+    assert.strictEqual(await semSessao.verificar(agora), null);
+    assert.strictEqual(semSessao.getStatus().puladasSemSessao, 1);
+    assert.strictEqual(buscas.length, 0);
+});
+
+test('renovação não tira a entrada do cache antes da nova busca', async () => {
+    const chave = RECURSOS_PACIENTE.prescricoes.chaves('555', {}, 'hicd-renova')[0];
+    cache.set(chave, 'antiga', 30 * 1000);
+    let liberar;
+    let falhar = false;
+    const durante = [];
+
+    const { scheduler } = criarScheduler({
+        clinicas: ['099'],
+        host: 'hicd-renova',
+        recursos: ['prescricoes'],
+        margemMs: 60 * 1000,
+        obterCrawler: () => ({ getPacientesClinica: async () => [{ prontuario: '555' }] }),
+        // Como o handler: getOrSet na chave do recurso
+        buscarRecurso: async (recurso, prontuario, query, host) => {
+            const dados = await cache.getOrSet(chave, async () => {
+                await new Promise(r => { liberar = r; });
+                if (falhar) throw new Error('HICD fora');
+                return 'nova';
+            });
+            return { status: 200, body: dados };
+        }
+    });
+
+    await silenciar(async () => {
+        const execucao = scheduler.verificar();
+        await new Promise(r => setTimeout(r, 5));
+        // Requisição de usuário durante a renovação: recebe a entrada atual na hora
+        durante.push(await cache.getOrSet(chave, async () => assert.fail('não deveria buscar')));
+        liberar();
+        assert.strictEqual((await execucao).aquecidos, 1);
+    });
+    assert.deepStrictEqual(durante, ['antiga']);
+    assert.strictEqual(cache.get(chave), 'nova');
+
+    // Busca que falha não derruba a entrada que havia
+    cache.set(chave, 'antiga', 30 * 1000);
+    falhar = true;
+    await silenciar(async () => {
+        const execucao = scheduler.verificar();
+        await new Promise(r => setTimeout(r, 5));
+        liberar();
+        assert.strictEqual((await execucao).falhas, 1);
+    });
+    assert.strictEqual(cache.get(chave), 'antiga');
+});
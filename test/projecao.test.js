@@ -0,0 +1,80 @@
+/**
+ * Testes da projeção de campos (api/utils/projecao.js).
+ *
+ * Cobre:
+ *  1. Caminhos aninhados atravessando arrays; campos ausentes omitidos
+ *  2. Preset slim por recurso, combinável com outros campos
+ *  3. projecaoInclui — ancestral pedido inteiro, caminho não pedido, sem projeção
+ *  4. fields vazio devolve null; caminho malformado lança CAMPOS_INVALIDOS
+ *  5. Segmentos do protótipo rejeitados; membros herdados não são copiados
+ *
+ * Runner: node --test (Node >= 18). Sem dependências externas nem rede.
+ */
+const { test } = require('node:test');
+const assert = require('node:assert');
+
+const { PRESETS_SLIM, compilarProjecao, projecaoInclui } = require('../api/utils/projecao');
+
+const EXAME = {
+    requisicaoId: 'R1',
+    data: '01/02/2025',
+    hora: '08:00',
+    medico: 'DR. X',
+    status: { temResultados: true },
+    resultados: [
+        { sigla: 'HB', valor: '12', unidade: 'g/dL', status: 'normal', metadata: { linha: 3 } },
+        { sigla: 'K', valor: '5.9', unidade: 'mEq/L', status: 'alto', metadata: { linha: 9 } }
+    ],
+    metadata: { fonte: 'HICD' }
+};
+
+test('caminhos aninhados atravessam arrays e omitem campos ausentes', () => {
+    const projecao = compilarProjecao('exames', 'data, resultados.sigla,resultados.valor,inexistente');
+    assert.deepStrictEqual(projecao.projetar([EXAME]), [{
+        data: '01/02/2025',
+        resultados: [{ sigla: 'HB', valor: '12' }, { sigla: 'K', valor: '5.9' }]
+    }]);
+
+    // Pai pedido inteiro prevalece sobre filho
+    const inteiro = compilarProjecao('exames', 'metadata,metadata.fonte,status');
+    assert.deepStrictEqual(inteiro.projetar(EXAME), { metadata: { fonte: 'HICD' }, status: { temResultados: true } });
+});
+
+test('slim expande o preset do recurso e combina com outros campos', () => {
+    const slim = compilarProjecao('exames', 'slim,medico');
+    assert.deepStrictEqual(slim.campos, [...PRESETS_SLIM.exames, 'medico']);
+
+    const saida = slim.projetar(EXAME);
+    assert.deepStrictEqual(Object.keys(saida), ['requisicaoId', 'data', 'hora', 'status', 'resultados', 'medico']);
+    assert.deepStrictEqual(saida.resultados[1], { sigla: 'K', valor: '5.9', unidade: 'mEq/L', status: 'alto' });
+    assert.ok(JSON.stringify(saida).length < JSON.stringify(EXAME).length);
+
+    assert.strictEqual(compilarProjecao('exames', 'slim,medico'), slim, 'projeção compilada é reaproveitada');
+});
+
+test('projecaoInclui orienta trabalho condicional', () => {
+    const slim = compilarProjecao('evolucoes', 'slim');
+    assert.strictEqual(projecaoInclui(slim, 'conteudo.resumo'), true);
+    assert.strictEqual(projecaoInclui(slim, 'conteudo.textoCompleto'), false);
+    assert.strictEqual(projecaoInclui(compilarProjecao('evolucoes', 'conteudo'), 'conteudo.textoCompleto'), true);
+    assert.strictEqual(projecaoInclui(null, 'conteudo.textoCompleto'), true);
+});
+
+test('fields vazio é resposta completa; caminho malformado é rejeitado', () => {
+    assert.strictEqual(compilarProjecao('exames', undefined), null);
+    assert.strictEqual(compilarProjecao('exames', '  '), null);
+    assert.throws(() => compilarProjecao('exames', 'data,resultados..sigla'), /^Error: CAMPOS_INVALIDOS:/);
+    assert.throws(() => compilarProjecao('exames', 'data[0]'), /^Error: CAMPOS_INVALIDOS:/);
+});
+
+test('caminhos não alcançam o protótipo', () => {
+    for (const fields of ['__proto__.x', 'resultados.__proto__', 'constructor.prototype.x', 'data,prototype']) {
+        assert.throws(() => compilarProjecao('exames', fields), /^Error: CAMPOS_INVALIDOS:/, fields);
+    }
+    assert.strictEqual({}.x, undefined);
+
+    // Só campos próprios do objeto: herdados (funções do Object.prototype) não saem
+    const projecao = compilarProjecao('exames', 'hasOwnProperty,toString.x,data');
+    assert.deepStrictEqual(projecao.projetar(EXAME), { data: '01/02/2025' });
+    assert.strictEqual(projecaoInclui(projecao, 'valueOf'), false);
+});
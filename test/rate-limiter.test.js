@@ -0,0 +1,193 @@
+/**
+ * Testes do rate limiter por host e do modo concorrente do ClinicAnalyzer.
+ *
+ * Cobre:
+ *  1. RateLimiter — teto de concorrência, intervalo mínimo, propagação de erro
+ *     e fila de segundo plano (só anda sem fila normal, com teto próprio)
+ *  2. http-client — requisições de dados passam pelo limitador, login não;
+ *     em contexto de segundo plano vão para a fila de baixa prioridade e são contadas
+ *  3. ClinicAnalyzer — workers paralelos, resultados parciais via onResultado,
+ *     ordem preservada no relatório e resumo de tempos com percentis
+ *
+ * Runner: node --test (Node >= 18). Sem dependências externas nem rede.
+ */
+const { test } = require('node:test');
+const assert = require('node:assert');
+
+const RateLimiter = require('../src/core/rate-limiter');
+const HICDHttpClient = require('../src/core/http-client');
+const ClinicAnalyzer = require('../src/analyzers/clinic-analyzer');
+const { resumirDuracoes } = require('../src/core/timing');
+const { executarEmSegundoPlano } = require('../src/core/segundo-plano');
+
+const esperar = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+
+// O analisador é verboso (relatório no console); silencia durante o act.
+async function semLogs(fn) {
+    const original = console.log;
+    console.log = () => {};
+    try {
+        return await fn();
+    } finally {
+        console.log = original;
+    }
+}
+
+// ============ Item 1: RateLimiter ============
+
+test('RateLimiter nunca excede maxConcurrent', async () => {
+    const limiter = new RateLimiter({ maxConcurrent: 2 });
+    let ativos = 0;
+    let pico = 0;
+
+    await Promise.all(Array.from({ length: 6 }, () => limiter.schedule(async () => {
+        ativos++;
+        pico = Math.max(pico, ativos);
+        await esperar(5);
+        ativos--;
+    })));
+
+    assert.strictEqual(pico, 2);
+    assert.strictEqual(limiter.getStats().executadas, 6);
+});
+
+test('RateLimiter respeita o intervalo mínimo entre inícios', async () => {
+    const limiter = new RateLimiter({ minIntervalMs: 20 });
+    const inicios = [];
+
+    await Promise.all(Array.from({ length: 3 }, () => limiter.schedule(async () => inicios.push(Date.now()))));
+
+    assert.ok(inicios[2] - inicios[0] >= 38, `intervalo total ${inicios[2] - inicios[0]}ms`);
+});
+
+test('RateLimiter propaga rejeições e libera a vaga', async () => {
+    const limiter = new RateLimiter({ maxConcurrent: 1 });
+    await assert.rejects(() => limiter.schedule(async () => { throw new Error('falhou'); }), /falhou/);
+    assert.strictEqual(await limiter.schedule(async () => 'ok'), 'ok');
+});
+
+test('RateLimiter: segundo plano só anda sem fila normal e tem teto próprio', async () => {
+    const limiter = new RateLimiter({ maxConcurrent: 2, maxSegundoPlano: 1 });
+    const ordem = [];
+    let emVooSegundoPlano = 0;
+    let picoSegundoPlano = 0;
+
+    const tarefa = (nome, ms) => async () => {
+        ordem.push(nome);
+        await esperar(ms);
+    };
+    const segundoPlano = (nome) => limiter.schedule(async () => {
+        picoSegundoPlano = Math.max(picoSegundoPlano, ++emVooSegundoPlano);
+        ordem.push(nome);
+        await esperar(5);
+        emVooSegundoPlano--;
+    }, { segundoPlano: true });
+
+    // Duas normais ocupam as vagas; as de segundo plano entram na fila antes da terceira normal
+    const todas = [
+        limiter.schedule(tarefa('n1', 10)),
+        limiter.schedule(tarefa('n2', 10)),
+        segundoPlano('s1'),
+        segundoPlano('s2'),
+        limiter.schedule(tarefa('n3', 10))
+    ];
+    await Promise.all(todas);
+
+    assert.strictEqual(ordem.indexOf('n3') < ordem.indexOf('s1'), true, 'normal enfileirada depois passa na frente');
+    assert.strictEqual(picoSegundoPlano, 1);
+    assert.strictEqual(limiter.getStats().executadasSegundoPlano, 2);
+    assert.strictEqual(new RateLimiter({ maxConcurrent: 6 }).maxSegundoPlano, 3);
+});
+
+// ============ Item 2: http-client ============
+
+test('http-client encaminha requisições de dados ao rate limiter', async () => {
+    const c = new HICDHttpClient();
+    let agendadas = 0;
+    c.rateLimiter = { schedule: (fn) => { agendadas++; return fn(); } };
+    c.client = { post: async () => ({ data: '<select></select>' }), get: async () => ({ data: '' }) };
+
+    await c.post('u', {});
+    c.authPhase = true;
+    await c.post('u', {});
+
+    assert.strictEqual(agendadas, 1, 'durante o login a requisição não disputa vaga');
+});
+
+test('http-client em segundo plano usa a fila de baixa prioridade e conta as requisições', async () => {
+    const c = new HICDHttpClient();
+    const lanes = [];
+    c.rateLimiter = { schedule: (fn, opcoes = {}) => { lanes.push(Boolean(opcoes.segundoPlano)); return fn(); } };
+    c.client = { get: async () => ({ data: '' }) };
+
+    const contexto = { requisicoes: 0 };
+    await executarEmSegundoPlano(contexto, async () => {
+        await c.get('a');
+        await Promise.all([c.get('b'), c.get('c')]);
+    });
+    await c.get('d');
+
+    assert.deepStrictEqual(lanes, [true, true, true, false]);
+    assert.strictEqual(contexto.requisicoes, 3);
+});
+
+// ============ Item 3: ClinicAnalyzer concorrente ============
+
+function criarAnalyzer(latencias) {
+    const pacientes = latencias.map((_, i) => ({
+        prontuario: String(100 + i), nome: `P${i}`, clinicaNome: 'U T I', clinicaLeito: `007.007-000${i}`
+    }));
+    let emVoo = 0;
+    let pico = 0;
+    const patientService = { buscarPacientes: async () => pacientes };
+    const evolutionService = {
+        getEvolucoes: async (prontuario) => {
+            emVoo++;
+            pico = Math.max(pico, emVoo);
+            await esperar(latencias[Number(prontuario) - 100]);
+            emVoo--;
+            return [{ prontuario }];
+        }
+    };
+    const extractor = {
+        extrairDadosClinicosUltimaEvolucao: async ([e]) => ({ hda: `HDA ${e.prontuario}`, hipotesesDiagnosticas: [] })
+    };
+    const analyzer = new ClinicAnalyzer(patientService, evolutionService, extractor);
+    return { analyzer, pico: () => pico };
+}
+
+test('analisarClinica concorrente roda workers em paralelo e transmite parciais', async () => {
+    const { analyzer, pico } = criarAnalyzer([30, 5, 5, 5]);
+    const parciais = [];
+
+    const relatorio = await semLogs(() => analyzer.analisarClinica('UTI', {
+        salvarArquivo: false,
+        concorrencia: 2,
+        onResultado: (r, progresso) => parciais.push([r.paciente.prontuario, progresso.concluidos])
+    }));
+
+    assert.strictEqual(pico(), 2);
+    assert.strictEqual(parciais.length, 4);
+    assert.strictEqual(parciais[0][0], '101', 'paciente rápido chega antes do lento');
+    assert.deepStrictEqual(relatorio.resultados.map(r => r.paciente.prontuario), ['100', '101', '102', '103']);
+    assert.strictEqual(relatorio.sucessos, 4);
+});
+
+test('relatório traz resumo de tempos com percentis', async () => {
+    const { analyzer } = criarAnalyzer([1, 1, 1]);
+    const relatorio = await semLogs(() => analyzer.analisarClinica('UTI', { salvarArquivo: false, concorrencia: 3 }));
+
+    assert.strictEqual(relatorio.tempos.concorrencia, 3);
+    assert.strictEqual(relatorio.tempos.porPaciente.amostras, 3);
+    assert.ok(relatorio.tempos.totalMs >= 0);
+    assert.ok(relatorio.tempos.porPaciente.p95Ms >= relatorio.tempos.porPaciente.p50Ms);
+});
+
+test('resumirDuracoes calcula percentis nearest-rank', () => {
+    const r = resumirDuracoes([10, 20, 30, 40, 50, 60, 70, 80, 90, 100]);
+    assert.strictEqual(r.p50Ms, 50);
+    assert.strictEqual(r.p90Ms, 90);
+    assert.strictEqual(r.p99Ms, 100);
+    assert.strictEqual(r.totalMs, 550);
+    assert.strictEqual(resumirDuracoes([]).p50Ms, null);
+});
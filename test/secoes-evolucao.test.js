@@ -0,0 +1,105 @@
+/**
+ * Testes do tokenizador de seções de evolução (src/parsers/secoes-evolucao.js).
+ *
+ * Cobre:
+ *  1. Corpo das seções igual ao do parseSecaoSimples anterior (um RegExp por título)
+ *  2. Equivalência em textos gerados aleatoriamente (títulos sobrepostos, caixa, repetições)
+ *  3. textoAPartirDe: regex de seção sobre o trecho dá o mesmo resultado que sobre o texto todo
+ *
+ * Runner: node --test (Node >= 18). Sem dependências externas nem rede.
+ */
+const { test } = require('node:test');
+const assert = require('node:assert');
+
+const { SECOES_DELIMITADORAS, tokenizarSecoes, corpoDaSecao, textoAPartirDe } = require('../src/parsers/secoes-evolucao');
+
+/** Implementação anterior de parseSecaoSimples (referência). */
+function parseSecaoSimplesRegex(texto, tituloSecao) {
+    const esc = s => s.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
+    const lookahead = SECOES_DELIMITADORAS.filter(s => s !== tituloSecao).map(esc).join('|');
+    const match = texto.match(new RegExp(`${esc(tituloSecao)}:\\s*([\\s\\S]*?)(?=(?:${lookahead}):|$)`, 'i'));
+    if (!match || !match[1]) return [];
+    return match[1].trim().split(/[\n\r]+/).map(item => item.replace(/^[-•]\s*/, '').trim()).filter(item => item.length > 0);
+}
+
+function parseSecaoSimplesTokens(texto, titulo) {
+    const corpo = corpoDaSecao(tokenizarSecoes(texto), titulo);
+    if (!corpo) return [];
+    return corpo.trim().split(/[\n\r]+/).map(item => item.replace(/^[-•]\s*/, '').trim()).filter(item => item.length > 0);
+}
+
+const TITULOS = [...SECOES_DELIMITADORAS, 'Dieta', 'Sinais vitais'];
+
+const EVOLUCAO = [
+    'Nome: PACIENTE TESTE', 'DN: 01/01/2020', 'Hipóteses Diagnósticas:', '1. Pneumonia',
+    'Medicações em uso:', '- Ceftriaxona D3', 'Fez uso:', '- Amoxicilina', 'FEZ USO: dipirona',
+    'Dispositivos:', '- AVP em MSE', 'Sobrenome: nao e secao', 'Exames Complementares:',
+    '10/09/26: Hb 12', 'Gasometria: pH 7,35', 'Conduta:', '1. Manter ATB', 'Dieta: livre',
+    'Pendências:', '   ', 'HDA: tosse há 3 dias', 'HPP: nega'
+].join('\n');
+
+test('mesmo corpo de seção que o RegExp por título, numa evolução completa', () => {
+    for (const titulo of TITULOS) {
+        assert.deepStrictEqual(parseSecaoSimplesTokens(EVOLUCAO, titulo), parseSecaoSimplesRegex(EVOLUCAO, titulo), titulo);
+    }
+    // Como antes, títulos não exigem início de palavra: "nome:" dentro de "Sobrenome:" encerra a seção
+    assert.deepStrictEqual(parseSecaoSimplesTokens(EVOLUCAO, 'Dispositivos'), ['AVP em MSE', 'Sobre']);
+    assert.deepStrictEqual(parseSecaoSimplesTokens(EVOLUCAO, 'Pendências'), []);
+    assert.deepStrictEqual(parseSecaoSimplesTokens('', 'Conduta'), []);
+
+    const secoes = tokenizarSecoes(EVOLUCAO);
+    const emUso = secoes.marcadores.filter(m => m.chave === 'em uso' || m.chave === 'medicações em uso');
+    assert.strictEqual(emUso.length, 2, 'título dentro de outro título também é marcado');
+});
+
+test('equivalência em textos gerados aleatoriamente', () => {
+    let semente = 42;
+    const aleatorio = (n) => {
+        semente = (semente * 1103515245 + 12345) % 2147483648;
+        return semente % n;
+    };
+    const palavras = ['febre', 'uso', 'em', 'hf', 'nome', ':', '\n', '  ', '- item', '24 h', 'CONDUTA', 'exame'];
+    const variarCaixa = (s) => [s, s.toUpperCase(), s.toLowerCase()][aleatorio(3)];
+
+    for (let caso = 0; caso < 300; caso++) {
+        const partes = [];
+        const tamanho = 5 + aleatorio(25);
+        for (let i = 0; i < tamanho; i++) {
+            if (aleatorio(3) === 0) {
+                partes.push(variarCaixa(TITULOS[aleatorio(TITULOS.length)]) + (aleatorio(4) ? ':' : ''));
+            } else {
+                partes.push(palavras[aleatorio(palavras.length)]);
+            }
+            partes.push([' ', '\n', ''][aleatorio(3)]);
+        }
+        const texto = partes.join('');
+        for (const titulo of TITULOS) {
+            assert.deepStrictEqual(parseSecaoSimplesTokens(texto, titulo), parseSecaoSimplesRegex(texto, titulo), `${titulo} em ${JSON.stringify(texto)}`);
+        }
+    }
+});
+
+test('textoAPartirDe preserva o resultado dos regexes de seção', () => {
+    const casos = [
+        ['HDA', /HDA:\s*([\s\S]*?)(?=HPP:|Admissão emergência:)/],
+        ['HF', /HF:\s*([\s\S]*?)(?=HSE:)/],
+        ['Diurese', /Diurese:\s*([\s\S]*?)(?=BH 24 h?:|Balan[çc]o h[íi]drico:|Exame F[íi]sico:|AO EXAME|Conduta:|$)/i],
+        ['Evolução médica', /Evolução médica:\s*([\s\S]*?)(?=Controle 24 h:|Controle 24h:|Exame F[íi]sico:|AO EXAME|Conduta:)/i]
+    ];
+    const textos = [
+        EVOLUCAO,
+        'hda: minúsculo\nHDA: maiúsculo\nHPP: nega\nhf: x\nHF: y\nHSE: z',
+        'EVOLUÇÃO MÉDICA: estável\nDIURESE: presente\nConduta: manter',
+        'sem nenhuma seção'
+    ];
+
+    for (const texto of textos) {
+        const secoes = tokenizarSecoes(texto);
+        for (const [titulo, regex] of casos) {
+            const esperado = (texto.match(regex) || [])[1] || '';
+            const trecho = textoAPartirDe(secoes, titulo);
+            const obtido = trecho === null ? '' : ((trecho.match(regex) || [])[1] || '');
+            assert.strictEqual(obtido, esperado, `${titulo} em ${JSON.stringify(texto)}`);
+        }
+    }
+});
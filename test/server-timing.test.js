@@ -0,0 +1,114 @@
+/**
+ * Testes da medição por requisição e das métricas (src/core/medicao.js,
+ * src/core/metricas.js, api/middleware/server-timing.js).
+ *
+ * Cobre:
+ *  1. medir — soma por span (síncrono, assíncrono, com erro), contexto atravessando awaits,
+ *     nada registrado fora de uma requisição
+ *  2. http-client — span hicd na medição de quem pediu, mesmo com a tarefa rodando pela fila
+ *     do limitador; histograma por endpoint do HICD sem query string
+ *  3. Histograma — buckets cumulativos, _sum/_count e rótulos escapados no texto do Prometheus
+ *  4. Middleware — Server-Timing quando os cabeçalhos saem (com serialização) e histograma por rota
+ *
+ * Runner: node --test (Node >= 18). Sem dependências externas nem rede.
+ */
+const { test } = require('node:test');
+const assert = require('node:assert');
+const { EventEmitter } = require('events');
+
+const { Medicao, executarMedindo, medicaoAtual, medir } = require('../src/core/medicao');
+const { Histograma, Metricas } = require('../src/core/metricas');
+const { medirRequisicao } = require('../api/middleware/server-timing');
+const HICDHttpClient = require('../src/core/http-client');
+
+const esperar = (ms) => new Promise(r => setTimeout(r, ms));
+
+test('medir soma por span e só dentro de uma requisição', async () => {
+    const medicao = new Medicao();
+    await executarMedindo(medicao, async () => {
+        medir('parse', () => 1);
+        await esperar(1);
+        // O contexto sobrevive aos awaits
+        assert.strictEqual(medicaoAtual(), medicao);
+        await medir('hicd', () => esperar(5));
+        await assert.rejects(medir('hicd', async () => { throw new Error('falhou'); }), /falhou/);
+        assert.throws(() => medir('parse', () => { throw new Error('sync'); }), /sync/);
+    });
+
+    assert.strictEqual(medicao.spans.get('parse').vezes, 2);
+    assert.strictEqual(medicao.spans.get('hicd').vezes, 2);
+    assert.ok(medicao.spans.get('hicd').ms >= 4);
+    assert.match(medicao.serverTiming(), /^parse;dur=\d+\.\d;desc="2x", hicd;dur=\d+\.\d;desc="2x", total;dur=\d+\.\d$/);
+
+    // Fora de uma requisição: só o callback das métricas
+    let duracao = null;
+    assert.strictEqual(medicaoAtual(), undefined);
+    assert.strictEqual(medir('cache', () => 'ok', (ms) => { duracao = ms; }), 'ok');
+    assert.ok(duracao >= 0);
+});
+
+test('requisição ao HICD entra na medição de quem pediu, mesmo via fila do limitador', async () => {
+    const cliente = new HICDHttpClient({ origin: 'http://hicd.teste', auth: {} });
+    cliente.client = { get: async () => { await esperar(3); return { data: 'ok' }; } };
+    const histograma = Metricas.compartilhado.hicd;
+    const antes = (histograma.series.get(JSON.stringify(['GET', '/hicd/exames.php'])) || { total: 0 }).total;
+
+    const [a, b] = [new Medicao(), new Medicao()];
+    await Promise.all([
+        executarMedindo(a, () => cliente.get('/hicd/exames.php?prontuario=1')),
+        executarMedindo(b, () => Promise.all([
+            cliente.get('http://hicd.teste/hicd/exames.php?prontuario=2'),
+            cliente.get('/hicd/exames.php?prontuario=3')
+        ]))
+    ]);
+
+    assert.strictEqual(a.spans.get('hicd').vezes, 1);
+    assert.strictEqual(b.spans.get('hicd').vezes, 2);
+    assert.strictEqual(b.spans.get('hicd-fila').vezes, 2);
+    assert.strictEqual(histograma.series.get(JSON.stringify(['GET', '/hicd/exames.php'])).total, antes + 3);
+});
+
+test('histograma no formato texto do Prometheus', () => {
+    const histograma = new Histograma('teste_seconds', 'Ajuda', ['route'], [0.1, 1]);
+    histograma.observar(['/a'], 0.05);
+    histograma.observar(['/a'], 0.5);
+    histograma.observar(['/a'], 3);
+    histograma.observar(['x"y'], 0.1);
+
+    const linhas = histograma.texto().split('\n');
+    assert.deepStrictEqual(linhas.slice(0, 7), [
+        '# HELP teste_seconds Ajuda',
+        '# TYPE teste_seconds histogram',
+        'teste_seconds_bucket{route="/a",le="0.1"} 1',
+        'teste_seconds_bucket{route="/a",le="1"} 2',
+        'teste_seconds_bucket{route="/a",le="+Inf"} 3',
+        'teste_seconds_sum{route="/a"} 3.55',
+        'teste_seconds_count{route="/a"} 3'
+    ]);
+    assert.ok(linhas.includes('teste_seconds_bucket{route="x\\"y",le="0.1"} 1'));
+    assert.match(Metricas.compartilhado.paraPrometheus(), /# TYPE hicd_cache_lookups_total counter/);
+});
+
+test('middleware escreve Server-Timing nos cabeçalhos e mede a rota', async () => {
+    const req = { method: 'GET', baseUrl: '/api/pacientes', route: { path: '/:prontuario/exames' } };
+    const res = new EventEmitter();
+    const cabecalhos = {};
+    Object.assign(res, {
+        statusCode: 200,
+        headersSent: false,
+        setHeader(nome, valor) { cabecalhos[nome] = valor; },
+        writeHead() { this.headersSent = true; },
+        json(corpo) { this.writeHead(200); this.corpo = JSON.stringify(corpo); }
+    });
+
+    await new Promise(resolve => medirRequisicao(req, res, async () => {
+        await medir('hicd', () => esperar(2));
+        res.json({ ok: true });
+        resolve();
+    }));
+    res.emit('finish');
+
+    assert.match(cabecalhos['Server-Timing'], /^hicd;dur=\d+\.\d;desc="1x", serializacao;dur=\d+\.\d;desc="1x", total;dur=/);
+    const serie = Metricas.compartilhado.requisicoes.series.get(JSON.stringify(['GET', '/api/pacientes/:prontuario/exames', '200']));
+    assert.strictEqual(serie.total, 1);
+});
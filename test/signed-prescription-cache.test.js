@@ -0,0 +1,55 @@
+/**
+ * Testes do cache de detalhes de prescrições assinadas (src/services/signed-prescription-cache.js).
+ *
+ * Cobre:
+ *  1. Só guarda detalhes com cabecalho.dataAssinatura; acerto conta busca evitada
+ *  2. Chave por host + id (mesmo id em outro host não acerta)
+ *  3. Limite de entradas descarta a menos usada
+ *
+ * Runner: node --test (Node >= 18). Sem dependências externas nem rede.
+ */
+const { test } = require('node:test');
+const assert = require('node:assert');
+
+const SignedPrescriptionCache = require('../src/services/signed-prescription-cache');
+
+const assinada = (id) => ({ id, cabecalho: { dataAssinatura: '05/09/2026 10:12', medico: 'DRA ANA' }, itens: [] });
+const pendente = (id) => ({ id, cabecalho: { medico: 'DRA ANA' }, itens: [] });
+
+test('guarda só prescrição assinada e conta as buscas evitadas', () => {
+    const cache = new SignedPrescriptionCache();
+
+    assert.strictEqual(cache.registrar('hicd', '10', pendente('10')), false);
+    assert.strictEqual(cache.registrar('hicd', '11', null), false);
+    assert.strictEqual(cache.obter('hicd', '10'), null);
+
+    const detalhes = assinada('12');
+    assert.strictEqual(cache.registrar('hicd', '12', detalhes), true);
+    assert.strictEqual(cache.obter('hicd', '12'), detalhes);
+    assert.strictEqual(cache.obter('hicd', '12'), detalhes);
+
+    assert.deepStrictEqual(cache.getStats(), {
+        entradas: 1, maxEntradas: cache.maxEntradas, buscasEvitadas: 2, buscasRealizadas: 3, armazenadas: 1
+    });
+});
+
+test('chave inclui o host', () => {
+    const cache = new SignedPrescriptionCache();
+    cache.registrar('hicd-a', '12', assinada('12'));
+
+    assert.ok(cache.obter('hicd-a', '12'));
+    assert.strictEqual(cache.obter('hicd-b', '12'), null);
+});
+
+test('limite de entradas descarta a menos usada', () => {
+    const cache = new SignedPrescriptionCache({ maxEntradas: 2 });
+    cache.registrar('hicd', '1', assinada('1'));
+    cache.registrar('hicd', '2', assinada('2'));
+    cache.obter('hicd', '1');
+    cache.registrar('hicd', '3', assinada('3'));
+
+    assert.ok(cache.obter('hicd', '1'));
+    assert.strictEqual(cache.obter('hicd', '2'), null);
+    assert.ok(cache.obter('hicd', '3'));
+    assert.strictEqual(cache.getStats().entradas, 2);
+});